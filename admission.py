@@ -0,0 +1,298 @@
+"""
+Admission control untuk route upload (dan route tulis lain).
+
+Setiap request POST/PUT/PATCH/DELETE dicocokkan ke satu Gate berdasarkan
+prefix path. Gate membatasi:
+    - jumlah request yang diproses bersamaan (max_concurrent)
+    - panjang antrian tunggu (max_queue) dan lama menunggu (queue_timeout)
+    - total byte body yang sedang diterima (byte_budget), diambil dari
+      Content-Length; request tanpa Content-Length dihitung sebesar max_body
+    - ukuran body satu request (max_body), dicek juga saat body dibaca
+
+Kalau antrian penuh atau waktu tunggu habis, request langsung dijawab 503
+dengan header Retry-After sebelum body-nya dibaca, jadi file tidak sempat
+ditampung di memori/disk dan koneksi database tidak dipakai. Route GET
+(dashboard, laporan, feed) tidak lewat gate sama sekali.
+
+Gate per proses (seperti live_feed): dengan N worker, batas efektifnya N kali
+lipat. Statistik bisa dilihat di /api/admission. Set ADMISSION_DISABLED=1
+untuk mematikan.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import serializers
+
+MB = 1024 * 1024
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@dataclass
+class Policy:
+    max_concurrent: int
+    max_queue: int
+    byte_budget: int
+    max_body: int
+    queue_timeout: float = 5.0
+    retry_after: int = 2          # detik minimum untuk Retry-After
+
+
+# nama gate -> (policy, prefix path). Dicocokkan berurutan; "tulis" menangkap sisanya.
+POLICIES = {
+    "video": (Policy(max_concurrent=4, max_queue=16, byte_budget=1024 * MB, max_body=512 * MB,
+                     queue_timeout=10.0, retry_after=5),
+              ("/sebelum-loading", "/sesudah-loading", "/api/uploads/")),
+    "foto": (Policy(max_concurrent=8, max_queue=32, byte_budget=256 * MB, max_body=32 * MB),
+             ("/skid-keluar-", "/laporan/kirim-", "/laporan/bongkar-",
+              "/api/pembayaran-agen", "/agen/edit/")),
+    "tulis": (Policy(max_concurrent=16, max_queue=64, byte_budget=64 * MB, max_body=16 * MB),
+              ("/",)),
+}
+
+
+def _format_size(nbytes: int) -> str:
+    return f"{nbytes // MB} MB" if nbytes >= MB else f"{nbytes} byte"
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: Optional[int] = None):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+# ================== GATE ==================
+class Gate:
+    def __init__(self, name: str, policy: Policy):
+        self.name = name
+        self.policy = policy
+        self.active = 0
+        self.bytes_in_flight = 0
+        self._waiters = deque()          # (future, nbytes)
+        # statistik
+        self.admitted = 0
+        self.rejected = {"antrian_penuh": 0, "timeout": 0, "terlalu_besar": 0}
+        self.max_queue_seen = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._service_ewma = 1.0         # detik per request, untuk Retry-After
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _fits(self, nbytes: int) -> bool:
+        return (self.active < self.policy.max_concurrent
+                and self.bytes_in_flight + nbytes <= self.policy.byte_budget)
+
+    def _take(self, nbytes: int):
+        self.active += 1
+        self.bytes_in_flight += nbytes
+        self.admitted += 1
+
+    def retry_after(self) -> int:
+        """Perkiraan kapan antrian kosong, minimal policy.retry_after"""
+        estimate = self._service_ewma * (self.queued + 1) / self.policy.max_concurrent
+        return max(self.policy.retry_after, min(60, math.ceil(estimate)))
+
+    async def acquire(self, nbytes: int):
+        if nbytes > self.policy.max_body:
+            self.rejected["terlalu_besar"] += 1
+            raise Rejected(413, f"Ukuran body melebihi batas {_format_size(self.policy.max_body)}")
+        if not self._waiters and self._fits(nbytes):
+            self._take(nbytes)
+            return
+        if self.queued >= self.policy.max_queue:
+            self.rejected["antrian_penuh"] += 1
+            raise Rejected(503, "Server sedang sibuk, antrian upload penuh", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, nbytes)
+        self._waiters.append(entry)
+        self.max_queue_seen = max(self.max_queue_seen, self.queued)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.policy.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                return self._record_wait(started)   # diterima tepat saat timeout
+            self._remove(entry)
+            self.rejected["timeout"] += 1
+            raise Rejected(503, "Server sedang sibuk, coba lagi sebentar", self.retry_after())
+        except asyncio.CancelledError:
+            # Client putus saat menunggu; kembalikan slot kalau sempat diberikan
+            if future.done() and not future.cancelled():
+                self.release(nbytes)
+            else:
+                self._remove(entry)
+            raise
+        self._record_wait(started)
+
+    def _record_wait(self, started: float):
+        waited = time.perf_counter() - started
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def _remove(self, entry):
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+        entry[0].cancel()
+        self._wake()
+
+    def release(self, nbytes: int, service_time: float = None):
+        self.active -= 1
+        self.bytes_in_flight -= nbytes
+        if service_time is not None:
+            self._service_ewma = 0.8 * self._service_ewma + 0.2 * service_time
+        self._wake()
+
+    def _wake(self):
+        # FIFO: yang paling depan dilayani dulu supaya upload besar tidak kelaparan
+        while self._waiters:
+            future, nbytes = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(nbytes):
+                break
+            self._waiters.popleft()
+            self._take(nbytes)
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "aktif": self.active,
+            "antrian": self.queued,
+            "antrian_maks": self.max_queue_seen,
+            "byte_diproses": self.bytes_in_flight,
+            "diterima": self.admitted,
+            "ditolak": dict(self.rejected),
+            "tunggu_rata2_ms": round(self.wait_total / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "tunggu_maks_ms": round(self.wait_max * 1000, 1),
+            "durasi_ewma_ms": round(self._service_ewma * 1000, 1),
+            "batas": {
+                "bersamaan": self.policy.max_concurrent,
+                "antrian": self.policy.max_queue,
+                "byte": self.policy.byte_budget,
+                "body": self.policy.max_body,
+            },
+        }
+
+
+class AdmissionController:
+    def __init__(self, policies: dict = None):
+        policies = policies or POLICIES
+        self.gates = {name: Gate(name, policy) for name, (policy, _) in policies.items()}
+        self._routes = [(prefix, self.gates[name]) for name, (_, prefixes) in policies.items()
+                        for prefix in prefixes]
+
+    def gate_for(self, method: str, path: str) -> Optional[Gate]:
+        if method not in WRITE_METHODS:
+            return None
+        for prefix, gate in self._routes:
+            if path.startswith(prefix):
+                return gate
+        return None
+
+    def stats(self) -> dict:
+        return {name: gate.stats() for name, gate in self.gates.items()}
+
+
+controller = AdmissionController()
+
+
+# ================== MIDDLEWARE ==================
+def _content_length(scope) -> Tuple[Optional[int], bool]:
+    for key, value in scope.get("headers", ()):
+        if key == b"content-length":
+            try:
+                return int(value), True
+            except ValueError:
+                return None, True
+    return None, False
+
+
+async def _send_rejection(send, error: Rejected):
+    headers = [(b"content-type", b"application/json")]
+    if error.retry_after is not None:
+        headers.append((b"retry-after", str(error.retry_after).encode()))
+    body = serializers.dumps({"detail": error.reason})
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": error.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """ASGI murni; harus jadi middleware terluar supaya menolak sebelum apa pun jalan"""
+
+    def __init__(self, app, controller: AdmissionController = controller):
+        self.app = app
+        self.controller = controller
+        self.enabled = os.getenv("ADMISSION_DISABLED") != "1"
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        gate = self.controller.gate_for(scope["method"], scope["path"])
+        if gate is None:
+            return await self.app(scope, receive, send)
+
+        length, has_length = _content_length(scope)
+        if has_length and length is None:
+            return await _send_rejection(send, Rejected(400, "Content-Length tidak valid"))
+        nbytes = length if length is not None else gate.policy.max_body
+        try:
+            await gate.acquire(nbytes)
+        except Rejected as e:
+            return await _send_rejection(send, e)
+
+        max_body = gate.policy.max_body if length is None else length
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    too_large = True
+                    raise BodyTooLarge()
+            return message
+
+        async def checked_send(message):
+            # FastAPI mengubah error saat parsing body jadi 400; ganti dengan 413
+            nonlocal response_started
+            if too_large:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await _send_rejection(send, Rejected(413, f"Ukuran body melebihi batas {_format_size(max_body)}"))
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, limited_receive, checked_send)
+        except BodyTooLarge:
+            if not response_started:
+                response_started = True
+                await _send_rejection(send, Rejected(413, f"Ukuran body melebihi batas {_format_size(max_body)}"))
+        finally:
+            if too_large:
+                gate.rejected["terlalu_besar"] += 1
+            gate.release(nbytes, time.perf_counter() - started)
@@ -0,0 +1,444 @@
+"""
+Cache analitik kolumnar di memori untuk grafik manajemen.
+
+Setiap sumber (laporan kirim, bongkar, sebelum loading, skid keluar depot,
+produksi selesai, pembayaran agen) disimpan sebagai kumpulan array NumPy:
+
+    - id            int64
+    - tanggal       datetime64[D]
+    - kolom angka   float64 (NULL -> NaN)
+    - kolom teks    int32, dictionary-encoded (nilai -> kode urut kemunculan)
+
+Refresh inkremental memakai watermark id: hanya baris dengan id > id terakhir
+yang diambil (SELECT kolom saja, tanpa objek ORM) lalu di-append ke array.
+Refresh hanya dijalankan kalau versi tabel di cache bersama berubah; kalau
+versi "<tabel>:update" berubah (ada update/delete), tabel dimuat ulang penuh.
+
+Query group-by dikerjakan vektor: kode tiap kolom kelompok digabung jadi satu
+kunci int64, np.unique(return_inverse) memberi nomor grup, lalu sum/count/mean
+pakai np.bincount dan persentil/min/maks pakai satu lexsort.
+
+Cache ini per proses (tiap worker punya salinan sendiri). Watermark id
+disimpan per database (shard site punya urutan id sendiri) dan mengandalkan
+id yang naik sesuai urutan commit, seperti SQLite yang menulis serial.
+"""
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import inspect, select
+
+import cache
+import models
+import sharding
+from database import ReadSessionLocal
+
+AGREGASI = ("sum", "count", "mean", "min", "max", "percentile")
+INITIAL_CAPACITY = 1024
+FETCH_BATCH = 50_000
+
+
+# ================== SUMBER ==================
+class Source:
+    """Kolom yang dimuat dari satu model"""
+
+    def __init__(self, model, date_column: str, numeric: Sequence[str], categorical: Sequence[str],
+                 derived: Optional[Dict[str, tuple]] = None):
+        self.model = model
+        self.table = model.__tablename__
+        self.date_column = date_column
+        self.numeric = tuple(numeric)
+        self.categorical = tuple(categorical)
+        # kolom turunan: nama -> (kolom_a, kolom_b), disimpan sebagai a * b
+        self.derived = derived or {}
+
+    @property
+    def metrics(self) -> tuple:
+        return self.numeric + tuple(self.derived)
+
+    def statement(self, after_id: int):
+        m = self.model
+        columns = [m.id, getattr(m, self.date_column)]
+        columns += [getattr(m, c) for c in self.numeric + self.categorical]
+        return select(*columns).where(m.id > after_id).order_by(m.id)
+
+
+SOURCES = {
+    "kirim": Source(models.LaporanKirim, "tanggal",
+                    ("kapasitas", "jumlah_dibawa", "jumlah_turun"),
+                    ("lokasi", "nama_driver", "jenis_tabung")),
+    "bongkar": Source(models.LaporanBongkar, "tanggal",
+                      ("jumlah_terbawa", "jumlah_turun", "sisa_dibawa", "jumlah_kosong"),
+                      ("lokasi", "nama_driver", "jenis_tabung")),
+    "loading": Source(models.SebelumLoading, "tanggal",
+                      ("netto_spa", "rotogen_kanan", "rotogen_kiri"),
+                      ("nama_driver",)),
+    "skid_keluar": Source(models.SkidKeluarDepot, "tanggal",
+                          ("jumlah_spa",),
+                          ("nama_driver",)),
+    "produksi": Source(models.ProduksiSelesai, "tanggal",
+                       ("tabung_kosong", "tabung_12", "tabung_50"),
+                       ("kepala_produksi",)),
+    "pembayaran": Source(models.PembayaranAgen, "tanggal_pengiriman",
+                         ("harga_pertabung", "jumlah_turun"),
+                         ("nama_agen", "nama_driver", "jenis_tabung", "status"),
+                         derived={"nilai": ("harga_pertabung", "jumlah_turun")}),
+}
+
+
+# ================== TABEL KOLUMNAR ==================
+class ColumnarTable:
+    """
+    Array per kolom dengan kapasitas yang digandakan saat penuh.
+
+    Append menulis di belakang n lalu menaikkan n; snapshot() mengembalikan
+    view [:n], jadi pembaca yang sedang jalan tidak melihat baris setengah
+    jadi. Saat kapasitas digandakan, array lama tetap utuh untuk pembaca lama.
+    """
+
+    def __init__(self, source: Source):
+        self.source = source
+        self.n = 0
+        self.last_ids: Dict[str, int] = {}   # watermark id per database (shard punya id sendiri)
+        self.capacity = 0
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, List[str]] = {c: [] for c in source.categorical}
+        self.codes: Dict[str, Dict[str, int]] = {c: {} for c in source.categorical}
+        self._lock = threading.Lock()
+        self._allocate(INITIAL_CAPACITY)
+
+    def _dtypes(self) -> Dict[str, str]:
+        dtypes = {"id": "int64", "tanggal": "datetime64[D]"}
+        dtypes.update({c: "float64" for c in self.source.metrics})
+        dtypes.update({c: "int32" for c in self.source.categorical})
+        return dtypes
+
+    def _allocate(self, capacity: int):
+        arrays = {}
+        for name, dtype in self._dtypes().items():
+            arr = np.empty(capacity, dtype=dtype)
+            if name in self.arrays:
+                arr[:self.n] = self.arrays[name][:self.n]
+            arrays[name] = arr
+        self.arrays = arrays
+        self.capacity = capacity
+
+    def _encode(self, column: str, raw: Iterable) -> np.ndarray:
+        lookup, values = self.codes[column], self.values[column]
+        out = []
+        for v in raw:
+            code = lookup.get(v)
+            if code is None:
+                code = lookup[v] = len(values)
+                values.append(v)
+            out.append(code)
+        return np.array(out, dtype=np.int32)
+
+    def append(self, rows: list, target: str = "global"):
+        """rows: tuple (id, tanggal, *angka, *teks) sesuai Source.statement()"""
+        if not rows:
+            return
+        self.last_ids[target] = rows[-1][0]
+        src = self.source
+        count = len(rows)
+        columns = list(zip(*rows))
+        batch = {
+            "id": np.array(columns[0], dtype=np.int64),
+            "tanggal": np.array(columns[1], dtype="datetime64[D]"),
+        }
+        offset = 2
+        for name in src.numeric:
+            batch[name] = np.array(columns[offset], dtype=np.float64)  # None -> NaN
+            offset += 1
+        for name, (a, b) in src.derived.items():
+            batch[name] = batch[a] * batch[b]
+        with self._lock:
+            for name in src.categorical:
+                batch[name] = self._encode(name, columns[offset])
+                offset += 1
+            if self.n + count > self.capacity:
+                capacity = self.capacity
+                while capacity < self.n + count:
+                    capacity *= 2
+                self._allocate(capacity)
+            for name, arr in batch.items():
+                self.arrays[name][self.n:self.n + count] = arr
+            self.n += count
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            n = self.n
+            return {
+                "n": n,
+                "arrays": {name: arr[:n] for name, arr in self.arrays.items()},
+                "values": {c: list(v) for c, v in self.values.items()},
+                "codes": {c: dict(v) for c, v in self.codes.items()},
+            }
+
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in self.arrays.values())
+
+
+# ================== AGREGASI (VEKTOR) ==================
+DENSE_GROUP_LIMIT = 1 << 20   # kunci gabungan sampai sebesar ini dipakai langsung sebagai indeks bincount
+
+
+def _take(arr: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+    return arr if mask is None else arr[mask]
+
+
+def _group_keys(snap: dict, keys: Sequence[str], mask: Optional[np.ndarray]):
+    """Kode padat (0..k-1) per kolom kelompok untuk baris ter-mask + label tiap kode"""
+    arrays = snap["arrays"]
+    parts = []
+    for key in keys:
+        if key in ("tanggal", "bulan"):
+            unit = "D" if key == "tanggal" else "M"
+            days = _take(arrays["tanggal"], mask).astype(f"datetime64[{unit}]").astype(np.int64)
+            low = int(days.min()) if len(days) else 0
+            high = int(days.max()) if len(days) else -1
+            codes = days - low
+            # rentang tanggal dianggap kategori: tanpa sort, label dibuat saat decode
+            labels = _DateLabels(low, high - low + 1, unit)
+        else:
+            codes = _take(arrays[key], mask).astype(np.int64)
+            labels = snap["values"][key]
+        parts.append((key, codes, labels))
+    return parts
+
+
+class _DateLabels:
+    def __init__(self, low: int, size: int, unit: str):
+        self.low, self.size, self.unit = low, size, unit
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, code: int) -> str:
+        return str(np.datetime64(self.low + code, self.unit))
+
+
+def _percentile_sorted(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, p: float) -> np.ndarray:
+    """Persentil interpolasi linier per grup; values sudah urut di dalam tiap grup"""
+    pos = starts + (counts - 1) * (p / 100.0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    frac = pos - lo
+    return values[lo] + (values[hi] - values[lo]) * frac
+
+
+def aggregate(snap: dict, metric: Optional[str], agg: str, keys: Sequence[str],
+              mask: Optional[np.ndarray], p: float = 50.0) -> List[dict]:
+    """mask None = semua baris (tanpa salinan array)"""
+    arrays = snap["arrays"]
+    rows = snap["n"] if mask is None else int(np.count_nonzero(mask))
+    parts = _group_keys(snap, keys, mask)
+
+    # Gabungkan kode semua kolom kelompok jadi satu kunci int64
+    combined = np.zeros(rows, dtype=np.int64)
+    space = 1
+    for _, codes, labels in parts:
+        base = max(len(labels), 1)
+        combined = combined * base + codes
+        space *= base
+    dense = space <= max(DENSE_GROUP_LIMIT, 4 * rows)
+    if dense:
+        # Ruang kunci kecil: kunci langsung jadi nomor grup, grup kosong dibuang di akhir
+        inverse, size = combined, space
+    else:
+        groups, inverse = np.unique(combined, return_inverse=True)
+        inverse, size = inverse.reshape(-1), len(groups)
+
+    values = np.ones(rows) if metric is None else _take(arrays[metric], mask)
+    valid = ~np.isnan(values)
+    all_valid = bool(valid.all())
+    g = inverse if all_valid else inverse[valid]
+    v = values if all_valid else values[valid]
+    counts = np.bincount(g, minlength=size)
+
+    if agg == "count":
+        result = counts.astype(np.float64)
+    elif agg in ("sum", "mean"):
+        sums = np.bincount(g, weights=v, minlength=size)
+        if agg == "sum":
+            result = sums
+        else:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result = sums / counts
+    else:
+        q = {"min": 0.0, "max": 100.0}.get(agg, p)
+        order = np.lexsort((v, g))
+        starts = np.zeros(size, dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        result = np.full(size, np.nan)
+        has = counts > 0
+        if has.any():
+            result[has] = _percentile_sorted(v[order], starts[has], counts[has], q)
+
+    # Hanya grup yang punya baris (setelah filter); jumlah_baris = baris dengan nilai
+    if dense:
+        present = counts > 0 if all_valid else np.bincount(inverse, minlength=size) > 0
+        groups = np.flatnonzero(present)
+        result, counts = result[present], counts[present]
+    # Pecah kunci gabungan kembali jadi label per kolom
+    decoded = {}
+    rest = groups.astype(np.int64)
+    for key, _, labels in reversed(parts):
+        rest, codes = np.divmod(rest, max(len(labels), 1))
+        decoded[key] = [labels[c] for c in codes.tolist()]
+
+    hasil = []
+    for i, value in enumerate(result.tolist()):
+        row = {key: decoded[key][i] for key in keys}
+        row["nilai"] = None if value != value else round(value, 4)
+        row["jumlah_baris"] = int(counts[i])
+        hasil.append(row)
+    return hasil
+
+
+# ================== CACHE ==================
+class AnalyticsCache:
+    def __init__(self, session_factory=ReadSessionLocal):
+        self.session_factory = session_factory
+        self.tables: Dict[str, ColumnarTable] = {}
+        self._versions: Dict[str, tuple] = {}
+        self._refresh_locks = {name: threading.Lock() for name in SOURCES}
+        self.stats = {"refresh": 0, "reload": 0, "baris_dimuat": 0, "refresh_ms": 0.0}
+
+    def _current_versions(self, source: Source) -> Optional[tuple]:
+        try:
+            v = cache.get_cache().get_versions([source.table, f"{source.table}:update"])
+            return v[source.table], v[f"{source.table}:update"]
+        except Exception as e:
+            print(f"Error membaca versi cache {source.table}: {e}")
+            return None  # tidak tahu -> selalu cek baris baru
+
+    def refresh(self, name: str) -> ColumnarTable:
+        source = SOURCES[name]
+        with self._refresh_locks[name]:
+            versions = self._current_versions(source)
+            table = self.tables.get(name)
+            if table is not None and versions is not None and self._versions.get(name) == versions:
+                return table
+
+            start = time.perf_counter()
+            previous = self._versions.get(name)
+            if table is None or versions is None or previous is None or previous[1] != versions[1]:
+                # Baru pertama kali, atau ada update/delete: muat ulang penuh
+                if table is not None:
+                    self.stats["reload"] += 1
+                table = ColumnarTable(source)
+
+            db = self.session_factory()
+            try:
+                with sharding.sessions(db) as parts:
+                    for target, part in parts:
+                        # Core (bukan ORM): baris tuple langsung, tanpa lapisan loading ORM
+                        stmt = source.statement(table.last_ids.get(target, 0))
+                        result = part.connection(bind_arguments={"mapper": inspect(source.model)}).execute(stmt)
+                        while True:
+                            rows = result.fetchmany(FETCH_BATCH)
+                            if not rows:
+                                break
+                            table.append(rows, target)
+                            self.stats["baris_dimuat"] += len(rows)
+            finally:
+                db.close()
+
+            # Versi dibaca sebelum SELECT: tulisan selama load memicu refresh berikutnya
+            self.tables[name] = table
+            self._versions[name] = versions
+            self.stats["refresh"] += 1
+            self.stats["refresh_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            return table
+
+    def query(self, sumber: str, metrik: Optional[str], agregasi: str = "sum",
+              kelompok: Sequence[str] = (), dari: Optional[date] = None, sampai: Optional[date] = None,
+              filters: Optional[Dict[str, str]] = None, persentil: float = 50.0) -> dict:
+        if sumber not in SOURCES:
+            raise ValueError(f"Sumber tidak dikenal, pilih salah satu: {', '.join(SOURCES)}")
+        source = SOURCES[sumber]
+        if agregasi not in AGREGASI:
+            raise ValueError(f"Agregasi tidak dikenal, pilih salah satu: {', '.join(AGREGASI)}")
+        if metrik is None and agregasi != "count":
+            raise ValueError("Metrik wajib diisi kecuali agregasi count")
+        if metrik is not None and metrik not in source.metrics:
+            raise ValueError(f"Metrik untuk {sumber}: {', '.join(source.metrics)}")
+        for key in kelompok:
+            if key not in source.categorical + ("tanggal", "bulan"):
+                raise ValueError(f"Kelompok untuk {sumber}: {', '.join(source.categorical + ('tanggal', 'bulan'))}")
+        if not 0 <= persentil <= 100:
+            raise ValueError("Persentil harus antara 0 dan 100")
+
+        snap = self.refresh(sumber).snapshot()
+        start = time.perf_counter()
+        arrays = snap["arrays"]
+        mask = None
+        if dari or sampai or filters:
+            mask = np.ones(snap["n"], dtype=bool)
+        if dari:
+            mask &= arrays["tanggal"] >= np.datetime64(dari, "D")
+        if sampai:
+            mask &= arrays["tanggal"] <= np.datetime64(sampai, "D")
+        for column, value in (filters or {}).items():
+            if column not in source.categorical:
+                raise ValueError(f"Filter untuk {sumber}: {', '.join(source.categorical)}")
+            code = snap["codes"][column].get(value)
+            if code is None:
+                mask[:] = False
+            else:
+                mask &= arrays[column] == code
+
+        hasil = aggregate(snap, metrik, agregasi, list(kelompok), mask, persentil)
+        return {
+            "sumber": sumber,
+            "metrik": metrik,
+            "agregasi": agregasi,
+            "kelompok": list(kelompok),
+            "baris": snap["n"] if mask is None else int(np.count_nonzero(mask)),
+            "waktu_ms": round((time.perf_counter() - start) * 1000, 3),
+            "hasil": hasil,
+        }
+
+    def status(self) -> dict:
+        return {
+            "tabel": {
+                name: {"baris": t.n, "last_id": t.last_ids, "kapasitas": t.capacity, "bytes": t.nbytes(),
+                       "kategori": {c: len(v) for c, v in t.values.items()}}
+                for name, t in self.tables.items()
+            },
+            **self.stats,
+        }
+
+    def clear(self):
+        for lock in self._refresh_locks.values():
+            lock.acquire()
+        try:
+            self.tables.clear()
+            self._versions.clear()
+        finally:
+            for lock in self._refresh_locks.values():
+                lock.release()
+
+
+store = AnalyticsCache()
+
+
+# ================== GRAFIK SIAP PAKAI ==================
+PRESETS = {
+    # tabung yang dikirim per hari per lokasi
+    "tabung-harian": dict(sumber="kirim", metrik="jumlah_dibawa", agregasi="sum", kelompok=("tanggal", "lokasi")),
+    # netto SPA per driver (sebelum loading)
+    "spa-driver": dict(sumber="loading", metrik="netto_spa", agregasi="sum", kelompok=("nama_driver",)),
+    # nilai pembayaran (harga x jumlah turun) per agen
+    "pembayaran-agen": dict(sumber="pembayaran", metrik="nilai", agregasi="sum", kelompok=("nama_agen",)),
+}
+
+
+def preset(name: str, dari: Optional[date] = None, sampai: Optional[date] = None,
+           filters: Optional[Dict[str, str]] = None) -> dict:
+    if name not in PRESETS:
+        raise ValueError(f"Grafik tidak dikenal, pilih salah satu: {', '.join(PRESETS)}")
+    return store.query(dari=dari, sampai=sampai, filters=filters, **PRESETS[name])
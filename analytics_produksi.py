@@ -0,0 +1,176 @@
+"""
+Analitik throughput produksi per shift dari ProduksiMulai/ProduksiSelesai.
+
+Pemasangan mulai/selesai dilakukan di SQL (set-based): kedua tabel digabung
+menjadi satu aliran event per kepala_produksi yang diurutkan berdasarkan
+(tanggal, jam), lalu setiap mulai dipasangkan dengan event berikutnya (LEAD)
+kalau event itu selesai. Selesai shift malam yang bertanggal D+1 ikut
+terpasang. Hasil join diambil sebagai tuple kolom (bukan objek ORM) dan semua
+perhitungan tabung per jam, tren dan outlier dikerjakan dengan array NumPy.
+"""
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+import models
+
+JENIS_TABUNG = ("tabung_12", "tabung_50", "tabung_kosong")
+OUTLIER_THRESHOLD = 3.5   # batas robust z-score (median/MAD)
+
+
+# ================== PAIRING (SQL) ==================
+def _paired_rows(db: Session, dari: date, sampai: date) -> list:
+    PM, PS = models.ProduksiMulai, models.ProduksiSelesai
+
+    # Satu aliran event per kepala produksi (tanpa partisi tanggal supaya
+    # selesai shift malam yang bertanggal D+1 ikut terlihat). Pada jam yang
+    # sama, mulai diurutkan sebelum selesai.
+    events = union_all(
+        select(PM.kepala_produksi.label("kepala_produksi"), PM.tanggal.label("tanggal"),
+               PM.jam_mulai.label("jam"), literal(0).label("jenis"), PM.id.label("id"))
+        .where(PM.tanggal >= dari, PM.tanggal <= sampai),
+        select(PS.kepala_produksi, PS.tanggal, PS.jam_selesai, literal(1), PS.id)
+        .where(PS.tanggal >= dari, PS.tanggal <= sampai + timedelta(days=1)),
+    ).subquery()
+
+    order = (events.c.tanggal, events.c.jam, events.c.jenis, events.c.id)
+    stream = select(
+        events.c.jenis,
+        events.c.id,
+        func.lead(events.c.jenis).over(partition_by=events.c.kepala_produksi, order_by=order).label("next_jenis"),
+        func.lead(events.c.id).over(partition_by=events.c.kepala_produksi, order_by=order).label("next_id"),
+    ).subquery()
+
+    # Mulai dipasangkan dengan event berikutnya kalau event itu selesai
+    # (belum didahului mulai lain); batas 24 jam dicek di throughput()
+    return db.query(
+        PM.id, PS.id, PM.kepala_produksi, PM.tanggal, PM.shift, PM.jam_mulai, PS.jam_selesai,
+        PS.tabung_12, PS.tabung_50, PS.tabung_kosong, PS.tanggal,
+    ).select_from(stream).join(
+        PM, PM.id == stream.c.id
+    ).join(
+        PS, PS.id == stream.c.next_id
+    ).filter(stream.c.jenis == 0, stream.c.next_jenis == 1).all()
+
+
+def _to_arrays(rows: list) -> dict:
+    """Ubah tuple hasil join menjadi array kolom"""
+    n = len(rows)
+    cols = list(zip(*rows)) if rows else [()] * 11
+    minutes = lambda ts: np.fromiter((t.hour * 60 + t.minute for t in ts), dtype=np.float64, count=n)
+    return {
+        "mulai_id": np.array(cols[0], dtype=np.int64),
+        "selesai_id": np.array(cols[1], dtype=np.int64),
+        "kepala_produksi": np.array(cols[2], dtype=object),
+        "tanggal": np.array(cols[3], dtype="datetime64[D]") if n else np.array([], dtype="datetime64[D]"),
+        "shift": np.array([s or "-" for s in cols[4]], dtype=object),
+        "mulai": minutes(cols[5]),
+        "selesai": minutes(cols[6]),
+        "tabung_12": np.array(cols[7], dtype=np.float64),
+        "tabung_50": np.array(cols[8], dtype=np.float64),
+        "tabung_kosong": np.array(cols[9], dtype=np.float64),
+        "tanggal_selesai": np.array(cols[10], dtype="datetime64[D]") if n else np.array([], dtype="datetime64[D]"),
+    }
+
+
+# ================== ENGINE ==================
+def throughput(db: Session, dari: Optional[date] = None, sampai: Optional[date] = None) -> dict:
+    """
+    Tabung per jam per shift dan per jenis, tren harian, dan daftar outlier.
+    Default 30 hari terakhir.
+    """
+    sampai = sampai or date.today()
+    dari = dari or (sampai - timedelta(days=30))
+    a = _to_arrays(_paired_rows(db, dari, sampai))
+
+    # Durasi dari tanggal+jam sebenarnya (selesai shift malam bertanggal D+1).
+    # Pasangan yang lebih dari 24 jam berarti ada mulai/selesai yang tidak
+    # diinput, jadi dibuang.
+    hari = (a["tanggal_selesai"] - a["tanggal"]).astype(np.int64)
+    durasi = a["selesai"] - a["mulai"] + hari * 24 * 60
+    valid = durasi < 24 * 60
+    a = {k: v[valid] for k, v in a.items()}
+    durasi = durasi[valid] / 60
+    total = a["tabung_12"] + a["tabung_50"] + a["tabung_kosong"]
+
+    return {
+        "dari": dari.isoformat(),
+        "sampai": sampai.isoformat(),
+        "jumlah_pasangan": int(len(durasi)),
+        "per_shift": _per_shift(a, durasi, total),
+        "tren_harian": _tren_harian(a, durasi, total),
+        "outlier": _outliers(a, durasi, total),
+    }
+
+
+def _rates(idx, n_groups, durasi, a, total) -> dict:
+    jam = np.bincount(idx, weights=durasi, minlength=n_groups)
+    safe_jam = np.where(jam > 0, jam, np.nan)
+    out = {"jam_kerja": jam, "jumlah_produksi": np.bincount(idx, minlength=n_groups)}
+    for jenis in JENIS_TABUNG:
+        out[jenis] = np.bincount(idx, weights=a[jenis], minlength=n_groups)
+        out[f"{jenis}_per_jam"] = out[jenis] / safe_jam
+    out["total_per_jam"] = np.bincount(idx, weights=total, minlength=n_groups) / safe_jam
+    return out
+
+
+def _rows_from(keys: dict, rates: dict) -> list:
+    n = len(next(iter(rates.values())))
+    result = []
+    for i in range(n):
+        row = {k: v[i] for k, v in keys.items()}
+        for k, v in rates.items():
+            value = v[i].item()
+            row[k] = None if value != value else round(value, 2)  # NaN -> None
+        result.append(row)
+    return result
+
+
+def _per_shift(a, durasi, total) -> list:
+    shifts, idx = np.unique(a["shift"].astype(str), return_inverse=True)
+    return _rows_from({"shift": shifts.tolist()}, _rates(idx, len(shifts), durasi, a, total))
+
+
+def _tren_harian(a, durasi, total) -> list:
+    if not len(durasi):
+        return []
+    # Grup gabungan (tanggal, shift)
+    keys = np.char.add(np.datetime_as_string(a["tanggal"]), "|" + a["shift"].astype(str))
+    groups, idx = np.unique(keys, return_inverse=True)
+    tanggal, shift = zip(*(g.split("|", 1) for g in groups.tolist()))
+    return _rows_from({"tanggal": list(tanggal), "shift": list(shift)},
+                      _rates(idx, len(groups), durasi, a, total))
+
+
+def _outliers(a, durasi, total) -> list:
+    """Produksi dengan tabung/jam jauh dari median shift-nya (robust z-score)"""
+    if not len(durasi):
+        return []
+    rate = total / np.where(durasi > 0, durasi, np.nan)
+    shifts, idx = np.unique(a["shift"].astype(str), return_inverse=True)
+
+    skor = np.zeros_like(rate)
+    for g in range(len(shifts)):
+        mask = idx == g
+        median = np.nanmedian(rate[mask])
+        mad = np.nanmedian(np.abs(rate[mask] - median))
+        if mad > 0:
+            skor[mask] = 0.6745 * (rate[mask] - median) / mad
+
+    hits = np.nonzero(np.abs(skor) > OUTLIER_THRESHOLD)[0]
+    return [
+        {
+            "mulai_id": int(a["mulai_id"][i]),
+            "selesai_id": int(a["selesai_id"][i]),
+            "kepala_produksi": a["kepala_produksi"][i],
+            "tanggal": str(a["tanggal"][i]),
+            "shift": a["shift"][i],
+            "durasi_jam": round(float(durasi[i]), 2),
+            "total_per_jam": round(float(rate[i]), 2),
+            "skor": round(float(skor[i]), 2),
+        }
+        for i in hits
+    ]
@@ -0,0 +1,310 @@
+"""
+Analitik waktu tunggu (dwell) dan turnaround skid di Depot, Laut dan Lumbung.
+
+Event masuk dan keluar disimpan di tabel terpisah tanpa relasi. Modul ini
+memasangkan keduanya per (nama_driver, tanggal) dengan sort-merge interval
+join: kedua sisi diurutkan berdasarkan (driver, tanggal, jam), lalu setiap
+masuk dipasangkan dengan keluar pertama yang jam-nya >= jam masuk dan
+sebelum masuk berikutnya.
+
+Hasilnya disimpan di tabel KunjunganSkid. Refresh bersifat bertahap: hanya
+grup (driver, tanggal) yang punya baris baru sejak watermark terakhir yang
+dihitung ulang, jadi query setahun tidak perlu memasangkan ulang semua data.
+
+Refresh jalan di jalur tulis, bukan di GET: setelah skid masuk/keluar
+di-commit, schedule_refresh() memasukkan job "segarkan_turnaround" ke antrian
+(JOB_QUEUE=1), atau langsung refresh di thread penulis kalau tidak ada worker.
+Baris dari jalur lain (bulk_import) ikut terambil oleh cron job yang sama.
+Refresh dari beberapa worker diserialisasi di database (lihat _lock), dan
+(site, masuk_id) unik sehingga pasangan tidak bisa terduplikasi.
+"""
+import time as _time
+from collections import defaultdict
+from datetime import date, time
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+
+# site -> (model masuk, model keluar)
+SITES = {
+    "depot": (models.SkidMasukDepot, models.SkidKeluarDepot),
+    "laut": (models.SkidMasukLaut, models.SkidKeluarLaut),
+    "lumbung": (models.SkidMasukLumbung, models.SkidKeluarLumbung),
+}
+
+PERCENTILES = (50, 90, 95)
+REFRESH_DELAY = 30      # detik; insert beruntun dalam jendela ini cukup satu job
+LOCK_NAME = "turnaround:lock"
+
+# tabel sumber -> site
+SOURCE_TABLES = {model.__tablename__: site for site, pair in SITES.items() for model in pair}
+
+
+# ================== HELPER ==================
+def _menit(t: time) -> float:
+    return t.hour * 60 + t.minute + t.second / 60
+
+def _get_watermark(db: Session, name: str) -> int:
+    row = db.query(models.AnalyticsWatermark).filter(models.AnalyticsWatermark.name == name).first()
+    return row.last_id if row else 0
+
+def _set_watermark(db: Session, name: str, last_id: int):
+    row = db.query(models.AnalyticsWatermark).filter(models.AnalyticsWatermark.name == name).first()
+    if row:
+        row.last_id = last_id
+    else:
+        db.add(models.AnalyticsWatermark(name=name, last_id=last_id))
+
+def percentile(sorted_values: list, p: float) -> Optional[float]:
+    """Persentil dengan interpolasi linier (data harus sudah urut)"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+# ================== SORT-MERGE JOIN ==================
+def _pair_group(site: str, masuk_rows: list, keluar_rows: list) -> list:
+    """
+    Pasangkan masuk/keluar untuk satu (driver, tanggal). Kedua list sudah
+    urut berdasarkan jam. Masuk tanpa keluar tetap dicatat (keluar kosong).
+    """
+    pairs = []
+    j = 0
+    for i, masuk in enumerate(masuk_rows):
+        next_masuk = masuk_rows[i + 1].jam_masuk if i + 1 < len(masuk_rows) else None
+        # Lewati keluar yang lebih awal dari masuk ini (keluar tanpa masuk)
+        while j < len(keluar_rows) and keluar_rows[j].jam_keluar < masuk.jam_masuk:
+            j += 1
+
+        keluar = None
+        if j < len(keluar_rows) and (next_masuk is None or keluar_rows[j].jam_keluar <= next_masuk):
+            keluar = keluar_rows[j]
+            j += 1
+
+        pairs.append({
+            "site": site,
+            "nama_driver": masuk.nama_driver,
+            "tanggal": masuk.tanggal,
+            "rit": getattr(masuk, "rit", None),
+            "masuk_id": masuk.id,
+            "keluar_id": keluar.id if keluar else None,
+            "jam_masuk": masuk.jam_masuk,
+            "jam_keluar": keluar.jam_keluar if keluar else None,
+            "dwell_menit": _menit(keluar.jam_keluar) - _menit(masuk.jam_masuk) if keluar else None,
+            "turnaround_menit": None,
+        })
+
+    # Turnaround = keluar kunjungan ini sampai masuk kunjungan berikutnya
+    for prev, nxt in zip(pairs, pairs[1:]):
+        if prev["jam_keluar"] is not None:
+            prev["turnaround_menit"] = _menit(nxt["jam_masuk"]) - _menit(prev["jam_keluar"])
+    return pairs
+
+
+def _ordered(db: Session, model, jam_col, groups: Optional[set]):
+    query = db.query(model)
+    if groups is not None:
+        query = query.filter(
+            model.nama_driver.in_({g[0] for g in groups}),
+            model.tanggal.in_({g[1] for g in groups}),
+        )
+    # Urut murni berdasarkan jam: rit (skid masuk depot) diisi manual oleh
+    # driver dan bisa salah/berulang, jadi hanya dibawa sebagai data
+    return query.order_by(model.nama_driver, model.tanggal, jam_col, model.id).yield_per(1000)
+
+
+def pair_site(db: Session, site: str, groups: Optional[set] = None) -> list:
+    """Sort-merge kedua tabel site; `groups` membatasi ke (driver, tanggal) tertentu"""
+    masuk_model, keluar_model = SITES[site]
+    masuk_iter = iter(_ordered(db, masuk_model, masuk_model.jam_masuk, groups))
+    keluar_iter = iter(_ordered(db, keluar_model, keluar_model.jam_keluar, groups))
+
+    def key(row):
+        return (row.nama_driver, row.tanggal)
+
+    def take_group(it, first):
+        # Ambil semua baris berurutan dengan key yang sama
+        rows = [first]
+        for row in it:
+            if key(row) != key(first):
+                return rows, row
+            rows.append(row)
+        return rows, None
+
+    # Perbandingan key di Python harus sama dengan urutan ORDER BY database
+    # (collation biner, default SQLite)
+    pairs = []
+    m = next(masuk_iter, None)
+    k = next(keluar_iter, None)
+    while m is not None:
+        mk = key(m)
+        masuk_rows, m = take_group(masuk_iter, m)
+        # Majukan sisi keluar sampai key-nya >= key masuk
+        while k is not None and key(k) < mk:
+            k = next(keluar_iter, None)
+        keluar_rows = []
+        if k is not None and key(k) == mk:
+            keluar_rows, k = take_group(keluar_iter, k)
+
+        if groups is None or mk in groups:
+            pairs.extend(_pair_group(site, masuk_rows, keluar_rows))
+    return pairs
+
+
+# ================== MATERIALIZE ==================
+def _lock(db: Session):
+    """
+    Kunci tingkat database untuk refresh: UPDATE baris penanda sebagai
+    statement pertama transaksi. SQLite mengambil lock tulis database,
+    PostgreSQL mengunci barisnya; keduanya dilepas saat commit/rollback.
+    """
+    db.commit()  # lock harus jadi statement pertama transaksi baru
+    W = models.AnalyticsWatermark
+    if db.query(W).filter(W.name == LOCK_NAME).update({W.last_id: W.last_id + 1}, synchronize_session=False):
+        return
+    try:
+        db.add(W(name=LOCK_NAME, last_id=1))
+        db.flush()
+    except IntegrityError:
+        # Proses lain membuat baris penanda lebih dulu
+        db.rollback()
+        db.query(W).filter(W.name == LOCK_NAME).update({W.last_id: W.last_id + 1}, synchronize_session=False)
+
+def refresh(db: Session, site: Optional[str] = None) -> dict:
+    """
+    Refresh bertahap tabel KunjunganSkid. Mengembalikan jumlah grup
+    (driver, tanggal) yang dihitung ulang per site. Setiap site dikerjakan
+    di transaksi sendiri yang diawali _lock, jadi refresh dari proses lain
+    menunggu lalu melihat watermark yang sudah maju (tidak ada kerja ganda).
+    """
+    result = {}
+    for name in ([site] if site else SITES):
+        _lock(db)
+        masuk_model, keluar_model = SITES[name]
+        marks = {}
+        groups = set()
+        for model in (masuk_model, keluar_model):
+            wm_name = f"turnaround:{model.__tablename__}"
+            last_id = _get_watermark(db, wm_name)
+            rows = db.query(model.id, model.nama_driver, model.tanggal).filter(model.id > last_id).all()
+            groups.update((r.nama_driver, r.tanggal) for r in rows)
+            marks[wm_name] = max([last_id] + [r.id for r in rows])
+
+        if groups:
+            # Hapus pasangan lama untuk grup yang berubah, lalu pasangkan ulang
+            for driver, tanggal in groups:
+                db.query(models.KunjunganSkid).filter(
+                    models.KunjunganSkid.site == name,
+                    models.KunjunganSkid.nama_driver == driver,
+                    models.KunjunganSkid.tanggal == tanggal,
+                ).delete(synchronize_session=False)
+            db.bulk_insert_mappings(models.KunjunganSkid, pair_site(db, name, groups))
+
+        for wm_name, last_id in marks.items():
+            _set_watermark(db, wm_name, last_id)
+        db.commit()
+        result[name] = len(groups)
+    return result
+
+
+def rebuild(db: Session):
+    """Hitung ulang semuanya dari nol (misal setelah data lama diedit)"""
+    _lock(db)
+    db.query(models.KunjunganSkid).delete()
+    db.query(models.AnalyticsWatermark).filter(
+        models.AnalyticsWatermark.name.like("turnaround:%"),
+        models.AnalyticsWatermark.name != LOCK_NAME,
+    ).delete(synchronize_session=False)
+    db.commit()
+    return refresh(db)
+
+
+def schedule_refresh(model_classes: Iterable):
+    """
+    Dipanggil setelah laporan di-commit (crud._create, journal). Refresh site
+    yang tabel skid-nya berubah lewat antrian job, atau langsung kalau worker
+    tidak dijalankan. Error tidak menggagalkan insert-nya.
+    """
+    sites = {SOURCE_TABLES[m.__tablename__] for m in model_classes if m.__tablename__ in SOURCE_TABLES}
+    if not sites:
+        return
+    import jobs
+    try:
+        if jobs.queue_enabled():
+            bucket = int(_time.time() // REFRESH_DELAY)
+            jobs.enqueue("segarkan_turnaround", delay=REFRESH_DELAY, unique_key=f"turnaround:{bucket}")
+            return
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            for site in sites:
+                refresh(db, site)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"Error refresh turnaround: {e}")
+
+
+def dedupe(conn) -> int:
+    """Buang pasangan dobel (site, masuk_id) sisa refresh paralel lama, sebelum index unik dibuat"""
+    K = models.KunjunganSkid.__table__
+    keep = select(func.min(K.c.id)).group_by(K.c.site, K.c.masuk_id)
+    return conn.execute(K.delete().where(K.c.id.not_in(keep))).rowcount
+
+
+# ================== DISTRIBUSI ==================
+def _summary(values: list) -> dict:
+    values = sorted(values)
+    summary = {"n": len(values)}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = percentile(values, p)
+    summary["max"] = values[-1] if values else None
+    return summary
+
+
+def distribution(db: Session, site: Optional[str] = None,
+                 dari: Optional[date] = None, sampai: Optional[date] = None) -> dict:
+    """
+    Persentil dwell dan turnaround per site dan per hari, dari tabel yang
+    sudah dimaterialisasi. Hanya kolom yang dibutuhkan yang diambil.
+    """
+    K = models.KunjunganSkid
+    query = db.query(K.site, K.tanggal, K.dwell_menit, K.turnaround_menit)
+    if site:
+        query = query.filter(K.site == site)
+    if dari:
+        query = query.filter(K.tanggal >= dari)
+    if sampai:
+        query = query.filter(K.tanggal <= sampai)
+
+    per_site = defaultdict(lambda: {"dwell": [], "turnaround": []})
+    per_day = defaultdict(lambda: {"dwell": [], "turnaround": []})
+    for s, tanggal, dwell, turnaround in query.order_by(K.site, K.tanggal):
+        for bucket in (per_site[s], per_day[(s, tanggal)]):
+            if dwell is not None:
+                bucket["dwell"].append(dwell)
+            if turnaround is not None:
+                bucket["turnaround"].append(turnaround)
+
+    return {
+        "per_site": {
+            s: {"dwell_menit": _summary(v["dwell"]), "turnaround_menit": _summary(v["turnaround"])}
+            for s, v in per_site.items()
+        },
+        "per_hari": [
+            {
+                "site": s,
+                "tanggal": tanggal.isoformat(),
+                "dwell_menit": _summary(v["dwell"]),
+                "turnaround_menit": _summary(v["turnaround"]),
+            }
+            for (s, tanggal), v in per_day.items()
+        ],
+    }
@@ -0,0 +1,371 @@
+"""
+Pipeline aset statis: CSS/JS halaman di static/src, hasil build di static/dist.
+
+    python assets.py extract    # sekali: pindahkan <style>/<script> inline dari templates/
+    python assets.py build      # minify + hash + gzip/brotli ke static/dist + manifest.json
+
+extract memindahkan blok <style> dan <script> inline (yang tidak berisi tag
+Jinja) dari setiap template ke static/src/css/<template>.css dan
+static/src/js/<template>.js, lalu menggantinya dengan
+{{ asset('css/<template>.css') }}. Blok yang memakai variabel template tetap
+inline.
+
+build menghasilkan untuk setiap file sumber:
+    static/dist/css/base.<hash>.css        hasil minify
+    static/dist/css/base.<hash>.css.gz     gzip level 9
+    static/dist/css/base.<hash>.css.br     brotli (kalau paket brotli terpasang)
+dan static/dist/manifest.json (nama sumber -> nama hasil). Nama file berisi
+hash isi, jadi boleh di-cache browser selamanya (routes/assets.py mengirim
+Cache-Control immutable dan memilih varian .br/.gz sesuai Accept-Encoding).
+
+Build juga dijalankan di lifespan kalau ada sumber yang lebih baru dari
+manifest. Tanpa manifest, asset() menunjuk langsung ke file sumber
+(/static/src/...) tanpa cache jangka panjang.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli opsional
+    brotli = None
+
+STATIC_DIR = "static"
+SOURCE_DIR = os.path.join(STATIC_DIR, "src")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+TEMPLATES_DIR = "templates"
+STATIC_URL = "/static"
+HASH_LENGTH = 10
+EXTENSIONS = {".css": "css", ".js": "js"}
+
+
+# ================== MINIFY ==================
+# String dan komentar dipisahkan dulu supaya isinya tidak ikut diubah
+_CSS_STRINGS = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+_CSS_COMMENTS = re.compile(rf"({_CSS_STRINGS})|/\*.*?\*/", re.S)
+_CSS_TOKENS = re.compile(rf"({_CSS_STRINGS})", re.S)
+
+
+def minify_css(source: str) -> str:
+    source = _CSS_COMMENTS.sub(lambda m: m.group(1) or "", source)
+    out = []
+    for i, part in enumerate(_CSS_TOKENS.split(source)):
+        if i % 2:
+            out.append(part)
+            continue
+        part = re.sub(r"\s+", " ", part)
+        # Spasi sebelum ':' dibiarkan (selector "a :hover" beda dengan "a:hover");
+        # '+' juga, karena calc() butuh spasi di sekitarnya
+        part = re.sub(r" ?([{};,>~]) ?", r"\1", part)
+        part = part.replace(": ", ":").replace(";}", "}")
+        out.append(part)
+    return "".join(out).strip()
+
+
+# Karakter/kata sebelum '/' yang berarti regex literal, bukan pembagian
+_REGEX_PREFIX = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "throw")
+
+
+def _skip_string(source: str, i: int) -> int:
+    """Indeks setelah string '...' / "..." yang dimulai di i"""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_template(source: str, i: int) -> int:
+    """Indeks setelah template literal `...` (termasuk ${...} bersarang)"""
+    i += 1
+    while i < len(source):
+        c = source[i]
+        if c == "\\":
+            i += 2
+        elif c == "`":
+            return i + 1
+        elif source.startswith("${", i):
+            i = _skip_braces(source, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_braces(source: str, i: int) -> int:
+    """Indeks setelah '}' penutup ekspresi ${...}"""
+    depth = 1
+    while i < len(source) and depth:
+        c = source[i]
+        if c in "\"'":
+            i = _skip_string(source, i)
+            continue
+        if c == "`":
+            i = _skip_template(source, i)
+            continue
+        depth += (c == "{") - (c == "}")
+        i += 1
+    return i
+
+
+def _skip_regex(source: str, i: int) -> int:
+    in_class = False
+    i += 1
+    while i < len(source) and source[i] != "\n":
+        c = source[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            return i + 1
+        i += 1
+    return i
+
+
+def _js_tokens(source: str):
+    """(kode, literal) bergantian: literal = string, template literal, regex"""
+    code = []
+    after_literal = False      # '/' tepat setelah string/regex = pembagian
+    i = 0
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c in "\"'`":
+            end = _skip_template(source, i) if c == "`" else _skip_string(source, i)
+            yield "".join(code), source[i:end]
+            code = []
+            after_literal = True
+            i = end
+        elif source.startswith("//", i):
+            j = source.find("\n", i)
+            i = n if j < 0 else j
+        elif source.startswith("/*", i):
+            j = source.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+            code.append(" ")
+        elif c == "/":
+            before = "".join(code).rstrip()
+            if (not before and not after_literal) or before[-1:] in _REGEX_PREFIX or re.search(
+                    rf"\b({'|'.join(_REGEX_KEYWORDS)})$", before):
+                end = _skip_regex(source, i)
+                yield "".join(code), source[i:end]
+                code = []
+                after_literal = True
+                i = end
+            else:
+                code.append(c)
+                i += 1
+        else:
+            code.append(c)
+            i += 1
+    yield "".join(code), ""
+
+
+def minify_js(source: str) -> str:
+    """
+    Minify konservatif: buang komentar, indentasi dan baris kosong. Baris
+    baru dipertahankan supaya automatic semicolon insertion tidak berubah;
+    isi string dan template literal tidak disentuh.
+    """
+    out = []
+    for code, literal in _js_tokens(source):
+        code = re.sub(r"[ \t]*\n\s*", "\n", code)
+        code = re.sub(r"[ \t]+", " ", code)
+        out.append(code)
+        out.append(literal)
+    return "".join(out).strip()
+
+
+MINIFIERS = {"css": minify_css, "js": minify_js}
+
+
+# ================== BUILD ==================
+def _sources() -> Dict[str, str]:
+    """nama relatif (css/base.css) -> path file sumber"""
+    found = {}
+    for root, _, files in os.walk(SOURCE_DIR):
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in EXTENSIONS:
+                path = os.path.join(root, name)
+                found[os.path.relpath(path, SOURCE_DIR).replace(os.sep, "/")] = path
+    return found
+
+
+def _write(path: str, data: bytes):
+    """Tulis atomik (beberapa worker bisa build bersamaan)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build() -> dict:
+    manifest = {}
+    stats = {}
+    for name, path in _sources().items():
+        stem, ext = os.path.splitext(name)
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        data = MINIFIERS[EXTENSIONS[ext]](source).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        output = f"{stem}.{digest}{ext}"
+        target = os.path.join(DIST_DIR, output)
+        if not os.path.exists(target):
+            _write(target, data)
+            _write(target + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write(target + ".br", brotli.compress(data, quality=11))
+        manifest[name] = output
+        stats[name] = {
+            "sumber": len(source.encode("utf-8")),
+            "minify": len(data),
+            "gzip": os.path.getsize(target + ".gz"),
+            "brotli": os.path.getsize(target + ".br") if os.path.exists(target + ".br") else None,
+        }
+    _write(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    _manifest.reset()
+    return stats
+
+
+def is_stale() -> bool:
+    """Ada file sumber yang lebih baru dari manifest (atau manifest belum ada)"""
+    if not os.path.exists(MANIFEST_PATH):
+        return bool(_sources())
+    built = os.path.getmtime(MANIFEST_PATH)
+    return any(os.path.getmtime(path) > built for path in _sources().values())
+
+
+def ensure_built() -> Optional[dict]:
+    return build() if is_stale() else None
+
+
+# ================== MANIFEST & URL ==================
+class Manifest:
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def entries(self) -> Dict[str, str]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    try:
+                        with open(self.path, encoding="utf-8") as f:
+                            self._entries = json.load(f)
+                    except (OSError, ValueError):
+                        self._entries = {}
+        return self._entries
+
+    def reset(self):
+        self._entries = None
+
+
+_manifest = Manifest()
+
+
+def asset(name: str) -> str:
+    """URL aset untuk template: versi hash kalau sudah di-build, selain itu file sumber"""
+    built = _manifest.entries().get(name)
+    if built:
+        return f"{STATIC_URL}/dist/{built}"
+    return f"{STATIC_URL}/src/{name}"
+
+
+def names() -> list:
+    """Semua nama aset sumber (css/base.css, js/outbox.js, ...)"""
+    return sorted(_manifest.entries() or _sources())
+
+
+def version() -> str:
+    """Hash seluruh manifest: berubah kalau ada satu aset yang berubah"""
+    entries = _manifest.entries()
+    if not entries:
+        entries = {name: os.path.getmtime(path) for name, path in _sources().items()}
+    return hashlib.sha256(json.dumps(entries, sort_keys=True).encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+
+def read(name: str) -> str:
+    """Isi file yang ditunjuk asset(name): hasil build kalau ada, selain itu sumber"""
+    built = _manifest.entries().get(name)
+    path = os.path.join(DIST_DIR, built) if built else os.path.join(SOURCE_DIR, name)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def is_fingerprinted(path: str) -> bool:
+    """Path relatif terhadap static/ yang isinya tidak pernah berubah"""
+    return path.startswith("dist/") and path != "dist/manifest.json"
+
+
+# ================== EXTRACT DARI TEMPLATE ==================
+_INLINE_BLOCK = re.compile(r"^([ \t]*)<(style|script)>(.*?)</\2>[ \t]*(?=\r?$)", re.S | re.M)
+
+
+def extract(templates_dir: str = TEMPLATES_DIR) -> dict:
+    """Pindahkan <style>/<script> inline tanpa tag Jinja ke static/src"""
+    moved = {}
+    for filename in sorted(os.listdir(templates_dir)):
+        if not filename.endswith(".html"):
+            continue
+        path = os.path.join(templates_dir, filename)
+        # newline="" supaya akhir baris CRLF di template tidak berubah
+        with open(path, encoding="utf-8", newline="") as f:
+            html = f.read()
+        page = os.path.splitext(filename)[0]
+        counts = {"style": 0, "script": 0}
+
+        def replace(match):
+            indent, tag, body = match.groups()
+            if "{{" in body or "{%" in body or not body.strip():
+                return match.group(0)
+            kind = "css" if tag == "style" else "js"
+            counts[tag] += 1
+            suffix = f"-{counts[tag]}" if counts[tag] > 1 else ""
+            name = f"{kind}/{page}{suffix}.{kind}"
+            _write(os.path.join(SOURCE_DIR, name), (_dedent(body).strip("\n") + "\n").encode("utf-8"))
+            moved.setdefault(filename, []).append(name)
+            if tag == "style":
+                return f'{indent}<link rel="stylesheet" href="{{{{ asset(\'{name}\') }}}}">'
+            return f'{indent}<script src="{{{{ asset(\'{name}\') }}}}"></script>'
+
+        updated = _INLINE_BLOCK.sub(replace, html)
+        if updated != html:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(updated)
+    return moved
+
+
+def _dedent(text: str) -> str:
+    lines = text.replace("\r\n", "\n").split("\n")
+    indents = [len(l) - len(l.lstrip()) for l in lines if l.strip()]
+    cut = min(indents) if indents else 0
+    return "\n".join(l[cut:] for l in lines)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1:]
+    if command == ["extract"]:
+        for template, found in extract().items():
+            print(f"{template:40} {', '.join(found)}")
+    elif command == ["build"]:
+        for name, s in build().items():
+            br = s["brotli"] if s["brotli"] is not None else "-"
+            print(f"{name:40} {s['sumber']:7} -> minify {s['minify']:7}  gzip {s['gzip']:6}  br {br}")
+        if brotli is None:
+            print("Paket brotli tidak terpasang: varian .br dilewati")
+    else:
+        print(__doc__)
+        sys.exit(1)
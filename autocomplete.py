@@ -0,0 +1,351 @@
+"""
+Index prefix di memori untuk autocomplete nama driver, plat, agen, pangkalan
+dan tujuan.
+
+Per field ada satu PrefixIndex: list key ter-normalisasi (huruf kecil, spasi
+dirapikan) yang selalu urut, dicari dengan bisect. Setiap key menyimpan
+jumlah pemakaian dan ejaan yang paling sering dipakai untuk ditampilkan.
+Hasil top-N per prefix disimpan di cache LRU; karena jumlah pemakaian hanya
+bisa naik, cache cukup diperbarui untuk prefix dari key yang berubah (tanpa
+hitung ulang).
+
+Index dibangun sekali di background saat startup (agregat GROUP BY per tabel
+sumber) dan diperbarui oleh crud.create_* lewat record(). Seperti live_feed,
+index ini per proses: worker lain baru melihat nama baru setelah rebuild.
+
+Nilai yang di-record selama build berjalan disimpan dulu lalu digabung ke
+index baru sebelum dipasang, jadi tidak hilang saat index ditukar. Selama
+index belum siap (build berjalan, atau gagal dan menunggu BUILD_RETRY_SECONDS
+sebelum dicoba lagi di background) pencarian memakai search_db(): query
+prefix ke database yang dibatasi per tabel sumber.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+import models
+import sharding
+from database import ReadSessionLocal
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+PREFIX_CACHE_SIZE = 100_000
+WARM_MAX_RANGE = 1000     # prefix dengan key lebih dari ini dihitung saat build
+BUILD_RETRY_SECONDS = 60  # jeda sebelum build yang gagal dicoba lagi
+
+# field -> [(model, kolom)]
+SOURCES = {
+    "driver": [
+        (models.Driver, "nama"),
+        (models.Karyawan, "nama"),
+        (models.SkidMasukDepot, "nama_driver"),
+        (models.SkidKeluarDepot, "nama_driver"),
+        (models.SkidMasukLaut, "nama_driver"),
+        (models.SkidKeluarLaut, "nama_driver"),
+        (models.SkidMasukLumbung, "nama_driver"),
+        (models.SkidKeluarLumbung, "nama_driver"),
+        (models.SebelumLoading, "nama_driver"),
+        (models.ProduksiMulai, "nama_driver"),
+        (models.LaporanKirim, "nama_driver"),
+        (models.LaporanBongkar, "nama_driver"),
+        (models.PembayaranAgen, "nama_driver"),
+    ],
+    "plat_mobil": [
+        (models.SkidMasukDepot, "plat_mobil"),
+        (models.SkidKeluarDepot, "plat_mobil"),
+        (models.SkidMasukLaut, "plat_mobil"),
+        (models.SkidKeluarLaut, "plat_mobil"),
+        (models.SkidMasukLumbung, "plat_mobil"),
+        (models.SkidKeluarLumbung, "plat_mobil"),
+        (models.LaporanKirim, "plat_mobil"),
+    ],
+    "nama_agen": [(models.PembayaranAgen, "nama_agen")],
+    "nama_pangkalan": [(models.LaporanBongkar, "nama_pangkalan")],
+    "tujuan": [(models.LaporanKirim, "tujuan")],
+}
+
+# model -> [(field, atribut)] untuk record()
+_FIELDS_BY_MODEL: Dict[type, List[Tuple[str, str]]] = {}
+for _field, _sources in SOURCES.items():
+    for _model, _column in _sources:
+        _FIELDS_BY_MODEL.setdefault(_model, []).append((_field, _column))
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+# ================== INDEX ==================
+class PrefixIndex:
+    def __init__(self, cache_size: int = PREFIX_CACHE_SIZE):
+        self._keys: List[str] = []             # urut
+        self._count: Dict[str, int] = {}
+        self._display: Dict[str, str] = {}      # ejaan terbanyak
+        self._spellings: Dict[str, Dict[str, int]] = {}
+        self._top = OrderedDict()               # prefix -> [(count, key)] desc
+        self._cache_size = cache_size
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _accumulate(self, value: str, count: int):
+        display = " ".join(value.split())
+        if not display or display == "-":
+            return None, False
+        key = display.casefold()
+        is_new = key not in self._count
+        if is_new:
+            self._count[key] = 0
+            self._display[key] = display
+        self._count[key] += count
+        self._track_spelling(key, display, count)
+        return key, is_new
+
+    def add(self, value: str, count: int = 1):
+        with self._lock:
+            key, is_new = self._accumulate(value, count)
+            if key is None:
+                return
+            if is_new:
+                insort(self._keys, key)
+            self._update_cached_prefixes(key)
+
+    def load(self, pairs: Iterable[Tuple[str, int]]):
+        """Isi awal dari (nilai, jumlah); key diurutkan sekali di akhir"""
+        with self._lock:
+            for value, count in pairs:
+                if value:
+                    self._accumulate(value, count)
+            self._keys = sorted(self._count)
+            self._top.clear()
+
+    def _track_spelling(self, key: str, display: str, count: int):
+        current = self._display[key]
+        if display == current and key not in self._spellings:
+            return
+        spellings = self._spellings.setdefault(key, {current: self._count[key] - count})
+        spellings[display] = spellings.get(display, 0) + count
+        if spellings[display] > spellings.get(current, 0):
+            self._display[key] = display
+
+    def _update_cached_prefixes(self, key: str):
+        # Jumlah hanya naik, jadi top-N prefix yang sudah di-cache cukup
+        # diperbarui dengan key ini saja
+        count = self._count[key]
+        for i in range(1, len(key) + 1):
+            top = self._top.get(key[:i])
+            if top is None:
+                continue
+            limit, items = top
+            items = [item for item in items if item[1] != key]
+            items.append((count, key))
+            items.sort(key=lambda item: (-item[0], item[1]))
+            self._top[key[:i]] = (limit, items[:limit])
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def _compute_top(self, prefix: str, limit: int) -> list:
+        lo, hi = self._range(prefix)
+        count = self._count
+        return heapq.nsmallest(limit, ((-count[k], k) for k in self._keys[lo:hi]))
+
+    def search(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[Tuple[str, int]]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            cached = self._top.get(prefix)
+            if cached is not None and cached[0] >= limit:
+                self._top.move_to_end(prefix)
+                items = cached[1][:limit]
+            else:
+                found = self._compute_top(prefix, max(limit, DEFAULT_LIMIT))
+                items_all = [(-neg, key) for neg, key in found]
+                self._top[prefix] = (max(limit, DEFAULT_LIMIT), items_all)
+                if len(self._top) > self._cache_size:
+                    self._top.popitem(last=False)
+                items = items_all[:limit]
+            return [(self._display[key], count) for count, key in items]
+
+    def warm(self, max_range: int = WARM_MAX_RANGE):
+        """
+        Hitung top-N untuk setiap prefix yang range-nya lebih dari max_range
+        key (mulai dari 1 huruf, diperpanjang selama range masih lebar).
+        Prefix lain cukup dihitung saat diminta, range-nya sudah kecil.
+        """
+        with self._lock:
+            pending = sorted({key[:1] for key in self._keys})
+            while pending:
+                prefix = pending.pop()
+                lo, hi = self._range(prefix)
+                self.search(prefix)
+                if hi - lo <= max_range:
+                    continue
+                n = len(prefix) + 1
+                pending.extend({key[:n] for key in self._keys[lo:hi] if len(key) >= n})
+
+class AutocompleteIndex:
+    def __init__(self):
+        self.fields = {field: PrefixIndex() for field in SOURCES}
+        self.ready = threading.Event()
+        self.failed_at: Optional[float] = None   # monotonic, build terakhir gagal
+        self._build_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: Optional[list] = None     # (field, nilai) selama build berjalan
+
+    def build(self, db) -> dict:
+        """Bangun ulang semua field dari database (agregat per tabel)"""
+        with self._build_lock:
+            with self._lock:
+                self._pending = []
+            try:
+                fresh = {field: PrefixIndex() for field in SOURCES}
+                # Satu agregat per tabel; dengan shard per site dijalankan di setiap database
+                for part in sharding.fan_out(db, _aggregates):
+                    for field, rows in part.items():
+                        fresh[field].load(rows)
+                for index in fresh.values():
+                    index.warm()
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                self.failed_at = time.monotonic()
+                raise
+            with self._lock:
+                # Baris yang di-commit setelah agregatnya dibaca; yang sebelum
+                # itu bisa terhitung dua kali, cukup untuk urutan saran
+                for field, value in self._pending:
+                    fresh[field].add(value)
+                self._pending = None
+                self.fields = fresh
+            self.failed_at = None
+            self.ready.set()
+            return {field: len(index) for field, index in fresh.items()}
+
+    def add_values(self, values: List[Tuple[str, str]]):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.extend(values)
+            if not self.ready.is_set():
+                return
+            fields = self.fields
+        for field, value in values:
+            fields[field].add(value)
+
+    def record(self, item):
+        """Tambah nilai dari baris baru (dipanggil crud setelah commit)"""
+        values = [(field, value) for field, column in _FIELDS_BY_MODEL.get(type(item), ())
+                  for value in [getattr(item, column, None)] if isinstance(value, str)]
+        if values:
+            self.add_values(values)
+
+    def search(self, field: str, prefix: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+        limit = max(1, min(limit, MAX_LIMIT))
+        return [{"nilai": value, "jumlah": count} for value, count in self.fields[field].search(prefix, limit)]
+
+
+def _aggregates(db) -> Dict[str, list]:
+    result = {}
+    for field, sources in SOURCES.items():
+        rows = result.setdefault(field, [])
+        for model_class, column in sources:
+            col = getattr(model_class, column)
+            rows.extend(db.query(col, func.count()).group_by(col).all())
+    return result
+
+
+def _prefix_counts(db, field: str, prefix: str, limit: int) -> list:
+    pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    rows = []
+    for model_class, column in SOURCES[field]:
+        col = getattr(model_class, column)
+        rows.extend(db.query(col, func.count())
+                    .filter(func.lower(col).like(pattern, escape="\\"))
+                    .group_by(col).order_by(func.count().desc()).limit(limit).all())
+    return rows
+
+
+def search_db(field: str, prefix: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+    """Pengganti index saat belum siap: top-N per tabel sumber lalu digabung"""
+    limit = max(1, min(limit, MAX_LIMIT))
+    prefix = normalize(prefix)
+    if not prefix:
+        return []
+    merged = PrefixIndex(cache_size=1)
+    db = ReadSessionLocal()
+    try:
+        for part in sharding.fan_out(db, lambda part: _prefix_counts(part, field, prefix, limit)):
+            merged.load(part)
+    finally:
+        db.close()
+    return [{"nilai": value, "jumlah": count} for value, count in merged.search(prefix, limit)]
+
+
+index = AutocompleteIndex()
+
+
+# ================== BUILD ==================
+def rebuild(db=None) -> dict:
+    own_session = db is None
+    db = db or ReadSessionLocal()
+    try:
+        return index.build(db)
+    finally:
+        if own_session:
+            db.close()
+
+
+_builder: Optional[threading.Thread] = None
+_builder_lock = threading.Lock()
+
+
+def start_background_build() -> threading.Thread:
+    """Dipanggil di lifespan supaya startup tidak menunggu index selesai"""
+    global _builder
+
+    def run():
+        try:
+            rebuild()
+        except Exception as e:
+            print(f"Error membangun index autocomplete (dicoba lagi setelah {BUILD_RETRY_SECONDS} dtk): {e}")
+
+    with _builder_lock:
+        if _builder is None or not _builder.is_alive():
+            _builder = threading.Thread(target=run, name="autocomplete-build", daemon=True)
+            _builder.start()
+        return _builder
+
+
+def ensure_ready(timeout: Optional[float] = None) -> bool:
+    """
+    Tunggu index siap. Kalau build belum pernah dimulai, atau gagal dan
+    BUILD_RETRY_SECONDS sudah lewat, build dimulai di background (tidak di
+    jalur request). False = pakai search_db dulu.
+    """
+    if index.ready.is_set():
+        return True
+    failed_at = index.failed_at
+    if failed_at is not None and time.monotonic() - failed_at < BUILD_RETRY_SECONDS:
+        return False
+    start_background_build()
+    return index.ready.wait(timeout)
+
+
+def record(item):
+    try:
+        index.record(item)
+    except Exception as e:
+        print(f"Error update index autocomplete: {e}")
+
+
+def record_values(field: str, values: Iterable[str]):
+    index.add_values([(field, value) for value in values if value])
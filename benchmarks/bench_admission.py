@@ -0,0 +1,97 @@
+"""
+Benchmark admission control: latensi route ringan saat banyak upload masuk.
+
+    python benchmarks/bench_admission.py            # 300 upload bersamaan
+    python benchmarks/bench_admission.py 600
+
+Route upload dan route ringan sama-sama handler sync (def), jadi berbagi
+threadpool anyio (40 thread). Tanpa admission, upload memenuhi threadpool
+dan request ringan ikut antri di belakangnya. Dengan AdmissionMiddleware,
+upload dibatasi gate "foto" dan sisanya langsung dapat 503 + Retry-After.
+
+Yang dicetak: p50/p99 latensi route ringan, jumlah upload 200/503, dan
+puncak byte upload yang sedang diproses.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+import admission
+
+UPLOAD_SIZE = 256 * 1024
+HANDLER_SECONDS = 0.05
+
+
+def make_app(with_admission: bool):
+    app = FastAPI()
+    state = {"bytes": 0, "peak": 0}
+
+    @app.post("/skid-keluar-depot")
+    def upload(foto_spa: UploadFile = File(...)):
+        data = foto_spa.file.read()
+        state["bytes"] += len(data)
+        state["peak"] = max(state["peak"], state["bytes"])
+        time.sleep(HANDLER_SECONDS)          # simpan file + insert database
+        state["bytes"] -= len(data)
+        return {"status": "success"}
+
+    @app.get("/api/ringan")
+    def ringan():
+        return {"ok": True}
+
+    if with_admission:
+        app.add_middleware(admission.AdmissionMiddleware, controller=admission.AdmissionController())
+    return app, state
+
+
+def percentile(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+
+async def run(with_admission: bool, n_uploads: int):
+    app, state = make_app(with_admission)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        payload = os.urandom(UPLOAD_SIZE)
+
+        async def upload():
+            r = await client.post("/skid-keluar-depot", files={"foto_spa": ("a.jpg", payload)})
+            return r.status_code
+
+        async def light():
+            samples = []
+            await asyncio.sleep(0.05)
+            for _ in range(50):
+                t0 = time.perf_counter()
+                await client.get("/api/ringan")
+                samples.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.01)
+            return samples
+
+        started = time.perf_counter()
+        results = await asyncio.gather(light(), *[upload() for _ in range(n_uploads)])
+        elapsed = time.perf_counter() - started
+
+    samples, statuses = results[0], results[1:]
+    label = "dengan admission" if with_admission else "tanpa admission "
+    print(f"{label}: ringan p50 {percentile(samples, 0.5):7.1f} ms  p99 {percentile(samples, 0.99):7.1f} ms"
+          f"  | upload 200={statuses.count(200)} 503={statuses.count(503)}"
+          f"  puncak {state['peak'] / 1024 / 1024:.1f} MB  total {elapsed:.1f} s")
+
+
+def main():
+    n_uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print(f"{n_uploads} upload x {UPLOAD_SIZE // 1024} KB, handler {HANDLER_SECONDS * 1000:.0f} ms")
+    asyncio.run(run(False, n_uploads))
+    asyncio.run(run(True, n_uploads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark grafik "tabung per hari per lokasi": loop Python atas objek ORM vs
+cache kolumnar NumPy (analytics_cache).
+
+    python benchmarks/bench_analytics_cache.py            # 300k laporan kirim
+    python benchmarks/bench_analytics_cache.py 1000000
+
+Yang dicetak: waktu loop ORM, waktu load awal cache, waktu query group-by
+(sum dan persentil) dari cache, dan waktu refresh inkremental setelah 1000
+laporan baru. Database sementara di file SQLite terpisah.
+"""
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, time as dtime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import analytics_cache
+import cache
+import models
+from database import Base
+
+LOKASI = ("Merak", "Semarang")
+JENIS = ("3KG", "12KG", "50KG")
+
+
+def rows(start: int, n: int) -> list:
+    return [{
+        "lokasi": LOKASI[i % 2], "tanggal": date(2024, 1 + i % 12, 1 + i % 28),
+        "nama_driver": f"Driver {i % 300}", "plat_mobil": f"B {i % 900} XY", "jam_berangkat": dtime(8),
+        "kapasitas": 560, "jenis_tabung": JENIS[i % 3], "jumlah_dibawa": 100 + i % 400,
+        "jumlah_turun": None if i % 7 == 0 else i % 400, "tujuan": "Agen", "kondisi_tabung": "baik",
+    } for i in range(start, start + n)]
+
+
+def orm_loop(Session) -> dict:
+    db = Session()
+    try:
+        total = defaultdict(int)
+        for r in db.query(models.LaporanKirim).yield_per(10_000):
+            total[(r.tanggal, r.lokasi)] += r.jumlah_dibawa
+        return total
+    finally:
+        db.close()
+
+
+def timed(fn, repeat: int = 1):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(models.LaporanKirim), rows(0, n))
+        Session = sessionmaker(bind=engine)
+        store = analytics_cache.AnalyticsCache(session_factory=Session)
+        print(f"{n} laporan kirim")
+
+        orm, ms = timed(lambda: orm_loop(Session))
+        print(f"loop ORM (group by tanggal, lokasi)      {ms:9.1f} ms")
+
+        _, ms = timed(lambda: store.refresh("kirim"))
+        print(f"cache: load awal                         {ms:9.1f} ms  "
+              f"({store.tables['kirim'].nbytes() / 1e6:.1f} MB)")
+
+        query = lambda **kw: store.query("kirim", kelompok=("tanggal", "lokasi"), **kw)
+        hasil, ms = timed(lambda: query(metrik="jumlah_dibawa", agregasi="sum"), repeat=5)
+        print(f"cache: sum per tanggal+lokasi            {ms:9.2f} ms  ({len(hasil['hasil'])} grup)")
+        _, ms = timed(lambda: query(metrik="jumlah_turun", agregasi="percentile", persentil=90), repeat=5)
+        print(f"cache: p90 jumlah_turun per tanggal+lokasi {ms:7.2f} ms")
+        _, ms = timed(lambda: store.query("kirim", "jumlah_dibawa", "mean", ("nama_driver", "jenis_tabung"),
+                                          filters={"lokasi": "Merak"}), repeat=5)
+        print(f"cache: mean per driver+jenis (Merak)     {ms:9.2f} ms")
+
+        same = all(orm[(date.fromisoformat(r["tanggal"]), r["lokasi"])] == r["nilai"] for r in hasil["hasil"])
+        print(f"hasil sama dengan loop ORM: {same and len(orm) == len(hasil['hasil'])}")
+
+        with engine.begin() as conn:
+            conn.execute(insert(models.LaporanKirim), rows(n, 1000))
+        # Seperti crud._touch setelah insert
+        cache.bump_table_version("laporan_kirim")
+        _, ms = timed(lambda: store.refresh("kirim"))
+        print(f"cache: refresh inkremental (+1000 baris) {ms:9.1f} ms  -> {store.tables['kirim'].n} baris")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
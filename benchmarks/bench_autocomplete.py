@@ -0,0 +1,95 @@
+"""
+Benchmark PrefixIndex autocomplete dengan ratusan ribu nama.
+
+    python benchmarks/bench_autocomplete.py            # 300k nama
+    python benchmarks/bench_autocomplete.py 500000
+
+Yang diukur:
+    - waktu build (load + warm prefix pendek)
+    - latensi search untuk prefix 1-6 huruf (p50/p99), dingin dan hangat
+    - latensi add() nama baru / nama yang sudah ada
+    - pembanding: scan linear list seperti filter di sisi klien
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from autocomplete import PrefixIndex, normalize
+
+DEPAN = ["Agus", "Budi", "Cahyo", "Dedi", "Eko", "Fajar", "Gunawan", "Hadi", "Imam", "Joko",
+         "Kurniawan", "Lukman", "Mulyono", "Nur", "Oki", "Purnomo", "Rahmat", "Slamet", "Teguh", "Wahyu"]
+BELAKANG = ["Santoso", "Saputra", "Hidayat", "Setiawan", "Prasetyo", "Wibowo", "Susanto", "Nugroho",
+            "Kusuma", "Pratama", "Firmansyah", "Siregar", "Harahap", "Lubis", "Sitompul"]
+
+
+def make_names(n: int) -> list:
+    rng = random.Random(n)
+    names = set()
+    while len(names) < n:
+        names.add(f"{rng.choice(DEPAN)} {rng.choice(BELAKANG)} {rng.randrange(100000)}")
+    # frekuensi zipf-ish: sebagian kecil nama sangat sering muncul
+    return [(name, int(1 + 1000 / (1 + i))) for i, name in enumerate(sorted(names, key=lambda _: rng.random()))]
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1e6
+    p99 = samples[int(len(samples) * 0.99)] * 1e6
+    return f"p50 {p50:7.1f} us  p99 {p99:7.1f} us"
+
+
+def bench_search(index: PrefixIndex, prefixes: list) -> list:
+    samples = []
+    for prefix in prefixes:
+        t0 = time.perf_counter()
+        index.search(prefix)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    rng = random.Random(1)
+    pairs = make_names(n)
+    names = [name for name, _ in pairs]
+    print(f"{n} nama")
+
+    index = PrefixIndex()
+    t0 = time.perf_counter()
+    index.load(pairs)
+    t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index.warm()
+    t_warm = time.perf_counter() - t0
+    print(f"build: load {t_load:.2f} s, warm {t_warm:.2f} s")
+
+    for length in range(1, 7):
+        prefixes = [rng.choice(names)[:length] for _ in range(2000)]
+        cold = bench_search(index, prefixes)
+        warm = bench_search(index, prefixes)
+        print(f"prefix {length} huruf  dingin {percentiles(cold)}   hangat {percentiles(warm)}")
+
+    samples = []
+    for i in range(2000):
+        value = rng.choice(names) if i % 2 else f"Driver Baru {i}"
+        t0 = time.perf_counter()
+        index.add(value)
+        samples.append(time.perf_counter() - t0)
+    print(f"add()               {percentiles(samples)}")
+
+    # Pembanding: filter linear seperti yang dilakukan di browser
+    keys = [(normalize(name), count) for name, count in pairs]
+    samples = []
+    for _ in range(50):
+        prefix = normalize(rng.choice(names)[:3])
+        t0 = time.perf_counter()
+        sorted((item for item in keys if item[0].startswith(prefix)), key=lambda item: -item[1])[:10]
+        samples.append(time.perf_counter() - t0)
+    print(f"scan linear         {percentiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
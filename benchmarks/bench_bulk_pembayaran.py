@@ -0,0 +1,79 @@
+"""
+Benchmark "tandai Paid" untuk banyak pembayaran agen: satu per satu
+(crud.update_pembayaran, seperti PUT /api/pembayaran-agen/{id}) vs satu
+UPDATE massal (crud.bulk_update_pembayaran), lalu hapus massal beserta file
+bukti.
+
+    python benchmarks/bench_bulk_pembayaran.py          # 500 baris per putaran
+    python benchmarks/bench_bulk_pembayaran.py 2000
+
+Database sementara di file SQLite terpisah; hook CDC ikut jalan di kedua
+jalur, jadi angka sudah termasuk penulisan change_log.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+_tmp = tempfile.TemporaryDirectory()
+os.chdir(_tmp.name)    # file bukti dibuat di static/uploads folder sementara
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}")
+os.environ.setdefault("CACHE_URL", "memory://")
+
+from sqlalchemy import insert
+
+import crud
+import models
+from database import Base, SessionLocal, engine
+
+
+def seed(n: int, batch: str) -> list:
+    rows = []
+    for i in range(n):
+        path = f"static/uploads/bukti_{batch}_{i}.jpg"
+        with open(path, "wb") as f:
+            f.write(b"x" * 1024)
+        rows.append({
+            "nama_agen": f"Agen {i % 20}", "harga_pertabung": 18000, "jenis_tabung": "12KG",
+            "nama_driver": f"Driver {i % 50}", "tanggal_pengiriman": date(2024, 1 + i % 12, 1 + i % 28),
+            "jumlah_turun": 10, "status": "Belum Paid", "bukti": path,
+        })
+    with engine.begin() as conn:
+        result = conn.execute(insert(models.PembayaranAgen.__table__).returning(models.PembayaranAgen.id), rows)
+        return [row.id for row in result]
+
+
+def main(n: int):
+    Base.metadata.create_all(engine)
+    os.makedirs("static/uploads")
+
+    ids = seed(n, "satu")
+    db = SessionLocal()
+    started = time.perf_counter()
+    for pid in ids:
+        crud.update_pembayaran(db, pid, status="Paid")
+    per_row = time.perf_counter() - started
+    db.close()
+
+    ids = seed(n, "massal")
+    db = SessionLocal()
+    started = time.perf_counter()
+    crud.bulk_update_pembayaran(db, {"status": "Paid"}, ids=ids)
+    bulk = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = crud.bulk_delete_pembayaran(db, ids=ids)
+    hapus = time.perf_counter() - started
+    db.close()
+
+    print(f"{n} pembayaran -> Paid")
+    print(f"  satu per satu   {per_row * 1000:9.1f} ms")
+    print(f"  UPDATE massal   {bulk * 1000:9.1f} ms  ({per_row / bulk:.0f}x lebih cepat)")
+    print(f"  DELETE massal   {hapus * 1000:9.1f} ms  (file bukti: {result['file']})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,111 @@
+"""
+Benchmark insert laporan: jalur langsung (crud._create, commit per baris) vs
+write-behind journal (fsync bersama + commit per batch).
+
+    python benchmarks/bench_journal.py              # 16 thread x 500 laporan
+    python benchmarks/bench_journal.py 32 1000
+
+Setiap thread meniru satu request POST /skid-masuk-depot. Untuk journal,
+waktu total dihitung sampai semua baris benar-benar ada di database (close()
+menunggu writer selesai), bukan hanya sampai response dikirim.
+
+Catatan: pakai database test.db di direktori kerja; jalankan di salinan repo
+atau database percobaan.
+"""
+import os
+import sys
+import threading
+import time
+from datetime import date, time as dtime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+import crud
+import journal
+import migrations
+import models
+from database import SessionLocal, engine
+
+
+def payload(i: int) -> dict:
+    return {
+        "nama_driver": f"Driver {i % 300}",
+        "plat_mobil": f"B {1000 + i % 900} XY",
+        "tanggal": date(2024, 1 + i % 12, 1 + i % 28),
+        "rit": 1 + i % 5,
+        "jam_masuk": dtime(8, i % 60),
+    }
+
+
+def run(threads: int, per_thread: int) -> tuple:
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        db = SessionLocal()
+        local = []
+        try:
+            for i in range(per_thread):
+                t0 = time.perf_counter()
+                crud.create_skid_masuk_depot(db, payload(offset + i))
+                local.append(time.perf_counter() - t0)
+        finally:
+            db.close()
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, started
+
+
+def percentile(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+
+def count_rows() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(models.SkidMasukDepot).count()
+    finally:
+        db.close()
+
+
+def report(label: str, latencies: list, elapsed: float, rows: int):
+    print(f"{label}: {rows / elapsed:8.0f} laporan/detik  "
+          f"ack p50 {percentile(latencies, 0.5):6.1f} ms  p99 {percentile(latencies, 0.99):6.1f} ms")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    total = threads * per_thread
+    migrations.ensure_schema(engine)
+    print(f"{threads} thread x {per_thread} laporan")
+
+    before = count_rows()
+    latencies, started = run(threads, per_thread)
+    elapsed = time.perf_counter() - started
+    report("langsung      ", latencies, elapsed, count_rows() - before)
+
+    before = count_rows()
+    active = journal.start()
+    latencies, started = run(threads, per_thread)
+    acked = time.perf_counter() - started
+    stats = dict(active.stats)
+    journal.stop()                       # tunggu semua batch masuk database
+    elapsed = time.perf_counter() - started
+    rows = count_rows() - before
+    report("write-behind  ", latencies, elapsed, rows)
+    print(f"  ack semua {acked:.2f} s, sampai database {elapsed:.2f} s; "
+          f"{stats['fsync']} fsync journal untuk {total} laporan, {rows} baris masuk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark memo hasil baca crud: get_all_karyawan / get_all (laporan kirim per
+lokasi) dipanggil berulang tanpa tulisan di antaranya, dengan memo mati
+(MEMO_MAX_BYTES=0, query + objek ORM setiap kali) vs memo aktif, lalu satu
+tulisan di tengah untuk memastikan hasil ikut berubah.
+
+    python benchmarks/bench_memo.py            # 5000 baris, 50 panggilan
+    python benchmarks/bench_memo.py 20000 500
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dt_time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}")
+os.environ.setdefault("CACHE_URL", "memory://")
+
+from sqlalchemy import insert
+
+import crud
+import memo
+import models
+from database import Base, SessionLocal, engine
+
+
+def seed(n: int):
+    karyawan = [{"nik": f"NIK{i:06d}", "nama": f"Karyawan {i}", "jabatan": f"Jabatan {i % 12}",
+                 "kontak": f"08{i:010d}", "keterangan": "-"} for i in range(n)]
+    kirim = [{"lokasi": "merak" if i % 2 else "semarang", "tanggal": date(2024, 1 + i % 12, 1 + i % 28),
+              "nama_driver": f"Driver {i % 50}", "plat_mobil": f"B {i % 900} XY", "jam_berangkat": dt_time(8),
+              "kapasitas": 560, "jenis_tabung": "12KG", "jumlah_dibawa": 100,
+              "tujuan": f"Pangkalan {i % 80}", "kondisi_tabung": "Baik"} for i in range(n)]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Karyawan.__table__), karyawan)
+        conn.execute(insert(models.LaporanKirim.__table__), kirim)
+
+
+def run(db, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        crud.get_all_karyawan(db)
+        crud.get_all(db, models.LaporanKirim, filters={"lokasi": "merak"})
+    return time.perf_counter() - started
+
+
+def main(n: int, calls: int):
+    Base.metadata.create_all(engine)
+    seed(n)
+    db = SessionLocal()
+
+    limit = memo.store.max_bytes
+    memo.store.max_bytes = 0
+    tanpa = run(db, calls)
+    memo.store.max_bytes = limit
+    dengan = run(db, calls)
+
+    before = len(crud.get_all_karyawan(db))
+    crud.create_karyawan(db, nik="BARU", nama="Karyawan Baru", jabatan="Staf")
+    after = len(crud.get_all_karyawan(db))
+    db.close()
+
+    stats = memo.stats()
+    print(f"{n} baris x 2 helper, {calls} panggilan")
+    print(f"  tanpa memo   {tanpa * 1000:9.1f} ms")
+    print(f"  dengan memo  {dengan * 1000:9.1f} ms  ({tanpa / dengan:.0f}x lebih cepat)")
+    print(f"  setelah insert: {before} -> {after} karyawan (versi tabel naik, memo basi)")
+    print(f"  memo: {stats['entri']} entri, {stats['byte'] / 1e6:.1f} MB, hit {stats['hit']}, "
+          f"miss {stats['miss']}, basi {stats['basi']}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,86 @@
+"""
+Berat halaman sebelum dan sesudah pipeline aset (assets.py + compression.py).
+
+    python benchmarks/bench_page_weight.py
+
+Untuk setiap halaman dicetak byte yang dikirim server:
+    sebelum   HTML dengan CSS/JS sumber inline lagi, tanpa kompresi
+              (seperti template sebelum extract)
+    pertama   HTML terkompresi + aset hash versi .gz (kunjungan pertama)
+    ulang     HTML terkompresi saja; aset immutable sudah di cache browser
+Halaman dirender lewat TestClient dengan database SQLite sementara dan user
+login palsu.
+"""
+import os
+import re
+import sys
+import tempfile
+from types import SimpleNamespace
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}")
+
+from fastapi.testclient import TestClient
+
+import assets
+import deps
+from main import app
+
+PAGES = ("/", "/login", "/register", "/dashboard/mrksmg", "/form-laporan", "/laporan-skid",
+         "/laporan-loading", "/laporan-produksi", "/laporan-supir", "/laporan/about", "/users")
+ASSET_TAG = re.compile(r'<link rel="stylesheet" href="(/static/[^"]+)">|<script src="(/static/[^"]+)"></script>')
+USER = SimpleNamespace(id=1, username="admin", role="admin", email=None, is_active=True)
+
+
+def wire_size(response) -> int:
+    return int(response.headers.get("content-length") or len(response.content))
+
+
+def source_of(url: str) -> str:
+    """File sumber untuk URL aset (versi hash -> nama sumber lewat manifest)"""
+    built = url.split("/static/dist/", 1)[-1]
+    names = {v: k for k, v in assets._manifest.entries().items()}
+    name = names.get(built, url.split("/static/src/", 1)[-1])
+    with open(os.path.join(assets.SOURCE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def inline_sources(html: str) -> str:
+    def replace(match):
+        css, js = match.groups()
+        return f"<style>{source_of(css)}</style>" if css else f"<script>{source_of(js)}</script>"
+    return ASSET_TAG.sub(replace, html)
+
+
+def main():
+    assets.build()
+    for dep in (deps.require_login, deps.require_admin, deps.require_login_redirect, deps.get_current_user):
+        app.dependency_overrides[dep] = lambda: USER
+    total = {"sebelum": 0, "pertama": 0, "ulang": 0}
+    print(f"{'halaman':24} {'sebelum':>9} {'pertama':>9} {'ulang':>9}  aset")
+    with TestClient(app) as client:
+        for page in PAGES:
+            plain = client.get(page, headers={"Accept-Encoding": "identity"})
+            if plain.status_code != 200:
+                print(f"{page:24} status {plain.status_code}, dilewati")
+                continue
+            before = len(inline_sources(plain.text).encode("utf-8"))
+            html = wire_size(client.get(page, headers={"Accept-Encoding": "gzip, br"}))
+            urls = [css or js for css, js in ASSET_TAG.findall(plain.text)]
+            asset_bytes = sum(
+                wire_size(client.get(url, headers={"Accept-Encoding": "gzip"})) for url in urls
+            )
+            row = {"sebelum": before, "pertama": html + asset_bytes, "ulang": html}
+            for key in total:
+                total[key] += row[key]
+            print(f"{page:24} {before:9} {row['pertama']:9} {html:9}  {len(urls)} file")
+    print(f"{'total':24} {total['sebelum']:9} {total['pertama']:9} {total['ulang']:9}")
+    if total["sebelum"]:
+        print(f"kunjungan ulang {100 * (1 - total['ulang'] / total['sebelum']):.0f}% lebih kecil")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark pencarian foto mirip: multi-index photo_hashes (photo_hash.find_similar)
+vs membandingkan hash baru dengan semua hash satu per satu.
+
+    python benchmarks/bench_photo_hash.py            # 200000 hash, 200 pencarian
+    python benchmarks/bench_photo_hash.py 500000 500
+
+Hash acak (bukan dari gambar) supaya tidak butuh Pillow; separuh pencarian
+memakai hash yang sudah ada dengan beberapa bit dibalik (harus ketemu).
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}")
+os.environ.setdefault("CACHE_URL", "memory://")
+
+from sqlalchemy import insert, select
+
+import models
+import photo_hash
+from database import Base, SessionLocal, engine
+
+BATCH = 20000
+
+
+def seed(n: int) -> list:
+    values = [random.getrandbits(64) for _ in range(n)]
+    with engine.begin() as conn:
+        for start in range(0, n, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, n)):
+                h0, h1, h2, h3 = photo_hash.chunks(values[i])
+                rows.append({"url": f"/uploads/skid_depot/{i}.jpg", "phash": f"{values[i]:016x}",
+                             "h0": h0, "h1": h1, "h2": h2, "h3": h3})
+            conn.execute(insert(models.PhotoHash.__table__), rows)
+    return values
+
+
+def flip(value: int, bits: int) -> int:
+    for bit in random.sample(range(64), bits):
+        value ^= 1 << bit
+    return value
+
+
+def main(n: int, lookups: int):
+    random.seed(7)
+    Base.metadata.create_all(engine)
+    values = seed(n)
+    queries = [flip(random.choice(values), random.randint(0, photo_hash.MAX_DISTANCE)) if i % 2
+               else random.getrandbits(64) for i in range(lookups)]
+    db = SessionLocal()
+
+    started = time.perf_counter()
+    found = sum(1 for q in queries if photo_hash.find_similar(db, q))
+    index = time.perf_counter() - started
+
+    started = time.perf_counter()
+    all_hashes = [int(h, 16) for h in db.execute(select(models.PhotoHash.phash)).scalars()]
+    scan_found = sum(1 for q in queries
+                     if any(photo_hash.distance(q, h) <= photo_hash.MAX_DISTANCE for h in all_hashes))
+    scan = time.perf_counter() - started
+    db.close()
+
+    print(f"{n} hash, {lookups} pencarian (jarak <= {photo_hash.MAX_DISTANCE})")
+    print(f"  multi-index   {index / lookups * 1000:8.2f} ms/pencarian  ketemu {found}")
+    print(f"  scan semua    {scan / lookups * 1000:8.2f} ms/pencarian  ketemu {scan_found}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,138 @@
+"""
+Benchmark latensi insert laporan saat dashboard membaca data besar.
+
+    python benchmarks/bench_read_write.py            # 200k baris awal
+    python benchmarks/bench_read_write.py 500000
+
+Dua konfigurasi SQLite, masing-masing di file sementara:
+    - lama: satu engine, journal_mode=DELETE (seperti sebelum database.py
+      dipisah); pembaca memegang SHARED lock selama cursor terbuka sehingga
+      commit penulis harus menunggu.
+    - baru: engine tulis WAL + engine baca read-only (mode=ro), seperti
+      database.py sekarang.
+
+Selama benchmark, 2 thread terus men-stream crud.iter_laporan (seperti
+/api/laporan) dan 1 thread meng-insert laporan satu per satu. Yang dicetak:
+p50/p99/maks latensi insert dan jumlah insert yang gagal karena database
+terkunci.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, time as dtime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from database import Base
+
+DURATION = 5.0
+BUSY_TIMEOUT_MS = 5000
+
+
+def make_engines(path: str, wal: bool):
+    write = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(write, "connect")
+    def _pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    if not wal:
+        return write, write
+    read = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true", connect_args={"check_same_thread": False})
+
+    @event.listens_for(read, "connect")
+    def _read_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA query_only=1")
+        cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        cursor.close()
+    return write, read
+
+
+def seed(engine, n: int):
+    Base.metadata.create_all(engine)
+    rows = [{
+        "nama_driver": f"Driver {i % 300}", "plat_mobil": f"B {i % 900} XY",
+        "tanggal": date(2024, 1 + i % 12, 1 + i % 28), "rit": 1, "jam_masuk": dtime(8, i % 60),
+    } for i in range(n)]
+    with engine.begin() as conn:
+        conn.execute(insert(models.SkidMasukDepot), rows)
+
+
+def run(label: str, wal: bool, n: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        write_engine, read_engine = make_engines(path, wal)
+        seed(write_engine, n)
+        WriteSession = sessionmaker(bind=write_engine, autoflush=False)
+        ReadSession = sessionmaker(bind=read_engine, autoflush=False)
+        stop = threading.Event()
+        latencies, failures, reads = [], [0], [0]
+
+        def reader():
+            while not stop.is_set():
+                db = ReadSession()
+                try:
+                    for i, _ in enumerate(crud.iter_laporan(db)):
+                        if i % 5000 == 0:
+                            time.sleep(0.001)   # client lambat menerima response
+                    reads[0] += 1
+                except OperationalError:
+                    failures[0] += 1            # pembaca ikut kena "database is locked"
+                finally:
+                    db.close()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                db = WriteSession()
+                t0 = time.perf_counter()
+                try:
+                    db.add(models.SkidMasukDepot(nama_driver=f"Baru {i}", tanggal=date(2024, 6, 1),
+                                                 rit=1, jam_masuk=dtime(9)))
+                    db.commit()
+                    latencies.append(time.perf_counter() - t0)
+                except OperationalError:
+                    db.rollback()
+                    failures[0] += 1
+                finally:
+                    db.close()
+                i += 1
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=reader) for _ in range(2)] + [threading.Thread(target=writer)]
+        for t in threads:
+            t.start()
+        time.sleep(DURATION)
+        stop.set()
+        for t in threads:
+            t.join()
+        write_engine.dispose()
+        read_engine.dispose()
+
+    latencies.sort()
+    pick = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+    print(f"{label}: insert p50 {pick(0.5):7.1f} ms  p99 {pick(0.99):7.1f} ms  maks {pick(1.0):7.1f} ms"
+          f"  | {len(latencies)} insert, {failures[0]} gagal terkunci (baca/tulis), {reads[0]} baca penuh")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{n} baris awal, {DURATION:.0f} detik per konfigurasi")
+    run("lama (DELETE, 1 engine)   ", False, n)
+    run("baru (WAL, engine baca ro)", True, n)
+
+
+if __name__ == "__main__":
+    main()
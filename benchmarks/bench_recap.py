@@ -0,0 +1,113 @@
+"""
+Benchmark rekap bulanan (recap.py): satu bulan data untuk seluruh armada
+(D driver, A agen), lalu
+    1. generate pertama (semua PDF dirender di process pool)
+    2. generate ulang tanpa perubahan (semua dari cache hash)
+    3. satu pembayaran diubah -> hanya PDF agen itu yang dirender
+    4. zip semua dokumen
+Target: langkah 1 untuk seluruh armada di bawah satu menit.
+
+    python benchmarks/bench_recap.py            # 300 driver, 200 agen
+    python benchmarks/bench_recap.py 1000 500
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date, time as dt_time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}")
+os.environ.setdefault("CACHE_URL", "memory://")
+os.environ.setdefault("RECAP_DIR", os.path.join(_tmp.name, "rekap"))
+
+from sqlalchemy import insert, update
+
+import models
+import recap
+from database import Base, SessionLocal, engine
+
+PERIODE = "2026-09"
+
+
+def seed(drivers: int, agen: int):
+    rng = random.Random(50)
+    days = [date(2026, 9, d) for d in range(1, 31)]
+    rows = {model: [] for model in (models.SkidMasukDepot, models.SkidMasukLaut, models.SkidMasukLumbung,
+                                    models.SkidKeluarDepot, models.LaporanKirim, models.LaporanBongkar,
+                                    models.PembayaranAgen)}
+    for d in range(drivers):
+        nama = f"Driver {d:04d}"
+        for day in rng.sample(days, 22):
+            for rit in range(1, rng.randint(1, 3) + 1):
+                site = rng.choice((models.SkidMasukDepot, models.SkidMasukLaut, models.SkidMasukLumbung))
+                masuk = {"nama_driver": nama, "tanggal": day, "jam_masuk": dt_time(7 + rit)}
+                if site is models.SkidMasukDepot:
+                    masuk["rit"] = rit
+                    rows[models.SkidKeluarDepot].append({"nama_driver": nama, "tanggal": day,
+                                                         "jam_keluar": dt_time(8 + rit), "jumlah_spa": rng.randint(50, 560)})
+                else:
+                    masuk["petugas_loading"] = "Petugas"
+                rows[site].append(masuk)
+            lokasi = rng.choice(("merak", "semarang"))
+            dibawa = rng.randint(100, 560)
+            rows[models.LaporanKirim].append({
+                "lokasi": lokasi, "tanggal": day, "nama_driver": nama, "plat_mobil": f"B {d} XY",
+                "jam_berangkat": dt_time(9), "kapasitas": 560, "jenis_tabung": "12KG", "jumlah_dibawa": dibawa,
+                "jumlah_turun": dibawa - 10, "tujuan": f"Pangkalan {d % 80}", "kondisi_tabung": "Baik"})
+            rows[models.LaporanBongkar].append({
+                "lokasi": lokasi, "tanggal": day, "nama_driver": nama, "jam_bongkar": dt_time(13),
+                "jenis_tabung": "12KG", "jumlah_terbawa": dibawa, "jumlah_turun": dibawa - 10, "sisa_dibawa": 10,
+                "jumlah_kosong": dibawa - 20, "kondisi_tabung": "Baik", "nama_pangkalan": f"Pangkalan {d % 80}"})
+    for a in range(agen):
+        for _ in range(rng.randint(10, 40)):
+            rows[models.PembayaranAgen].append({
+                "nama_agen": f"Agen {a:04d}", "harga_pertabung": rng.choice((19000.0, 21000.0, 145000.0)),
+                "jenis_tabung": rng.choice(("12KG", "50KG")), "nama_driver": f"Driver {rng.randrange(drivers):04d}",
+                "tanggal_pengiriman": rng.choice(days), "jumlah_turun": rng.randint(5, 120),
+                "status": rng.choice(("Paid", "Belum Paid"))})
+    with engine.begin() as conn:
+        for model, values in rows.items():
+            conn.execute(insert(model.__table__), values)
+    return sum(len(v) for v in rows.values())
+
+
+def timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<38} {time.perf_counter() - started:7.2f} dtk  {result if isinstance(result, dict) else ''}")
+    return result
+
+
+def main(drivers: int, agen: int):
+    Base.metadata.create_all(engine)
+    print(f"{seed(drivers, agen):,} baris, {recap.WORKERS} proses render")
+    db = SessionLocal()
+
+    first = timed("1. generate (semua baru)", lambda: recap.generate(db, PERIODE))
+    assert first["dirender"] == first["dokumen"] == drivers + agen, first
+    assert first["total_ms"] < 60_000, "rekap seluruh armada harus di bawah satu menit"
+
+    again = timed("2. generate ulang (tanpa perubahan)", lambda: recap.generate(db, PERIODE))
+    assert again["dirender"] == 0, again
+
+    db.execute(update(models.PembayaranAgen).where(models.PembayaranAgen.id == 1).values(status="Paid", jumlah_turun=999))
+    db.commit()
+    changed = timed("3. generate (satu pembayaran berubah)", lambda: recap.generate(db, PERIODE))
+    assert changed["dirender"] == 1, changed
+
+    path = timed("4. zip", lambda: recap.build_zip(db, PERIODE))
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        sample = archive.read(names[0])
+    assert len(names) == drivers + agen + 1 and sample.startswith(b"%PDF-") and sample.rstrip().endswith(b"%%EOF")
+    print(f"zip {os.path.getsize(path) / 1e6:.1f} MB, {len(names) - 1} PDF")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,132 @@
+"""
+Benchmark serialisasi /api/laporan dan /api/pembayaran-agen.
+
+    python benchmarks/bench_serializers.py            # 100k baris
+    python benchmarks/bench_serializers.py 20000
+
+Setiap mode dijalankan di proses terpisah supaya peak RSS-nya tidak
+tercampur:
+    lama    objek ORM -> list dict -> jsonable_encoder -> JSONResponse
+    json    crud.iter_* -> serializers.iter_json_array (streaming)
+    ndjson  crud.iter_* -> serializers.iter_ndjson (streaming)
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from database import Base
+
+
+def seed(url: str, n: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    rng = random.Random(n)
+    start = datetime(2023, 1, 1)
+    half = n // 2
+    with engine.begin() as conn:
+        conn.execute(models.LaporanKirim.__table__.insert(), [{
+            "lokasi": rng.choice(["merak", "semarang"]), "tanggal": date(2023, 1, 1) + timedelta(days=i % 365),
+            "nama_driver": f"Driver {i % 300}", "plat_mobil": f"A {i % 9000} XY",
+            "jam_berangkat": dtime(8, i % 60), "kapasitas": 100, "jenis_tabung": "12KG",
+            "jumlah_dibawa": i % 100, "tujuan": f"Agen {i % 500}", "kondisi_tabung": "baik",
+            "created_at": start + timedelta(minutes=i),
+        } for i in range(half)])
+        conn.execute(models.SkidMasukDepot.__table__.insert(), [{
+            "nama_driver": f"Driver {i % 300}", "tanggal": date(2023, 1, 1) + timedelta(days=i % 365),
+            "rit": i % 5 + 1, "jam_masuk": dtime(7, i % 60), "created_at": start + timedelta(minutes=i, seconds=30),
+        } for i in range(n - half)])
+        conn.execute(models.PembayaranAgen.__table__.insert(), [{
+            "nama_agen": f"Agen {i % 500}", "harga_pertabung": 18000.0, "jenis_tabung": "12KG",
+            "nama_driver": f"Driver {i % 300}", "tanggal_pengiriman": date(2023, 1, 1) + timedelta(days=i % 365),
+            "jumlah_turun": i % 50, "status": rng.choice(["Paid", None]),
+        } for i in range(n)])
+    engine.dispose()
+
+
+# ================== MODE (di proses anak) ==================
+def old_laporan(db):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    result = []
+    for model_class, jenis_name, lokasi_default, _ in crud.RINGKASAN_LAPORAN:
+        for item in db.query(model_class).all():
+            result.append({
+                "id": item.id,
+                "jenis": jenis_name,
+                "lokasi": getattr(item, 'lokasi', lokasi_default),
+                "nama_driver": getattr(item, 'nama_driver', '-'),
+                "plat_mobil": getattr(item, 'plat_mobil', '-'),
+                "tujuan": getattr(item, 'tujuan', getattr(item, 'nama_pangkalan', '-')),
+                "created_at": item.created_at.strftime("%Y-%m-%d %H:%M:%S") if item.created_at else None,
+            })
+    result.sort(key=lambda x: x["created_at"] or "0000-00-00 00:00:00", reverse=True)
+    yield JSONResponse(jsonable_encoder(result)).body
+
+
+def old_pembayaran(db):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    rows = crud.get_all_pembayaran(db)
+    data = [{
+        "id": r.id, "nama_agen": r.nama_agen, "harga_pertabung": r.harga_pertabung,
+        "jenis_tabung": r.jenis_tabung, "nama_driver": r.nama_driver,
+        "tanggal_pengiriman": r.tanggal_pengiriman.isoformat() if r.tanggal_pengiriman else None,
+        "jumlah_turun": r.jumlah_turun, "status": r.status or "Belum Paid", "bukti": r.bukti,
+    } for r in rows]
+    yield JSONResponse(jsonable_encoder(data)).body
+
+
+def run_child(url: str, endpoint: str, mode: str):
+    import serializers
+    engine = create_engine(url)
+    db = sessionmaker(bind=engine)()
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    rows_fn = crud.iter_laporan if endpoint == "laporan" else crud.iter_pembayaran
+    if mode == "lama":
+        chunks = old_laporan(db) if endpoint == "laporan" else old_pembayaran(db)
+    elif mode == "json":
+        chunks = serializers.iter_json_array(rows_fn(db))
+    else:
+        chunks = serializers.iter_ndjson(rows_fn(db))
+
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if first is None and size > 1:  # lewati "[" pembuka array
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{endpoint:<11} {mode:<7} | baris pertama {first * 1000:8.1f} ms | total {total * 1000:8.1f} ms "
+          f"| {size / 1e6:5.1f} MB | peak RSS {peak / 1024:6.1f} MB (+{(peak - base_rss) / 1024:.1f})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        run_child(*sys.argv[2:5])
+        sys.exit(0)
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, n)
+        print(f"{n} baris per endpoint")
+        for endpoint in ("laporan", "pembayaran"):
+            for mode in ("lama", "json", "ndjson"):
+                subprocess.run([sys.executable, os.path.abspath(__file__), "--child", url, endpoint, mode],
+                               check=True, cwd=ROOT)
@@ -0,0 +1,108 @@
+"""
+Benchmark render dashboardmrksmg.html dengan cache fragmen per baris.
+
+    python benchmarks/bench_templates.py            # 10k dan 100k baris
+    python benchmarks/bench_templates.py 50000
+
+Yang diukur:
+    - load template: tanpa bytecode cache vs dengan bytecode cache yang sudah terisi
+    - render dingin (semua fragmen miss) vs hangat (semua hit)
+    - render setelah 1 jenis laporan di-update (hanya jenis itu yang dirender ulang)
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, time as dtime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+from jinja2 import Environment, FileSystemLoader
+
+import template_cache
+
+JENIS = list(template_cache.DISPLAY_FIELDS)
+
+
+def make_rows(n: int, lokasi: str) -> list:
+    rng = random.Random(n)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": i + 1,
+            "jenis": rng.choice(JENIS),
+            "lokasi": lokasi,
+            "tanggal": date(2024, 1 + i % 12, 1 + i % 28),
+            "nama_driver": f"Driver {i % 300}",
+            "plat_mobil": f"A {1000 + i % 9000} XY",
+            "rit": i % 5 + 1,
+            "jam_masuk": dtime(8, i % 60),
+            "jam_keluar": dtime(10, i % 60),
+            "jumlah_spa": i % 40,
+            "petugas_loading": "Petugas",
+            "penanggung_jawab": "PJ",
+            "kepala_produksi": "Kepala",
+            "tabung_12": i % 100,
+            "tabung_50": i % 10,
+            "tabung_kosong": i % 7,
+            "keterangan": "-",
+            "media": f"skid_laut/{i}.jpg" if i % 3 == 0 else None,
+        })
+    return rows
+
+
+def timed(fn, repeat: int = 1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_load():
+    def load(bytecode_cache):
+        env = Environment(
+            loader=FileSystemLoader("templates"),
+            extensions=[template_cache.FragmentCacheExtension],
+            bytecode_cache=bytecode_cache,
+        )
+        env.get_template("dashboardmrksmg.html")
+
+    from jinja2 import FileSystemBytecodeCache
+    os.makedirs(template_cache.BYTECODE_CACHE_DIR, exist_ok=True)
+    bcc = FileSystemBytecodeCache(template_cache.BYTECODE_CACHE_DIR)
+    load(bcc)  # isi cache
+    print(f"load template tanpa bytecode cache : {timed(lambda: load(None), 5) * 1000:8.2f} ms")
+    print(f"load template dengan bytecode cache: {timed(lambda: load(bcc), 5) * 1000:8.2f} ms")
+
+
+def bench_render(n: int):
+    templates = template_cache.create_templates("templates")
+    env = templates.env
+    tpl = env.get_template("dashboardmrksmg.html")
+    merak = make_rows(n // 2, "merak")
+    semarang = make_rows(n - n // 2, "semarang")
+    versi = {jenis: 0 for jenis in JENIS}
+
+    def render():
+        tpl.render(laporan_merak=merak, laporan_semarang=semarang, versi=versi,
+                   live_last_event_id="", user=None)
+
+    env.fragment_cache.clear()
+    cold = timed(render)
+    warm = timed(render, 3)
+    versi[JENIS[0]] += 1  # satu jenis laporan di-update
+    partial = timed(render)
+
+    print(f"{n:>7} baris | dingin {cold * 1000:9.1f} ms | hangat {warm * 1000:9.1f} ms "
+          f"| 1 jenis berubah {partial * 1000:9.1f} ms | fragmen {len(env.fragment_cache)}")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    bench_load()
+    for n in sizes:
+        bench_render(n)
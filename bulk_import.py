@@ -0,0 +1,569 @@
+"""
+Import massal data historis (CSV/XLSX) ke tabel laporan.
+
+    python bulk_import.py skid_masuk_depot data/skid_2021.csv
+    python bulk_import.py laporan_kirim kirim.xlsx --lokasi merak --reject gagal.csv
+    python bulk_import.py skid_keluar_depot arsip.csv --tanpa-index
+
+File dibaca per chunk (default 20.000 baris). Setiap chunk diubah menjadi
+array kolom NumPy lalu tanggal, jam dan angka di-parse sekaligus per kolom
+(bukan parse_date/parse_time/parse_int per baris). Tipe dan kolom wajib
+diambil dari schema *Create di schemas.py, panjang maksimum string dari
+models.py. Baris yang lolos di-insert dengan executemany dalam transaksi
+besar. Baris yang gagal ditulis ke file reject (CSV) beserta alasannya.
+
+Dengan --tanpa-index, index sekunder tabel tujuan di-drop selama import dan
+dibuat ulang di akhir (lebih cepat untuk file besar). Hanya pakai saat server
+tidak melayani tabel itu: kalau proses dimatikan di tengah jalan, index tetap
+hilang sampai migrations.apply_schema dijalankan lagi.
+
+Format yang diterima:
+    tanggal  YYYY-MM-DD atau DD/MM/YYYY
+    jam      H:MM, HH:MM atau HH:MM:SS (pemisah ':' atau '.')
+    angka    bilangan bulat tanpa pemisah ribuan
+
+created_at diisi dari tanggal + jam laporan (bukan waktu import), supaya
+urutan di dashboard tetap sesuai kejadian. Laporan hasil import tidak
+dikirim ke feed live.
+
+Dengan shard per site, baris ditulis langsung ke database site tabelnya;
+laporan kirim/bongkar wajib memakai --lokasi (satu file = satu site) dan
+kolom lokasi di file ditimpa. Dimensi driver/kendaraan tetap di database
+global.
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time as _time
+import typing
+from datetime import date, datetime, time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+import cdc
+import crud
+import database
+import dimensions
+import models
+import schemas
+from database import engine
+
+CHUNK_SIZE = 20_000
+COMMIT_EVERY = 100_000
+
+# tabel -> (model, schema validasi). Lumbung memakai schema Laut (kolomnya sama).
+IMPORT_TARGETS = {
+    "skid_masuk_depot": (models.SkidMasukDepot, schemas.SkidMasukDepotCreate),
+    "skid_keluar_depot": (models.SkidKeluarDepot, schemas.SkidKeluarDepotCreate),
+    "skid_masuk_laut": (models.SkidMasukLaut, schemas.SkidMasukLautCreate),
+    "skid_keluar_laut": (models.SkidKeluarLaut, schemas.SkidKeluarLautCreate),
+    "skid_masuk_lumbung": (models.SkidMasukLumbung, schemas.SkidMasukLautCreate),
+    "skid_keluar_lumbung": (models.SkidKeluarLumbung, schemas.SkidKeluarLautCreate),
+    "sebelum_loading": (models.SebelumLoading, schemas.SebelumLoadingCreate),
+    "sesudah_loading": (models.SesudahLoading, schemas.SesudahLoadingCreate),
+    "produksi_mulai": (models.ProduksiMulai, schemas.ProduksiMulaiCreate),
+    "produksi_selesai": (models.ProduksiSelesai, schemas.ProduksiSelesaiCreate),
+    "laporan_kirim": (models.LaporanKirim, schemas.LaporanKirimCreate),
+    "laporan_bongkar": (models.LaporanBongkar, schemas.LaporanBongkarCreate),
+}
+
+
+class BulkImportError(Exception):
+    """Kesalahan yang membatalkan seluruh import (file/kolom tidak valid)"""
+
+
+# ================== SPEC KOLOM DARI SCHEMA ==================
+def _field_specs(schema) -> list:
+    """[(nama, tipe, wajib)] dari schema pydantic (v2, fallback v1)"""
+    specs = []
+    fields = getattr(schema, "model_fields", None)
+    if fields is not None:
+        items = [(name, f.annotation, f.is_required()) for name, f in fields.items()]
+    else:
+        items = [(name, f.outer_type_, f.required) for name, f in schema.__fields__.items()]
+    for name, annotation, required in items:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        base = args[0] if args else annotation
+        specs.append((name, base, bool(required)))
+    return specs
+
+
+def _max_lengths(model_class) -> dict:
+    return {
+        c.name: c.type.length
+        for c in model_class.__table__.columns
+        if getattr(c.type, "length", None)
+    }
+
+
+# ================== PARSER VEKTOR ==================
+def _codes(values: np.ndarray, width: int) -> np.ndarray:
+    """Kode unicode per karakter (n x width), dipotong/padding ke width"""
+    fixed = values.astype(f"U{width}")
+    return fixed.view(np.uint32).reshape(len(fixed), width).astype(np.int64)
+
+
+def _digits(codes: np.ndarray, positions) -> np.ndarray:
+    d = codes[:, positions] - ord("0")
+    return ((d >= 0) & (d <= 9)).all(axis=1)
+
+
+def _number(codes: np.ndarray, positions) -> np.ndarray:
+    out = np.zeros(len(codes), dtype=np.int64)
+    for p in positions:
+        out = out * 10 + (codes[:, p] - ord("0"))
+    return out
+
+
+def parse_dates(values: np.ndarray):
+    """Array string -> (datetime64[D], mask valid)"""
+    n = len(values)
+    if n == 0:
+        return np.array([], dtype="datetime64[D]"), np.zeros(0, dtype=bool)
+    lens = np.char.str_len(values)
+    c = _codes(values, 10)
+
+    iso = (lens == 10) & (c[:, 4] == ord("-")) & (c[:, 7] == ord("-")) & _digits(c, [0, 1, 2, 3, 5, 6, 8, 9])
+    dmy = (lens == 10) & (c[:, 2] == ord("/")) & (c[:, 5] == ord("/")) & _digits(c, [0, 1, 3, 4, 6, 7, 8, 9])
+
+    year = np.where(iso, _number(c, [0, 1, 2, 3]), _number(c, [6, 7, 8, 9]))
+    month = np.where(iso, _number(c, [5, 6]), _number(c, [3, 4]))
+    day = np.where(iso, _number(c, [8, 9]), _number(c, [0, 1]))
+
+    ok = (iso | dmy) & (year >= 1900) & (year <= 2100) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    year, month, day = np.where(ok, year, 1970), np.where(ok, month, 1), np.where(ok, day, 1)
+
+    first_of_month = np.datetime64("1970-01", "M") + ((year - 1970) * 12 + (month - 1))
+    result = first_of_month.astype("datetime64[D]") + (day - 1)
+    # 31/02 dst. meluber ke bulan berikutnya
+    ok &= result.astype("datetime64[M]") == first_of_month
+    return result, ok
+
+
+def parse_times(values: np.ndarray):
+    """Array string -> (detik sejak 00:00, mask valid)"""
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    values = values.astype(str)
+    lens = np.char.str_len(values)
+    # "7:30" -> "07:30"
+    short = (lens == 4) | (lens == 7)
+    values = np.where(short, np.char.add("0", values), values)
+    lens = np.where(short, lens + 1, lens)
+    c = _codes(values, 8)
+
+    sep = lambda p: (c[:, p] == ord(":")) | (c[:, p] == ord("."))
+    hhmm = (lens == 5) & sep(2) & _digits(c, [0, 1, 3, 4])
+    hhmmss = (lens == 8) & sep(2) & sep(5) & _digits(c, [0, 1, 3, 4, 6, 7])
+
+    hour, minute = _number(c, [0, 1]), _number(c, [3, 4])
+    second = np.where(hhmmss, _number(c, [6, 7]), 0)
+    ok = (hhmm | hhmmss) & (hour < 24) & (minute < 60) & (second < 60)
+    return np.where(ok, hour * 3600 + minute * 60 + second, 0), ok
+
+
+def parse_ints(values: np.ndarray):
+    """Array string -> (int64, mask valid)"""
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    # Dicek per kode karakter seperti tanggal/jam: str.isdigit() juga menerima
+    # digit non-ASCII ("²", "١") yang lalu membuat astype gagal
+    lens = np.char.str_len(values)
+    c = _codes(values, 15)
+    in_value = np.arange(15) < lens[:, None]
+    ascii_digit = (c >= ord("0")) & (c <= ord("9"))
+    ok = (lens > 0) & (lens <= 15) & (ascii_digit | ~in_value).all(axis=1)
+    return np.where(ok, values, "0").astype(np.int64), ok
+
+
+def parse_floats(values: np.ndarray):
+    """Array string -> (float64, mask valid); di-parse per nilai unik"""
+    uniq, inverse = np.unique(values, return_inverse=True)
+    parsed = np.zeros(len(uniq))
+    valid = np.zeros(len(uniq), dtype=bool)
+    for i, v in enumerate(uniq.tolist()):
+        try:
+            parsed[i] = float(v.replace(",", "."))
+            valid[i] = True
+        except ValueError:
+            pass
+    return parsed[inverse], valid[inverse]
+
+
+def _seconds_to_time(seconds: int) -> time:
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def _bound_values(raw: np.ndarray, empty: np.ndarray, to_python=None, processor=None) -> np.ndarray:
+    """
+    Nilai siap kirim ke driver DB untuk satu kolom. Konversi ke objek Python
+    dan bind processor SQLAlchemy (misal date -> string di SQLite) hanya
+    dijalankan per nilai unik, lalu disebar lagi dengan indeks.
+    """
+    if to_python is None and processor is None:
+        out = raw.astype(object)
+        out[empty] = None
+        return out
+    uniq, inverse = np.unique(raw, return_inverse=True)
+    values = uniq.tolist()
+    if to_python is not None:
+        values = [to_python(v) for v in values]
+    if processor is not None:
+        values = [processor(v) for v in values]
+    lookup = np.empty(len(values), dtype=object)
+    lookup[:] = values
+    out = lookup[inverse]
+    out[empty] = None
+    return out
+
+
+# ================== PARSE SATU CHUNK ==================
+def parse_chunk(columns: dict, specs: list, max_lengths: dict, n: int, processors: dict = None):
+    """
+    columns: nama -> array string (sudah di-strip). processors: nama kolom ->
+    bind processor dialect (boleh kosong). Mengembalikan (kolom hasil parse,
+    mask valid, array alasan gagal per baris).
+    """
+    processors = processors or {}
+    ok = np.ones(n, dtype=bool)
+    reasons = np.full(n, "", dtype=object)
+    parsed = {}
+    raw_dates = None
+    raw_jam = None
+
+    def fail(mask, message):
+        nonlocal ok
+        bad = mask & ok
+        reasons[bad] = message
+        ok &= ~mask
+
+    for name, type_, required in specs:
+        values = columns.get(name)
+        if values is None:
+            parsed[name] = np.full(n, None, dtype=object)
+            continue
+        empty = values == ""
+        if required:
+            fail(empty, f"{name}: wajib diisi")
+        filled = ~empty
+
+        if type_ is date:
+            days, valid = parse_dates(values)
+            fail(filled & ~valid, f"{name}: format tanggal tidak valid")
+            parsed[name] = _bound_values(days, empty, processor=processors.get(name))
+            if name == "tanggal":
+                raw_dates = np.where(filled & valid, days, np.datetime64("NaT"))
+        elif type_ is time:
+            seconds, valid = parse_times(values)
+            fail(filled & ~valid, f"{name}: format jam tidak valid")
+            parsed[name] = _bound_values(seconds, empty, _seconds_to_time, processors.get(name))
+            if raw_jam is None and name.startswith("jam_"):
+                raw_jam = np.where(filled & valid, seconds, 0)
+        elif type_ is int:
+            numbers, valid = parse_ints(values)
+            fail(filled & ~valid, f"{name}: harus bilangan bulat")
+            parsed[name] = _bound_values(numbers, empty, processor=processors.get(name))
+        elif type_ is float:
+            numbers, valid = parse_floats(values)
+            fail(filled & ~valid, f"{name}: harus angka")
+            parsed[name] = _bound_values(numbers, empty, processor=processors.get(name))
+        else:
+            limit = max_lengths.get(name)
+            if limit:
+                fail(np.char.str_len(values) > limit, f"{name}: lebih dari {limit} karakter")
+            parsed[name] = _bound_values(values, empty, processor=processors.get(name))
+
+    # created_at = tanggal + jam kejadian
+    if raw_dates is not None:
+        stamp = raw_dates.astype("datetime64[s]")
+        if raw_jam is not None:
+            stamp = stamp + raw_jam.astype("timedelta64[s]")
+        parsed["created_at"] = _bound_values(stamp, np.isnat(stamp), processor=processors.get("created_at"))
+    return parsed, ok, reasons
+
+
+# ================== BACA FILE PER CHUNK ==================
+def _cell_to_str(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, time):
+        return value.strftime("%H:%M:%S")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _read_csv(path: str, chunk_size: int):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = next(reader, None)
+        if header is None:
+            raise BulkImportError("File kosong")
+        yield header
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def _read_xlsx(path: str, chunk_size: int):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise BulkImportError("Import XLSX butuh paket openpyxl (pip install openpyxl)")
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise BulkImportError("File kosong")
+        yield [_cell_to_str(v) for v in header]
+        while True:
+            chunk = [[_cell_to_str(v) for v in row] for row in itertools.islice(rows, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        workbook.close()
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE):
+    """Generator: header dulu, lalu list baris per chunk"""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        return _read_xlsx(path, chunk_size)
+    return _read_csv(path, chunk_size)
+
+
+def _normalize_header(name: str) -> str:
+    return name.strip().lower().replace(" ", "_")
+
+
+# ================== INDEX ==================
+# IF [NOT] EXISTS, bukan checkfirst: refleksi SQLite tidak melihat index ekspresi
+def _drop_indexes(table, bind) -> list:
+    dropped = []
+    with bind.begin() as conn:
+        for index in table.indexes:
+            conn.execute(DropIndex(index, if_exists=True))
+            dropped.append(index)
+    return dropped
+
+
+def _restore_indexes(indexes: list, bind):
+    with bind.begin() as conn:
+        for index in indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _target_engine(table, lokasi: str = None):
+    """Engine tujuan import (database site kalau shard aktif)"""
+    if not database.sharding_enabled:
+        return engine
+    site = database.site_of(table.name, lokasi)
+    if table.name in database.LOKASI_TABLES and site is None:
+        raise BulkImportError(
+            f"Dengan shard per site, {table.name} butuh --lokasi ({' / '.join(database.SITES)})"
+        )
+    return database.site_engines[site][0] if site else engine
+
+
+# ================== IMPORT ==================
+def _remember(dim_pending: list):
+    """Id dimensi baru masuk cache setelah transaksinya di-commit"""
+    for cache, found in dim_pending:
+        cache.remember(found)
+    dim_pending.clear()
+
+
+def import_file(jenis: str, path: str, reject_path: str = None, lokasi: str = None,
+                chunk_size: int = CHUNK_SIZE, commit_every: int = COMMIT_EVERY,
+                defer_indexes: bool = False) -> dict:
+    if jenis not in IMPORT_TARGETS:
+        raise BulkImportError(f"Jenis tidak dikenal: {jenis}. Pilihan: {', '.join(IMPORT_TARGETS)}")
+    model_class, schema = IMPORT_TARGETS[jenis]
+    table = model_class.__table__
+    target = _target_engine(table, lokasi)
+    # Seluruh file masuk satu site: lokasi dari argumen menimpa kolom file
+    force_lokasi = target is not engine and table.name in database.LOKASI_TABLES
+    specs = _field_specs(schema)
+    max_lengths = _max_lengths(model_class)
+    target_columns = {c.name for c in table.columns}
+
+    chunks = read_chunks(path, chunk_size)
+    raw_header = next(chunks)
+    header = [_normalize_header(h) for h in raw_header]
+    index_of = {name: i for i, name in enumerate(header)}
+
+    missing = [name for name, _, required in specs
+               if required and name not in index_of and not (name == "lokasi" and lokasi)]
+    if missing:
+        raise BulkImportError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+    ignored = [h for h in header if h not in {s[0] for s in specs}]
+
+    # Insert di-compile sekali; nilai dikirim langsung ke executemany driver
+    dialect = target.dialect
+    names = [name for name, _, _ in specs if name in target_columns]
+    if "created_at" in target_columns and "tanggal" in names:
+        names.append("created_at")
+    # driver_id / kendaraan_id di-intern per nilai unik per chunk
+    dims = [(text_col, id_col, cache) for text_col, id_col, cache in dimensions.columns_for(model_class)
+            if text_col in names]
+    names.extend(id_col for _, id_col, _ in dims)
+    compiled = table.insert().compile(dialect=dialect, column_keys=names)
+    processors = {
+        name: table.c[name].type.dialect_impl(dialect).bind_processor(dialect) for name in names
+    }
+
+    reject_path = reject_path or f"{os.path.splitext(path)[0]}_reject.csv"
+    stats = {"dibaca": 0, "masuk": 0, "ditolak": 0, "kolom_diabaikan": ignored, "reject": None}
+    started = _time.perf_counter()
+
+    dropped = _drop_indexes(table, target) if defer_indexes else []
+    reject_file = None
+    reject_writer = None
+    conn = target.connect()
+    tx = conn.begin()
+    # Dimensi di database global; koneksi terpisah kalau tujuannya shard
+    dim_conn = conn if target is engine or not dims else engine.connect()
+    dim_tx = tx if dim_conn is conn else dim_conn.begin()
+    since_commit = 0
+    dim_pending = []
+    try:
+        line_no = 1  # baris header
+        for rows in chunks:
+            n = len(rows)
+            width = len(header)
+            # Samakan panjang baris dengan header
+            rows_fixed = [r[:width] + [""] * (width - len(r)) if len(r) != width else r for r in rows]
+            matrix = np.array(rows_fixed, dtype=str).reshape(n, width) if n else np.empty((0, width), dtype=str)
+            columns = {name: np.char.strip(matrix[:, i]) for name, i in index_of.items()}
+            if lokasi and ("lokasi" not in columns or force_lokasi):
+                columns["lokasi"] = np.full(n, lokasi.lower(), dtype=f"U{len(lokasi)}")
+
+            parsed, ok, reasons = parse_chunk(columns, specs, max_lengths, n, processors)
+            good = np.nonzero(ok)[0]
+            if len(good):
+                for text_col, id_col, cache in dims:
+                    values = parsed[text_col].tolist()
+                    mapping, found = cache.resolve(dim_conn, (values[i] for i in good.tolist()))
+                    if found:
+                        dim_pending.append((cache, found))
+                    parsed[id_col] = np.array([mapping.get(v) for v in values], dtype=object)
+                if compiled.positional:
+                    keys = compiled.positiontup
+                    cols = [parsed[name][good] for name in keys]
+                    records = list(zip(*cols))
+                else:
+                    keys = names
+                    cols = [parsed[name][good] for name in names]
+                    records = [dict(zip(names, values)) for values in zip(*cols)]
+                if dialect.name == "postgresql":
+                    conn.exec_driver_sql(f"LOCK TABLE {table.name} IN SHARE ROW EXCLUSIVE MODE")
+                conn.exec_driver_sql(compiled.string, records)
+                # Transaksi ini memegang lock tulis, jadi id tertinggi adalah milik chunk ini
+                ids = conn.execute(
+                    select(table.c.id).order_by(table.c.id.desc()).limit(len(records))
+                ).scalars().all()[::-1]
+                cdc.record_rows(conn, table.name, ids, (dict(zip(keys, values)) for values in zip(*cols)))
+                since_commit += len(records)
+                if since_commit >= commit_every:
+                    if dim_tx is not tx:
+                        dim_tx.commit()
+                        dim_tx = dim_conn.begin()
+                    tx.commit()
+                    _remember(dim_pending)
+                    tx = conn.begin()
+                    since_commit = 0
+
+            bad = np.nonzero(~ok)[0]
+            if len(bad):
+                if reject_writer is None:
+                    reject_file = open(reject_path, "w", newline="", encoding="utf-8")
+                    reject_writer = csv.writer(reject_file)
+                    reject_writer.writerow(list(raw_header) + ["baris", "alasan"])
+                for i in bad.tolist():
+                    reject_writer.writerow(list(rows[i]) + [line_no + 1 + i, reasons[i]])
+
+            stats["dibaca"] += n
+            stats["masuk"] += len(good)
+            stats["ditolak"] += len(bad)
+            line_no += n
+        if dim_tx is not tx:
+            dim_tx.commit()
+        tx.commit()
+        _remember(dim_pending)
+    except Exception:
+        tx.rollback()
+        if dim_tx is not tx:
+            dim_tx.rollback()
+        raise
+    finally:
+        conn.close()
+        if dim_conn is not conn:
+            dim_conn.close()
+        if reject_file:
+            reject_file.close()
+            stats["reject"] = reject_path
+        if dropped:
+            index_started = _time.perf_counter()
+            _restore_indexes(dropped, target)
+            stats["detik_index"] = round(_time.perf_counter() - index_started, 2)
+
+    if stats["masuk"]:
+        crud._touch(model_class)
+    elapsed = _time.perf_counter() - started
+    stats["detik"] = round(elapsed, 2)
+    stats["baris_per_detik"] = round(stats["dibaca"] / elapsed) if elapsed > 0 else None
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import massal laporan historis dari CSV/XLSX")
+    parser.add_argument("jenis", choices=sorted(IMPORT_TARGETS), help="tabel tujuan")
+    parser.add_argument("file", help="file .csv atau .xlsx")
+    parser.add_argument("--reject", help="file CSV untuk baris yang gagal (default <file>_reject.csv)")
+    parser.add_argument("--lokasi", help="isi kolom lokasi kalau tidak ada di file (laporan kirim/bongkar)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="baris per chunk")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY, help="baris per transaksi")
+    parser.add_argument("--tanpa-index", action="store_true",
+                        help="drop index selama import lalu buat ulang di akhir (server jangan sedang memakai tabel ini)")
+    args = parser.parse_args(argv)
+    # Import sendiri memakai Core, tapi jalur crud di proses ini tetap butuh id dimensi
+    dimensions.install(database.SessionLocal)
+
+    try:
+        stats = import_file(args.jenis, args.file, args.reject, args.lokasi,
+                            args.chunk, args.commit_every, args.tanpa_index)
+    except BulkImportError as e:
+        print(f"Import gagal: {e}")
+        return 1
+
+    print(f"Dibaca {stats['dibaca']} baris, masuk {stats['masuk']}, ditolak {stats['ditolak']} "
+          f"dalam {stats['detik']} detik ({stats['baris_per_detik']} baris/detik)")
+    if stats.get("detik_index") is not None:
+        print(f"Index dibuat ulang dalam {stats['detik_index']} detik")
+    if stats["kolom_diabaikan"]:
+        print(f"Kolom diabaikan: {', '.join(stats['kolom_diabaikan'])}")
+    if stats["reject"]:
+        print(f"Baris yang ditolak ditulis ke {stats['reject']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""
+Cache bersama untuk dashboard dan agregat.
+
+Backend dipilih lewat environment variable CACHE_URL:
+    memory://                 -> LRU di memori (hanya cocok untuk 1 worker)
+    sqlite:///./cache.db      -> file SQLite (WAL + mmap), dipakai bersama semua worker
+    redis://host:6379/0       -> server Redis (atau LocalRedisServer untuk test)
+
+Invalidasi tidak dilakukan dengan menghapus key, tapi dengan "versi tabel":
+setiap kali crud menulis ke sebuah tabel, versinya dinaikkan di backend
+bersama. Key cache memuat versi semua tabel yang dipakai, jadi begitu ada
+tulisan baru, semua worker otomatis membaca key yang berbeda (miss) dan data
+lama tidak pernah terbaca lagi.
+"""
+import os
+import pickle
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+DEFAULT_TTL = 300  # detik
+
+
+# ================== BASE ==================
+class CacheBackend:
+    """Interface backend cache. Value disimpan dalam bentuk pickle."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int = DEFAULT_TTL):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_versions(self, tables: Iterable[str]) -> dict:
+        """Versi sekarang untuk setiap tabel (0 jika belum pernah ditulis)"""
+        raise NotImplementedError
+
+    def bump_version(self, table: str) -> int:
+        raise NotImplementedError
+
+
+# ================== MEMORY (LRU) ==================
+class MemoryLRUCache(CacheBackend):
+    """LRU sederhana di memori proses. Versi tabel juga lokal per proses."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return pickle.loads(value)
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (payload, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_versions(self, tables):
+        with self._lock:
+            return {t: self._versions.get(t, 0) for t in tables}
+
+    def bump_version(self, table):
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+            return self._versions[table]
+
+
+# ================== SQLITE (FILE BERSAMA) ==================
+class SQLiteCache(CacheBackend):
+    """
+    Cache di file SQLite yang dibuka semua worker. Memakai WAL supaya pembaca
+    tidak memblokir penulis, dan mmap supaya pembacaan tidak perlu syscall read.
+    """
+
+    def __init__(self, path: str = "./cache.db", mmap_size: int = 64 * 1024 * 1024):
+        self.path = path
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS table_versions ("
+            "name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_cache_entries_expires ON cache_entries (expires_at)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Satu koneksi per thread, sqlite3 tidak boleh dipakai lintas thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, payload, now + ttl),
+        )
+        # Bersihkan entri kadaluarsa sesekali saja
+        if int(now) % 30 == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache_entries")
+
+    def get_versions(self, tables):
+        tables = list(tables)
+        if not tables:
+            return {}
+        placeholders = ",".join("?" for _ in tables)
+        rows = self._conn().execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({placeholders})",
+            tables,
+        ).fetchall()
+        found = dict(rows)
+        return {t: found.get(t, 0) for t in tables}
+
+    def bump_version(self, table):
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO table_versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (table,),
+        )
+        row = conn.execute(
+            "SELECT version FROM table_versions WHERE name = ?", (table,)
+        ).fetchone()
+        return row[0]
+
+
+# ================== REDIS (PROTOKOL RESP) ==================
+class RedisCache(CacheBackend):
+    """
+    Client Redis minimal (protokol RESP) tanpa dependency tambahan.
+    Hanya memakai perintah GET, SET PX, DEL, MGET, INCR dan FLUSHDB.
+    """
+
+    VERSION_PREFIX = "tblver:"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 prefix: str = "laporan:"):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _sock(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=5)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.db:
+                self._command("SELECT", self.db)
+        return conn
+
+    def _command(self, *args):
+        sock, reader = self._sock()
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(f"${len(arg)}\r\n".encode() + arg + b"\r\n")
+        try:
+            sock.sendall(b"".join(parts))
+            return _read_resp(reader)
+        except OSError:
+            # Koneksi putus: buang supaya perintah berikutnya membuka ulang
+            self._local.conn = None
+            raise
+
+    def get(self, key):
+        value = self._command("GET", self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._command("SET", self.prefix + key, payload, "PX", int(ttl * 1000))
+
+    def delete(self, key):
+        self._command("DEL", self.prefix + key)
+
+    def clear(self):
+        self._command("FLUSHDB")
+
+    def get_versions(self, tables):
+        tables = list(tables)
+        if not tables:
+            return {}
+        values = self._command("MGET", *[self.prefix + self.VERSION_PREFIX + t for t in tables])
+        return {t: int(v) if v is not None else 0 for t, v in zip(tables, values)}
+
+    def bump_version(self, table):
+        return self._command("INCR", self.prefix + self.VERSION_PREFIX + table)
+
+
+class RedisError(Exception):
+    pass
+
+
+def _read_resp(reader):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("Koneksi Redis tertutup")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise RedisError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length == -1:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        if count == -1:
+            return None
+        return [_read_resp(reader) for _ in range(count)]
+    raise RedisError(f"Balasan RESP tidak dikenal: {line!r}")
+
+
+# ================== STAND-IN REDIS LOKAL ==================
+class LocalRedisServer:
+    """
+    Server RESP kecil di dalam proses, pengganti Redis asli untuk test dan
+    development. Mendukung perintah yang dipakai RedisCache saja.
+
+        server = LocalRedisServer().start()
+        backend = RedisCache(port=server.port)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.data = {}
+        self.lock = threading.Lock()
+        store = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        args = _read_resp(self.rfile)
+                    except (ConnectionError, OSError):
+                        return
+                    self.wfile.write(store._execute(args))
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _get(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at < time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def _execute(self, args) -> bytes:
+        cmd = args[0].decode().upper()
+        with self.lock:
+            if cmd == "PING":
+                return b"+PONG\r\n"
+            if cmd in ("SELECT", "FLUSHDB"):
+                if cmd == "FLUSHDB":
+                    self.data.clear()
+                return b"+OK\r\n"
+            if cmd == "GET":
+                return _bulk(self._get(args[1]))
+            if cmd == "MGET":
+                values = [self._get(k) for k in args[1:]]
+                return f"*{len(values)}\r\n".encode() + b"".join(_bulk(v) for v in values)
+            if cmd == "SET":
+                expires_at = None
+                if len(args) >= 5 and args[3].upper() == b"PX":
+                    expires_at = time.time() + int(args[4]) / 1000
+                self.data[args[1]] = (args[2], expires_at)
+                return b"+OK\r\n"
+            if cmd == "DEL":
+                removed = sum(1 for k in args[1:] if self.data.pop(k, None) is not None)
+                return f":{removed}\r\n".encode()
+            if cmd == "INCR":
+                value = int(self._get(args[1]) or 0) + 1
+                self.data[args[1]] = (str(value).encode(), None)
+                return f":{value}\r\n".encode()
+        return f"-ERR unknown command '{cmd}'\r\n".encode()
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return f"${len(value)}\r\n".encode() + value + b"\r\n"
+
+
+# ================== FACTORY ==================
+def backend_from_url(url: str) -> CacheBackend:
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryLRUCache()
+    if parsed.scheme == "sqlite":
+        # sqlite:///./cache.db -> ./cache.db
+        return SQLiteCache(url[len("sqlite:///"):] or "./cache.db")
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisCache(parsed.hostname or "127.0.0.1", parsed.port or 6379, db)
+    raise ValueError(f"CACHE_URL tidak dikenal: {url}")
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+def get_cache() -> CacheBackend:
+    """Backend cache global, dibuat sekali per proses dari CACHE_URL"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_url(os.getenv("CACHE_URL", "sqlite:///./cache.db"))
+    return _backend
+
+def set_cache(backend: CacheBackend):
+    """Ganti backend (dipakai test untuk memasang LocalRedisServer / memory)"""
+    global _backend
+    _backend = backend
+
+
+# ================== HELPER ==================
+def bump_table_version(*tables: str):
+    """Tandai tabel sudah berubah; dipanggil crud setelah commit"""
+    backend = get_cache()
+    for table in tables:
+        try:
+            backend.bump_version(table)
+        except Exception as e:
+            print(f"Error bump cache version {table}: {e}")
+
+def cached(name: str, tables: Iterable[str], loader: Callable[[], Any], ttl: int = DEFAULT_TTL):
+    """
+    Ambil hasil dari cache, atau panggil loader() lalu simpan.
+    Key memuat versi tabel, jadi tulisan baru ke salah satu tabel = cache miss.
+    Kalau backend error, loader() tetap dipanggil (cache tidak boleh bikin error).
+    """
+    backend = get_cache()
+    try:
+        versions = backend.get_versions(tables)
+        key = name + "|" + ",".join(f"{t}:{v}" for t, v in sorted(versions.items()))
+        value = backend.get(key)
+        if value is not None:
+            return value
+    except Exception as e:
+        print(f"Error membaca cache {name}: {e}")
+        return loader()
+
+    value = loader()
+    try:
+        backend.set(key, value, ttl)
+    except Exception as e:
+        print(f"Error menulis cache {name}: {e}")
+    return value
+
+def cached_query(*tables: str, ttl: int = DEFAULT_TTL):
+    """
+    Decorator untuk fungsi baca crud dengan bentuk fn(db, *args).
+    Argumen db tidak ikut jadi key.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            name = fn.__name__ + repr(args) + repr(sorted(kwargs.items()))
+            return cached(name, tables, lambda: fn(db, *args, **kwargs), ttl)
+        return wrapper
+    return decorator
@@ -0,0 +1,318 @@
+"""
+Change-data-capture: outbox perubahan untuk consumer bertahap.
+
+Setiap insert/update/delete pada tabel di TRACKED dicatat di tabel
+change_log oleh hook after_flush SessionLocal, jadi baris log masuk di
+transaksi yang sama dengan perubahannya: kalau transaksi di-rollback, log-nya
+ikut hilang; kalau commit, log-nya pasti ada. Semua jalur ORM ikut tercatat
+(crud._create, crud.update, crud.delete, update_pembayaran, update_karyawan,
+journal write-behind, edit langsung di route). Jalur Core menulis log sendiri:
+bulk_import lewat record_rows(), operasi massal pembayaran agen lewat
+record_bulk() dan reset_logs lewat record_truncate().
+
+Satu baris log:
+    seq     nomor urut naik (AUTOINCREMENT, tidak dipakai ulang)
+    tabel   nama tabel
+    row_id  id baris
+    op      insert / update / delete / truncate
+    data    JSON isi baris setelah perubahan (delete: isi sebelum dihapus)
+    kolom   kolom yang berubah (update saja)
+
+Karena data selalu berisi baris lengkap, consumer cukup melakukan upsert untuk
+insert/update dan hapus untuk delete; urutan seq = urutan commit (SQLite
+menulis serial; di PostgreSQL penulis log diserialkan dengan advisory lock).
+
+Consumer membaca dengan read(after=seq) atau Cursor (offset tersimpan di
+analytics_watermark dengan nama "cdc:<consumer>"). compact() membuang log yang
+sudah dibaca semua consumer dan menyisakan perubahan terakhir per baris.
+
+Dengan shard per site (database.py), log ada di database tempat barisnya
+ditulis: setiap shard punya change_log, seq dan offset consumer sendiri.
+Fungsi baca/compact menerima session database yang dimaksud.
+Kolom turunan yang diisi Core (driver_id/kendaraan_id oleh
+dimensions.backfill) tidak dicatat.
+"""
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import event, func, insert, inspect, or_, select, text
+from sqlalchemy.orm import Session, aliased
+
+import models
+from database import SessionLocal
+
+TRACKED = {
+    "skid_masuk_depot", "skid_keluar_depot", "skid_masuk_laut", "skid_keluar_laut",
+    "skid_masuk_lumbung", "skid_keluar_lumbung", "sebelum_loading", "sesudah_loading",
+    "produksi_mulai", "produksi_selesai", "laporan_kirim", "laporan_bongkar",
+    "pembayaran_agen", "karyawan", "users",
+}
+# Kolom yang tidak pernah ikut ke log
+EXCLUDED_COLUMNS = {"users": {"password_hash"}}
+
+CONSUMER_PREFIX = "cdc:"
+TRIMMED_KEY = CONSUMER_PREFIX + "_dibuang"   # bukan consumer: seq tertinggi yang sudah di-trim
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10_000
+RETENTION_DAYS = 7            # log yang sudah dibaca semua consumer disimpan selama ini
+PG_LOCK_KEY = 0x63646301      # advisory lock penulis change_log (PostgreSQL)
+
+ChangeLog = models.ChangeLog
+
+
+# ================== ENCODING ==================
+def _json_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _dump(data: dict) -> str:
+    return json.dumps({k: _json_value(v) for k, v in data.items()}, separators=(",", ":"), ensure_ascii=False)
+
+
+def _row_data(state, tabel: str) -> dict:
+    """Kolom yang sudah ter-load di objek (server default yang belum di-load dilewati)"""
+    excluded = EXCLUDED_COLUMNS.get(tabel, ())
+    loaded = state.dict
+    return {
+        attr.key: loaded[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in loaded and attr.key not in excluded
+    }
+
+
+# ================== HOOK SESSION ==================
+def _lock_writers(conn, session: Session):
+    """PostgreSQL: seq diambil berurutan dengan commit (sekali per transaksi per database)"""
+    locked = session.info.setdefault("cdc_locked", set())
+    if conn.dialect.name == "postgresql" and conn.engine not in locked:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PG_LOCK_KEY})
+        locked.add(conn.engine)
+
+
+def _write(session: Session, rows_by_mapper: dict):
+    """Log ditulis lewat koneksi tabelnya sendiri (shard site), jadi satu transaksi dengan barisnya"""
+    by_bind = {}
+    for mapper, rows in rows_by_mapper.items():
+        conn = session.connection(bind_arguments={"mapper": mapper})
+        by_bind.setdefault(conn, []).extend(rows)
+    for conn, rows in by_bind.items():
+        _lock_writers(conn, session)
+        conn.execute(insert(ChangeLog.__table__), rows)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _capture(session: Session, flush_context):
+    rows = {}
+    for obj in session.new:
+        state = inspect(obj)
+        tabel = state.mapper.local_table.name
+        if tabel in TRACKED:
+            rows.setdefault(state.mapper, []).append({"tabel": tabel, "row_id": obj.id, "op": "insert",
+                         "data": _dump(_row_data(state, tabel)), "kolom": None})
+    for obj in session.dirty:
+        state = inspect(obj)
+        tabel = state.mapper.local_table.name
+        if tabel not in TRACKED or state.deleted:
+            continue
+        excluded = EXCLUDED_COLUMNS.get(tabel, ())
+        changed = [attr.key for attr in state.mapper.column_attrs
+                   if attr.key not in excluded and state.attrs[attr.key].history.has_changes()]
+        if changed:
+            rows.setdefault(state.mapper, []).append({"tabel": tabel, "row_id": obj.id, "op": "update",
+                         "data": _dump(_row_data(state, tabel)), "kolom": ",".join(changed)})
+    for obj in session.deleted:
+        state = inspect(obj)
+        tabel = state.mapper.local_table.name
+        if tabel in TRACKED:
+            rows.setdefault(state.mapper, []).append({"tabel": tabel, "row_id": obj.id, "op": "delete",
+                         "data": _dump(_row_data(state, tabel)), "kolom": None})
+    if rows:
+        _write(session, rows)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(SessionLocal, "after_rollback")
+def _reset(session: Session):
+    session.info.pop("cdc_locked", None)
+
+
+# ================== JALUR CORE ==================
+def record_rows(conn, tabel: str, ids: Sequence[int], records: Iterable[dict]):
+    """Log insert untuk baris yang di-insert lewat Core (bulk_import), di transaksi conn"""
+    if tabel not in TRACKED:
+        return
+    excluded = EXCLUDED_COLUMNS.get(tabel, ())
+    rows = [
+        {"tabel": tabel, "row_id": row_id, "op": "insert", "kolom": None,
+         "data": _dump({"id": row_id, **{k: v for k, v in record.items() if k not in excluded}})}
+        for row_id, record in zip(ids, records)
+    ]
+    if rows:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PG_LOCK_KEY})
+        conn.execute(insert(ChangeLog.__table__), rows)
+
+
+def record_bulk(db: Session, model_class, op: str, rows: Sequence[dict], kolom: Optional[Sequence[str]] = None):
+    """Log UPDATE/DELETE massal lewat Core (baris dari RETURNING): satu entri per baris"""
+    tabel = model_class.__tablename__
+    if tabel not in TRACKED or not rows:
+        return
+    excluded = EXCLUDED_COLUMNS.get(tabel, ())
+    entries = [
+        {"tabel": tabel, "row_id": row["id"], "op": op, "kolom": ",".join(kolom) if kolom else None,
+         "data": _dump({k: v for k, v in row.items() if k not in excluded})}
+        for row in rows
+    ]
+    _write(db, {inspect(model_class): entries})
+
+
+def record_truncate(db: Session, model_classes: Iterable):
+    """Satu entri 'truncate' per tabel untuk query(...).delete() massal"""
+    rows = {
+        inspect(m): [{"tabel": m.__tablename__, "row_id": None, "op": "truncate", "data": None, "kolom": None}]
+        for m in model_classes if m.__tablename__ in TRACKED
+    }
+    if rows:
+        _write(db, rows)
+
+
+# ================== BACA (CURSOR) ==================
+def _format(row) -> dict:
+    return {
+        "seq": row.seq,
+        "tabel": row.tabel,
+        "row_id": row.row_id,
+        "op": row.op,
+        "data": json.loads(row.data) if row.data else None,
+        "kolom": row.kolom.split(",") if row.kolom else [],
+        "waktu": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def bounds(db: Session) -> tuple:
+    """(seq terkecil, seq terbesar) yang masih ada di log; (None, None) kalau kosong"""
+    return db.execute(select(func.min(ChangeLog.seq), func.max(ChangeLog.seq))).one()
+
+
+def read(db: Session, after: int = 0, limit: int = DEFAULT_LIMIT, tables: Optional[Sequence[str]] = None) -> dict:
+    """
+    Perubahan dengan seq > after, urut naik. "next" dipakai sebagai after
+    berikutnya; "gap" True kalau sebagian log setelah `after` sudah dibuang
+    compaction (consumer perlu snapshot ulang dari tabel).
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    query = select(ChangeLog).where(ChangeLog.seq > after)
+    if tables:
+        query = query.where(ChangeLog.tabel.in_(list(tables)))
+    rows = db.execute(query.order_by(ChangeLog.seq).limit(limit + 1)).scalars().all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "changes": [_format(r) for r in rows],
+        "next": rows[-1].seq if rows else after,
+        "more": more,
+        "gap": after < _trimmed_upto(db),
+    }
+
+
+def _trimmed_upto(db: Session) -> int:
+    """seq tertinggi yang pernah dibuang trim (0 kalau belum pernah)"""
+    row = db.get(models.AnalyticsWatermark, TRIMMED_KEY)
+    return row.last_id if row else 0
+
+
+class Cursor:
+    """Consumer bernama; offset-nya disimpan di analytics_watermark"""
+
+    def __init__(self, name: str, tables: Optional[Sequence[str]] = None, limit: int = DEFAULT_LIMIT):
+        self.name = name
+        self.key = CONSUMER_PREFIX + name
+        self.tables = tables
+        self.limit = limit
+
+    def offset(self, db: Session) -> int:
+        row = db.get(models.AnalyticsWatermark, self.key)
+        return row.last_id if row else 0
+
+    def poll(self, db: Session) -> dict:
+        """Batch berikutnya sejak offset terakhir (offset belum maju sebelum commit())"""
+        return read(db, self.offset(db), self.limit, self.tables)
+
+    def commit(self, db: Session, seq: int):
+        """Simpan offset setelah batch selesai diproses"""
+        row = db.get(models.AnalyticsWatermark, self.key)
+        if row:
+            row.last_id = max(row.last_id, seq)
+        else:
+            db.add(models.AnalyticsWatermark(name=self.key, last_id=seq))
+        db.commit()
+
+    def reset(self, db: Session):
+        row = db.get(models.AnalyticsWatermark, self.key)
+        if row:
+            db.delete(row)
+            db.commit()
+
+
+def consumers(db: Session) -> dict:
+    rows = db.query(models.AnalyticsWatermark).filter(
+        models.AnalyticsWatermark.name.like(CONSUMER_PREFIX + "%"),
+        models.AnalyticsWatermark.name != TRIMMED_KEY,
+    ).all()
+    return {r.name[len(CONSUMER_PREFIX):]: r.last_id for r in rows}
+
+
+def status(db: Session) -> dict:
+    earliest, latest = bounds(db)
+    per_tabel = dict(db.execute(select(ChangeLog.tabel, func.count()).group_by(ChangeLog.tabel)).all())
+    return {
+        "seq_awal": earliest,
+        "seq_akhir": latest,
+        "jumlah": sum(per_tabel.values()),
+        "per_tabel": per_tabel,
+        "dibuang_sampai": _trimmed_upto(db),
+        "consumer": {name: {"offset": off, "tertinggal": (latest or 0) - off}
+                     for name, off in consumers(db).items()},
+    }
+
+
+# ================== COMPACTION ==================
+def compact(db: Session, days: int = RETENTION_DAYS) -> dict:
+    """
+    Dua tahap, hanya untuk log yang lebih tua dari `days` hari:
+      1. trim: buang seq yang sudah dibaca semua consumer terdaftar.
+      2. collapse: buang entri yang sudah digantikan entri lebih baru untuk
+         baris yang sama atau oleh truncate tabelnya (data selalu baris
+         lengkap, jadi upsert tetap benar).
+    """
+    batas = datetime.now() - timedelta(days=days)
+    offsets = consumers(db)
+    horizon = min(offsets.values()) if offsets else 0
+
+    trimmed = 0
+    trim_filter = (ChangeLog.seq <= horizon, ChangeLog.created_at < batas)
+    upto = db.execute(select(func.max(ChangeLog.seq)).where(*trim_filter)).scalar() if horizon else None
+    if upto:
+        trimmed = db.query(ChangeLog).filter(*trim_filter).delete(synchronize_session=False)
+        mark = db.get(models.AnalyticsWatermark, TRIMMED_KEY)
+        if mark:
+            mark.last_id = max(mark.last_id, upto)
+        else:
+            db.add(models.AnalyticsWatermark(name=TRIMMED_KEY, last_id=upto))
+
+    newer = aliased(ChangeLog)
+    superseded = select(newer.seq).where(
+        newer.tabel == ChangeLog.tabel,
+        newer.seq > ChangeLog.seq,
+        or_(newer.row_id == ChangeLog.row_id, newer.op == "truncate"),
+    ).exists()
+    collapsed = db.query(ChangeLog).filter(
+        ChangeLog.created_at < batas, superseded,
+    ).delete(synchronize_session=False)
+
+    db.commit()
+    return {"dibuang": trimmed, "digabung": collapsed, "horizon": horizon}
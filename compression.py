@@ -0,0 +1,151 @@
+"""
+Kompresi response dinamis (HTML halaman, JSON API) per request.
+
+Brotli dipakai kalau paket brotli terpasang dan browser menerimanya,
+selain itu gzip. Response yang dikirim bertahap (StreamingResponse
+/api/laporan, NDJSON) dikompresi per potongan dengan sync flush, jadi setiap
+potongan tetap langsung sampai ke client; feed live (text/event-stream)
+tidak dikompresi sama sekali supaya event tidak tertahan di buffer.
+
+Response yang sudah punya Content-Encoding (aset statis .br/.gz dari
+routes/assets.py) dan yang lebih kecil dari MINIMUM_SIZE dilewatkan apa
+adanya. Set COMPRESSION_DISABLED=1 untuk mematikan.
+"""
+import os
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli opsional
+    brotli = None
+
+MINIMUM_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5      # level rendah: dikompresi tiap request, bukan sekali saat build
+
+COMPRESSIBLE_TYPES = {
+    "text/html", "text/plain", "text/css", "text/csv", "text/javascript",
+    "application/javascript", "application/json", "application/x-ndjson",
+    "image/svg+xml",
+}
+
+
+def accepts(header: str, coding: str) -> bool:
+    """Apakah Accept-Encoding menerima coding ini (q=0 berarti ditolak)"""
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() != coding:
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    if brotli is not None and accepts(header, "br"):
+        return "br"
+    if accepts(header, "gzip"):
+        return "gzip"
+    return None
+
+
+class _Gzip:
+    def __init__(self, level: int = GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _Brotli:
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+COMPRESSORS = {"gzip": _Gzip, "br": _Brotli}
+
+
+def _header(headers: list, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _compressible(message: dict) -> bool:
+    if message["status"] in (204, 304) or message["status"] < 200:
+        return False
+    headers = message.get("headers", [])
+    if _header(headers, b"content-encoding") is not None:
+        return False
+    content_type = (_header(headers, b"content-type") or b"").split(b";")[0].strip().decode("latin-1")
+    return content_type.lower() in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """ASGI murni; ditaruh di luar route supaya semua response ikut"""
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.enabled = os.getenv("COMPRESSION_DISABLED") != "1"
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        accept = _header(scope["headers"], b"accept-encoding")
+        encoding = choose_encoding(accept.decode("latin-1")) if accept else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                passthrough = not _compressible(message)
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = COMPRESSORS[encoding]()
+                headers = [(k, v) for k, v in start.get("headers", [])
+                           if k.lower() not in (b"content-length", b"vary")]
+                vary = _header(start.get("headers", []), b"vary")
+                headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                headers.append((b"content-encoding", encoding.encode()))
+                data = compressor.compress(body, final=not more_body)
+                if not more_body:
+                    headers.append((b"content-length", str(len(data)).encode()))
+                await send({**start, "headers": headers})
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+            await send({"type": "http.response.body", "body": compressor.compress(body, final=not more_body),
+                        "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -4,12 +4,10 @@ from sqlalchemy.orm import Session
 
 # Karena modul berada di folder yang sama,
 # impor langsung tanpa awalan 'app'
-from models import User, Base
+from models import User
 from crud import create_user, get_user_by_username
 from database import SessionLocal, engine
-
-# Buat tabel jika belum ada
-Base.metadata.create_all(bind=engine)
+import migrations
 
 def get_db():
     db = SessionLocal()
@@ -42,4 +40,6 @@ def create_initial_admin_user():
         print("Gagal membuat user admin. Username mungkin sudah digunakan.")
 
 if __name__ == "__main__":
+    # Buat tabel jika belum ada (dilewati kalau versi skema sudah sama)
+    print(f"Skema: {migrations.ensure_schema(engine)}")
     create_initial_admin_user()
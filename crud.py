@@ -1,11 +1,42 @@
 from typing import Any, Dict, Type, Optional
+from sqlalchemy import func, select, union_all, literal, null, cast, Integer, inspect, or_
+from sqlalchemy import update as sql_update, delete as sql_delete  # crud.update/delete = fungsi ORM di bawah
 from sqlalchemy.orm import Session
 import models
 import os
 import secrets
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
 import models
+import analytics_turnaround
+import autocomplete
+import cache
+import cdc  # mencatat perubahan ke change_log saat flush
+import form_utils
+import journal
+import live_feed
+import memo
+import sharding
+
+# ================== CACHE INVALIDATION ==================
+def _touch(*model_classes):
+    """Naikkan versi tabel di cache bersama setelah commit (invalidasi semua worker)"""
+    cache.bump_table_version(*[m.__tablename__ for m in model_classes])
+
+def _touch_updated(*model_classes):
+    """
+    Seperti _touch, untuk update/delete baris yang sudah ada. Versi ':update'
+    dipakai key cache fragmen template, jadi insert tidak membuang fragmen lama.
+    """
+    tables = [m.__tablename__ for m in model_classes]
+    cache.bump_table_version(*tables, *[f"{t}:update" for t in tables])
+
+# Tabel yang dibaca oleh dashboard gabungan / per lokasi
+LAPORAN_TABLES = (
+    "skid_masuk_depot", "skid_keluar_depot", "skid_masuk_laut", "skid_keluar_laut",
+    "skid_masuk_lumbung", "skid_keluar_lumbung", "sebelum_loading", "sesudah_loading",
+    "produksi_mulai", "produksi_selesai", "laporan_kirim", "laporan_bongkar",
+)
 
 # ================== USER AUTHENTICATION ==================
 def create_user(db: Session, username: str, password: str, email: str = None, role: str = "user"):
@@ -25,6 +56,7 @@ def create_user(db: Session, username: str, password: str, email: str = None, ro
     db.add(user)
     db.commit()
     db.refresh(user)
+    _touch(models.User)
     return user
 
 def authenticate_user(db: Session, username: str, password: str):
@@ -43,7 +75,8 @@ def authenticate_user(db: Session, username: str, password: str):
     # Update last login
     user.last_login = datetime.now()
     db.commit()
-    
+    _touch(models.User)  # last_login berubah: snapshot get_all_users basi
+
     return user
 
 def get_user_by_username(db: Session, username: str):
@@ -102,8 +135,8 @@ def cleanup_expired_sessions(db: Session):
 
 # ================== USER MANAGEMENT ==================
 def get_all_users(db: Session):
-    """Get all users (admin only)"""
-    return db.query(models.User).all()
+    """Get all users (admin only), snapshot read-only dari memo.py"""
+    return memo.rows(db, "get_all_users", models.User, lambda: db.query(models.User).all())
 
 def update_user_role(db: Session, user_id: int, role: str):
     """Update user role"""
@@ -112,6 +145,7 @@ def update_user_role(db: Session, user_id: int, role: str):
         user.role = role
         db.commit()
         db.refresh(user)
+        _touch_updated(models.User)
     return user
 
 def deactivate_user(db: Session, user_id: int):
@@ -124,6 +158,7 @@ def deactivate_user(db: Session, user_id: int):
         # Remove all sessions for this user
         db.query(models.UserSession).filter(models.UserSession.user_id == user_id).delete()
         db.commit()
+        _touch_updated(models.User)
     return user
 # ================== HELPER GENERIC ==================
 def get_all(db: Session, model: Type, filters: Optional[Dict[str, Any]] = None) -> list:
@@ -141,6 +176,7 @@ def _create(db: Session, model: Type, payload: Dict[str, Any]):
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    _touch(model)
     return obj
 
 def update(db: Session, model: Type, id: int, payload: Dict[str, Any]):
@@ -150,6 +186,7 @@ def update(db: Session, model: Type, id: int, payload: Dict[str, Any]):
             setattr(obj, k, v)
         db.commit()
         db.refresh(obj)
+        _touch_updated(model)
     return obj
 
 def delete(db: Session, model: Type, id: int):
@@ -157,6 +194,7 @@ def delete(db: Session, model: Type, id: int):
     if obj:
         db.delete(obj)
         db.commit()
+        _touch_updated(model)
     return obj
 
 # ================== SKID MERAK DEPOT ==================
@@ -224,6 +262,16 @@ def get_produksi_mulai(db: Session):
 def get_produksi_selesai(db: Session):  
     return get_all(db, models.ProduksiSelesai)
 
+def count_produksi_selesai_bulan(db: Session, hari: date = None):
+    """Jumlah produksi selesai bulan ini (range tanggal, pakai index tanggal)"""
+    hari = hari or date.today()
+    awal = hari.replace(day=1)
+    akhir = (awal + timedelta(days=32)).replace(day=1)
+    return db.query(func.count(models.ProduksiSelesai.id)).filter(
+        models.ProduksiSelesai.tanggal >= awal,
+        models.ProduksiSelesai.tanggal < akhir,
+    ).scalar()
+
 # ================== HELPER FUNCTIONS ==================
 
 def _create(db: Session, model_class, d: dict):
@@ -233,19 +281,68 @@ def _create(db: Session, model_class, d: dict):
     d_filtered = {k: v for k, v in d.items() if k in valid_keys}
     
     db_item = model_class(**d_filtered)
+    active_journal = journal.active()
+    if active_journal is not None and model_class in JENIS_LAPORAN:
+        # Write-behind: cukup durable di journal, insert menyusul per batch
+        db_item.journal_id = active_journal.submit(model_class.__tablename__, d_filtered)
+        return db_item
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    _touch(model_class)
+    _publish_laporan(db_item)
+    autocomplete.record(db_item)
+    analytics_turnaround.schedule_refresh([model_class])
     return db_item
 
+def ack_ids(item) -> dict:
+    """Id untuk response POST: id baris, atau journal_id kalau masih di journal"""
+    journal_id = getattr(item, "journal_id", None)
+    if journal_id is not None:
+        return {"id": None, "journal_id": journal_id}
+    return {"id": item.id}
+
+# Nama jenis laporan di dashboard dan lokasi default per model
+JENIS_LAPORAN = {
+    models.SkidMasukDepot: ("Skid Masuk Depot", "merak"),
+    models.SkidKeluarDepot: ("Skid Keluar Depot", "merak"),
+    models.SkidMasukLaut: ("Skid Masuk Laut", "merak"),
+    models.SkidKeluarLaut: ("Skid Keluar Laut", "merak"),
+    models.SkidMasukLumbung: ("Skid Masuk Lumbung", "semarang"),
+    models.SkidKeluarLumbung: ("Skid Keluar Lumbung", "semarang"),
+    models.SebelumLoading: ("Sebelum Loading", "merak"),
+    models.SesudahLoading: ("Sesudah Loading", "merak"),
+    models.ProduksiMulai: ("Produksi Mulai", "merak"),
+    models.ProduksiSelesai: ("Produksi Selesai", "merak"),
+    models.LaporanKirim: ("Laporan Kirim", None),
+    models.LaporanBongkar: ("Laporan Bongkar", None),
+}
+
+def _publish_laporan(item):
+    """Kirim laporan baru ke feed live dashboard (sama seperti get_laporan_by_location)"""
+    jenis = JENIS_LAPORAN.get(type(item))
+    if not jenis:
+        return
+    jenis_name, lokasi_name = jenis
+    lokasi_name = (getattr(item, 'lokasi', None) or lokasi_name or "merak").lower()
+    try:
+        live_feed.publish_laporan(format_laporan_item(item, jenis_name, lokasi_name))
+    except Exception as e:
+        print(f"Error publish live feed: {e}")
+
 def get_all(db: Session, model_class, filters: dict = None):
-    """Fungsi helper generik untuk mendapatkan semua item."""
-    query = db.query(model_class)
-    if filters:
-        for key, value in filters.items():
+    """
+    Fungsi helper generik untuk mendapatkan semua item.
+    Hasilnya tuple snapshot read-only (memo.py), dipakai ulang selama tabel
+    belum ditulis lagi; filter bernilai None diabaikan.
+    """
+    def load():
+        query = db.query(model_class)
+        for key, value in (filters or {}).items():
             if value is not None:
                 query = query.filter(getattr(model_class, key) == value)
-    return query.all()
+        return query.all()
+    return memo.rows(db, "get_all", model_class, load, filters)
 
 # Helper function untuk format data
 def format_laporan_item(item, jenis_name, lokasi_name):
@@ -303,8 +400,7 @@ def create_laporan_kirim(db: Session, d: dict, lokasi: str):
     return _create(db, models.LaporanKirim, d)
 
 def get_laporan_kirim(db: Session, lokasi: str = None):
-    filters = {"lokasi": lokasi} if lokasi else None
-    return get_all(db, models.LaporanKirim, filters=filters)
+    return _get_per_lokasi(db, models.LaporanKirim, lokasi)
 
 # ================== DISTRIBUSI: BONGKAR ==================
 def create_laporan_bongkar(db: Session, d: dict, lokasi: str):
@@ -312,18 +408,40 @@ def create_laporan_bongkar(db: Session, d: dict, lokasi: str):
     return _create(db, models.LaporanBongkar, d)
 
 def get_laporan_bongkar(db: Session, lokasi: str = None):
-    filters = {"lokasi": lokasi} if lokasi else None
-    return get_all(db, models.LaporanBongkar, filters=filters)
+    return _get_per_lokasi(db, models.LaporanBongkar, lokasi)
+
+def _get_per_lokasi(db: Session, model_class, lokasi: str = None):
+    """Satu lokasi: database site-nya saja; semua lokasi: gabungan semua shard"""
+    if lokasi:
+        with sharding.using_site(lokasi):
+            return get_all(db, model_class, filters={"lokasi": lokasi})
+    return [item for part in sharding.fan_out(db, lambda s: get_all(s, model_class)) for item in part]
 
 # ================== DASHBOARD FUNCTIONS ==================
 
+@cache.cached_query(*LAPORAN_TABLES)
 def get_laporan_by_location(db: Session):
     """
     Fungsi untuk mendapatkan data laporan yang dipisah berdasarkan lokasi.
     Returns: tuple (laporan_merak, laporan_semarang)
+    Dengan shard per site, setiap database dibaca paralel lalu digabung.
     """
     laporan_merak = []
     laporan_semarang = []
+    for merak, semarang in sharding.fan_out(db, _laporan_by_location_on):
+        laporan_merak.extend(merak)
+        laporan_semarang.extend(semarang)
+
+    # Sort berdasarkan created_at/tanggal terbaru
+    laporan_merak.sort(key=lambda x: x.get("tanggal") or "0000-00-00 00:00:00", reverse=True)
+    laporan_semarang.sort(key=lambda x: x.get("tanggal") or "0000-00-00 00:00:00", reverse=True)
+
+    return laporan_merak, laporan_semarang
+
+def _laporan_by_location_on(db: Session):
+    """Isi get_laporan_by_location dari satu database"""
+    laporan_merak = []
+    laporan_semarang = []
     
     try:
         # MERAK
@@ -364,13 +482,13 @@ def get_laporan_by_location(db: Session):
                     laporan_semarang.append(format_laporan_item(item, jenis_name, "semarang"))
 
         # DISTRIBUSI - filter berdasarkan lokasi field
-        for item in get_laporan_kirim(db):
+        for item in get_all(db, models.LaporanKirim):
             if getattr(item, 'lokasi', None) and item.lokasi.lower() == "merak":
                 laporan_merak.append(format_laporan_item(item, "Laporan Kirim", "merak"))
             elif getattr(item, 'lokasi', None) and item.lokasi.lower() == "semarang":
                 laporan_semarang.append(format_laporan_item(item, "Laporan Kirim", "semarang"))
                 
-        for item in get_laporan_bongkar(db):
+        for item in get_all(db, models.LaporanBongkar):
             if getattr(item, 'lokasi', None) and item.lokasi.lower() == "merak":
                 laporan_merak.append(format_laporan_item(item, "Laporan Bongkar", "merak"))
             elif getattr(item, 'lokasi', None) and item.lokasi.lower() == "semarang":
@@ -379,54 +497,79 @@ def get_laporan_by_location(db: Session):
     except Exception as e:
         print(f"Error loading dashboard data: {e}")
 
-    # Sort berdasarkan created_at/tanggal terbaru
-    laporan_merak.sort(key=lambda x: x.get("tanggal") or "0000-00-00 00:00:00", reverse=True)
-    laporan_semarang.sort(key=lambda x: x.get("tanggal") or "0000-00-00 00:00:00", reverse=True)
-
     return laporan_merak, laporan_semarang
 
 
 # ================== DASHBOARD (Gabungan) - BACKUP ==================
+# (model, jenis, lokasi default, kolom yang dijumlahkan untuk "jumlah")
+RINGKASAN_LAPORAN = (
+    (models.LaporanKirim, "Laporan Kirim", "-", ("jumlah_dibawa",)),
+    (models.LaporanBongkar, "Laporan Bongkar", "-", ("jumlah_turun",)),
+    (models.SkidMasukDepot, "Skid Masuk Depot", "Depot", ()),
+    (models.SkidKeluarDepot, "Skid Keluar Depot", "Depot", ("jumlah_spa",)),
+    (models.SkidMasukLaut, "Skid Masuk Laut", "Laut", ()),
+    (models.SkidKeluarLaut, "Skid Keluar Laut", "Laut", ()),
+    (models.SkidMasukLumbung, "Skid Masuk Lumbung", "Lumbung", ()),
+    (models.SkidKeluarLumbung, "Skid Keluar Lumbung", "Lumbung", ()),
+    (models.SebelumLoading, "Sebelum Loading", "-", ("netto_spa",)),
+    (models.SesudahLoading, "Sesudah Loading", "-", ()),
+    (models.ProduksiMulai, "Produksi Mulai", "-", ()),
+    (models.ProduksiSelesai, "Produksi Selesai", "-", ("tabung_12", "tabung_50", "tabung_kosong")),
+)
+
+def _ringkasan_select(model_class, jenis_name, lokasi_default, jumlah_cols):
+    def column_or(name, default):
+        column = getattr(model_class, name, None)
+        return column if column is not None else literal(default)
+
+    jumlah = null()
+    if jumlah_cols:
+        jumlah = getattr(model_class, jumlah_cols[0])
+        for name in jumlah_cols[1:]:
+            jumlah = jumlah + getattr(model_class, name)
+
+    tujuan = getattr(model_class, 'tujuan', None)
+    if tujuan is None:
+        tujuan = column_or('nama_pangkalan', '-')
+
+    return select(
+        model_class.id.label("id"),
+        literal(jenis_name).label("jenis"),
+        column_or('lokasi', lokasi_default).label("lokasi"),
+        column_or('nama_driver', '-').label("nama_driver"),
+        column_or('plat_mobil', '-').label("plat_mobil"),
+        tujuan.label("tujuan"),
+        cast(jumlah, Integer).label("jumlah"),
+        model_class.created_at.label("created_at"),
+    )
+
+def iter_laporan(db: Session, batch_size: int = 1000):
+    """
+    Ringkasan semua laporan terbaru dulu, satu dict per baris. Gabungan dan
+    urutan dikerjakan database (UNION ALL + ORDER BY), baris dibaca bertahap
+    dari cursor, jadi tidak ada objek ORM atau list besar di memori. Dengan
+    shard per site, UNION dijalankan di setiap database dan hasilnya di-merge.
+    """
+    union = union_all(*[_ringkasan_select(*spec) for spec in RINGKASAN_LAPORAN]).subquery()
+    stmt = select(union).order_by(union.c.created_at.desc())
+    rows = sharding.iter_merged(db, stmt, key=lambda row: row.created_at, reverse=True, batch_size=batch_size)
+    for row in rows:
+        item = row._asdict()
+        created_at = item["created_at"]
+        # Format sama seperti sebelumnya: "YYYY-MM-DD HH:MM:SS"
+        item["created_at"] = str(created_at)[:19] if created_at else None
+        yield item
+
+@cache.cached_query(*LAPORAN_TABLES)
 def get_all_laporan(db: Session):
     """
     Fungsi backup untuk dashboard gabungan semua laporan
     """
-    result = []
-
-    # Helper function
-    def add_to_result(items, jenis_name, lokasi_default="-"):
-        for item in items:
-            result.append({
-                "id": item.id,
-                "jenis": jenis_name,
-                "lokasi": getattr(item, 'lokasi', lokasi_default),
-                "nama_driver": getattr(item, 'nama_driver', '-'),
-                "plat_mobil": getattr(item, 'plat_mobil', '-'),
-                "tujuan": getattr(item, 'tujuan', getattr(item, 'nama_pangkalan', '-')),
-                "jumlah": get_jumlah_for_dashboard(item),
-                "created_at": item.created_at.strftime("%Y-%m-%d %H:%M:%S") if item.created_at else None
-            })
-
     try:
-        # Add all data
-        add_to_result(get_all(db, models.LaporanKirim), "Laporan Kirim")
-        add_to_result(get_all(db, models.LaporanBongkar), "Laporan Bongkar")
-        add_to_result(get_all(db, models.SkidMasukDepot), "Skid Masuk Depot", "Depot")
-        add_to_result(get_all(db, models.SkidKeluarDepot), "Skid Keluar Depot", "Depot")
-        add_to_result(get_all(db, models.SkidMasukLaut), "Skid Masuk Laut", "Laut")
-        add_to_result(get_all(db, models.SkidKeluarLaut), "Skid Keluar Laut", "Laut")
-        add_to_result(get_all(db, models.SkidMasukLumbung), "Skid Masuk Lumbung", "Lumbung")
-        add_to_result(get_all(db, models.SkidKeluarLumbung), "Skid Keluar Lumbung", "Lumbung")
-        add_to_result(get_all(db, models.SebelumLoading), "Sebelum Loading")
-        add_to_result(get_all(db, models.SesudahLoading), "Sesudah Loading")
-        add_to_result(get_all(db, models.ProduksiMulai), "Produksi Mulai")
-        add_to_result(get_all(db, models.ProduksiSelesai), "Produksi Selesai")
+        return list(iter_laporan(db))
     except Exception as e:
         print(f"Error in get_all_laporan: {e}")
-
-    # Sort by created_at terbaru
-    result.sort(key=lambda x: x["created_at"] or "0000-00-00 00:00:00", reverse=True)
-    return result
+        return []
 
 # ------- PEMBAYARAN AGEN -------  CRUD
 
@@ -435,7 +578,6 @@ import models
 from sqlalchemy.orm import Session
 
 UPLOAD_DIR = "static/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 def create_pembayaran(
@@ -451,6 +593,7 @@ def create_pembayaran(
     bukti_path = None
     if bukti:
         filename = f"bukti_{nama_agen}_{bukti.filename}"
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
         filepath = os.path.join(UPLOAD_DIR, filename)
 
         with open(filepath, "wb") as f:
@@ -471,11 +614,29 @@ def create_pembayaran(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    _touch(models.PembayaranAgen)
+    autocomplete.record(db_obj)
     return db_obj
 
 
 def get_all_pembayaran(db: Session):
-    return db.query(models.PembayaranAgen).all()
+    return memo.rows(db, "get_all_pembayaran", models.PembayaranAgen,
+                     lambda: db.query(models.PembayaranAgen).all())
+
+
+def iter_pembayaran(db: Session, batch_size: int = 1000):
+    """Baris pembayaran agen untuk API (kolom saja, dibaca bertahap dari cursor)"""
+    P = models.PembayaranAgen
+    result = db.execute(
+        select(P.id, P.nama_agen, P.harga_pertabung, P.jenis_tabung, P.nama_driver,
+               P.tanggal_pengiriman, P.jumlah_turun, P.status, P.bukti).order_by(P.id),
+        execution_options={"yield_per": batch_size},
+    )
+    keys = list(result.keys())
+    for row in result:
+        item = dict(zip(keys, row))
+        item["status"] = item["status"] or "Belum Paid"
+        yield item
 
 
 def get_pembayaran_by_id(db: Session, id: int):
@@ -515,6 +676,7 @@ def update_pembayaran(
 
     if bukti:
         filename = f"bukti_{id}_{bukti.filename}"
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
         filepath = os.path.join(UPLOAD_DIR, filename)
 
         with open(filepath, "wb") as f:
@@ -525,8 +687,71 @@ def update_pembayaran(
 
     db.commit()
     db.refresh(pembayaran)
+    _touch_updated(models.PembayaranAgen)
     return pembayaran
 
+
+# ================== PEMBAYARAN AGEN: OPERASI MASSAL ==================
+MAX_BULK_IDS = 10_000
+
+
+def _pembayaran_conditions(ids=None, nama_agen: str = None, tanggal_dari=None,
+                           tanggal_sampai=None, status: str = None) -> list:
+    """Kondisi WHERE untuk operasi massal; tanpa sasaran sama sekali ditolak (bukan seluruh tabel)"""
+    T = models.PembayaranAgen.__table__
+    conditions = []
+    if ids is not None:
+        if len(ids) > MAX_BULK_IDS:
+            raise ValueError(f"Maksimal {MAX_BULK_IDS} id per operasi")
+        conditions.append(T.c.id.in_(ids))
+    if nama_agen:
+        conditions.append(T.c.nama_agen == nama_agen)
+    if tanggal_dari:
+        conditions.append(T.c.tanggal_pengiriman >= tanggal_dari)
+    if tanggal_sampai:
+        conditions.append(T.c.tanggal_pengiriman <= tanggal_sampai)
+    if status:
+        conditions.append(func.coalesce(T.c.status, "Belum Paid") == status)
+    if not conditions:
+        raise ValueError("Tentukan ids atau filter (nama_agen, tanggal_dari/tanggal_sampai, status)")
+    return conditions
+
+
+def _pembayaran_bulk(db: Session, stmt, op: str, kolom=None) -> list:
+    """Jalankan UPDATE/DELETE ... RETURNING di transaksi session, catat ke CDC, commit"""
+    P = models.PembayaranAgen
+    conn = db.connection(bind_arguments={"mapper": inspect(P)})
+    rows = [dict(row) for row in conn.execute(stmt.returning(*P.__table__.c)).mappings()]
+    cdc.record_bulk(db, P, op, rows, kolom)
+    db.commit()
+    if rows:
+        _touch_updated(P)
+    return rows
+
+
+def bulk_update_pembayaran(db: Session, values: Dict[str, Any], **criteria) -> list:
+    """
+    Ubah status / harga_pertabung banyak pembayaran dengan satu UPDATE.
+    criteria: ids, nama_agen, tanggal_dari, tanggal_sampai, status (lihat
+    _pembayaran_conditions). Mengembalikan baris setelah diubah.
+    """
+    T = models.PembayaranAgen.__table__
+    stmt = sql_update(T).where(*_pembayaran_conditions(**criteria)).values(**values)
+    return _pembayaran_bulk(db, stmt, "update", list(values))
+
+
+def bulk_delete_pembayaran(db: Session, **criteria) -> dict:
+    """
+    Hapus banyak pembayaran dengan satu DELETE, lalu hapus file bukti secara
+    paralel setelah commit (file yang masih dipakai baris lain dibiarkan).
+    """
+    T = models.PembayaranAgen.__table__
+    rows = _pembayaran_bulk(db, sql_delete(T).where(*_pembayaran_conditions(**criteria)), "delete")
+    bukti = {row["bukti"] for row in rows if row["bukti"]}
+    if bukti:
+        bukti -= set(db.execute(select(T.c.bukti).where(T.c.bukti.in_(bukti))).scalars())
+    return {"id": [row["id"] for row in rows], "file": form_utils.remove_uploads(bukti)}
+
 ##-------------------------------------------------------##
 
 def update_user(db: Session, user_id: int, username: str, email: str, role: str):
@@ -540,6 +765,7 @@ def update_user(db: Session, user_id: int, username: str, email: str, role: str)
         
         db.commit()
         db.refresh(db_user)
+        _touch_updated(models.User)
         return db_user
     return None
 
@@ -549,6 +775,7 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()
+        _touch_updated(models.User)
         return True
     return False
 
@@ -566,11 +793,13 @@ def create_karyawan(db: Session, nik: str, nama: str, jabatan: str, kontak: str
     db.add(karyawan)
     db.commit()
     db.refresh(karyawan)
+    _touch(models.Karyawan)
+    autocomplete.record(karyawan)
     return karyawan
 
 # Read all
 def get_all_karyawan(db: Session):
-    return db.query(models.Karyawan).all()
+    return memo.rows(db, "get_all_karyawan", models.Karyawan, lambda: db.query(models.Karyawan).all())
 
 # Read by ID
 def get_karyawan_by_id(db: Session, karyawan_id: int):
@@ -587,6 +816,7 @@ def update_karyawan(db: Session, karyawan_id: int, nik: str, nama: str, jabatan:
         karyawan.keterangan = keterangan
         db.commit()
         db.refresh(karyawan)
+        _touch_updated(models.Karyawan)
     return karyawan
 
 # Delete
@@ -595,16 +825,94 @@ def delete_karyawan(db: Session, karyawan_id: int):
     if karyawan:
         db.delete(karyawan)
         db.commit()
+        _touch_updated(models.Karyawan)
     return karyawan
 
 
+# ================== DIREKTORI: CARI & HALAMAN ==================
+# Daftar karyawan/user diambil per halaman. Pencarian: setiap kata harus
+# menjadi awalan salah satu kolom SEARCH (tanpa beda huruf besar/kecil),
+# dicek dengan rentang lower(kolom) >= kata AND < kata + U+10FFFF supaya
+# memakai index ekspresi lower() di models.py (LIKE '%kata%' selalu scan).
+DIRECTORY_PER_PAGE = 25
+DIRECTORY_MAX_PER_PAGE = 100
+_PREFIX_END = "\U0010ffff"
+
+KARYAWAN_SEARCH = ("nik", "nama", "jabatan")
+KARYAWAN_SORT = ("nama", "nik", "jabatan", "id")
+USER_SEARCH = ("username", "email", "role")
+USER_SORT = ("username", "email", "role", "created_at", "id")
+USER_COLUMNS = ("id", "username", "email", "role", "is_active", "created_at", "last_login")
+
+
+def _prefix(column, term: str):
+    lowered = func.lower(column)
+    return (lowered >= term) & (lowered < term + _PREFIX_END)
+
+
+def _directory_page(db: Session, model, columns, search, sortable, q: str = "", sort: str = None,
+                    desc: bool = False, page: int = 1, per_page: int = DIRECTORY_PER_PAGE,
+                    filters: Optional[Dict[str, Any]] = None) -> dict:
+    if sort is None:
+        sort = sortable[0]
+    if sort not in sortable:
+        raise ValueError(f"Urutan harus salah satu dari: {', '.join(sortable)}")
+    page = max(1, page)
+    per_page = min(max(1, per_page), DIRECTORY_MAX_PER_PAGE)
+
+    conditions = []
+    for term in (q or "").lower().split():
+        conditions.append(or_(*[_prefix(getattr(model, name), term) for name in search]))
+    for name, value in (filters or {}).items():
+        if value:
+            conditions.append(getattr(model, name) == value)
+
+    total = db.execute(select(func.count()).select_from(model).where(*conditions)).scalar_one()
+    order = getattr(model, sort)
+    order_by = [order.desc(), model.id.desc()] if desc else [order.asc(), model.id.asc()]
+    rows = db.execute(
+        select(*[getattr(model, name) for name in columns]).where(*conditions)
+        .order_by(*order_by).limit(per_page).offset((page - 1) * per_page)
+    ).mappings().all()
+    return {
+        "items": [dict(row) for row in rows],
+        "total": total,
+        "halaman": page,
+        "per_halaman": per_page,
+        "jumlah_halaman": max(1, -(-total // per_page)),
+        "urut": sort,
+        "turun": desc,
+    }
+
+
+def search_karyawan(db: Session, q: str = "", sort: str = None, desc: bool = False,
+                    page: int = 1, per_page: int = DIRECTORY_PER_PAGE) -> dict:
+    """Satu halaman karyawan, dicari di nik/nama/jabatan"""
+    columns = [c.key for c in models.Karyawan.__table__.columns]
+    return _directory_page(db, models.Karyawan, columns, KARYAWAN_SEARCH, KARYAWAN_SORT,
+                           q, sort, desc, page, per_page)
+
+
+def search_users(db: Session, q: str = "", role: str = None, sort: str = None, desc: bool = False,
+                 page: int = 1, per_page: int = DIRECTORY_PER_PAGE) -> dict:
+    """Satu halaman user (tanpa password_hash), dicari di username/email/role"""
+    return _directory_page(db, models.User, USER_COLUMNS, USER_SEARCH, USER_SORT,
+                           q, sort, desc, page, per_page, {"role": role})
+
+
 # ================== RESET LOGS (opsional) ==================
 def reset_logs(db: Session):
-    for M in [
+    logs = [
         models.SkidMasukDepot, models.SkidKeluarDepot, models.SkidMasukLaut,
         models.SkidKeluarLaut, models.SebelumLoading, models.SesudahLoading,
         models.ProduksiMulai, models.ProduksiSelesai, models.LaporanKirim,
         models.LaporanBongkar, models.PembayaranAgen
-    ]:
-        db.query(M).delete()
+    ]
+    for M in logs:
+        # Laporan kirim/bongkar dihapus di setiap shard site
+        for site in sharding.sites_of(M):
+            with sharding.using_site(site):
+                db.query(M).delete()
+                cdc.record_truncate(db, [M])
     db.commit()
+    _touch_updated(*logs)
@@ -1,21 +1,238 @@
-from sqlalchemy import create_engine
+"""
+Koneksi database: satu engine tulis dan satu engine baca.
+
+- SessionLocal / get_write_db: engine utama, untuk form dan semua yang menulis.
+- ReadSessionLocal / get_read_db: untuk dashboard dan API daftar.
+    * SQLite: file yang sama dibuka read-only (URI mode=ro) dan database
+      memakai WAL, jadi pembaca tidak pernah menahan lock yang menunda
+      penulis (dan sebaliknya).
+    * PostgreSQL: DATABASE_READ_URL (replika); kalau kosong, DSN utama dengan
+      pool terpisah dan transaksi read-only.
+
+Route memilih salah satu dependency. get_db tetap ada sebagai alias
+get_write_db untuk kode lama.
+
+Shard per site (opsional): DATABASE_URL_MERAK / DATABASE_URL_SEMARANG.
+Tabel skid depot/laut ada di database Merak, skid lumbung di Semarang, dan
+laporan kirim/bongkar di database site sesuai kolom lokasi. User, session,
+karyawan, loading, produksi dan pembayaran tetap di database global.
+RoutingSession memilih engine per tabel, jadi kode crud tidak berubah; query
+lintas site dikerjakan sharding.fan_out. Tanpa URL shard semuanya satu
+database seperti sebelumnya.
+"""
+import os
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 # URL database SQLite, sesuaikan jika Anda menggunakan database lain
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+# Replika baca (PostgreSQL); untuk SQLite diabaikan
+SQLALCHEMY_READ_URL = os.getenv("DATABASE_READ_URL")
+
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+
+def _is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _sqlite_read_url(url: str) -> str:
+    """sqlite:///./x.db -> sqlite:///file:./x.db?mode=ro&uri=true"""
+    database = make_url(url).database
+    return f"sqlite:///file:{database}?mode=ro&uri=true"
+
+
+def _create_engines(url: str, read_url: Optional[str] = None) -> Tuple:
+    """(engine tulis, engine baca) untuk satu database"""
+    if _is_sqlite(url):
+        write = create_engine(url, connect_args={"check_same_thread": False})
+        read = create_engine(_sqlite_read_url(url), connect_args={"check_same_thread": False})
+
+        @event.listens_for(write, "connect")
+        def _sqlite_write_pragmas(dbapi_conn, _record):
+            cursor = dbapi_conn.cursor()
+            # WAL tersimpan di file database; cukup diset dari koneksi tulis
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.close()
+
+        @event.listens_for(read, "connect")
+        def _sqlite_read_pragmas(dbapi_conn, _record):
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA query_only=1")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.close()
+        return write, read
+
+    write = create_engine(url, pool_pre_ping=True)
+    if read_url:
+        read = create_engine(read_url, pool_pre_ping=True)
+    elif make_url(url).get_backend_name() == "postgresql":
+        # Tanpa replika: DSN utama, pool sendiri, transaksi read-only
+        read = create_engine(url, pool_pre_ping=True, execution_options={"postgresql_readonly": True})
+    else:
+        read = create_engine(url, pool_pre_ping=True)
+    return write, read
+
+
+engine, read_engine = _create_engines(SQLALCHEMY_DATABASE_URL, SQLALCHEMY_READ_URL)
+
+
+# ================== SHARD PER SITE ==================
+# Database per site; kalau URL kosong, site memakai database global (tanpa shard)
+SITES = ("merak", "semarang")
+SHARD_URLS = {site: os.getenv(f"DATABASE_URL_{site.upper()}") for site in SITES}
+sharding_enabled = any(SHARD_URLS.values())
+
+site_engines: Dict[str, Tuple] = {
+    site: _create_engines(url, os.getenv(f"DATABASE_READ_URL_{site.upper()}")) if url else (engine, read_engine)
+    for site, url in SHARD_URLS.items()
+}
+
+# Tabel milik satu site (Merak: depot + laut, Semarang: lumbung)
+SITE_TABLES = {
+    "skid_masuk_depot": "merak", "skid_keluar_depot": "merak",
+    "skid_masuk_laut": "merak", "skid_keluar_laut": "merak",
+    "skid_masuk_lumbung": "semarang", "skid_keluar_lumbung": "semarang",
+}
+# Tabel yang barisnya dibagi per site berdasarkan kolom lokasi
+LOKASI_TABLES = {"laporan_kirim", "laporan_bongkar"}
+
+# Site request yang sedang berjalan (diisi sharding.ShardRoutingMiddleware / sharding.using_site)
+current_site: ContextVar[Optional[str]] = ContextVar("current_site", default=None)
+
+
+class ShardRoutingError(RuntimeError):
+    """Query tabel per-lokasi tanpa site; pakai sharding.using_site atau sharding.fan_out"""
+
+
+def site_for_lokasi(lokasi: Optional[str]) -> Optional[str]:
+    site = (lokasi or "").strip().lower()
+    return site if site in SITES else None
+
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+def site_of(table: str, lokasi: Optional[str] = None) -> Optional[str]:
+    """Site pemilik baris; None = database global"""
+    if table in SITE_TABLES:
+        return SITE_TABLES[table]
+    if table in LOKASI_TABLES:
+        return site_for_lokasi(lokasi)
+    return None
+
+
+def _table_of(mapper, clause) -> Optional[str]:
+    if mapper is not None:
+        return mapper.local_table.name
+    table = getattr(clause, "table", None)          # insert/update/delete Core
+    if table is not None:
+        return getattr(table, "name", None)
+    return None
+
+
+class RoutingSession(Session):
+    """
+    Session yang memilih engine per tabel: tabel site ke database site-nya,
+    laporan kirim/bongkar ke site dari lokasi baris (diisi saat flush) atau
+    site request, sisanya ke database global.
+    """
+    engine_index = 0   # 0 = engine tulis, 1 = engine baca
+
+    def site(self) -> Optional[str]:
+        return self.info.get("site") or current_site.get()
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not sharding_enabled:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        table = _table_of(mapper, clause)
+        if table in SITE_TABLES:
+            return site_engines[SITE_TABLES[table]][self.engine_index]
+        if table in LOKASI_TABLES:
+            site = kw.get("site") or self.site()
+            if site is None:
+                raise ShardRoutingError(f"Query {table} butuh site (merak/semarang) saat sharding aktif")
+            return site_engines[site][self.engine_index]
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+class ReadRoutingSession(RoutingSession):
+    engine_index = 1
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=ReadRoutingSession, autocommit=False, autoflush=False, bind=read_engine)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _pin_site(session: Session, flush_context, instances):
+    """Satu transaksi hanya boleh menulis laporan kirim/bongkar untuk satu site"""
+    if not sharding_enabled:
+        return
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = obj.__table__.name
+        if table not in LOKASI_TABLES:
+            continue
+        site = site_for_lokasi(getattr(obj, "lokasi", None))
+        if site is None:
+            raise ShardRoutingError(f"Lokasi {getattr(obj, 'lokasi', None)!r} bukan site yang dikenal")
+        pinned = session.info.setdefault("site", site)
+        if pinned != site:
+            raise ShardRoutingError(f"Satu transaksi tidak boleh menulis ke site {pinned} dan {site}")
+        inspect(obj).info["site"] = site
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(SessionLocal, "after_rollback")
+def _unpin_site(session: Session):
+    session.info.pop("site", None)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+@event.listens_for(ReadSessionLocal, "do_orm_execute")
+def _route_refresh(state):
+    """refresh() / atribut expired setelah commit: site dari instance yang dimuat ulang"""
+    if not sharding_enabled or not state.is_select:
+        return
+    refresh = state.load_options._refresh_state
+    if refresh is not None and refresh.info.get("site"):
+        state.bind_arguments["site"] = refresh.info["site"]
+
+
+def targets(read: bool = False) -> Dict[str, object]:
+    """Database yang berbeda: {"global": engine, "merak": ..., ...}; tanpa shard hanya global"""
+    index = 1 if read else 0
+    found = {"global": read_engine if read else engine}
+    for site, engines in site_engines.items():
+        if all(engines[index] is not e for e in found.values()):
+            found[site] = engines[index]
+    return found
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
+
+@event.listens_for(Base, "load", propagate=True)
+def _remember_site(obj, context):
+    if sharding_enabled and obj.__table__.name in LOKASI_TABLES:
+        inspect(obj).info["site"] = site_for_lokasi(obj.__dict__.get("lokasi"))
+
+def get_write_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Alias lama: route yang belum memilih tetap memakai engine tulis
+get_db = get_write_db
@@ -0,0 +1,47 @@
+"""
+Dependency FastAPI untuk autentikasi, dipakai semua modul di routes/.
+"""
+from fastapi import Depends, HTTPException, Request
+from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import Session
+
+import crud
+from database import get_write_db
+
+
+# ================== AUTHENTICATION DEPENDENCIES ==================
+# Sesi login dibaca dari database utama: replika bisa tertinggal sesaat
+# setelah login dan membuat user terlempar ke halaman login lagi
+def get_current_user(request: Request, db: Session = Depends(get_write_db)):
+    """Get current logged in user from session"""
+    session_token = request.cookies.get("session_token")
+    
+    if not session_token:
+        return None
+    
+    session = crud.get_session(db, session_token)
+    if not session:
+        return None
+    
+    user = crud.get_user_by_id(db, session.user_id)
+    return user
+
+def require_login(user = Depends(get_current_user)):
+    """Require user to be logged in"""
+    if not user:
+        raise HTTPException(status_code=401, detail="Login required")
+    return user
+
+def require_login_redirect(request: Request, db: Session = Depends(get_write_db)):
+    """Require user to be logged in with redirect for HTML pages"""
+    user = get_current_user(request, db)
+    if not user:
+        current_path = request.url.path
+        return RedirectResponse(url=f"/login?next={current_path}", status_code=302)
+    return user
+
+def require_admin(user = Depends(require_login)):
+    """Require admin role"""
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
@@ -0,0 +1,273 @@
+"""
+Dimensi driver dan kendaraan untuk tabel laporan.
+
+Setiap laporan tetap menyimpan nama_driver / plat_mobil (dipakai form dan
+template), tapi sekarang juga driver_id -> drivers.id dan kendaraan_id ->
+kendaraan.id. Query per driver cukup membandingkan integer lewat index kecil,
+bukan string di belasan tabel.
+
+Id diisi otomatis di before_flush SessionLocal setelah install() dipanggil
+(main.create_app dan bulk_import), jadi semua jalur tulis (crud._create,
+crud.update, edit langsung di route) ikut terisi. Pemetaan
+nama -> id disimpan di InternCache per proses: insert dengan nama yang sudah
+dikenal tidak menjalankan query tambahan. Nama baru di-insert ke tabel
+dimensi di transaksi yang sama, dan baru masuk cache setelah commit (kalau
+rollback, id-nya dibuang).
+
+Nama dianggap sama kalau hanya beda spasi/huruf besar-kecil; plat disimpan
+dalam huruf besar. Data lama diisi oleh backfill() yang dipanggil
+migrations.apply_schema.
+"""
+import threading
+from contextlib import ExitStack
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+SELECT_BATCH = 500
+
+
+def clean_nama(value: str) -> str:
+    return " ".join(value.split())
+
+
+def clean_plat(value: str) -> str:
+    return " ".join(value.split()).upper()
+
+
+def _insert_ignore(table, dialect_name: str):
+    """INSERT yang melewati baris bentrok unique (proses lain sudah insert)"""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(table).on_conflict_do_nothing()
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table).on_conflict_do_nothing()
+    return table.insert()
+
+
+# ================== INTERN CACHE ==================
+class InternCache:
+    """Pemetaan nilai teks -> id baris dimensi, dimuat penuh saat pertama dipakai"""
+
+    def __init__(self, model_class, column: str, clean, extra: dict = None):
+        self.model_class = model_class
+        self.column = column
+        self.clean = clean
+        self.extra = extra or {}
+        self._ids: Dict[str, int] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, value: str) -> str:
+        return self.clean(value).lower()
+
+    def _load(self, conn):
+        table = self.model_class.__table__
+        rows = conn.execute(select(table.c.id, table.c[self.column]).order_by(table.c.id))
+        with self._lock:
+            for id_, value in rows:
+                if value:
+                    # Duplikat lama (beda huruf besar-kecil) -> pakai id terkecil
+                    self._ids.setdefault(self.key(value), id_)
+            self._loaded = True
+
+    def _select(self, conn, keys: list) -> Dict[str, int]:
+        table = self.model_class.__table__
+        col = table.c[self.column]
+        found = {}
+        for i in range(0, len(keys), SELECT_BATCH):
+            batch = keys[i:i + SELECT_BATCH]
+            rows = conn.execute(
+                select(table.c.id, col).where(func.lower(col).in_(batch)).order_by(table.c.id)
+            )
+            for id_, value in rows:
+                found.setdefault(self.key(value), id_)
+        return found
+
+    def resolve(self, conn, values: Iterable[Optional[str]]) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Id untuk setiap nilai. Mengembalikan (nilai -> id, key baru -> id);
+        key baru belum masuk cache, panggil remember() setelah commit.
+        """
+        if not self._loaded:
+            self._load(conn)
+        by_key = {}
+        for value in set(values):
+            if value and value.strip() and value.strip() != "-":
+                by_key.setdefault(self.key(value), []).append(value)
+
+        found = {}
+        with self._lock:
+            missing = [key for key in by_key if key not in self._ids]
+        self.hits += len(by_key) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            found = self._select(conn, missing)
+            to_insert = [key for key in missing if key not in found]
+            if to_insert:
+                table = self.model_class.__table__
+                conn.execute(
+                    _insert_ignore(table, conn.dialect.name),
+                    [{self.column: self.clean(by_key[key][0]), **self.extra} for key in to_insert],
+                )
+                found.update(self._select(conn, to_insert))
+
+        result = {}
+        for key, raw_values in by_key.items():
+            id_ = self._ids.get(key) or found.get(key)
+            for value in raw_values:
+                result[value] = id_
+        return result, found
+
+    def remember(self, found: Dict[str, int]):
+        with self._lock:
+            for key, id_ in found.items():
+                self._ids.setdefault(key, id_)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._loaded = False
+
+    def stats(self) -> dict:
+        return {"jumlah": len(self._ids), "hit": self.hits, "miss": self.misses}
+
+
+drivers = InternCache(models.Driver, "nama", clean_nama, extra={"role": "driver"})
+kendaraan = InternCache(models.Kendaraan, "plat", clean_plat)
+
+# kolom teks -> (kolom id, cache)
+DIMENSIONS = {
+    "nama_driver": ("driver_id", drivers),
+    "plat_mobil": ("kendaraan_id", kendaraan),
+}
+
+
+def columns_for(model_class):
+    """[(kolom teks, kolom id, cache)] yang dimiliki model"""
+    names = {c.name for c in model_class.__table__.columns}
+    return [(text_col, id_col, cache) for text_col, (id_col, cache) in DIMENSIONS.items()
+            if text_col in names and id_col in names]
+
+
+DIMENSION_MODELS = {
+    mapper.class_: columns_for(mapper.class_)
+    for mapper in models.Base.registry.mappers
+    if columns_for(mapper.class_)
+}
+
+
+# ================== WRITE PATH ==================
+_PENDING_KEY = "dimensi_pending"
+
+
+def _changed(obj, text_col: str, id_col: str) -> bool:
+    state = inspect(obj)
+    if state.pending or getattr(obj, id_col) is None:
+        return True
+    return state.attrs[text_col].history.has_changes()
+
+
+def _assign_ids(session: Session, flush_context, instances):
+    targets = [obj for obj in list(session.new) + list(session.dirty) if type(obj) in DIMENSION_MODELS]
+    if not targets:
+        return
+    conn = session.connection()
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for text_col, (id_col, cache) in DIMENSIONS.items():
+        objs = [obj for obj in targets
+                if (text_col, id_col, cache) in DIMENSION_MODELS[type(obj)] and _changed(obj, text_col, id_col)]
+        if not objs:
+            continue
+        mapping, found = cache.resolve(conn, (getattr(obj, text_col) for obj in objs))
+        for obj in objs:
+            setattr(obj, id_col, mapping.get(getattr(obj, text_col)))
+        if found:
+            pending.append((cache, found))
+
+
+def _remember_pending(session: Session):
+    for cache, found in session.info.pop(_PENDING_KEY, ()):
+        cache.remember(found)
+
+
+def _drop_pending(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+_LISTENERS = (
+    ("before_flush", _assign_ids),
+    ("after_commit", _remember_pending),
+    ("after_rollback", _drop_pending),
+)
+
+
+def install(session_factory=SessionLocal):
+    """Pasang listener pengisi driver_id/kendaraan_id; aman dipanggil berulang"""
+    for name, fn in _LISTENERS:
+        if not event.contains(session_factory, name, fn):
+            event.listen(session_factory, name, fn)
+
+
+# ================== BACKFILL ==================
+def backfill(engine, dim_engine=None) -> dict:
+    """
+    Isi driver_id / kendaraan_id yang masih kosong. Nilai teks distinct
+    di-intern sekali, lalu setiap tabel di-update dengan satu UPDATE berbasis
+    tabel sementara (nilai -> id), bukan satu UPDATE per nama.
+
+    dim_engine: database tempat tabel dimensi berada kalau berbeda dari
+    engine (database shard site; dimensi selalu di database global).
+    """
+    result = {}
+    pending = []
+    with ExitStack() as stack:
+        conn = stack.enter_context(engine.begin())
+        dim_conn = conn
+        if dim_engine is not None and dim_engine is not engine:
+            dim_conn = stack.enter_context(dim_engine.begin())
+        for model_class, dims in DIMENSION_MODELS.items():
+            table = model_class.__table__
+            for text_col, id_col, cache in dims:
+                text_c, id_c = table.c[text_col], table.c[id_col]
+                values = conn.execute(
+                    select(text_c).where(id_c.is_(None), text_c.isnot(None)).distinct()
+                ).scalars().all()
+                if not values:
+                    continue
+                mapping, found = cache.resolve(dim_conn, values)
+                pending.append((cache, found))
+
+                mapping_table = Table(
+                    f"_map_{table.name}_{id_col}", MetaData(),
+                    Column("nilai", String, primary_key=True),
+                    Column("id", Integer, nullable=False),
+                    prefixes=["TEMPORARY"],
+                )
+                mapping_table.create(conn)
+                conn.execute(mapping_table.insert(),
+                             [{"nilai": v, "id": i} for v, i in mapping.items() if i is not None])
+                lookup = (select(mapping_table.c.id)
+                          .where(mapping_table.c.nilai == text_c)
+                          .scalar_subquery())
+                updated = conn.execute(
+                    table.update().where(id_c.is_(None), text_c.isnot(None)).values({id_col: lookup})
+                ).rowcount
+                mapping_table.drop(conn)
+                result[f"{table.name}.{id_col}"] = updated
+    for cache, found in pending:
+        cache.remember(found)
+    return result
+
+
+if __name__ == "__main__":
+    from database import engine
+    for name, count in backfill(engine).items():
+        print(f"{name:40} {count} baris")
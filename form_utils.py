@@ -0,0 +1,142 @@
+"""
+Helper bersama untuk route form: parsing input string dan simpan file upload.
+"""
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+
+from fastapi import UploadFile
+
+import photo_hash
+
+# Setup upload directory structure
+BASE_UPLOAD_DIR = "uploads"
+# Folder yang boleh dihapus isinya oleh remove_uploads (static/uploads = bukti pembayaran lama)
+UPLOAD_ROOTS = (BASE_UPLOAD_DIR, "static/uploads")
+REMOVE_WORKERS = 8
+
+# Create subdirectories for different types of uploads
+UPLOAD_FOLDERS = [
+    "skid_depot", "skid_laut", "skid_lumbung",
+    "loading", "distribusi", "pembayaran", "general"
+]
+
+
+def ensure_upload_dirs():
+    """Buat folder upload (dipanggil sekali di lifespan, bukan saat import)"""
+    os.makedirs(BASE_UPLOAD_DIR, exist_ok=True)
+    for folder in UPLOAD_FOLDERS:
+        os.makedirs(os.path.join(BASE_UPLOAD_DIR, folder), exist_ok=True)
+
+
+# =========================
+# ====== FILE UPLOAD ======
+# =========================
+def save_upload(file: UploadFile, folder: str = "general"):
+    """
+    Save uploaded file and return URL path for browser access
+    
+    Args:
+        file: UploadFile object from FastAPI
+        folder: Subfolder name (skid_depot, skid_laut, etc.)
+    
+    Returns:
+        str: URL path that can be accessed by browser (/uploads/folder/filename)
+        None: If file is None or empty
+    """
+    if not file or not file.filename:
+        return None
+    
+    # Validate folder name (security)
+    if folder not in UPLOAD_FOLDERS:
+        folder = "general"
+    
+    # Create upload directory if not exists
+    upload_dir = os.path.join(BASE_UPLOAD_DIR, folder)
+    os.makedirs(upload_dir, exist_ok=True)
+    
+    # Generate unique filename to avoid conflicts
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    file_extension = os.path.splitext(file.filename)[1]
+    safe_filename = f"{timestamp}{file_extension}"
+    
+    # Full file path on disk
+    file_path = os.path.join(upload_dir, safe_filename)
+    
+    # Save file to disk
+    try:
+        with open(file_path, "wb") as buffer:
+            shutil.copyfileobj(file.file, buffer)
+    except Exception as e:
+        print(f"Error saving file: {e}")
+        return None
+    
+    # ✅ Return URL path sesuai dengan mount /uploads
+    url = f"/uploads/{folder}/{safe_filename}"
+    # Gambar di-hash di background untuk deteksi foto bukti yang dipakai ulang
+    photo_hash.submit(url, file_path)
+    return url
+
+
+def _upload_path(url: str):
+    """Path file untuk URL upload (/uploads/... atau static/uploads/... lama); None kalau di luar folder upload"""
+    path = os.path.realpath(url.lstrip("/"))
+    for root in UPLOAD_ROOTS:
+        if path.startswith(os.path.realpath(root) + os.sep):
+            return path
+    return None
+
+
+def _remove(path: str) -> str:
+    try:
+        os.remove(path)
+        return "dihapus"
+    except FileNotFoundError:
+        return "tidak_ada"
+    except OSError as e:
+        print(f"Error removing file {path}: {e}")
+        return "gagal"
+
+
+def remove_uploads(urls) -> dict:
+    """Hapus banyak file upload sekaligus (paralel, I/O disk/NFS); hitungan per hasil"""
+    paths = {path for path in map(_upload_path, urls) if path}
+    counts = {"dihapus": 0, "tidak_ada": 0, "gagal": 0}
+    if not paths:
+        return counts
+    with ThreadPoolExecutor(max_workers=min(REMOVE_WORKERS, len(paths)), thread_name_prefix="hapus-upload") as pool:
+        for result in pool.map(_remove, paths):
+            counts[result] += 1
+    return counts
+
+
+# =========================
+# ====== HELPER DATE ======
+# =========================
+def parse_date(value: str) -> date:
+    """Convert string 'YYYY-MM-DD' ke datetime.date"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+def parse_time(value: str) -> time:
+    """Convert string 'HH:MM' ke datetime.time"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        return None
+
+def parse_int(value: str) -> int:
+    """Convert string ke int, return 0 jika gagal"""
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
@@ -0,0 +1,240 @@
+"""
+Idempotency key untuk kiriman form (POST/PUT/PATCH/DELETE).
+
+Outbox di browser (static/src/js/outbox.js) mengirim ulang laporan yang
+responsnya tidak sempat diterima, selalu dengan header Idempotency-Key yang
+sama. Middleware di sini memastikan kiriman ulang tidak membuat laporan dobel:
+
+    1. reserve(): key dicatat di idempotency_keys dengan status "proses"
+       (insert; bentrok primary key = key sudah pernah dipakai)
+    2. route jalan seperti biasa; hook after_flush SessionLocal mengubah
+       status jadi "tersimpan" di transaksi yang sama dengan laporannya
+    3. finish(): respons (status, Location, body kecil) disimpan, status
+       "selesai". Respons error (>= 400) tidak disimpan: key dilepas supaya
+       kiriman berikutnya diproses lagi
+
+Kiriman dengan key yang sudah ada dijawab tanpa menjalankan route:
+    selesai    respons yang disimpan + header Idempotent-Replayed: true
+    tersimpan  laporan sudah masuk tapi respons belum tercatat (proses mati
+               di tengah jalan): dijawab sukses generik
+    proses     kiriman pertama masih jalan: 409 + Retry-After; kalau lebih
+               dari LOCK_SECONDS, dianggap mati dan diambil alih
+Key yang sama untuk path lain ditolak 422. Request tanpa header tidak
+disentuh, jadi form lama dan client lain tetap jalan seperti biasa.
+
+Dengan shard per site, idempotency_keys ada di database global; penanda
+"tersimpan" ikut commit session yang sama, tapi bukan transaksi yang sama
+dengan laporan di shard. Key dibuang setelah RETENTION_DAYS hari (prune(),
+dijalankan saat startup). Set IDEMPOTENCY_DISABLED=1 untuk mematikan.
+"""
+import os
+import re
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, event, inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import models
+import serializers
+from database import SessionLocal
+
+HEADER = b"idempotency-key"
+KEY_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+LOCK_SECONDS = 120            # kiriman "proses" lebih lama dari ini dianggap mati
+MAX_STORED_BODY = 64 * 1024   # body respons lebih besar tidak disimpan (diganti sukses generik)
+RETENTION_DAYS = 7
+RETRY_AFTER = 5               # detik, untuk 409 saat kiriman pertama masih jalan
+
+IdempotencyKey = models.IdempotencyKey
+
+# Key request yang sedang diproses; dibaca hook after_flush
+current_key: ContextVar[Optional[str]] = ContextVar("idempotency_key", default=None)
+
+
+# ================== PENYIMPANAN ==================
+def reserve(db: Session, key: str, method: str, path: str) -> Optional[IdempotencyKey]:
+    """Catat key dengan status "proses". None = key baru (atau diambil alih), lanjutkan request;
+    selain itu baris yang sudah ada (sudah pernah/sedang diproses)."""
+    now = datetime.now()
+    db.add(IdempotencyKey(key=key, method=method, path=path, status="proses", created_at=now, updated_at=now))
+    try:
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+    existing = db.get(IdempotencyKey, key)
+    if existing is None:
+        # Dihapus (finish gagal / prune) di antara insert dan get: coba sekali lagi
+        return reserve(db, key, method, path)
+    db.expunge(existing)    # dipakai setelah session ditutup
+    if existing.status == "proses" and existing.path == path and existing.method == method:
+        stale = now - timedelta(seconds=LOCK_SECONDS)
+        taken = db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.status == "proses",
+                   IdempotencyKey.updated_at < stale)
+            .values(updated_at=now)
+        ).rowcount
+        db.commit()
+        if taken:
+            return None
+    return existing
+
+
+def finish(db: Session, key: str, status_code: int, content_type: Optional[str],
+           location: Optional[str], body: Optional[bytes]):
+    """Simpan respons (sukses) atau lepas key (error) supaya kiriman ulang diproses lagi"""
+    if status_code >= 400:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status == "proses"))
+    else:
+        db.execute(
+            update(IdempotencyKey).where(IdempotencyKey.key == key).values(
+                status="selesai", status_code=status_code, content_type=content_type,
+                location=location, body=body, updated_at=datetime.now(),
+            )
+        )
+    db.commit()
+
+
+def release(db: Session, key: str):
+    """Route gagal dengan exception: key dilepas kalau laporan belum tersimpan"""
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status == "proses"))
+    db.commit()
+
+
+def prune(db: Session, days: int = RETENTION_DAYS) -> int:
+    """Hapus key yang lebih tua dari `days` hari"""
+    cutoff = datetime.now() - timedelta(days=days)
+    removed = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff)).rowcount
+    db.commit()
+    return removed
+
+
+def _with_session(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def prune_expired() -> int:
+    """prune() dengan session sendiri (dipanggil di lifespan)"""
+    return _with_session(prune)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_saved(session: Session, flush_context):
+    # Laporan masuk di transaksi ini: kalau commit, key ikut berstatus "tersimpan"
+    key = current_key.get()
+    if key is None or not (session.new or session.dirty or session.deleted):
+        return
+    conn = session.connection(bind_arguments={"mapper": inspect(IdempotencyKey)})
+    conn.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.status == "proses")
+        .values(status="tersimpan", updated_at=datetime.now())
+    )
+
+
+# ================== MIDDLEWARE ==================
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _send_json(send, status_code: int, payload: dict, extra_headers=()):
+    body = serializers.dumps(payload)
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+               *extra_headers]
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send, row: IdempotencyKey):
+    replayed = (b"idempotent-replayed", b"true")
+    if row.status == "selesai" and row.body is not None:
+        headers = [(b"content-length", str(len(row.body)).encode()), replayed]
+        if row.content_type:
+            headers.append((b"content-type", row.content_type.encode("latin-1")))
+        if row.location:
+            headers.append((b"location", row.location.encode("latin-1")))
+        await send({"type": "http.response.start", "status": row.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": row.body})
+        return
+    # "tersimpan", atau "selesai" dengan body terlalu besar untuk disimpan
+    extra = [replayed]
+    if row.location:
+        extra.append((b"location", row.location.encode("latin-1")))
+    status_code = row.status_code if row.status == "selesai" and row.status_code < 300 else 200
+    await _send_json(send, status_code, {
+        "status": "success",
+        "success": True,
+        "message": "Laporan sudah diterima sebelumnya",
+        "idempotent_replay": True,
+    }, extra)
+
+
+class IdempotencyMiddleware:
+    """ASGI murni; dipasang di dalam compression supaya body yang disimpan belum dikompresi"""
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = os.getenv("IDEMPOTENCY_DISABLED") != "1"
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] not in METHODS:
+            return await self.app(scope, receive, send)
+        key = _header(scope, HEADER)
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not KEY_PATTERN.match(key):
+            return await _send_json(send, 400, {"detail": "Idempotency-Key harus 8-64 karakter huruf, angka, - atau _"})
+
+        method, path = scope["method"], scope["path"]
+        existing = await run_in_threadpool(_with_session, reserve, key, method, path)
+        if existing is not None:
+            if existing.path != path or existing.method != method:
+                return await _send_json(send, 422, {"detail": "Idempotency-Key sudah dipakai untuk request lain"})
+            if existing.status == "proses":
+                return await _send_json(send, 409, {"detail": "Kiriman dengan key ini masih diproses"},
+                                        [(b"retry-after", str(RETRY_AFTER).encode())])
+            return await _replay(send, existing)
+
+        response = {"status": 500, "content_type": None, "location": None}
+        chunks = []
+        size = 0
+
+        async def recording_send(message):
+            nonlocal size
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type":
+                        response["content_type"] = value.decode("latin-1")
+                    elif name == b"location":
+                        response["location"] = value.decode("latin-1")
+            elif message["type"] == "http.response.body" and size <= MAX_STORED_BODY:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                chunks.append(chunk)
+            await send(message)
+
+        token = current_key.set(key)
+        try:
+            await self.app(scope, receive, recording_send)
+        except BaseException:
+            current_key.reset(token)
+            await run_in_threadpool(_with_session, release, key)
+            raise
+        current_key.reset(token)
+        body = b"".join(chunks) if size <= MAX_STORED_BODY else None
+        await run_in_threadpool(_with_session, finish, key, response["status"],
+                                response["content_type"], response["location"], body)
\ No newline at end of file
@@ -0,0 +1,581 @@
+"""
+Antrian job di background: tabel SQLite tahan restart + proses worker.
+
+Kerja yang tidak perlu ditunggu request (bersihkan sesi, hash foto upload,
+buang data lama) dimasukkan ke antrian lalu dikerjakan proses worker
+terpisah. Tidak butuh broker: antrian adalah file SQLite (JOBS_DB, default
+./jobs.db, mode WAL) yang dibuka web dan semua worker di mesin yang sama.
+
+    python jobs.py worker 4          # 4 proses worker (default 1)
+    python jobs.py worker --burst    # kerjakan yang siap lalu berhenti
+    python jobs.py status            # ringkasan antrian (JSON)
+
+Alur satu job:
+    antri   enqueue(); run_at = kapan boleh dijalankan (delay / jadwal)
+    jalan   diambil worker dengan satu UPDATE ... RETURNING (atomik, dua
+            worker tidak pernah mengambil job yang sama), lease sampai
+            started_at + timeout task
+    selesai task tidak error
+    gagal   error dan percobaan habis; sebelum habis job kembali "antri"
+            dengan backoff eksponensial (BACKOFF_BASE * 2^(n-1) + jitter)
+Job "jalan" yang lease-nya lewat (worker mati di tengah jalan) dikembalikan
+ke antrian oleh worker lain (reap). Urutan ambil: priority terbesar dulu,
+lalu run_at terlama.
+
+Task didaftarkan dengan @task("nama"); job periodik ada di CRON (format cron
+5 kolom, waktu lokal). Setiap worker mengecek jadwal tiap menit dan
+memasukkan job dengan unique_key "cron:<task>:<menit>", jadi walaupun semua
+worker mengecek, setiap jadwal hanya masuk sekali. Jadwal yang terlewat
+saat tidak ada worker tidak dikejar.
+
+Set JOB_QUEUE=1 di proses web kalau worker dijalankan: hash foto upload
+(photo_hash.py) lalu dikirim ke antrian, bukan ke process pool proses web.
+Dashboard: /admin/jobs (routes/jobs.py).
+"""
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+JOBS_DB = os.getenv("JOBS_DB", "./jobs.db")
+POLL_SECONDS = 1.0            # jeda worker saat antrian kosong
+REAP_SECONDS = 30             # seberapa sering worker mencari lease yang lewat
+DEFAULT_TIMEOUT = 600         # detik, lease job yang sedang jalan
+DEFAULT_ATTEMPTS = 3
+BACKOFF_BASE = 10             # detik, percobaan ke-2; lalu 20, 40, ...
+BACKOFF_MAX = 3600
+RETENTION_DAYS = 7            # job selesai/gagal yang lebih tua dibuang
+LATENCY_WINDOW = 3600         # detik, jendela statistik latensi dashboard
+RESTART_DELAY = 2             # detik sebelum worker yang mati dijalankan lagi
+
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+
+STATUSES = ("antri", "jalan", "selesai", "gagal")
+
+
+def queue_enabled() -> bool:
+    """Worker dijalankan (JOB_QUEUE=1): kerja background proses web dikirim ke antrian"""
+    return os.getenv("JOB_QUEUE") == "1"
+
+
+# ================== TASK ==================
+class Task(NamedTuple):
+    fn: Callable
+    priority: int
+    max_attempts: int
+    timeout: int
+
+
+TASKS: Dict[str, Task] = {}
+
+
+def task(name: str, priority: int = PRIORITY_NORMAL, max_attempts: int = DEFAULT_ATTEMPTS,
+         timeout: int = DEFAULT_TIMEOUT):
+    """Daftarkan fungsi fn(**payload) sebagai task antrian"""
+    def decorator(fn):
+        TASKS[name] = Task(fn, priority, max_attempts, timeout)
+        return fn
+    return decorator
+
+
+def backoff(attempts: int) -> float:
+    """Jeda sebelum percobaan berikutnya setelah `attempts` kali gagal"""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(1.0, 1.25)
+
+
+# ================== PENYIMPANAN ==================
+class JobQueue:
+    """Antrian di file SQLite; satu koneksi per thread seperti cache.SQLiteCache"""
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                payload TEXT NOT NULL DEFAULT '{}',
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'antri',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                timeout INTEGER NOT NULL DEFAULT 600,
+                run_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                lease_until REAL,
+                worker TEXT,
+                error TEXT,
+                unique_key TEXT UNIQUE
+            );
+            CREATE INDEX IF NOT EXISTS ix_jobs_antrian ON jobs (priority DESC, run_at, id) WHERE status = 'antri';
+            CREATE INDEX IF NOT EXISTS ix_jobs_lease ON jobs (lease_until) WHERE status = 'jalan';
+            CREATE INDEX IF NOT EXISTS ix_jobs_finished ON jobs (finished_at);
+            CREATE INDEX IF NOT EXISTS ix_jobs_status_name ON jobs (status, name);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, name: str, payload: Optional[dict] = None, priority: Optional[int] = None,
+                run_at: Optional[float] = None, delay: float = 0, unique_key: Optional[str] = None,
+                max_attempts: Optional[int] = None) -> Optional[int]:
+        """Masukkan job; id-nya, atau None kalau unique_key sudah ada"""
+        if name not in TASKS:
+            raise ValueError(f"Task tidak dikenal: {name}")
+        spec = TASKS[name]
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT OR IGNORE INTO jobs (name, payload, priority, max_attempts, timeout, run_at, created_at, unique_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (name, json.dumps(payload or {}), spec.priority if priority is None else priority,
+             max_attempts or spec.max_attempts, spec.timeout, run_at if run_at is not None else now + delay,
+             now, unique_key),
+        )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def claim(self, worker: str) -> Optional[sqlite3.Row]:
+        """Ambil satu job siap (status -> jalan); None kalau tidak ada"""
+        now = time.time()
+        # fetchall: statement RETURNING baru selesai (dan lock tulis dilepas) setelah semua baris dibaca
+        rows = self._conn().execute(
+            "UPDATE jobs SET status = 'jalan', worker = ?, started_at = ?, attempts = attempts + 1, "
+            "lease_until = ? + timeout "
+            "WHERE id = (SELECT id FROM jobs WHERE status = 'antri' AND run_at <= ? "
+            "            ORDER BY priority DESC, run_at, id LIMIT 1) AND status = 'antri' "
+            "RETURNING id, name, payload, attempts, max_attempts, run_at, started_at",
+            (worker, now, now, now),
+        ).fetchall()
+        return rows[0] if rows else None
+
+    def complete(self, job_id: int, worker: str):
+        self._conn().execute(
+            "UPDATE jobs SET status = 'selesai', finished_at = ?, lease_until = NULL, error = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'jalan'",
+            (time.time(), job_id, worker),
+        )
+
+    def fail(self, job, worker: str, error: str):
+        """Job error: antri lagi dengan backoff, atau gagal kalau percobaan habis"""
+        now = time.time()
+        if job["attempts"] < job["max_attempts"]:
+            self._conn().execute(
+                "UPDATE jobs SET status = 'antri', run_at = ?, lease_until = NULL, error = ? "
+                "WHERE id = ? AND worker = ? AND status = 'jalan'",
+                (now + backoff(job["attempts"]), error, job["id"], worker),
+            )
+        else:
+            self._conn().execute(
+                "UPDATE jobs SET status = 'gagal', finished_at = ?, lease_until = NULL, error = ? "
+                "WHERE id = ? AND worker = ? AND status = 'jalan'",
+                (now, error, job["id"], worker),
+            )
+
+    def reap(self) -> int:
+        """Job "jalan" yang lease-nya lewat (worker mati): antri lagi, atau gagal kalau percobaan habis"""
+        now = time.time()
+        conn = self._conn()
+        requeued = conn.execute(
+            "UPDATE jobs SET status = 'antri', run_at = ?, lease_until = NULL, error = 'lease habis (worker mati?)' "
+            "WHERE status = 'jalan' AND lease_until < ? AND attempts < max_attempts",
+            (now, now),
+        ).rowcount
+        failed = conn.execute(
+            "UPDATE jobs SET status = 'gagal', finished_at = ?, lease_until = NULL, error = 'lease habis (worker mati?)' "
+            "WHERE status = 'jalan' AND lease_until < ? AND attempts >= max_attempts",
+            (now, now),
+        ).rowcount
+        return requeued + failed
+
+    def retry(self, job_id: int) -> bool:
+        """Jalankan ulang job yang gagal (percobaan dihitung dari nol)"""
+        return self._conn().execute(
+            "UPDATE jobs SET status = 'antri', attempts = 0, run_at = ?, finished_at = NULL, error = NULL "
+            "WHERE id = ? AND status = 'gagal'",
+            (time.time(), job_id),
+        ).rowcount > 0
+
+    def prune(self, days: int = RETENTION_DAYS) -> int:
+        cutoff = time.time() - days * 86400
+        return self._conn().execute(
+            "DELETE FROM jobs WHERE status IN ('selesai', 'gagal') AND finished_at < ?", (cutoff,)
+        ).rowcount
+
+    def get(self, job_id: int) -> Optional[dict]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def stats(self, window: int = LATENCY_WINDOW) -> dict:
+        """Kedalaman antrian, latensi (tunggu & durasi) per task, worker aktif, gagal terakhir"""
+        now = time.time()
+        conn = self._conn()
+        per_status = {s: 0 for s in STATUSES}
+        per_task: Dict[str, dict] = {}
+        for row in conn.execute("SELECT status, name, COUNT(*) AS n FROM jobs GROUP BY status, name"):
+            per_status[row["status"]] = per_status.get(row["status"], 0) + row["n"]
+            per_task.setdefault(row["name"], {s: 0 for s in STATUSES})[row["status"]] = row["n"]
+        ready = conn.execute(
+            "SELECT COUNT(*) AS n, MIN(run_at) AS oldest FROM jobs WHERE status = 'antri' AND run_at <= ?", (now,)
+        ).fetchone()
+
+        waits: Dict[str, List[float]] = {}
+        durations: Dict[str, List[float]] = {}
+        for row in conn.execute(
+            "SELECT name, started_at - run_at AS tunggu, finished_at - started_at AS durasi FROM jobs "
+            "WHERE status IN ('selesai', 'gagal') AND finished_at >= ?", (now - window,)
+        ):
+            waits.setdefault(row["name"], []).append(max(row["tunggu"] or 0.0, 0.0))
+            durations.setdefault(row["name"], []).append(max(row["durasi"] or 0.0, 0.0))
+        all_waits = [v for values in waits.values() for v in values]
+        all_durations = [v for values in durations.values() for v in values]
+
+        return {
+            "antrian": {
+                **per_status,
+                "siap": ready["n"],
+                "terjadwal": per_status["antri"] - ready["n"],
+                "tunggu_terlama_detik": round(now - ready["oldest"], 1) if ready["oldest"] else 0.0,
+            },
+            "latensi": {
+                "jendela_detik": window,
+                "selesai": len(all_waits),
+                "per_menit": round(len(all_waits) / (window / 60), 2),
+                "tunggu": _summary(all_waits),
+                "durasi": _summary(all_durations),
+            },
+            "task": {
+                name: {**counts, "tunggu": _summary(waits.get(name, [])), "durasi": _summary(durations.get(name, []))}
+                for name, counts in sorted(per_task.items())
+            },
+            "worker": {row["worker"]: row["n"] for row in conn.execute(
+                "SELECT worker, COUNT(*) AS n FROM jobs WHERE status = 'jalan' GROUP BY worker")},
+            "gagal_terakhir": [dict(row) for row in conn.execute(
+                "SELECT id, name, attempts, finished_at, error FROM jobs WHERE status = 'gagal' "
+                "ORDER BY finished_at DESC LIMIT 20")],
+            "cron": [{"jadwal": expr, "task": name, "berikutnya": next_run(expr).isoformat(timespec="minutes")}
+                     for expr, name in CRON],
+        }
+
+
+def _summary(values: List[float]) -> dict:
+    """rata-rata, p50, p95 dan maks dalam ms"""
+    if not values:
+        return {"rata2_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "maks_ms": 0.0}
+    ordered = sorted(values)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+    return {
+        "rata2_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+        "p50_ms": round(pick(0.50), 1),
+        "p95_ms": round(pick(0.95), 1),
+        "maks_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """Antrian global, dibuka sekali per proses"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
+
+
+def enqueue(name: str, payload: Optional[dict] = None, **options) -> Optional[int]:
+    """Lihat JobQueue.enqueue (priority, run_at, delay, unique_key, max_attempts)"""
+    return get_queue().enqueue(name, payload, **options)
+
+
+# ================== CRON ==================
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_field(field: str, low: int, high: int) -> set:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/")
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(int, part.split("-"))
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high
+        if start < low or end > high + (1 if high == 6 else 0) or step < 1:
+            raise ValueError(f"Nilai cron di luar {low}-{high}: {field}")
+        values.update(range(start, end + 1, step))
+    return {0 if v == 7 and high == 6 else v for v in values}   # 7 = Minggu juga
+
+
+class CronSchedule:
+    """Ekspresi cron 5 kolom: menit jam tanggal bulan hari (0/7 = Minggu)"""
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron harus 5 kolom: {expr}")
+        self.expr = expr
+        self.minute, self.hour, self.day, self.month, self.weekday = (
+            _parse_field(f, low, high) for f, (low, high) in zip(fields, _CRON_RANGES))
+        # Seperti cron: kalau tanggal dan hari sama-sama dibatasi, cukup salah satu cocok
+        self._day_or = fields[2] != "*" and fields[4] != "*"
+
+    def matches(self, when: datetime) -> bool:
+        if when.minute not in self.minute or when.hour not in self.hour or when.month not in self.month:
+            return False
+        day_ok = when.day in self.day
+        weekday_ok = (when.weekday() + 1) % 7 in self.weekday
+        return (day_ok or weekday_ok) if self._day_or else (day_ok and weekday_ok)
+
+
+def next_run(expr: str, after: Optional[datetime] = None) -> datetime:
+    """Menit pertama setelah `after` yang cocok dengan jadwal (maks. 1 tahun ke depan)"""
+    schedule = CronSchedule(expr)
+    when = (after or datetime.now()).replace(second=0, microsecond=0) + timedelta(minutes=1)
+    for _ in range(366 * 24 * 60):
+        if schedule.matches(when):
+            return when
+        when += timedelta(minutes=1)
+    raise ValueError(f"Jadwal tidak pernah jalan: {expr}")
+
+
+class CronScheduler:
+    """Dipanggil di loop worker; memasukkan job untuk setiap menit jadwal yang lewat sejak cek terakhir"""
+
+    def __init__(self, queue: JobQueue, entries=None):
+        self.queue = queue
+        self.entries = [(CronSchedule(expr), name) for expr, name in (entries or CRON)]
+        self._checked = datetime.now().replace(second=0, microsecond=0) - timedelta(minutes=1)
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        now = (now or datetime.now()).replace(second=0, microsecond=0)
+        added = 0
+        while self._checked < now:
+            self._checked += timedelta(minutes=1)
+            for schedule, name in self.entries:
+                if schedule.matches(self._checked):
+                    key = f"cron:{name}:{self._checked:%Y-%m-%dT%H:%M}"
+                    if self.queue.enqueue(name, run_at=self._checked.timestamp(), unique_key=key):
+                        added += 1
+        return added
+
+
+# ================== WORKER ==================
+def execute(queue: JobQueue, job, worker: str) -> bool:
+    """Jalankan satu job yang sudah di-claim; True kalau sukses"""
+    spec = TASKS.get(job["name"])
+    try:
+        if spec is None:
+            raise LookupError(f"Task tidak dikenal: {job['name']}")
+        spec.fn(**json.loads(job["payload"]))
+    except Exception:
+        error = traceback.format_exc(limit=5)
+        print(f"Job {job['id']} {job['name']} gagal (percobaan {job['attempts']}): {error.splitlines()[-1]}")
+        queue.fail(job, worker, error)
+        return False
+    queue.complete(job["id"], worker)
+    return True
+
+
+def run_worker(name: Optional[str] = None, stop: Optional[threading.Event] = None,
+               burst: bool = False, queue: Optional[JobQueue] = None) -> int:
+    """Loop worker: cron, reap, ambil dan kerjakan job. burst=True berhenti saat antrian kosong."""
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    queue = queue or get_queue()
+    scheduler = CronScheduler(queue)
+    next_reap = 0.0
+    done = 0
+    while not stop.is_set():
+        scheduler.tick()
+        if time.time() >= next_reap:
+            queue.reap()
+            next_reap = time.time() + REAP_SECONDS
+        job = queue.claim(name)
+        if job is None:
+            if burst:
+                break
+            stop.wait(POLL_SECONDS)
+            continue
+        execute(queue, job, name)
+        done += 1
+    return done
+
+
+def _worker_process(index: int, stop):
+    # Ctrl+C / SIGTERM diurus proses induk lewat event stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    parent = os.getppid()
+
+    def watch_parent():
+        # Induk mati tanpa sempat set stop (kill -9): berhenti juga, jangan jadi yatim
+        while not stop.wait(5):
+            if os.getppid() != parent:
+                stop.set()
+    threading.Thread(target=watch_parent, daemon=True).start()
+    run_worker(f"{socket.gethostname()}:{os.getpid()}#{index}", stop)
+
+
+def run_workers(processes: int = 1):
+    """Jalankan `processes` proses worker (spawn, koneksi database sendiri-sendiri) sampai dihentikan"""
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+
+    def _stop(signum, frame):
+        stop.set()
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    children = {}
+    for i in range(processes):
+        children[i] = ctx.Process(target=_worker_process, args=(i, stop), name=f"job-worker-{i}")
+        children[i].start()
+    print(f"{processes} worker jalan (antrian {os.path.abspath(JOBS_DB)})")
+    while not stop.is_set():
+        stop.wait(1)
+        for i, proc in list(children.items()):
+            if not proc.is_alive() and not stop.is_set():
+                print(f"Worker {i} berhenti (exit {proc.exitcode}), dijalankan lagi")
+                time.sleep(RESTART_DELAY)
+                children[i] = ctx.Process(target=_worker_process, args=(i, stop), name=f"job-worker-{i}")
+                children[i].start()
+    for proc in children.values():
+        proc.join()
+
+
+# ================== TASK BAWAAN ==================
+def _with_session(fn, *args):
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+@task("bersihkan_sesi")
+def cleanup_sessions():
+    import crud
+    _with_session(crud.cleanup_expired_sessions)
+
+
+@task("hash_foto", priority=PRIORITY_HIGH, timeout=120)
+def hash_photo(url: str, path: str):
+    import photo_hash
+    if photo_hash.enabled():
+        photo_hash.hash_now(url, path)
+
+
+@task("tandai_foto_mirip", priority=PRIORITY_LOW)
+def reconcile_photos():
+    import photo_hash
+    photo_hash.reconcile_recent()
+
+
+@task("buang_upload_terbengkalai", priority=PRIORITY_LOW)
+def expire_uploads():
+    import resumable_upload
+    resumable_upload.expire_stale_uploads()
+
+
+@task("buang_idempotency", priority=PRIORITY_LOW)
+def prune_idempotency():
+    import idempotency
+    idempotency.prune_expired()
+
+
+@task("buang_journal_commit", priority=PRIORITY_LOW)
+def prune_journal_commits():
+    import journal
+    _with_session(journal.prune_commits)
+
+
+def _compact_all(db):
+    """ChangeLog ada di tiap database (global + shard), padatkan satu per satu"""
+    import cdc
+    import sharding
+    with sharding.sessions(db) as targets:
+        return {name: cdc.compact(target) for name, target in targets}
+
+
+@task("padatkan_change_log", priority=PRIORITY_LOW)
+def compact_change_log():
+    _with_session(_compact_all)
+
+
+@task("segarkan_turnaround")
+def refresh_turnaround():
+    import analytics_turnaround
+    _with_session(analytics_turnaround.refresh)
+
+
+@task("rekap_bulanan", priority=PRIORITY_LOW, timeout=1800)
+def monthly_recap(periode: Optional[str] = None):
+    import recap
+    _with_session(recap.generate, periode or recap.previous_period())
+
+
+@task("buang_job_lama", priority=PRIORITY_LOW)
+def prune_jobs():
+    get_queue().prune()
+
+
+# (jadwal cron, task)
+CRON = (
+    ("*/15 * * * *", "bersihkan_sesi"),
+    ("5 * * * *", "buang_upload_terbengkalai"),
+    ("*/10 * * * *", "segarkan_turnaround"),
+    ("20 * * * *", "tandai_foto_mirip"),
+    ("30 2 * * *", "buang_idempotency"),
+    ("35 2 * * *", "buang_journal_commit"),
+    ("45 2 * * *", "padatkan_change_log"),
+    ("40 2 * * *", "buang_job_lama"),
+    ("0 3 1 * *", "rekap_bulanan"),
+)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["worker"]:
+        rest = [a for a in args[1:] if a != "--burst"]
+        if "--burst" in args:
+            print(f"{run_worker()} job dikerjakan")
+        else:
+            run_workers(int(rest[0]) if rest else 1)
+    elif args[:1] == ["status"]:
+        print(json.dumps(get_queue().stats(), indent=2, default=str))
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,477 @@
+"""
+Write-behind journal untuk laporan baru (opsional, WRITE_BEHIND=1).
+
+Jalur biasa crud._create melakukan add + commit + refresh per laporan; di
+SQLite setiap commit berarti satu fsync, jadi saat banyak laporan masuk
+bersamaan database sibuk dengan commit satu baris. Dengan journal:
+
+    1. submit() menulis laporan yang sudah divalidasi ke file journal
+       append-only, menunggu fsync, lalu langsung mengembalikan journal id
+       (jid) yang stabil. Beberapa request yang datang bersamaan berbagi satu
+       fsync (group commit).
+    2. Thread writer mengambil entri yang sudah durable dan meng-insert-nya
+       per batch (sampai BATCH_SIZE baris) dalam satu transaksi, bersama
+       penanda JournalCommit(jid -> id baris).
+    3. Saat startup, journal milik proses yang sudah mati (crash) di-replay;
+       jid yang sudah ada di journal_commit dilewati, jadi tidak ada dobel.
+
+Setiap proses menulis ke file sendiri (journal/laporan-<pid>.log) dan
+memegang flock atas file itu; file yang bisa di-lock saat startup berarti
+pemiliknya sudah tidak hidup. File dikosongkan (checkpoint) setelah semua
+entrinya masuk database.
+
+Konsekuensi: laporan baru muncul di dashboard beberapa puluh milidetik
+setelah response (MAX_DELAY), dan id database belum diketahui saat response
+dikirim; status jid bisa dicek di /api/journal/{jid}.
+
+Format satu entri: "<crc32 8 hex> <json>\n". Baris terakhir yang terpotong
+(crash saat menulis) gagal cek CRC dan dibuang.
+
+Dengan shard per site, batch dipecah per database tujuan dan penanda
+journal_commit ditulis di database yang sama dengan barisnya (tetap satu
+transaksi); pengecekan jid membaca semua database.
+"""
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Optional
+
+from sqlalchemy import insert, inspect
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+
+import database
+import models
+import sharding
+from database import Base, SessionLocal
+
+JOURNAL_DIR = os.getenv("WRITE_BEHIND_DIR", "journal")
+BATCH_SIZE = 500
+MAX_DELAY = 0.02              # detik menunggu batch terisi sebelum commit
+CHECKPOINT_BYTES = 4 * 1024 * 1024
+RETENTION_DAYS = 7            # umur penanda journal_commit sebelum dihapus
+
+_MODELS = {mapper.class_.__tablename__: mapper.class_ for mapper in Base.registry.mappers}
+
+
+class JournalError(Exception):
+    pass
+
+
+# Ditolak karena isi entri: dicoba ulang pun tetap gagal. ShardRoutingError =
+# lokasi laporan kirim/bongkar yang tidak punya shard.
+DATA_ERRORS = (IntegrityError, DataError, database.ShardRoutingError)
+
+
+def enabled() -> bool:
+    return os.getenv("WRITE_BEHIND") == "1"
+
+
+# ================== ENCODING ==================
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, dtime):
+        return {"$t": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and len(value) == 1:
+        (tag, raw), = value.items()
+        if tag == "$dt":
+            return datetime.fromisoformat(raw)
+        if tag == "$d":
+            return date.fromisoformat(raw)
+        if tag == "$t":
+            return dtime.fromisoformat(raw)
+    return value
+
+
+def encode_entry(jid: str, tabel: str, data: dict) -> bytes:
+    payload = json.dumps(
+        {"jid": jid, "tabel": tabel, "data": {k: _encode_value(v) for k, v in data.items()}},
+        separators=(",", ":"), ensure_ascii=False,
+    ).encode("utf-8")
+    return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+
+def decode_entry(line: bytes) -> Optional[dict]:
+    """None kalau baris rusak/terpotong"""
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        entry = json.loads(payload)
+    except ValueError:
+        return None
+    entry["data"] = {k: _decode_value(v) for k, v in entry["data"].items()}
+    return entry
+
+
+def read_entries(path: str) -> list:
+    entries = []
+    with open(path, "rb") as f:
+        for line in f:
+            entry = decode_entry(line)
+            if entry is None:
+                break   # sisa file setelah baris rusak tidak bisa dipercaya
+            entries.append(entry)
+    return entries
+
+
+# ================== APPLY KE DATABASE ==================
+def _after_commit(items: list):
+    # Invalidasi cache, feed live dan autocomplete sama seperti crud._create
+    import crud
+    crud._touch(*{type(item) for item in items})
+    for item in items:
+        crud._publish_laporan(item)
+        crud.autocomplete.record(item)
+    crud.analytics_turnaround.schedule_refresh({type(item) for item in items})
+
+
+def apply_entries(entries: list) -> dict:
+    """
+    Insert entri dalam satu transaksi bersama penanda journal_commit. Kalau
+    ditolak karena isi data (DATA_ERRORS), entri dicoba satu per satu supaya
+    satu baris buruk tidak menahan yang lain; baris yang tetap ditolak
+    dicatat dengan error-nya. Error lain (database terkunci, koneksi
+    putus) tidak dicatat sebagai penolakan: diteruskan ke pemanggil supaya
+    batch dicoba lagi, dan entri yang sempat masuk satu per satu dikenali
+    lewat _already_committed.
+    """
+    if not entries:
+        return {"masuk": 0, "ditolak": 0}
+    if database.sharding_enabled:
+        groups = {}
+        for entry in entries:
+            site = database.site_of(entry["tabel"], entry["data"].get("lokasi"))
+            groups.setdefault(site, []).append(entry)
+        if len(groups) > 1:
+            results = [apply_entries(group) for group in groups.values()]
+            return {k: sum(r[k] for r in results) for k in ("masuk", "ditolak")}
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        try:
+            items = _insert(db, entries)
+            db.commit()
+            _after_commit(items)
+            return {"masuk": len(items), "ditolak": 0}
+        except DATA_ERRORS:
+            db.rollback()
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+
+        masuk = ditolak = 0
+        for entry in entries:
+            try:
+                items = _insert(db, [entry])
+                db.commit()
+                _after_commit(items)
+                masuk += 1
+            except DATA_ERRORS as e:
+                db.rollback()
+                db.add(models.JournalCommit(jid=entry["jid"], tabel=entry["tabel"], error=str(e)[:2000]))
+                db.commit()
+                print(f"Journal: entri {entry['jid']} ditolak database: {e}")
+                ditolak += 1
+            except SQLAlchemyError:
+                db.rollback()
+                raise
+        return {"masuk": masuk, "ditolak": ditolak}
+    finally:
+        db.close()
+
+
+def _insert(db, entries: list) -> list:
+    items = [_MODELS[entry["tabel"]](**entry["data"]) for entry in entries]
+    db.add_all(items)
+    db.flush()
+    # Penanda di koneksi yang sama dengan barisnya (database shard kalau ada)
+    conn = db.connection(bind_arguments={"mapper": inspect(type(items[0]))})
+    conn.execute(insert(models.JournalCommit.__table__), [
+        {"jid": entry["jid"], "tabel": entry["tabel"], "row_id": item.id}
+        for entry, item in zip(entries, items)
+    ])
+    return items
+
+
+def _committed_on(db, jids: list) -> set:
+    done = set()
+    for i in range(0, len(jids), 500):
+        done.update(jid for (jid,) in db.query(models.JournalCommit.jid)
+                    .filter(models.JournalCommit.jid.in_(jids[i:i + 500])))
+    return done
+
+
+def _already_committed(jids: list) -> set:
+    db = SessionLocal()
+    try:
+        return set().union(*sharding.fan_out(db, lambda part: _committed_on(part, jids)))
+    finally:
+        db.close()
+
+
+def replay_orphans(directory: str = JOURNAL_DIR) -> dict:
+    """
+    Replay journal milik proses yang sudah mati. File yang masih di-flock
+    proses lain dilewati. Dipanggil di lifespan sebelum writer dimulai.
+    """
+    stats = {"file": 0, "entri": 0, "masuk": 0, "ditolak": 0, "sudah_ada": 0, "tertunda": 0}
+    for path in sorted(glob.glob(os.path.join(directory, "laporan-*.log"))):
+        fd = os.open(path, os.O_RDWR)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            entries = read_entries(path)
+            try:
+                done = _already_committed([e["jid"] for e in entries])
+                todo = [e for e in entries if e["jid"] not in done]
+                for i in range(0, len(todo), BATCH_SIZE):
+                    result = apply_entries(todo[i:i + BATCH_SIZE])
+                    stats["masuk"] += result["masuk"]
+                    stats["ditolak"] += result["ditolak"]
+            except SQLAlchemyError as e:
+                # File dibiarkan; di-replay lagi oleh startup berikutnya (jid yang sudah masuk dilewati)
+                print(f"Journal: replay {path} tertunda ({e})")
+                stats["tertunda"] += 1
+                continue
+            stats["file"] += 1
+            stats["entri"] += len(entries)
+            stats["sudah_ada"] += len(done)
+            os.unlink(path)
+        finally:
+            os.close(fd)
+    return stats
+
+
+# ================== JOURNAL PER PROSES ==================
+class WriteBehindJournal:
+    def __init__(self, directory: str = JOURNAL_DIR, batch_size: int = BATCH_SIZE,
+                 max_delay: float = MAX_DELAY):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.path = os.path.join(directory, f"laporan-{os.getpid()}.log")
+        self._file = None
+        self._cond = threading.Condition()
+        self._buffer = []            # (seq, bytes, entry) menunggu fsync
+        self._apply = deque()        # entri durable menunggu insert
+        self._pending = {}           # jid -> tabel, belum masuk database
+        self._retried = set()        # jid dari batch yang gagal commit dan diulang
+        self._seq = 0
+        self._durable_seq = 0
+        self._applied = 0
+        self._failed: Optional[BaseException] = None
+        self._closing = False
+        self._flush_done = False
+        self._threads = []
+        self.stats = {"submit": 0, "fsync": 0, "batch": 0, "masuk": 0, "ditolak": 0, "checkpoint": 0}
+
+    # ----- lifecycle -----
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Lock dulu di nama sementara, baru rename: replay_orphans di worker
+        # lain tidak boleh sempat mengunci (dan menghapus) file yang baru dibuat
+        tmp_path = self.path + ".new"
+        self._file = open(tmp_path, "ab")
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.rename(tmp_path, self.path)
+        for target, name in ((self._flush_loop, "journal-fsync"), (self._apply_loop, "journal-writer")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self, timeout: float = 30.0):
+        """Tunggu semua entri masuk database lalu hapus file journal"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        # Urutan penting: fsync selesai dulu, baru writer boleh berhenti
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._file:
+            clean = not self._apply and not self._buffer and self._failed is None
+            self._file.close()
+            if clean:
+                os.unlink(self.path)
+            self._file = None
+
+    # ----- tulis -----
+    def submit(self, tabel: str, data: dict) -> str:
+        """
+        Tulis satu laporan ke journal; kembali setelah entri durable (fsync).
+        Blocking: panggil dari thread (handler `def` biasa / run_in_threadpool),
+        bukan dari event loop, supaya request lain bisa ikut fsync yang sama.
+        """
+        jid = uuid.uuid4().hex
+        entry = {"jid": jid, "tabel": tabel, "data": data}
+        line = encode_entry(jid, tabel, data)
+        with self._cond:
+            if self._closing or self._file is None:
+                raise JournalError("Journal tidak aktif")
+            self._seq += 1
+            seq = self._seq
+            self._buffer.append((seq, line, entry))
+            self._pending[jid] = tabel
+            self.stats["submit"] += 1
+            self._cond.notify_all()
+            while self._durable_seq < seq:
+                if self._failed is not None:
+                    raise JournalError(f"Journal gagal ditulis: {self._failed}")
+                self._cond.wait()
+        return jid
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closing:
+                    self._cond.wait()
+                if not self._buffer and self._closing:
+                    self._flush_done = True
+                    self._cond.notify_all()
+                    return
+                batch, self._buffer = self._buffer, []
+            try:
+                # Satu write + satu fsync untuk semua submit yang menunggu
+                self._file.write(b"".join(line for _, line, _ in batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                with self._cond:
+                    self._failed = e
+                    self._flush_done = True
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self.stats["fsync"] += 1
+                self._durable_seq = batch[-1][0]
+                self._apply.extend(entry for _, _, entry in batch)
+                self._cond.notify_all()
+
+    def _apply_loop(self):
+        while True:
+            with self._cond:
+                while not self._apply and not self._flush_done:
+                    self._cond.wait()
+                if not self._apply:
+                    return
+            # Beri kesempatan batch terisi
+            if len(self._apply) < self.batch_size and not self._closing:
+                time.sleep(self.max_delay)
+            with self._cond:
+                batch = [self._apply.popleft() for _ in range(min(self.batch_size, len(self._apply)))]
+            try:
+                todo = batch
+                if any(entry["jid"] in self._retried for entry in batch):
+                    # Percobaan sebelumnya bisa sudah memasukkan sebagian entri satu per satu
+                    done = _already_committed([entry["jid"] for entry in batch])
+                    todo = [entry for entry in batch if entry["jid"] not in done]
+                result = apply_entries(todo)
+            except Exception as e:
+                # Database tidak bisa dipakai: entri tetap aman di journal,
+                # dikembalikan ke antrian dan dicoba lagi
+                print(f"Journal: gagal commit batch ({e}), dicoba lagi")
+                with self._cond:
+                    self._retried.update(entry["jid"] for entry in batch)
+                    self._apply.extendleft(reversed(batch))
+                time.sleep(1.0)
+                continue
+            with self._cond:
+                for entry in batch:
+                    self._pending.pop(entry["jid"], None)
+                    self._retried.discard(entry["jid"])
+                self._applied += len(batch)
+                self.stats["batch"] += 1
+                self.stats["masuk"] += result["masuk"]
+                self.stats["ditolak"] += result["ditolak"]
+                self._checkpoint()
+
+    def _checkpoint(self):
+        # Dipanggil dengan _cond dipegang: kosongkan file kalau semua entri
+        # yang pernah ditulis sudah masuk database
+        if self._applied != self._seq or self._buffer or self._apply:
+            return
+        if self._file.tell() < CHECKPOINT_BYTES:
+            return
+        self._file.truncate(0)
+        self._file.seek(0)
+        os.fsync(self._file.fileno())
+        self.stats["checkpoint"] += 1
+
+    # ----- status -----
+    def is_pending(self, jid: str) -> bool:
+        with self._cond:
+            return jid in self._pending
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                **self.stats,
+                "menunggu_fsync": len(self._buffer),
+                "menunggu_commit": len(self._pending) - len(self._buffer),
+                "ukuran_file": self._file.tell() if self._file else 0,
+                "file": self.path,
+            }
+
+
+_journal: Optional[WriteBehindJournal] = None
+
+
+def active() -> Optional[WriteBehindJournal]:
+    return _journal
+
+
+def start() -> WriteBehindJournal:
+    global _journal
+    if _journal is None:
+        _journal = WriteBehindJournal()
+        _journal.start()
+    return _journal
+
+
+def stop():
+    global _journal
+    if _journal is not None:
+        _journal.close()
+        _journal = None
+
+
+def prune_commits(db, days: int = RETENTION_DAYS) -> int:
+    """Hapus penanda journal_commit lama (journal-nya sudah lama dikosongkan)"""
+    batas = datetime.now() - timedelta(days=days)
+    deleted = 0
+    with sharding.sessions(db) as parts:
+        for _, part in parts:
+            deleted += part.query(models.JournalCommit).filter(models.JournalCommit.committed_at < batas).delete()
+            part.commit()
+    return deleted
+
+
+def status(db, jid: str) -> Optional[dict]:
+    """Status jid: menunggu / masuk (dengan id baris) / ditolak"""
+    if _journal is not None and _journal.is_pending(jid):
+        return {"jid": jid, "status": "menunggu"}
+    rows = sharding.fan_out(
+        db, lambda part: part.query(models.JournalCommit).filter(models.JournalCommit.jid == jid).first()
+    )
+    row = next((r for r in rows if r is not None), None)
+    if row is None:
+        return None
+    if row.row_id is None:
+        return {"jid": jid, "status": "ditolak", "tabel": row.tabel, "error": row.error}
+    return {"jid": jid, "status": "masuk", "tabel": row.tabel, "id": row.row_id}
@@ -0,0 +1,179 @@
+"""
+Feed laporan baru secara live untuk dashboard Merak/Semarang (Server-Sent Events).
+
+crud._create() memanggil publish_laporan() setelah commit. Event disimpan di
+ring buffer (untuk client yang reconnect dengan Last-Event-ID) lalu dikirim ke
+semua subscriber. Setiap subscriber punya antrian terbatas; kalau client lambat
+dan antriannya penuh, koneksinya diputus dengan event "lag" dan client akan
+reconnect lalu melanjutkan dari Last-Event-ID terakhir.
+
+Id event berbentuk "<epoch>-<n>": epoch dibuat sekali per proses saat start.
+Kalau epoch di Last-Event-ID tidak cocok (server restart, atau halaman
+dirender worker lain) stream dilanjutkan dari posisi sekarang tanpa replay,
+bukan diberi replay dari nomor urut yang kebetulan sama tapi isinya berbeda.
+Halaman tidak pernah di-reload otomatis; dengan beberapa worker hal itu bisa
+berulang terus dan setiap reload menjalankan query dashboard penuh.
+
+Catatan: bus ini ada di dalam proses. Dengan beberapa worker uvicorn, setiap
+worker hanya melihat laporan yang masuk lewat worker itu sendiri.
+"""
+import asyncio
+import json
+import os
+import threading
+import time as _time
+from collections import deque
+from datetime import date, datetime, time
+from typing import Optional
+
+HISTORY_SIZE = 2000       # jumlah event terakhir yang bisa di-resume
+SUBSCRIBER_QUEUE = 256    # batas antrian per client sebelum dianggap lambat
+HEARTBEAT_SECONDS = 15
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return str(value)
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self.lagging = False
+
+    def offer(self, event):
+        # Dipanggil di thread event loop milik subscriber
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+
+class BroadcastBus:
+    """Bus broadcast di dalam proses dengan id event yang terus naik"""
+
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.epoch = f"{int(_time.time() * 1000):x}.{os.getpid()}"
+        self.last_id = 0
+
+    def event_id(self, n: int) -> str:
+        return f"{self.epoch}-{n}"
+
+    @property
+    def last_event_id(self) -> str:
+        return self.event_id(self.last_id)
+
+    def _parse(self, event_id: str) -> Optional[int]:
+        """Nomor urut dari id event, None kalau epoch-nya dari proses lain"""
+        epoch, _, n = event_id.rpartition("-")
+        if epoch != self.epoch or not n.isdigit():
+            return None
+        return int(n)
+
+    def owns(self, event_id: Optional[str]) -> bool:
+        return bool(event_id) and self._parse(event_id) is not None
+
+    def publish(self, event_type: str, data: dict) -> str:
+        """Kirim event ke semua subscriber. Aman dipanggil dari thread mana pun."""
+        payload = json.dumps(data, default=_json_default, separators=(",", ":"))
+        with self._lock:
+            self.last_id += 1
+            event = (self.last_id, event_type, payload)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                # Event loop sudah ditutup, buang subscriber
+                self.unsubscribe(sub)
+        return self.event_id(event[0])
+
+    def subscribe(self, last_event_id: Optional[str] = None):
+        """
+        Daftarkan subscriber baru. Mengembalikan (subscriber, backlog) di mana
+        backlog adalah event setelah last_event_id, atau None kalau id tersebut
+        dari proses lain atau sudah keluar dari ring buffer (stream dilanjutkan
+        dari posisi sekarang, lihat event_stream).
+        """
+        sub = _Subscriber(asyncio.get_running_loop())
+        n = self._parse(last_event_id) if last_event_id else None
+        with self._lock:
+            self._subscribers.add(sub)
+            if not last_event_id:
+                backlog = []
+            elif n is None or n > self.last_id or (
+                self._history and n < self._history[0][0] - 1
+            ):
+                # Server restart / worker lain (epoch beda) atau riwayat sudah terbuang
+                backlog = None
+            else:
+                backlog = [e for e in self._history if e[0] > n]
+        return sub, backlog
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+bus = BroadcastBus()
+
+
+# ================== FORMAT EVENT ==================
+def _format_sse(n: int, event_type: str, payload: str) -> str:
+    return f"id: {bus.event_id(n)}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+def publish_laporan(item: dict):
+    """
+    Kirim laporan baru sebagai delta ringkas: hanya field yang terisi
+    (format_laporan_item mengisi '-' / None untuk field yang tidak ada).
+    """
+    delta = {k: v for k, v in item.items() if v is not None and v != "-"}
+    return bus.publish("laporan", delta)
+
+
+async def event_stream(request, last_event_id: Optional[str] = None):
+    """Generator SSE untuk StreamingResponse"""
+    sub, backlog = bus.subscribe(last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        if backlog is None:
+            if bus.owns(last_event_id):
+                # Terlalu lama terputus, riwayat sudah hilang: client cukup diberi tahu
+                yield _format_sse(bus.last_id, "reset", "{}")
+            else:
+                # Id dari proses lain (restart / worker lain): lanjut dari posisi
+                # sekarang. Frame id saja sudah memperbarui Last-Event-ID browser.
+                yield f"id: {bus.last_event_id}\n\n"
+            backlog = []
+        for event in backlog:
+            yield _format_sse(*event)
+
+        while True:
+            if await request.is_disconnected():
+                return
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if sub.lagging:
+                # Client terlalu lambat: putus, biar reconnect dari Last-Event-ID
+                yield _format_sse(event[0] - 1, "lag", "{}")
+                return
+            yield _format_sse(*event)
+    finally:
+        bus.unsubscribe(sub)
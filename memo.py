@@ -0,0 +1,193 @@
+"""
+Memo hasil baca crud (get_all, get_all_karyawan, get_all_users, ...) di memori proses.
+
+Helper baca yang sama dipanggil berulang kali dengan argumen yang sama
+(dashboard, halaman daftar, export), padahal di antaranya sering tidak ada
+tulisan sama sekali. rows() menyimpan hasilnya dengan key
+(nama helper, database, filter yang dinormalisasi); setiap entri mencatat
+versi tabel dari cache bersama (cache.get_versions) saat query dijalankan.
+Versi itu dinaikkan crud._touch / _touch_updated setiap create, update dan
+delete, jadi begitu ada tulisan, entri lama otomatis dianggap basi dan
+query dijalankan lagi. Dengan CACHE_URL sqlite/redis versinya dipakai
+bersama, jadi tulisan di worker lain juga membuat memo di sini basi.
+
+Hasil disimpan sebagai snapshot, bukan objek ORM: tuple berisi namedtuple
+per model (KaryawanRow, UserRow, ...) dengan nilai kolom saja. Snapshot
+tidak bisa diubah, tidak terikat session, dan aman dipakai bersama banyak
+request; kode yang perlu mengubah baris tetap memakai get_by_id / query
+biasa. Akses atribut (row.nama, getattr(row, 'lokasi', ...)) sama seperti
+objek ORM; row._asdict() untuk dict.
+
+Memori dibatasi MEMO_MAX_BYTES (default 32 MB, 0 = memo mati): ukuran
+setiap entri diperkirakan dari sys.getsizeof tuple, baris dan nilainya,
+lalu entri yang paling lama tidak dipakai dibuang sampai total di bawah
+batas. Entri juga kadaluarsa setelah MEMO_TTL detik, untuk tulisan yang
+tidak lewat crud (dan tidak menaikkan versi).
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+import cache
+
+MAX_BYTES = int(os.getenv("MEMO_MAX_BYTES", 32 * 1024 * 1024))
+TTL = int(os.getenv("MEMO_TTL", cache.DEFAULT_TTL))   # detik
+MAX_ENTRY_FRACTION = 4   # satu entri maksimal 1/4 batas, supaya tidak menyapu seluruh memo
+
+
+# ================== SNAPSHOT BARIS ==================
+_row_types: Dict[type, type] = {}
+_row_types_lock = threading.Lock()
+
+
+def row_type(model_class) -> type:
+    """namedtuple dengan field = kolom model (dibuat sekali per model)"""
+    row_cls = _row_types.get(model_class)
+    if row_cls is None:
+        with _row_types_lock:
+            row_cls = _row_types.get(model_class)
+            if row_cls is None:
+                keys = [attr.key for attr in inspect(model_class).column_attrs]
+                row_cls = namedtuple(f"{model_class.__name__}Row", keys)
+                _row_types[model_class] = row_cls
+    return row_cls
+
+
+def snapshot(model_class, items) -> tuple:
+    """Tuple snapshot (read-only) dari objek ORM hasil query"""
+    row_cls = row_type(model_class)
+    fields = row_cls._fields
+    return tuple(row_cls._make([getattr(item, f) for f in fields]) for item in items)
+
+
+def sizeof(rows: tuple) -> int:
+    """Perkiraan byte satu entri: tuple luar, setiap baris dan setiap nilai kolom"""
+    total = sys.getsizeof(rows)
+    for row in rows:
+        total += sys.getsizeof(row)
+        for value in row:
+            if value is not None:
+                total += sys.getsizeof(value)
+    return total
+
+
+# ================== LRU DENGAN BATAS BYTE ==================
+class MemoLRU:
+    """LRU thread-safe: key -> (versi, kadaluarsa, rows, ukuran), dibatasi total ukuran"""
+
+    def __init__(self, max_bytes: int = MAX_BYTES, ttl: int = TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evicted = 0
+        self.too_large = 0
+
+    def get(self, key: Hashable, version) -> Optional[tuple]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry_version, expires_at, rows, size = entry
+            if entry_version != version or expires_at < time.time():
+                # Ada tulisan sejak entri dibuat (atau kadaluarsa): buang sekarang
+                del self._data[key]
+                self._bytes -= size
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def put(self, key: Hashable, version, rows: tuple):
+        size = sizeof(rows)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[3]
+            if size > self.max_bytes // MAX_ENTRY_FRACTION:
+                self.too_large += 1
+                return
+            self._data[key] = (version, time.time() + self.ttl, rows, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "aktif": self.max_bytes > 0,
+                "entri": len(self._data),
+                "byte": self._bytes,
+                "batas_byte": self.max_bytes,
+                "hit": self.hits,
+                "miss": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "basi": self.stale,
+                "dibuang": self.evicted,
+                "terlalu_besar": self.too_large,
+            }
+
+
+store = MemoLRU()
+
+
+# ================== HELPER ==================
+def normalize(filters: Optional[dict]) -> Optional[Tuple]:
+    """Filter -> tuple terurut tanpa nilai None; None kalau ada nilai yang tidak hashable"""
+    items = tuple(sorted((k, v) for k, v in (filters or {}).items() if v is not None))
+    try:
+        hash(items)
+    except TypeError:
+        return None
+    return items
+
+
+def rows(db: Session, name: str, model_class, loader: Callable[[], Any], filters: dict = None) -> tuple:
+    """
+    Snapshot hasil loader() (list objek model_class), dari memo kalau versi
+    tabel belum berubah. Database tujuan (shard/replica) ikut jadi key.
+    """
+    normalized = normalize(filters)
+    if store.max_bytes <= 0 or normalized is None:
+        return snapshot(model_class, loader())
+    table = model_class.__tablename__
+    try:
+        version = cache.get_cache().get_versions([table])[table]
+    except Exception as e:
+        print(f"Error membaca versi tabel {table}: {e}")
+        return snapshot(model_class, loader())
+    # Versi dibaca sebelum query: tulisan di tengah jalan paling buruk membuat
+    # hasil baru tersimpan dengan versi lama (langsung basi), tidak pernah sebaliknya
+    bind = db.get_bind(mapper=inspect(model_class))
+    key = (name, str(bind.url), table, normalized)
+    found = store.get(key, version)
+    if found is not None:
+        return found
+    result = snapshot(model_class, loader())
+    store.put(key, version, result)
+    return result
+
+
+def stats() -> dict:
+    return store.stats()
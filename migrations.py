@@ -0,0 +1,143 @@
+"""
+Pengecekan versi skema saat startup.
+
+Dulu create_admin.py menjalankan Base.metadata.create_all (plus cek semua
+index) setiap kali di-import. Sekarang skema diberi fingerprint dari metadata
+di memori (nama tabel, kolom, tipe dan index) dan disimpan di tabel
+schema_version. Startup cukup membaca satu baris: kalau fingerprint sama,
+tidak ada DDL yang dijalankan. Kalau beda (model berubah atau database baru),
+create_all + kolom/index baru dijalankan sekali lalu fingerprint disimpan.
+
+Kolom baru di tabel lama ditambahkan dengan ALTER TABLE ADD COLUMN (hanya
+kolom nullable tanpa default), lalu kolom dimensi driver_id/kendaraan_id
+diisi oleh dimensions.backfill.
+
+Database shard site dibuat tanpa foreign key (foreign_keys=False): tabel
+drivers/kendaraan hanya terisi di database global, jadi FK ke sana dari
+laporan di shard akan gagal di setiap insert (PostgreSQL). FK lama yang
+sudah terlanjur dibuat di shard di-drop saat skema diterapkan.
+"""
+import hashlib
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+import analytics_turnaround
+import dimensions
+import models
+from database import Base
+
+
+def schema_fingerprint(foreign_keys: bool = True) -> str:
+    """Hash metadata model; berubah kalau ada tabel/kolom/index baru"""
+    parts = [] if foreign_keys else ["tanpa FK"]
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(f"T {table.name}")
+        for column in table.columns:
+            parts.append(f"C {column.name} {column.type!r} {column.nullable}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"I {index.name} {','.join(c.name for c in index.columns)}")
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+SCHEMA_VERSION = schema_fingerprint()
+SHARD_SCHEMA_VERSION = schema_fingerprint(foreign_keys=False)
+
+
+def current_version(engine):
+    """Versi yang tercatat di database, None kalau tabel belum ada"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(
+                f"SELECT version FROM {models.SchemaVersion.__tablename__} WHERE id = 1"
+            )).scalar()
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def add_missing_columns(engine, foreign_keys: bool = True) -> list:
+    """ALTER TABLE ADD COLUMN untuk kolom model yang belum ada di tabel lama"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                ddl = (f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN "
+                       f"{preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}")
+                for fk in (column.foreign_keys if foreign_keys else ()):
+                    ddl += (f" REFERENCES {preparer.quote(fk.column.table.name)}"
+                            f" ({preparer.quote(fk.column.name)})")
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _create_tables_without_fk(engine):
+    existing = set(inspect(engine).get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                conn.execute(CreateTable(table, include_foreign_key_constraints=()))
+
+
+def drop_foreign_keys(engine) -> list:
+    """Drop FK yang sudah ada (shard lama); SQLite tidak bisa dan tidak menegakkannya"""
+    if engine.dialect.name == "sqlite":
+        return []
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    dropped = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            for fk in inspector.get_foreign_keys(table.name):
+                if fk.get("name"):
+                    conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} "
+                                      f"DROP CONSTRAINT {preparer.quote(fk['name'])}"))
+                    dropped.append(f"{table.name}.{fk['name']}")
+    return dropped
+
+
+def apply_schema(engine, dim_engine=None, foreign_keys: bool = True):
+    """Buat tabel, kolom dan index yang belum ada, lalu catat versinya"""
+    if foreign_keys:
+        Base.metadata.create_all(bind=engine)
+    else:
+        _create_tables_without_fk(engine)
+        drop_foreign_keys(engine)
+    add_missing_columns(engine, foreign_keys)
+    # create_all tidak menambah index baru ke tabel yang sudah ada. IF NOT EXISTS,
+    # bukan checkfirst: refleksi SQLite tidak melihat index ekspresi (lower(...))
+    with engine.begin() as conn:
+        analytics_turnaround.dedupe(conn)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    dimensions.backfill(engine, dim_engine)
+
+    with engine.begin() as conn:
+        table = models.SchemaVersion.__table__
+        conn.execute(table.delete())
+        conn.execute(table.insert().values(
+            id=1, version=SCHEMA_VERSION if foreign_keys else SHARD_SCHEMA_VERSION))
+
+
+def ensure_schema(engine, dim_engine=None, foreign_keys: bool = True) -> str:
+    """
+    Dipanggil saat startup. Mengembalikan "ok" kalau skema sudah sesuai
+    (hanya satu SELECT), atau "applied" kalau DDL dijalankan.
+    """
+    expected = SCHEMA_VERSION if foreign_keys else SHARD_SCHEMA_VERSION
+    if current_version(engine) == expected:
+        return "ok"
+    apply_schema(engine, dim_engine, foreign_keys)
+    return "applied"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Time, DateTime, Text, func, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, Time, DateTime, Text, func, Boolean, Index, ForeignKey, LargeBinary
 from sqlalchemy.orm import relationship
 from database import Base
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -14,6 +14,14 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     last_login = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Pencarian prefix tanpa beda huruf besar/kecil (crud.search_users)
+        Index("ix_users_username_lower", func.lower(username)),
+        Index("ix_users_email_lower", func.lower(email)),
+        Index("ix_users_role_lower", func.lower(role)),
+        Index("ix_users_created_at", "created_at"),
+    )
     
     def set_password(self, password):
         """Hash dan simpan password"""
@@ -43,13 +51,23 @@ class Driver(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+# ============ KENDARAAN ============
+class Kendaraan(Base):
+    """Dimensi plat mobil; laporan merujuk lewat kendaraan_id (lihat dimensions.py)"""
+    __tablename__ = "kendaraan"
+    id = Column(Integer, primary_key=True, index=True)
+    plat = Column(String(50), unique=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 
 # ============ DEPOT (MERAK) ============
 class SkidMasukDepot(Base):
     __tablename__ = "skid_masuk_depot"
     id = Column(Integer, primary_key=True, index=True)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     plat_mobil = Column(String(50), nullable=True)
+    kendaraan_id = Column(Integer, ForeignKey("kendaraan.id"), nullable=True, index=True)
     tanggal = Column(Date, nullable=False)
     rit = Column(Integer, nullable=False)
     jam_masuk = Column(Time, nullable=False)
@@ -59,11 +77,14 @@ class SkidKeluarDepot(Base):
     __tablename__ = "skid_keluar_depot"
     id = Column(Integer, primary_key=True, index=True)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     plat_mobil = Column(String(50), nullable=True)
+    kendaraan_id = Column(Integer, ForeignKey("kendaraan.id"), nullable=True, index=True)
     tanggal = Column(Date, nullable=False)
     jam_keluar = Column(Time, nullable=False)
     jumlah_spa = Column(Integer, nullable=False)
     foto_spa = Column(String(255), nullable=True)  # path foto
+    foto_duplikat = Column(String(255), nullable=True)  # URL foto lama yang mirip (photo_hash.py)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 # ============ LAUT (MERAK) ============
@@ -71,7 +92,9 @@ class SkidMasukLaut(Base):
     __tablename__ = "skid_masuk_laut"
     id = Column(Integer, primary_key=True, index=True)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     plat_mobil = Column(String(50), nullable=True)
+    kendaraan_id = Column(Integer, ForeignKey("kendaraan.id"), nullable=True, index=True)
     tanggal = Column(Date, nullable=False)
     jam_masuk = Column(Time, nullable=False)
     petugas_loading = Column(String(100), nullable=False)
@@ -81,11 +104,14 @@ class SkidKeluarLaut(Base):
     __tablename__ = "skid_keluar_laut"
     id = Column(Integer, primary_key=True, index=True)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     plat_mobil = Column(String(50), nullable=True)
+    kendaraan_id = Column(Integer, ForeignKey("kendaraan.id"), nullable=True, index=True)
     tanggal = Column(Date, nullable=False)
     jam_keluar = Column(Time, nullable=False)
     catatan = Column(Text, nullable=True)
     media = Column(String(255), nullable=True)  # foto/video
+    foto_duplikat = Column(String(255), nullable=True)  # URL foto lama yang mirip (photo_hash.py)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 # ============ LUMBUNG (SEMARANG) ============
@@ -93,7 +119,9 @@ class SkidMasukLumbung(Base):
     __tablename__ = "skid_masuk_lumbung"
     id = Column(Integer, primary_key=True, index=True)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     plat_mobil = Column(String(50), nullable=True)
+    kendaraan_id = Column(Integer, ForeignKey("kendaraan.id"), nullable=True, index=True)
     tanggal = Column(Date, nullable=False)
     jam_masuk = Column(Time, nullable=False)
     petugas_loading = Column(String(100), nullable=True)
@@ -103,11 +131,14 @@ class SkidKeluarLumbung(Base):
     __tablename__ = "skid_keluar_lumbung"
     id = Column(Integer, primary_key=True, index=True)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     plat_mobil = Column(String(50), nullable=True)
+    kendaraan_id = Column(Integer, ForeignKey("kendaraan.id"), nullable=True, index=True)
     tanggal = Column(Date, nullable=False)
     jam_keluar = Column(Time, nullable=False)
     catatan = Column(Text, nullable=True)
     media = Column(String(255), nullable=True)  # foto/video
+    foto_duplikat = Column(String(255), nullable=True)  # URL foto lama yang mirip (photo_hash.py)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 # ============ LOADING ============
@@ -117,6 +148,7 @@ class SebelumLoading(Base):
     penanggung_jawab = Column(String(100), nullable=False)
     tanggal = Column(Date, nullable=False)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     jam_mulai = Column(Time, nullable=False)
     netto_spa = Column(Integer, nullable=False)
     rotogen_kanan = Column(Integer, nullable=True)
@@ -142,15 +174,20 @@ class ProduksiMulai(Base):
     kepala_produksi = Column(String(100), nullable=False)
     tanggal = Column(Date, nullable=False)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     jam_mulai = Column(Time, nullable=False)
     shift = Column(String(50), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_produksi_mulai_kepala_tanggal", "kepala_produksi", "tanggal"),
+    )
+
 class ProduksiSelesai(Base):
     __tablename__ = "produksi_selesai"
     id = Column(Integer, primary_key=True, index=True)
     kepala_produksi = Column(String(100), nullable=False)
-    tanggal = Column(Date, nullable=False)
+    tanggal = Column(Date, nullable=False, index=True)
     jam_selesai = Column(Time, nullable=False)
     tabung_kosong = Column(Integer, nullable=False)
     tabung_12 = Column(Integer, nullable=False)
@@ -158,6 +195,10 @@ class ProduksiSelesai(Base):
     keterangan = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_produksi_selesai_kepala_tanggal", "kepala_produksi", "tanggal"),
+    )
+
 # ============ DISTRIBUSI ============
 class LaporanKirim(Base):
     __tablename__ = "laporan_kirim"
@@ -165,7 +206,9 @@ class LaporanKirim(Base):
     lokasi = Column(String(50), nullable=False)  # Merak / Semarang
     tanggal = Column(Date, nullable=False)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     plat_mobil = Column(String(50), nullable=False)
+    kendaraan_id = Column(Integer, ForeignKey("kendaraan.id"), nullable=True, index=True)
     jam_berangkat = Column(Time, nullable=False)
     kapasitas = Column(Integer, nullable=False)
     jenis_tabung = Column(String(50), nullable=False)
@@ -176,6 +219,7 @@ class LaporanKirim(Base):
     kondisi_tabung = Column(String(100), nullable=False)
     keterangan = Column(Text, nullable=True)
     verifikasi_barang = Column(String(255), nullable=True)  # path foto/video
+    foto_duplikat = Column(String(255), nullable=True)  # URL foto lama yang mirip (photo_hash.py)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 class LaporanBongkar(Base):
@@ -184,6 +228,7 @@ class LaporanBongkar(Base):
     lokasi = Column(String(50), nullable=False)  # Merak / Semarang
     tanggal = Column(Date, nullable=False)
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     jam_bongkar = Column(Time, nullable=False)
     jenis_tabung = Column(String(50), nullable=False)
     jumlah_terbawa = Column(Integer, nullable=False)
@@ -195,6 +240,7 @@ class LaporanBongkar(Base):
     alamat_pangkalan = Column(Text, nullable=True)
     catatan = Column(Text, nullable=True)
     media = Column(String(255), nullable=True)  # path foto/video
+    foto_duplikat = Column(String(255), nullable=True)  # URL foto lama yang mirip (photo_hash.py)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 # ============ PEMBAYARAN AGEN ============
@@ -205,12 +251,18 @@ class PembayaranAgen(Base):
     harga_pertabung = Column(Float, nullable=False)
     jenis_tabung = Column(String(20), nullable=False)        # contoh: "12KG" / "50KG"
     nama_driver = Column(String(100), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     tanggal_pengiriman = Column(Date, nullable=False)
     jumlah_turun = Column(Integer, nullable=False)
     bukti = Column(String(200), nullable=True)               # simpan path / URL bukti
+    foto_duplikat = Column(String(255), nullable=True)  # URL foto lama yang mirip (photo_hash.py)
     status = Column(String(20), default="Belum Paid")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        # Filter operasi massal: agen + rentang tanggal pengiriman
+        Index("ix_pembayaran_agen_agen_tanggal", "nama_agen", "tanggal_pengiriman"),
+    )
 
 
 class Karyawan(Base):
@@ -222,3 +274,112 @@ class Karyawan(Base):
     jabatan = Column(String(100), nullable=False)
     kontak = Column(String(50), nullable=True)
     keterangan = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Pencarian prefix tanpa beda huruf besar/kecil (crud.search_karyawan) dan urutan default
+        Index("ix_karyawan_nik_lower", func.lower(nik)),
+        Index("ix_karyawan_nama_lower", func.lower(nama)),
+        Index("ix_karyawan_jabatan_lower", func.lower(jabatan)),
+        Index("ix_karyawan_nama", "nama"),
+    )
+
+
+# ============ ANALYTICS: KUNJUNGAN SKID (MATERIALIZED) ============
+class KunjunganSkid(Base):
+    """Pasangan masuk/keluar skid per driver per hari (diisi analytics_turnaround)"""
+    __tablename__ = "kunjungan_skid"
+    id = Column(Integer, primary_key=True, index=True)
+    site = Column(String(20), nullable=False)           # depot / laut / lumbung
+    nama_driver = Column(String(100), nullable=False)
+    tanggal = Column(Date, nullable=False)
+    rit = Column(Integer, nullable=True)
+    masuk_id = Column(Integer, nullable=False)
+    keluar_id = Column(Integer, nullable=True)          # kosong = belum keluar
+    jam_masuk = Column(Time, nullable=False)
+    jam_keluar = Column(Time, nullable=True)
+    dwell_menit = Column(Float, nullable=True)          # lama di lokasi
+    turnaround_menit = Column(Float, nullable=True)     # keluar -> masuk berikutnya
+
+    __table_args__ = (
+        Index("ix_kunjungan_skid_site_tanggal", "site", "tanggal"),
+        Index("ix_kunjungan_skid_driver_tanggal", "site", "nama_driver", "tanggal"),
+        Index("ux_kunjungan_skid_site_masuk", "site", "masuk_id", unique=True),
+    )
+
+
+class AnalyticsWatermark(Base):
+    """id terakhir yang sudah diproses per tabel sumber, untuk refresh bertahap"""
+    __tablename__ = "analytics_watermark"
+    name = Column(String(100), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+
+
+# ============ SCHEMA VERSION ============
+class SchemaVersion(Base):
+    """Fingerprint skema terakhir yang sudah diterapkan (lihat migrations.py)"""
+    __tablename__ = "schema_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(String(64), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# ============ WRITE-BEHIND JOURNAL ============
+class JournalCommit(Base):
+    """Entri journal yang sudah masuk database (lihat journal.py); dipakai replay agar tidak dobel"""
+    __tablename__ = "journal_commit"
+    jid = Column(String(32), primary_key=True)
+    tabel = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=True)        # kosong = ditolak database
+    error = Column(Text, nullable=True)
+    committed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+# ============ CDC OUTBOX ============
+class ChangeLog(Base):
+    """Log perubahan append-only, ditulis di transaksi yang sama dengan perubahannya (lihat cdc.py)"""
+    __tablename__ = "change_log"
+    seq = Column(Integer, primary_key=True)
+    tabel = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=True)        # kosong untuk op "truncate"
+    op = Column(String(10), nullable=False)        # insert / update / delete / truncate
+    data = Column(Text, nullable=True)             # JSON: isi baris setelah perubahan (sebelum, untuk delete)
+    kolom = Column(Text, nullable=True)            # kolom yang berubah (update), dipisah koma
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_change_log_tabel_row", "tabel", "row_id", "seq"),
+        # seq tidak boleh dipakai ulang setelah compaction menghapus ekor log
+        {"sqlite_autoincrement": True},
+    )
+
+
+# ============ IDEMPOTENCY KEY ============
+class IdempotencyKey(Base):
+    """Kiriman form dengan header Idempotency-Key (lihat idempotency.py); kiriman ulang dijawab dari sini"""
+    __tablename__ = "idempotency_keys"
+    key = Column(String(64), primary_key=True)
+    method = Column(String(10), nullable=False)
+    path = Column(String(255), nullable=False)
+    status = Column(String(10), nullable=False, default="proses")   # proses / tersimpan / selesai
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    location = Column(String(500), nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.now, nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), default=datetime.now, nullable=False)
+
+
+# ============ HASH FOTO UPLOAD ============
+class PhotoHash(Base):
+    """dHash 64 bit setiap foto yang di-upload (lihat photo_hash.py); h0-h3 = 4 potongan 16 bit untuk multi-index"""
+    __tablename__ = "photo_hashes"
+    id = Column(Integer, primary_key=True)
+    url = Column(String(255), nullable=False, unique=True)
+    phash = Column(String(16), nullable=False)                 # hex
+    h0 = Column(Integer, nullable=False, index=True)
+    h1 = Column(Integer, nullable=False, index=True)
+    h2 = Column(Integer, nullable=False, index=True)
+    h3 = Column(Integer, nullable=False, index=True)
+    mirip_dengan = Column(String(255), nullable=True)          # URL foto lama yang paling mirip
+    jarak = Column(Integer, nullable=True)                     # jarak hamming ke foto itu
+    created_at = Column(DateTime(timezone=True), default=datetime.now, nullable=False, index=True)
@@ -0,0 +1,368 @@
+"""
+Deteksi foto bukti yang dipakai ulang (foto_spa, media, verifikasi_barang, bukti).
+
+Setiap gambar yang disimpan form_utils.save_upload di-hash di process pool
+(decode JPEG/PNG berat untuk CPU, jangan di event loop) dengan dHash 64 bit:
+gambar diperkecil jadi 9x8 abu-abu, lalu setiap bit = apakah piksel lebih
+terang dari tetangga kirinya. Foto yang sama, di-resize, dikompres ulang atau
+sedikit di-crop menghasilkan hash dengan jarak hamming kecil.
+
+Hash disimpan di photo_hashes sebagai index multi-index hashing: 64 bit
+dipotong jadi 4 potongan 16 bit (h0-h3), masing-masing ber-index. Kalau jarak
+dua hash <= MAX_DISTANCE, minimal satu potongan berjarak <= MAX_DISTANCE // 4
+(pigeonhole), jadi kandidat cukup dicari dengan h0 IN (potongan + semua
+variasi 1 bit) OR h1 IN (...) ...: beberapa lookup index, bukan membandingkan
+dengan ratusan ribu foto. Index-nya tabel biasa, jadi tetap ada setelah
+restart dan dipakai bersama semua worker tanpa perlu dibangun ulang.
+
+Foto yang mirip foto lama ditandai di barisnya (kolom foto_duplikat = URL foto
+lama):
+    - hash selesai sebelum laporan di-flush: hook before_flush SessionLocal
+    - hash selesai setelah laporan tersimpan: UPDATE berdasarkan URL
+    - terlewat (proses mati, commit bersamaan): reconcile() saat startup
+
+Dengan worker antrian (JOB_QUEUE=1, lihat jobs.py) hash dikerjakan task
+"hash_foto" di proses worker, bukan di process pool proses web.
+
+Butuh Pillow; tanpa Pillow atau dengan PHOTO_HASH_DISABLED=1 upload tetap
+jalan tanpa hash. Foto lama yang sudah ada di disk:
+
+    python photo_hash.py backfill
+"""
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import chain, combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+import cache
+import jobs
+import models
+import sharding
+from database import SessionLocal
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow opsional
+    Image = None
+
+HASH_SIZE = 8                       # 8x8 bit = 64 bit
+CHUNKS = 4                          # potongan 16 bit untuk multi-index
+CHUNK_BITS = HASH_SIZE * HASH_SIZE // CHUNKS
+MAX_DISTANCE = int(os.getenv("PHOTO_DUPLICATE_DISTANCE", 6))
+WORKERS = int(os.getenv("PHOTO_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif"}
+RECONCILE_DAYS = 7
+BACKFILL_BATCH = 500
+
+PhotoHash = models.PhotoHash
+
+# Model -> kolom foto yang dicek
+PHOTO_COLUMNS = {
+    models.SkidKeluarDepot: "foto_spa",
+    models.SkidKeluarLaut: "media",
+    models.SkidKeluarLumbung: "media",
+    models.LaporanKirim: "verifikasi_barang",
+    models.LaporanBongkar: "media",
+    models.PembayaranAgen: "bukti",
+}
+
+
+def enabled() -> bool:
+    return Image is not None and os.getenv("PHOTO_HASH_DISABLED") != "1"
+
+
+def is_image(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+# ================== HASH (DI PROCESS POOL) ==================
+def dhash(pixels: np.ndarray) -> int:
+    """dHash dari array abu-abu HASH_SIZE x (HASH_SIZE + 1)"""
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def compute_hash(path: str) -> int:
+    """Buka gambar dan hitung dHash-nya; dijalankan di proses worker"""
+    with Image.open(path) as img:
+        # JPEG: decode langsung di skala kecil (jauh lebih cepat dari ukuran penuh)
+        img.draft("L", (HASH_SIZE * 16, HASH_SIZE * 16))
+        img = ImageOps.exif_transpose(img).convert("L")
+        img = img.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+        return dhash(np.asarray(img, dtype=np.int16))
+
+
+def _hash_or_none(path: str) -> Optional[int]:
+    try:
+        return compute_hash(path)
+    except Exception as e:
+        print(f"Error hash foto {path}: {e}")
+        return None
+
+
+# ================== MULTI-INDEX ==================
+def chunks(value: int) -> List[int]:
+    """[h0, h1, h2, h3], h0 = 16 bit paling atas"""
+    mask = (1 << CHUNK_BITS) - 1
+    return [(value >> (CHUNK_BITS * (CHUNKS - 1 - i))) & mask for i in range(CHUNKS)]
+
+
+def _neighbours(chunk: int, radius: int) -> List[int]:
+    """Semua nilai 16 bit dengan jarak hamming <= radius dari chunk"""
+    found = [chunk]
+    for r in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), r):
+            flipped = chunk
+            for bit in bits:
+                flipped ^= 1 << bit
+            found.append(flipped)
+    return found
+
+
+def distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def find_similar(db: Session, value: int, max_distance: int = MAX_DISTANCE,
+                 exclude_url: str = None) -> List[Tuple[str, int]]:
+    """[(url, jarak)] foto dengan jarak <= max_distance, terdekat lalu terlama dulu"""
+    radius = max_distance // CHUNKS
+    columns = (PhotoHash.h0, PhotoHash.h1, PhotoHash.h2, PhotoHash.h3)
+    stmt = select(PhotoHash.id, PhotoHash.url, PhotoHash.phash).where(or_(*[
+        column.in_(_neighbours(chunk, radius)) for column, chunk in zip(columns, chunks(value))
+    ]))
+    matches = []
+    for id_, url, phash in db.execute(stmt):
+        d = distance(value, int(phash, 16))
+        if d <= max_distance and url != exclude_url:
+            matches.append((d, id_, url))
+    matches.sort()
+    return [(url, d) for d, _, url in matches]
+
+
+# ================== PENANDA DI BARIS LAPORAN ==================
+def _bump(model_classes):
+    tables = [m.__tablename__ for m in model_classes]
+    cache.bump_table_version(*tables, *[f"{t}:update" for t in tables])
+
+
+def flag_records(db: Session, pairs: Dict[str, str]) -> int:
+    """
+    foto_duplikat = URL lama untuk baris yang fotonya ada di pairs (url baru -> url lama)
+    dan belum ditandai; di setiap database (shard) karena laporan bisa di site mana saja.
+    """
+    if not pairs:
+        return 0
+    params = [{"u": url, "m": mirip} for url, mirip in pairs.items()]
+    flagged = 0
+    changed = set()
+    with sharding.sessions(db) as targets:
+        for _, session in targets:
+            for model_class, column in PHOTO_COLUMNS.items():
+                table = model_class.__table__
+                stmt = (update(table)
+                        .where(table.c[column] == bindparam("u"), table.c.foto_duplikat.is_(None))
+                        .values(foto_duplikat=bindparam("m")))
+                count = session.connection().execute(stmt, params).rowcount
+                if count and count > 0:
+                    flagged += count
+                    changed.add(model_class)
+            session.commit()
+    if changed:
+        _bump(changed)
+    return flagged
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _flag_on_flush(session: Session, flush_context, instances):
+    # Laporan baru / foto diganti: pakai hasil hash kalau sudah ada
+    pending: Dict[str, list] = {}
+    for obj in chain(session.new, session.dirty):
+        column = PHOTO_COLUMNS.get(type(obj))
+        if column is None:
+            continue
+        state = inspect(obj)
+        if not state.pending and not state.attrs[column].history.has_changes():
+            continue
+        url = getattr(obj, column)
+        if url:
+            pending.setdefault(url, []).append(obj)
+        elif obj.foto_duplikat is not None:
+            obj.foto_duplikat = None
+    if not pending:
+        return
+    found = dict(session.execute(
+        select(PhotoHash.url, PhotoHash.mirip_dengan).where(PhotoHash.url.in_(list(pending)))
+    ).all())
+    for url, objs in pending.items():
+        for obj in objs:
+            obj.foto_duplikat = found.get(url)
+
+
+# ================== INGEST ==================
+def ingest(db: Session, url: str, value: int) -> Optional[dict]:
+    """Simpan hash foto, cari foto lama yang mirip, tandai barisnya. None kalau url sudah pernah di-hash."""
+    if db.execute(select(PhotoHash.id).where(PhotoHash.url == url)).first():
+        return None
+    matches = find_similar(db, value, exclude_url=url)
+    mirip, jarak = matches[0] if matches else (None, None)
+    h0, h1, h2, h3 = chunks(value)
+    db.add(PhotoHash(url=url, phash=f"{value:016x}", h0=h0, h1=h1, h2=h2, h3=h3,
+                     mirip_dengan=mirip, jarak=jarak))
+    db.commit()
+    if mirip:
+        flag_records(db, {url: mirip})
+    return {"url": url, "phash": f"{value:016x}", "mirip_dengan": mirip, "jarak": jarak}
+
+
+def _with_session(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Satu thread untuk menulis hasil ke database: ingest berurutan, tidak ada
+# dua foto mirip yang sama-sama lolos karena masuk bersamaan
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="photo-hash")
+stats = {"dikirim": 0, "di_hash": 0, "mirip": 0, "gagal": 0}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: proses web punya banyak thread, fork bisa mewarisi lock yang sedang dipegang
+                _pool = ProcessPoolExecutor(max_workers=WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _store(url: str, value: int):
+    try:
+        result = _with_session(ingest, url, value)
+        stats["di_hash"] += 1
+        if result and result["mirip_dengan"]:
+            stats["mirip"] += 1
+            print(f"Foto {url} mirip {result['mirip_dengan']} (jarak {result['jarak']})")
+    except Exception as e:
+        stats["gagal"] += 1
+        print(f"Error menyimpan hash foto {url}: {e}")
+
+
+def _on_hashed(url: str, future):
+    value = None if future.cancelled() or future.exception() else future.result()
+    if value is None:
+        stats["gagal"] += 1
+        return
+    _writer.submit(_store, url, value)
+
+
+def hash_now(url: str, path: str) -> Optional[dict]:
+    """Hash dan simpan di proses ini (dipakai task "hash_foto" di worker jobs.py)"""
+    return _with_session(ingest, url, compute_hash(path))
+
+
+def submit(url: str, path: str):
+    """
+    Hash foto yang baru disimpan di background (tidak menunggu): lewat antrian
+    jobs.py kalau worker dijalankan (JOB_QUEUE=1), selain itu process pool
+    proses ini. None kalau bukan gambar / nonaktif.
+    """
+    if not enabled() or not is_image(path):
+        return None
+    if jobs.queue_enabled():
+        stats["dikirim"] += 1
+        return jobs.enqueue("hash_foto", {"url": url, "path": os.path.abspath(path)})
+    future = _get_pool().submit(_hash_or_none, path)
+    future.add_done_callback(lambda f: _on_hashed(url, f))
+    stats["dikirim"] += 1
+    return future
+
+
+def shutdown():
+    """Tunggu hash yang masih berjalan lalu tutup pool (dipanggil saat proses berhenti)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+    _writer.shutdown(wait=True)
+
+
+def pool_stats() -> dict:
+    return {"aktif": enabled(), "worker": WORKERS, "jarak_maks": MAX_DISTANCE, **stats}
+
+
+# ================== STARTUP & BACKFILL ==================
+def reconcile(db: Session, days: int = RECONCILE_DAYS) -> int:
+    """Tandai ulang baris yang terlewat untuk foto mirip dalam `days` hari terakhir"""
+    cutoff = datetime.now() - timedelta(days=days)
+    pairs = dict(db.execute(
+        select(PhotoHash.url, PhotoHash.mirip_dengan)
+        .where(PhotoHash.mirip_dengan.isnot(None), PhotoHash.created_at >= cutoff)
+    ).all())
+    return flag_records(db, pairs)
+
+
+def reconcile_recent() -> int:
+    """reconcile() dengan session sendiri (dipanggil di lifespan)"""
+    return _with_session(reconcile)
+
+
+def _upload_files(roots: Iterable[str]):
+    """(url, path) semua gambar di folder upload, urut nama (= urut waktu upload)"""
+    for root in roots:
+        for folder, _, files in os.walk(root):
+            for name in sorted(files):
+                path = os.path.join(folder, name)
+                if is_image(path):
+                    rel = os.path.relpath(path).replace(os.sep, "/")
+                    yield ("/" + rel if rel.startswith("uploads/") else rel), path
+
+
+def backfill(batch: int = BACKFILL_BATCH) -> dict:
+    """Hash semua gambar di folder upload yang belum ada di photo_hashes"""
+    from form_utils import UPLOAD_ROOTS
+    db = SessionLocal()
+    result = {"di_hash": 0, "mirip": 0, "gagal": 0}
+    try:
+        known = set(db.execute(select(PhotoHash.url)).scalars())
+        todo = [(url, path) for url, path in _upload_files(UPLOAD_ROOTS) if url not in known]
+        pool = _get_pool()
+        for start in range(0, len(todo), batch):
+            part = todo[start:start + batch]
+            values = pool.map(_hash_or_none, [path for _, path in part], chunksize=16)
+            for (url, _), value in zip(part, values):
+                if value is None:
+                    result["gagal"] += 1
+                    continue
+                stored = ingest(db, url, value)
+                result["di_hash"] += 1
+                if stored and stored["mirip_dengan"]:
+                    result["mirip"] += 1
+            print(f"  {min(start + batch, len(todo))}/{len(todo)} foto")
+    finally:
+        db.close()
+    return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        print(__doc__)
+        sys.exit(1)
+    if not enabled():
+        sys.exit("Pillow belum terpasang (pip install Pillow)")
+    print(backfill())
+    shutdown()
@@ -0,0 +1,472 @@
+"""
+Rekap bulanan per driver dan per agen, satu PDF per orang.
+
+Angka dihitung di SQL (GROUP BY nama + tanggal, di setiap shard lewat
+sharding.fan_out lalu dijumlahkan):
+    - driver: rit masuk depot/laut/lumbung, SPA keluar depot, laporan kirim
+      (rit, tabung dibawa/diturunkan) dan bongkar (turun, kosong)
+    - agen: pembayaran per jenis tabung dan status (jumlah tabung, nilai)
+
+PDF ditulis sendiri (Helvetica bawaan, tanpa paket tambahan) di process
+pool. Setiap dokumen diberi hash dari isinya; file yang hash-nya sama
+dengan hasil sebelumnya tidak dirender ulang, jadi membuat ulang rekap
+bulan lalu hanya merender driver/agen yang datanya berubah. Semua dokumen
+satu bulan bisa diunduh sekaligus sebagai zip.
+
+    python recap.py 2026-09            # buat rekap bulan itu
+    python recap.py 2026-09 --paksa    # render ulang semua
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import models
+import sharding
+
+RECAP_DIR = os.getenv("RECAP_DIR", "./rekap")
+WORKERS = int(os.getenv("RECAP_WORKERS", min(4, os.cpu_count() or 1)))
+POOL_MIN_DOCS = 8          # di bawah ini dirender langsung; start process pool lebih mahal
+LAYOUT_VERSION = "1"       # naikkan kalau tampilan PDF berubah supaya cache ikut dibuang
+
+JENIS = ("driver", "agen")
+_PERIODE = re.compile(r"^(\d{4})-(\d{2})$")
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def period_bounds(periode: str) -> Tuple[date, date]:
+    """"2026-09" -> (1 September, 1 Oktober); ValueError kalau format salah"""
+    match = _PERIODE.match(periode or "")
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Periode harus YYYY-MM, bukan {periode!r}")
+    year, month = int(match.group(1)), int(match.group(2))
+    return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
+
+
+# ================== AGREGAT (SQL) ==================
+def _driver_sources():
+    M = models
+    return (
+        (M.SkidMasukDepot, {"rit_depot": func.count()}),
+        (M.SkidMasukLaut, {"rit_laut": func.count()}),
+        (M.SkidMasukLumbung, {"rit_lumbung": func.count()}),
+        (M.SkidKeluarDepot, {"spa": func.sum(M.SkidKeluarDepot.jumlah_spa)}),
+        (M.LaporanKirim, {
+            "kirim": func.count(),
+            "dibawa": func.sum(M.LaporanKirim.jumlah_dibawa),
+            "diturunkan": func.sum(func.coalesce(M.LaporanKirim.jumlah_turun, 0)),
+        }),
+        (M.LaporanBongkar, {
+            "bongkar": func.count(),
+            "turun": func.sum(M.LaporanBongkar.jumlah_turun),
+            "kosong": func.sum(M.LaporanBongkar.jumlah_kosong),
+        }),
+    )
+
+
+DRIVER_KOLOM = ("rit_depot", "rit_laut", "rit_lumbung", "spa", "kirim", "dibawa", "diturunkan",
+                "bongkar", "turun", "kosong")
+
+
+def _driver_rows_on(db: Session, dari: date, sampai: date) -> list:
+    rows = []
+    for model, measures in _driver_sources():
+        stmt = (
+            select(model.nama_driver, model.tanggal, *[expr.label(name) for name, expr in measures.items()])
+            .where(model.tanggal >= dari, model.tanggal < sampai)
+            .group_by(model.nama_driver, model.tanggal)
+        )
+        for row in db.execute(stmt).mappings():
+            rows.append(dict(row))
+    return rows
+
+
+def driver_recaps(db: Session, periode: str) -> List[dict]:
+    """Satu dict per driver yang punya aktivitas di bulan itu: ringkasan + baris harian"""
+    dari, sampai = period_bounds(periode)
+    per_driver: Dict[str, Dict[date, Dict[str, int]]] = {}
+    for part in sharding.fan_out(db, lambda s: _driver_rows_on(s, dari, sampai)):
+        for row in part:
+            nama = (row.pop("nama_driver") or "").strip() or "(tanpa nama)"
+            day = per_driver.setdefault(nama, {}).setdefault(row.pop("tanggal"), dict.fromkeys(DRIVER_KOLOM, 0))
+            for key, value in row.items():
+                day[key] += int(value or 0)
+
+    docs = []
+    for nama in sorted(per_driver, key=str.lower):
+        days = per_driver[nama]
+        harian = [[tanggal.isoformat(), *[days[tanggal][k] for k in DRIVER_KOLOM]] for tanggal in sorted(days)]
+        ringkasan = {k: sum(days[t][k] for t in days) for k in DRIVER_KOLOM}
+        ringkasan["hari_aktif"] = len(days)
+        docs.append({"jenis": "driver", "nama": nama, "periode": periode,
+                     "ringkasan": ringkasan, "harian": harian})
+    return docs
+
+
+def agen_recaps(db: Session, periode: str) -> List[dict]:
+    """Satu dict per agen: total per jenis tabung & status, dan baris harian"""
+    dari, sampai = period_bounds(periode)
+    P = models.PembayaranAgen
+    status = func.coalesce(P.status, "Belum Paid")
+    nilai = func.sum(P.jumlah_turun * P.harga_pertabung)
+    where = (P.tanggal_pengiriman >= dari, P.tanggal_pengiriman < sampai)
+
+    per_agen: Dict[str, dict] = {}
+    for row in db.execute(
+        select(P.nama_agen, P.jenis_tabung, status.label("status"), func.count().label("kiriman"),
+               func.sum(P.jumlah_turun).label("tabung"), nilai.label("nilai"))
+        .where(*where).group_by(P.nama_agen, P.jenis_tabung, status)
+        .order_by(P.nama_agen, P.jenis_tabung, status)
+    ):
+        agen = per_agen.setdefault(row.nama_agen, {"rincian": [], "harian": []})
+        agen["rincian"].append([row.jenis_tabung, row.status, row.kiriman, int(row.tabung or 0),
+                                round(float(row.nilai or 0), 2)])
+    for row in db.execute(
+        select(P.nama_agen, P.tanggal_pengiriman, status.label("status"), func.count().label("kiriman"),
+               func.sum(P.jumlah_turun).label("tabung"), nilai.label("nilai"))
+        .where(*where).group_by(P.nama_agen, P.tanggal_pengiriman, status)
+        .order_by(P.nama_agen, P.tanggal_pengiriman, status)
+    ):
+        per_agen[row.nama_agen]["harian"].append([row.tanggal_pengiriman.isoformat(), row.status, row.kiriman,
+                                                  int(row.tabung or 0), round(float(row.nilai or 0), 2)])
+
+    docs = []
+    for nama in sorted(per_agen, key=str.lower):
+        agen = per_agen[nama]
+        paid = sum(r[4] for r in agen["rincian"] if str(r[1]).lower() == "paid")
+        nilai_total = sum(r[4] for r in agen["rincian"])
+        ringkasan = {
+            "kiriman": sum(r[2] for r in agen["rincian"]),
+            "tabung": sum(r[3] for r in agen["rincian"]),
+            "nilai": round(nilai_total, 2),
+            "sudah_dibayar": round(paid, 2),
+            "belum_dibayar": round(nilai_total - paid, 2),
+        }
+        docs.append({"jenis": "agen", "nama": nama, "periode": periode, "ringkasan": ringkasan, **agen})
+    return docs
+
+
+def content_hash(doc: dict) -> str:
+    payload = json.dumps(doc, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{LAYOUT_VERSION}:{payload}".encode()).hexdigest()[:16]
+
+
+# ================== PDF ==================
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842     # A4 dalam point
+MARGIN = 40
+
+# Lebar glyph Helvetica (per 1000) untuk karakter yang sering muncul; sisanya dianggap 556
+_WIDTHS = {" ": 278, ".": 278, ",": 278, "-": 333, ":": 278, "/": 278, "(": 333, ")": 333,
+           "i": 222, "l": 222, "j": 222, "t": 278, "f": 278, "r": 333, "I": 278,
+           "m": 833, "w": 722, "M": 833, "W": 944}
+
+
+def _text_width(text: str, size: float, bold: bool = False) -> float:
+    scale = 1.05 if bold else 1.0
+    return sum(_WIDTHS.get(ch, 556) for ch in text) * size / 1000 * scale
+
+
+def _escape(text: str) -> bytes:
+    raw = str(text).encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class _Canvas:
+    """Halaman PDF sebagai daftar operator content stream"""
+
+    def __init__(self):
+        self.pages: List[List[bytes]] = []
+        self.y = 0.0
+
+    def new_page(self):
+        self.pages.append([])
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def text(self, x: float, y: float, text, size: float = 9, bold: bool = False, align: str = "left"):
+        text = str(text)
+        if align == "right":
+            x -= _text_width(text, size, bold)
+        font = b"/F2" if bold else b"/F1"
+        self.pages[-1].append(b"BT %s %.1f Tf %.2f %.2f Td (%s) Tj ET" % (font, size, x, y, _escape(text)))
+
+    def rect(self, x: float, y: float, w: float, h: float, gray: float):
+        self.pages[-1].append(b"%.2f g %.2f %.2f %.2f %.2f re f 0 g" % (gray, x, y, w, h))
+
+    def line(self, x1: float, y1: float, x2: float, y2: float):
+        self.pages[-1].append(b"0.5 w %.2f %.2f m %.2f %.2f l S" % (x1, y1, x2, y2))
+
+    def to_pdf(self, footer: str) -> bytes:
+        total = len(self.pages)
+        objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+                   b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+                   b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"]
+        kids = []
+        for number, ops in enumerate(self.pages, 1):
+            ops = ops + [b"BT /F1 7.0 Tf %.2f %.2f Td (%s) Tj ET" % (
+                MARGIN, MARGIN / 2, _escape(f"{footer} - halaman {number}/{total}"))]
+            stream = zlib.compress(b"\n".join(ops))
+            objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+            objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                           b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                           % (PAGE_WIDTH, PAGE_HEIGHT, len(objects)))
+            kids.append(b"%d 0 R" % len(objects))
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), total)
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for index, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (index, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
+
+
+def _angka(value) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return f"{int(value):,}".replace(",", ".")
+
+
+def _rupiah(value) -> str:
+    return "Rp " + _angka(round(value))
+
+
+def _table(canvas: _Canvas, headers, widths, rows, numeric_from: int = 1, row_height: float = 14):
+    """Tabel dengan header diulang di setiap halaman; kolom mulai numeric_from rata kanan"""
+    def header():
+        canvas.rect(MARGIN, canvas.y - row_height + 4, sum(widths), row_height, 0.85)
+        x = MARGIN
+        for i, (title, width) in enumerate(zip(headers, widths)):
+            right = i >= numeric_from
+            canvas.text(x + width - 4 if right else x + 4, canvas.y - row_height + 8, title, 8, True,
+                        "right" if right else "left")
+            x += width
+        canvas.y -= row_height
+
+    header()
+    for row in rows:
+        if canvas.y - row_height < MARGIN + 10:
+            canvas.new_page()
+            header()
+        x = MARGIN
+        for i, (value, width) in enumerate(zip(row, widths)):
+            right = i >= numeric_from
+            canvas.text(x + width - 4 if right else x + 4, canvas.y - row_height + 8, value, 8,
+                        align="right" if right else "left")
+            x += width
+        canvas.line(MARGIN, canvas.y - row_height + 4, MARGIN + sum(widths), canvas.y - row_height + 4)
+        canvas.y -= row_height
+    canvas.y -= 12
+
+
+def _heading(canvas: _Canvas, doc: dict, title: str):
+    canvas.new_page()
+    canvas.text(MARGIN, canvas.y, title, 16, True)
+    canvas.text(PAGE_WIDTH - MARGIN, canvas.y, f"Periode {doc['periode']}", 10, align="right")
+    canvas.y -= 22
+    canvas.text(MARGIN, canvas.y, doc["nama"], 12, True)
+    canvas.y -= 24
+
+
+def _summary(canvas: _Canvas, items):
+    for label, value in items:
+        canvas.text(MARGIN, canvas.y, label, 9)
+        canvas.text(MARGIN + 220, canvas.y, value, 9, True, "right")
+        canvas.y -= 13
+    canvas.y -= 10
+
+
+def render_pdf(doc: dict) -> bytes:
+    """PDF satu rekap (hasil driver_recaps / agen_recaps)"""
+    canvas = _Canvas()
+    r = doc["ringkasan"]
+    if doc["jenis"] == "driver":
+        _heading(canvas, doc, "Rekap Bulanan Driver")
+        _summary(canvas, (
+            ("Hari aktif", _angka(r["hari_aktif"])),
+            ("Rit depot / laut / lumbung", f"{_angka(r['rit_depot'])} / {_angka(r['rit_laut'])} / {_angka(r['rit_lumbung'])}"),
+            ("SPA keluar depot", _angka(r["spa"])),
+            ("Laporan kirim", _angka(r["kirim"])),
+            ("Tabung dibawa / diturunkan", f"{_angka(r['dibawa'])} / {_angka(r['diturunkan'])}"),
+            ("Laporan bongkar", _angka(r["bongkar"])),
+            ("Tabung turun / kosong", f"{_angka(r['turun'])} / {_angka(r['kosong'])}"),
+        ))
+        _table(canvas, ("Tanggal", "Depot", "Laut", "Lumbung", "SPA", "Kirim", "Dibawa", "Diturunkan",
+                        "Bongkar", "Turun", "Kosong"),
+               (65, 40, 40, 48, 45, 40, 50, 60, 48, 40, 39),
+               [[row[0], *[_angka(v) for v in row[1:]]] for row in doc["harian"]])
+    else:
+        _heading(canvas, doc, "Rekap Bulanan Agen")
+        _summary(canvas, (
+            ("Kiriman", _angka(r["kiriman"])),
+            ("Tabung diturunkan", _angka(r["tabung"])),
+            ("Total tagihan", _rupiah(r["nilai"])),
+            ("Sudah dibayar", _rupiah(r["sudah_dibayar"])),
+            ("Belum dibayar", _rupiah(r["belum_dibayar"])),
+        ))
+        _table(canvas, ("Jenis tabung", "Status", "Kiriman", "Tabung", "Nilai"), (110, 110, 80, 80, 135),
+               [[jenis, status, _angka(n), _angka(t), _rupiah(v)] for jenis, status, n, t, v in doc["rincian"]],
+               numeric_from=2)
+        _table(canvas, ("Tanggal", "Status", "Kiriman", "Tabung", "Nilai"), (110, 110, 80, 80, 135),
+               [[tanggal, status, _angka(n), _angka(t), _rupiah(v)] for tanggal, status, n, t, v in doc["harian"]],
+               numeric_from=2)
+    return canvas.to_pdf(f"{doc['jenis'].capitalize()} {doc['nama']} - {doc['periode']}")
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _render_to(path: str, doc: dict) -> str:
+    """Dijalankan di process pool"""
+    _write_atomic(path, render_pdf(doc))
+    return path
+
+
+# ================== GENERATE & CACHE ==================
+def _slug(nama: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", nama.lower()).strip("-")[:60] or "tanpa-nama"
+
+
+def _period_dir(periode: str) -> str:
+    period_bounds(periode)
+    return os.path.join(RECAP_DIR, periode)
+
+
+def _lock_for(periode: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(periode, threading.Lock())
+
+
+def load_manifest(periode: str) -> Optional[dict]:
+    """Isi manifest.json bulan itu (dokumen dan hash-nya), None kalau belum pernah dibuat"""
+    path = os.path.join(_period_dir(periode), "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def generate(db: Session, periode: str, force: bool = False) -> dict:
+    """
+    Buat rekap semua driver dan agen untuk `periode` (YYYY-MM). Dokumen yang
+    hash isinya sama dengan file yang sudah ada dipakai lagi; sisanya
+    dirender di process pool. File lama yang tidak terpakai dihapus.
+    """
+    started = time.perf_counter()
+    folder = _period_dir(periode)
+    docs = driver_recaps(db, periode) + agen_recaps(db, periode)
+    aggregated = time.perf_counter()
+
+    with _lock_for(periode):
+        entries, pending, used = [], [], set()
+        for doc in docs:
+            digest = content_hash(doc)
+            name = f"{_slug(doc['nama'])}-{digest}.pdf"
+            relative = f"{doc['jenis']}/{name}"
+            path = os.path.join(folder, doc["jenis"], name)
+            if force or not os.path.exists(path):
+                pending.append((path, doc))
+            used.add(relative)
+            entries.append({"jenis": doc["jenis"], "nama": doc["nama"], "file": relative,
+                            "hash": digest, "ringkasan": doc["ringkasan"]})
+
+        for jenis in JENIS:
+            os.makedirs(os.path.join(folder, jenis), exist_ok=True)
+        if len(pending) >= POOL_MIN_DOCS and WORKERS > 1:
+            with ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn")) as pool:
+                list(pool.map(_render_to, *zip(*pending), chunksize=max(1, len(pending) // (WORKERS * 4))))
+        else:
+            for path, doc in pending:
+                _render_to(path, doc)
+
+        for jenis in JENIS:
+            for name in os.listdir(os.path.join(folder, jenis)):
+                if f"{jenis}/{name}" not in used:
+                    os.remove(os.path.join(folder, jenis, name))
+
+        manifest = {
+            "periode": periode,
+            "hash": hashlib.sha256("".join(e["hash"] for e in entries).encode()).hexdigest()[:16],
+            "dibuat_pada": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "dokumen": entries,
+        }
+        _write_atomic(os.path.join(folder, "manifest.json"),
+                      json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    return {
+        "periode": periode,
+        "dokumen": len(entries),
+        "driver": sum(1 for e in entries if e["jenis"] == "driver"),
+        "agen": sum(1 for e in entries if e["jenis"] == "agen"),
+        "dirender": len(pending),
+        "dari_cache": len(entries) - len(pending),
+        "agregat_ms": round((aggregated - started) * 1000, 1),
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def document_path(periode: str, file: str) -> Optional[str]:
+    """Path PDF dari entri manifest; None kalau tidak terdaftar (mencegah path traversal)"""
+    manifest = load_manifest(periode)
+    if manifest is None or file not in {e["file"] for e in manifest["dokumen"]}:
+        return None
+    return os.path.join(_period_dir(periode), file)
+
+
+def build_zip(db: Session, periode: str) -> str:
+    """Zip semua PDF bulan itu (dibuat ulang hanya kalau ada dokumen yang berubah)"""
+    generate(db, periode)
+    manifest = load_manifest(periode)
+    folder = _period_dir(periode)
+    path = os.path.join(folder, f"rekap-{periode}-{manifest['hash']}.zip")
+    with _lock_for(periode):
+        if not os.path.exists(path):
+            for name in os.listdir(folder):
+                if name.endswith(".zip"):
+                    os.remove(os.path.join(folder, name))
+            tmp = f"{path}.{os.getpid()}.tmp"
+            # PDF sudah dikompres (FlateDecode), zip cukup menyimpan
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED) as archive:
+                for entry in manifest["dokumen"]:
+                    archive.write(os.path.join(folder, entry["file"]), entry["file"])
+                archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=1))
+            os.replace(tmp, path)
+    return path
+
+
+def previous_period(today: Optional[date] = None) -> str:
+    today = today or date.today()
+    return f"{today.year - 1}-12" if today.month == 1 else f"{today.year}-{today.month - 1:02d}"
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or not _PERIODE.match(args[0]):
+        print(__doc__)
+        sys.exit(1)
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        print(json.dumps(generate(db, args[0], force="--paksa" in args), indent=2))
+    finally:
+        db.close()
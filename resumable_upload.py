@@ -0,0 +1,227 @@
+"""
+Upload bertahap (resumable) ala protokol tus untuk video loading yang besar.
+
+Alur:
+    1. create_upload()  -> buat upload baru, dapat upload_id
+    2. append_chunk()   -> kirim potongan file sesuai offset (PATCH)
+    3. get_upload()     -> cek progress (HEAD), untuk melanjutkan setelah putus
+    4. finalize_upload() -> pindahkan file jadi ke folder uploads, dapat URL
+
+Potongan langsung ditulis (append) ke file .part di disk, jadi file utuh
+tidak pernah ditampung di memori.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import re
+import secrets
+import time
+from datetime import datetime
+
+BASE_UPLOAD_DIR = "uploads"
+PARTIAL_DIR = os.path.join(BASE_UPLOAD_DIR, "_partial")
+
+# Batas ukuran satu upload (2 GB) dan umur upload yang belum selesai
+MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024
+STALE_AFTER_SECONDS = 24 * 60 * 60
+
+_UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# PATCH yang sedang menulis per upload_id (proses ini); antar worker lewat flock file .part
+_chunk_locks: dict = {}
+
+
+class UploadError(Exception):
+    """Error upload bertahap, membawa status HTTP yang sesuai"""
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+# ================== HELPER PATH ==================
+def _check_id(upload_id: str):
+    # Validasi id supaya tidak bisa dipakai untuk path traversal
+    if not upload_id or not _UPLOAD_ID_RE.match(upload_id):
+        raise UploadError("Upload ID tidak valid", 404)
+
+def _meta_path(upload_id: str) -> str:
+    return os.path.join(PARTIAL_DIR, f"{upload_id}.json")
+
+def _data_path(upload_id: str) -> str:
+    return os.path.join(PARTIAL_DIR, f"{upload_id}.part")
+
+def _read_meta(upload_id: str) -> dict:
+    _check_id(upload_id)
+    try:
+        with open(_meta_path(upload_id), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise UploadError("Upload tidak ditemukan atau sudah kadaluarsa", 404)
+
+def _write_meta(upload_id: str, meta: dict):
+    # Tulis ke file sementara lalu rename, supaya metadata tidak pernah setengah jadi
+    tmp_path = _meta_path(upload_id) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, _meta_path(upload_id))
+
+
+# ================== API UPLOAD ==================
+def create_upload(filename: str, length: int, folder: str = "loading") -> dict:
+    """Buat upload baru dan kembalikan metadata-nya"""
+    if length is None or length <= 0:
+        raise UploadError("Upload-Length harus lebih dari 0")
+    if length > MAX_UPLOAD_SIZE:
+        raise UploadError("File terlalu besar", 413)
+
+    os.makedirs(PARTIAL_DIR, exist_ok=True)
+    expire_stale_uploads()
+
+    upload_id = secrets.token_hex(16)
+    meta = {
+        "id": upload_id,
+        "filename": os.path.basename(filename or ""),
+        "folder": folder,
+        "length": length,
+        "offset": 0,
+        "created_at": time.time(),
+        "updated_at": time.time(),
+        "url": None,
+    }
+    # Buat file kosong supaya append pertama langsung jalan
+    open(_data_path(upload_id), "wb").close()
+    _write_meta(upload_id, meta)
+    return meta
+
+
+def get_upload(upload_id: str) -> dict:
+    """Ambil metadata upload (offset sekarang, panjang total, status)"""
+    return _read_meta(upload_id)
+
+
+async def append_chunk(upload_id: str, offset: int, stream) -> dict:
+    """
+    Tulis potongan data mulai dari `offset`.
+
+    Args:
+        upload_id: ID dari create_upload
+        offset: offset yang dikirim client (header Upload-Offset)
+        stream: async iterable bytes (request.stream()), ditulis langsung ke disk
+
+    Returns:
+        dict: metadata terbaru (offset baru)
+
+    Satu PATCH per upload pada satu waktu: PATCH lain yang datang selagi
+    potongan masih mengalir (retry client) ditolak 409, di proses yang sama
+    (asyncio.Lock) maupun dari worker lain (flock pada file .part).
+    """
+    _read_meta(upload_id)
+    lock = _chunk_locks.setdefault(upload_id, asyncio.Lock())
+    if lock.locked():
+        # PATCH ulang dari client selagi yang pertama masih mengalir
+        raise UploadError("Potongan lain untuk upload ini sedang ditulis", 409)
+    async with lock:
+        try:
+            with open(_data_path(upload_id), "r+b") as f:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise UploadError("Potongan lain untuk upload ini sedang ditulis", 409)
+                # Baca ulang setelah lock: offset bisa sudah maju oleh PATCH sebelumnya
+                meta = _read_meta(upload_id)
+                return await _write_chunk(upload_id, meta, offset, stream, f)
+        except FileNotFoundError:
+            raise UploadError("Upload tidak ditemukan atau sudah kadaluarsa", 404)
+        finally:
+            _chunk_locks.pop(upload_id, None)
+
+
+async def _write_chunk(upload_id: str, meta: dict, offset: int, stream, f) -> dict:
+    if meta.get("url"):
+        raise UploadError("Upload sudah selesai", 409)
+    if offset != meta["offset"]:
+        # Client harus HEAD dulu untuk tahu offset yang benar
+        raise UploadError(f"Offset tidak cocok, server di {meta['offset']}", 409)
+
+    written = meta["offset"]
+    f.seek(written)
+    try:
+        async for chunk in stream:
+            if not chunk:
+                continue
+            if written + len(chunk) > meta["length"]:
+                raise UploadError("Data melebihi Upload-Length", 413)
+            f.write(chunk)
+            written += len(chunk)
+    finally:
+        # Simpan progress walaupun koneksi putus di tengah potongan
+        f.truncate(written)
+        meta["offset"] = written
+        meta["updated_at"] = time.time()
+        _write_meta(upload_id, meta)
+    return meta
+
+
+def finalize_upload(upload_id: str) -> str:
+    """
+    Pindahkan file yang sudah lengkap ke uploads/<folder>/ dan kembalikan URL-nya.
+    Aman dipanggil berulang kali: URL yang sama dikembalikan.
+    """
+    meta = _read_meta(upload_id)
+    if meta.get("url"):
+        return meta["url"]
+    if meta["offset"] != meta["length"]:
+        raise UploadError(
+            f"Upload belum lengkap ({meta['offset']}/{meta['length']} byte)", 409
+        )
+
+    folder = meta["folder"]
+    upload_dir = os.path.join(BASE_UPLOAD_DIR, folder)
+    os.makedirs(upload_dir, exist_ok=True)
+
+    # Nama file sama seperti save_upload, ditambah id supaya tidak bentrok
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    file_extension = os.path.splitext(meta["filename"])[1]
+    safe_filename = f"{timestamp}_{upload_id[:8]}{file_extension}"
+
+    os.replace(_data_path(upload_id), os.path.join(upload_dir, safe_filename))
+
+    meta["url"] = f"/uploads/{folder}/{safe_filename}"
+    meta["updated_at"] = time.time()
+    _write_meta(upload_id, meta)
+    return meta["url"]
+
+
+def delete_upload(upload_id: str):
+    """Batalkan upload dan hapus file sementaranya"""
+    _check_id(upload_id)
+    for path in (_data_path(upload_id), _meta_path(upload_id)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def expire_stale_uploads(max_age: int = STALE_AFTER_SECONDS) -> int:
+    """Hapus upload yang tidak disentuh lebih dari `max_age` detik"""
+    if not os.path.isdir(PARTIAL_DIR):
+        return 0
+
+    now = time.time()
+    removed = 0
+    for name in os.listdir(PARTIAL_DIR):
+        if not name.endswith(".json"):
+            continue
+        upload_id = name[:-5]
+        try:
+            with open(os.path.join(PARTIAL_DIR, name), "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - meta.get("updated_at", 0) > max_age:
+            try:
+                delete_upload(upload_id)
+                removed += 1
+            except (OSError, UploadError):
+                pass
+    return removed
@@ -0,0 +1,85 @@
+"""
+Route per subsistem, di-import saat pertama kali dibutuhkan.
+
+Setiap modul di paket ini punya `router = APIRouter()`. create_app() hanya
+memasang `dashboard` (halaman awal dan feed live); subsistem lain di-import
+dan di-include oleh LazyRouteMiddleware saat request pertama yang path-nya
+cocok dengan prefix di SUBSYSTEMS. Worker baru jadi tidak perlu meng-import
+analytics, upload bertahap, dll. sebelum benar-benar dipakai.
+
+Set PRELOAD_ROUTES=1 untuk me-load semua subsistem di lifespan (misal di
+server dengan worker yang jarang restart). /openapi.json selalu me-load
+semuanya supaya /docs lengkap.
+"""
+import importlib
+import threading
+import time
+
+# subsistem -> prefix path yang ditangani
+SUBSYSTEMS = {
+    "skid": ("/laporan-skid", "/skid-", "/api/analytics/turnaround"),
+    "loading": ("/laporan-loading", "/sebelum-loading", "/sesudah-loading", "/api/uploads"),
+    "produksi": ("/laporan-produksi", "/produksi-", "/api/analytics/produksi"),
+    "distribusi": ("/laporan-supir", "/laporan/kirim-", "/laporan/bongkar-"),
+    "pembayaran": ("/agen", "/api/pembayaran-agen", "/laporan/pembayaran-agen", "/admin/fix-all-bukti-paths"),
+    "karyawan": ("/karyawan", "/laporan/data-karyawan", "/api/karyawan"),
+    "autocomplete": ("/api/autocomplete",),
+    "analytics": ("/api/analytics/grafik",),
+    "cdc": ("/api/cdc",),
+    "jobs": ("/admin/jobs", "/api/jobs"),
+    "rekap": ("/laporan/rekap", "/api/rekap"),
+    "auth": ("/login", "/logout", "/register", "/users", "/data-user", "/laporan/data-user", "/api/users"),
+}
+
+LOAD_ALL_PATHS = ("/openapi.json",)
+
+
+class LazyRouteLoader:
+    def __init__(self, app, report=None):
+        self.app = app
+        self.report = report
+        self.loaded = set()
+        self._lock = threading.Lock()
+
+    def load(self, name: str):
+        if name in self.loaded:
+            return
+        with self._lock:
+            if name in self.loaded:
+                return
+            start = time.perf_counter()
+            module = importlib.import_module(f"{__name__}.{name}")
+            self.app.include_router(module.router)
+            self.app.openapi_schema = None  # skema OpenAPI dibuat ulang dengan route baru
+            self.loaded.add(name)
+            if self.report:
+                self.report.record(f"routes.{name}", time.perf_counter() - start)
+
+    def load_all(self):
+        for name in SUBSYSTEMS:
+            self.load(name)
+
+    def load_for_path(self, path: str):
+        if path in LOAD_ALL_PATHS:
+            self.load_all()
+            return
+        for name, prefixes in SUBSYSTEMS.items():
+            if name not in self.loaded and path.startswith(prefixes):
+                self.load(name)
+
+    @property
+    def complete(self) -> bool:
+        return len(self.loaded) == len(SUBSYSTEMS)
+
+
+class LazyRouteMiddleware:
+    """Middleware ASGI: pastikan subsistem untuk path ini sudah di-load sebelum routing"""
+
+    def __init__(self, app, loader: LazyRouteLoader):
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and not self.loader.complete:
+            self.loader.load_for_path(scope["path"])
+        await self.app(scope, receive, send)
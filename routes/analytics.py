@@ -0,0 +1,75 @@
+"""
+Grafik manajemen dari cache analitik kolumnar (analytics_cache).
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+import analytics_cache
+from deps import require_login, require_admin
+from form_utils import parse_date
+
+router = APIRouter()
+
+
+def _filters(**values) -> dict:
+    return {k: v for k, v in values.items() if v}
+
+
+@router.get("/api/analytics/grafik")
+def api_grafik(
+    sumber: str,
+    metrik: Optional[str] = None,
+    agregasi: str = "sum",
+    kelompok: str = "",
+    persentil: float = 50.0,
+    dari: Optional[str] = None,
+    sampai: Optional[str] = None,
+    lokasi: Optional[str] = None,
+    nama_driver: Optional[str] = None,
+    jenis_tabung: Optional[str] = None,
+    nama_agen: Optional[str] = None,
+    status: Optional[str] = None,
+    kepala_produksi: Optional[str] = None,
+    user = Depends(require_login),
+):
+    """Group-by bebas: ?sumber=kirim&metrik=jumlah_dibawa&agregasi=sum&kelompok=tanggal,lokasi"""
+    filters = _filters(lokasi=lokasi, nama_driver=nama_driver, jenis_tabung=jenis_tabung,
+                       nama_agen=nama_agen, status=status, kepala_produksi=kepala_produksi)
+    try:
+        return analytics_cache.store.query(
+            sumber, metrik, agregasi, [k for k in kelompok.split(",") if k],
+            parse_date(dari), parse_date(sampai), filters, persentil,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/api/analytics/grafik/status")
+def api_grafik_status(user = Depends(require_login)):
+    """Jumlah baris, watermark dan memori tiap tabel kolumnar"""
+    return analytics_cache.store.status()
+
+
+@router.post("/api/analytics/grafik/reset")
+def api_grafik_reset(user = Depends(require_admin)):
+    """Buang semua array; request berikutnya memuat ulang dari database"""
+    analytics_cache.store.clear()
+    return {"status": "ok"}
+
+
+@router.get("/api/analytics/grafik/{nama}")
+def api_grafik_preset(
+    nama: str,
+    dari: Optional[str] = None,
+    sampai: Optional[str] = None,
+    lokasi: Optional[str] = None,
+    jenis_tabung: Optional[str] = None,
+    user = Depends(require_login),
+):
+    """Grafik siap pakai: tabung-harian, spa-driver, pembayaran-agen"""
+    try:
+        return analytics_cache.preset(nama, parse_date(dari), parse_date(sampai),
+                                      _filters(lokasi=lokasi, jenis_tabung=jenis_tabung))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
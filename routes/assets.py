@@ -0,0 +1,94 @@
+"""
+File statis dari static/ (lihat assets.py), service worker dan web manifest.
+
+File di static/dist/ namanya berisi hash isi: dikirim dengan Cache-Control
+immutable dan varian yang sudah dikompresi saat build (.br, lalu .gz) sesuai
+Accept-Encoding. File lain (static/src saat belum di-build) dikirim dengan
+no-cache + ETag, jadi browser selalu revalidasi.
+
+/sw.js dilayani dari root supaya scope-nya seluruh situs; isinya
+static/src/js/sw.js dengan SW_CONFIG (daftar aset versi hash, halaman form
+yang disimpan untuk offline, URL outbox.js) di awal file.
+"""
+import json
+import mimetypes
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+import assets
+import compression
+
+router = APIRouter()
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Halaman form yang bisa dibuka tanpa sinyal (laporan dikirim lewat outbox)
+SHELL_PAGES = ("/form-laporan", "/laporan-skid", "/laporan-loading", "/laporan-produksi", "/laporan-supir")
+SW_SOURCE = "js/sw.js"
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+_ROOT = os.path.realpath(assets.STATIC_DIR)
+
+
+def _resolve(path: str) -> Optional[str]:
+    """Path file di dalam static/; None kalau keluar folder atau file internal"""
+    full = os.path.realpath(os.path.join(_ROOT, path))
+    name = os.path.basename(full)
+    if not full.startswith(_ROOT + os.sep) or name.startswith(".") or name.endswith((".tmp", ".gz", ".br")):
+        return None
+    return full if os.path.isfile(full) else None
+
+
+@router.get("/static/{path:path}")
+def static_file(path: str, request: Request):
+    full = _resolve(path)
+    if full is None:
+        raise HTTPException(status_code=404, detail="File tidak ditemukan")
+    media_type = mimetypes.guess_type(full)[0] or "application/octet-stream"
+    headers = {"Vary": "Accept-Encoding"}
+
+    if assets.is_fingerprinted(path):
+        headers["Cache-Control"] = IMMUTABLE
+        accept = request.headers.get("accept-encoding", "")
+        for encoding, suffix in PRECOMPRESSED:
+            if compression.accepts(accept, encoding) and os.path.exists(full + suffix):
+                headers["Content-Encoding"] = encoding
+                full += suffix
+                break
+    else:
+        headers["Cache-Control"] = "no-cache"
+
+    stat = os.stat(full)
+    etag = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+    if request.headers.get("if-none-match") == etag:
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+    headers["ETag"] = etag
+    return FileResponse(full, media_type=media_type, headers=headers)
+
+
+@router.get("/sw.js")
+def service_worker():
+    config = {
+        "versi": assets.version(),
+        "shell": list(SHELL_PAGES),
+        "aset": [assets.asset(name) for name in assets.names() if name != SW_SOURCE],
+        "outbox": assets.asset("js/outbox.js"),
+    }
+    body = f"self.SW_CONFIG = {json.dumps(config)};\n{assets.read(SW_SOURCE)}"
+    return Response(body, media_type="application/javascript", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/manifest.webmanifest")
+def web_manifest():
+    manifest = {
+        "name": "Sistem Laporan SPBE Migas",
+        "short_name": "Laporan SPBE",
+        "start_url": "/form-laporan",
+        "scope": "/",
+        "display": "standalone",
+        "background_color": "#ffffff",
+        "theme_color": "#1d4ed8",
+    }
+    return Response(json.dumps(manifest), media_type="application/manifest+json")
@@ -0,0 +1,239 @@
+"""
+Login, logout, register dan manajemen user.
+"""
+from fastapi import APIRouter, Request, Depends, Form, HTTPException, Response
+from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+import models, crud
+import jobs
+import template_cache
+from database import get_read_db, get_write_db
+from deps import get_current_user, require_login, require_admin
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+# ================== USER ROUTES ==================
+@router.get("/users/edit/{user_id}", response_class=HTMLResponse)
+async def edit_user(request: Request, user_id: int, db: Session = Depends(get_read_db), user: models.User = Depends(require_admin)):
+    """Menampilkan halaman edit user"""
+    db_user = crud.get_user_by_id(db, user_id)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return templates.TemplateResponse(
+        "edit_user.html",
+        {
+            "request": request,
+            "user": db_user
+        }
+    )
+
+@router.post("/users/edit/{user_id}")
+async def update_user(
+    request: Request,
+    user_id: int,
+    username: str = Form(...),
+    email: str = Form(...),
+    role: str = Form(...),
+    db: Session = Depends(get_write_db),
+    user: models.User = Depends(require_admin)
+):
+    """Memproses formulir edit user dan memperbarui data"""
+    try:
+        updated_user = crud.update_user(
+            db,
+            user_id=user_id,
+            username=username,
+            email=email,
+            role=role
+        )
+        if not updated_user:
+            raise HTTPException(status_code=404, detail="User not found")
+            
+        return RedirectResponse(url="/data-user", status_code=303)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
+
+@router.get("/users/delete/{user_id}", response_class=HTMLResponse)
+async def delete_user(request: Request, user_id: int, db: Session = Depends(get_read_db), user: models.User = Depends(require_admin)):
+    """Menampilkan halaman konfirmasi hapus user"""
+    db_user = crud.get_user_by_id(db, user_id)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+        
+    return templates.TemplateResponse(
+        "delete_user_confirmation.html",
+        {
+            "request": request,
+            "user": db_user
+        }
+    )
+
+@router.post("/users/delete/{user_id}")
+async def delete_user_action(user_id: int, db: Session = Depends(get_write_db), user: models.User = Depends(require_admin)):
+    """Memproses penghapusan user"""
+    deleted = crud.delete_user(db, user_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="User not found or could not be deleted")
+    
+    # Baris ini yang benar. Hanya satu yang diperlukan.
+    return RedirectResponse(url="/data-user", status_code=303)
+    
+# --- Tambahkan rute ini untuk menampilkan halaman data user ---
+@router.get("/data-user", response_class=HTMLResponse)
+async def data_user(request: Request):
+    """Menampilkan halaman daftar pengguna (tabel diisi dari /api/users)."""
+    return templates.TemplateResponse(
+        "users.html",
+        {
+            "request": request,
+            "per_page": crud.DIRECTORY_PER_PAGE
+        }
+    )
+
+# ================== LOGIN ROUTES ==================
+@router.get("/login", response_class=HTMLResponse)
+async def login_page(request: Request):
+    """Login page"""
+    # Check if already logged in
+    try:
+        user = get_current_user(request, next(get_write_db()))
+        if user:
+            return RedirectResponse(url="/dashboard", status_code=302)
+    except:
+        pass
+    
+    next_url = request.query_params.get("next")
+    return templates.TemplateResponse("login.html", {
+        "request": request,
+        "next_url": next_url
+    })
+
+@router.post("/login")
+async def login(
+    response: Response,
+    username: str = Form(...),
+    password: str = Form(...),
+    next_url: Optional[str] = Form(None),  # Tambahkan ini
+    db: Session = Depends(get_write_db)
+):
+    """Process login"""
+    # Sesi kadaluarsa dibersihkan task cron "bersihkan_sesi" kalau worker jobs.py jalan
+    if not jobs.queue_enabled():
+        crud.cleanup_expired_sessions(db)
+
+    # Authenticate user
+    user = crud.authenticate_user(db, username, password)
+    
+    if not user:
+        return templates.TemplateResponse("login.html", {
+            "request": {"method": "POST"},
+            "error": "Username atau password salah",
+            "next_url": next_url  # Pass kembali next_url jika login gagal
+        })
+    
+    # Create session
+    session = crud.create_session(db, user.id)
+    
+    # Determine redirect URL
+    if next_url and next_url.startswith('/'):  # Security: only internal URLs
+        redirect_url = next_url
+    elif user.role == "admin":
+        redirect_url = "/dashboard/admin"
+    else:
+        redirect_url = "/dashboard"
+    
+    # Set session cookie
+    response = RedirectResponse(url=redirect_url, status_code=302)
+    response.set_cookie(
+        key="session_token",
+        value=session.session_token,
+        max_age=24*60*60,  # 24 hours
+        httponly=True,
+        secure=False  # Set to True in production with HTTPS
+    )
+    
+    return response
+
+@router.post("/logout")
+async def logout(response: Response, request: Request, db: Session = Depends(get_write_db)):
+    """Logout user"""
+    session_token = request.cookies.get("session_token")
+    
+    if session_token:
+        crud.delete_session(db, session_token)
+    
+    response = RedirectResponse(url="/login", status_code=302)
+    response.delete_cookie("session_token")
+    return response
+
+# ================== REGISTER ROUTES (ADMIN ONLY) ==================
+@router.get("/register", response_class=HTMLResponse)
+async def register_page(request: Request, user = Depends(require_admin)):
+    """Register page (admin only)"""
+    return templates.TemplateResponse("register.html", {"request": request, "user": user})
+
+@router.post("/register")
+async def register(
+    username: str = Form(...),
+    password: str = Form(...),
+    email: str = Form(""),
+    role: str = Form("user"),
+    user = Depends(require_admin),
+    db: Session = Depends(get_write_db)
+):
+    """Create new user (admin only)"""
+    new_user = crud.create_user(db, username, password, email, role)
+    
+    if not new_user:
+        return templates.TemplateResponse("register.html", {
+            "request": {"method": "POST"},
+            "error": "Username sudah digunakan",
+            "user": user
+        })
+    
+    return RedirectResponse(url="/users", status_code=302)
+
+# ================== USER MANAGEMENT ROUTES ==================
+@router.get("/users", response_class=HTMLResponse)
+async def users_page(request: Request, user = Depends(require_admin)):
+    """User management page (admin only)"""
+    return templates.TemplateResponse("users.html", {
+        "request": request, 
+        "user": user, 
+        "per_page": crud.DIRECTORY_PER_PAGE
+    })
+
+
+@router.get("/api/users")
+def api_users(
+    q: str = "",
+    role: Optional[str] = None,
+    sort: str = "username",
+    order: str = "asc",
+    page: int = 1,
+    per_page: int = crud.DIRECTORY_PER_PAGE,
+    user = Depends(require_login),
+    db: Session = Depends(get_read_db)
+):
+    """Satu halaman user; q dicari sebagai awalan username/email/role"""
+    try:
+        return crud.search_users(db, q, role, sort, order == "desc", page, per_page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# -------- Laporan --------
+@router.get("/laporan/data-user", response_class=HTMLResponse)
+async def laporan_data_user(request: Request, user = Depends(require_login)):
+    """Data user page - require login"""
+    # Data user diambil per halaman oleh static/src/js/users.js
+    return templates.TemplateResponse("users.html", {
+        "request": request, 
+        "user": user,
+        "per_page": crud.DIRECTORY_PER_PAGE,
+        "active_page": "data-user"
+    })
@@ -0,0 +1,33 @@
+"""
+Autocomplete nama driver, plat mobil, agen, pangkalan dan tujuan.
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+import autocomplete
+from deps import require_login, require_admin
+
+router = APIRouter()
+
+BUILD_WAIT_SECONDS = 0.5   # lebih dari ini, jawab dari database dulu
+
+
+@router.get("/api/autocomplete")
+async def cari_autocomplete(field: str, q: str = "", limit: int = autocomplete.DEFAULT_LIMIT,
+                            user = Depends(require_login)):
+    """Nilai yang diawali q, urut dari yang paling sering dipakai"""
+    if field not in autocomplete.SOURCES:
+        raise HTTPException(status_code=400, detail=f"Field tidak dikenal, pilih salah satu: {', '.join(autocomplete.SOURCES)}")
+    if not autocomplete.index.ready.is_set():
+        # Build masih berjalan atau gagal (dicoba lagi di background): query prefix ke database
+        if not await run_in_threadpool(autocomplete.ensure_ready, BUILD_WAIT_SECONDS):
+            hasil = await run_in_threadpool(autocomplete.search_db, field, q, limit)
+            return {"field": field, "q": q, "hasil": hasil}
+    return {"field": field, "q": q, "hasil": autocomplete.index.search(field, q, limit)}
+
+
+@router.post("/api/autocomplete/rebuild")
+async def rebuild_autocomplete(user = Depends(require_admin)):
+    """Bangun ulang index dari database (misal setelah bulk_import)"""
+    jumlah = await run_in_threadpool(autocomplete.rebuild)
+    return {"status": "ok", "jumlah_nilai": jumlah}
@@ -0,0 +1,107 @@
+"""
+API outbox perubahan (cdc.py) untuk consumer di luar proses.
+
+Dengan shard per site, ?database=merak|semarang membaca change_log shard
+tersebut (default global); offset consumer juga disimpan per database.
+"""
+from contextlib import contextmanager
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+import cdc
+import sharding
+from database import get_read_db, get_write_db
+from deps import require_admin
+
+router = APIRouter()
+
+
+def _tables(tabel: Optional[str]) -> Optional[list]:
+    if not tabel:
+        return None
+    tables = [t for t in tabel.split(",") if t]
+    unknown = [t for t in tables if t not in cdc.TRACKED]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Tabel tidak dicatat: {', '.join(unknown)}")
+    return tables
+
+
+@contextmanager
+def _target(db: Session, database: Optional[str]):
+    try:
+        with sharding.target_session(db, database) as target:
+            yield target
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _cursor(nama: str, tabel: Optional[str] = None, limit: int = cdc.DEFAULT_LIMIT) -> cdc.Cursor:
+    if not nama or nama.startswith("_"):
+        raise HTTPException(status_code=400, detail="Nama consumer tidak valid")
+    return cdc.Cursor(nama, _tables(tabel), limit)
+
+
+@router.get("/api/cdc/changes")
+def api_changes(after: int = 0, limit: int = cdc.DEFAULT_LIMIT, tabel: Optional[str] = None,
+                database: Optional[str] = None,
+                user = Depends(require_admin), db: Session = Depends(get_read_db)):
+    """Perubahan dengan seq > after; lanjutkan dengan after=next selama more=true"""
+    tables = _tables(tabel)
+    with _target(db, database) as target:
+        return cdc.read(target, after, limit, tables)
+
+
+@router.get("/api/cdc/status")
+def api_status(user = Depends(require_admin), db: Session = Depends(get_read_db)):
+    names = sharding.target_names(db)
+    if names == ["global"]:
+        return cdc.status(db)
+    result = {}
+    for name in names:
+        with _target(db, name) as target:
+            result[name] = cdc.status(target)
+    return result
+
+
+@router.get("/api/cdc/consumers/{nama}")
+def api_consumer_poll(nama: str, limit: int = cdc.DEFAULT_LIMIT, tabel: Optional[str] = None,
+                      database: Optional[str] = None,
+                      user = Depends(require_admin), db: Session = Depends(get_read_db)):
+    """Batch berikutnya sejak offset consumer; offset baru maju setelah commit"""
+    cursor = _cursor(nama, tabel, limit)
+    with _target(db, database) as target:
+        return {"consumer": nama, "offset": cursor.offset(target), **cursor.poll(target)}
+
+
+@router.post("/api/cdc/consumers/{nama}/commit")
+def api_consumer_commit(nama: str, seq: int, database: Optional[str] = None,
+                        user = Depends(require_admin), db: Session = Depends(get_write_db)):
+    cursor = _cursor(nama)
+    with _target(db, database) as target:
+        cursor.commit(target, seq)
+        return {"consumer": nama, "offset": cursor.offset(target)}
+
+
+@router.delete("/api/cdc/consumers/{nama}")
+def api_consumer_reset(nama: str, database: Optional[str] = None,
+                       user = Depends(require_admin), db: Session = Depends(get_write_db)):
+    """Hapus offset; consumer yang tidak terdaftar tidak menahan compaction"""
+    cursor = _cursor(nama)
+    with _target(db, database) as target:
+        cursor.reset(target)
+    return {"consumer": nama, "status": "dihapus"}
+
+
+@router.post("/api/cdc/compact")
+def api_compact(hari: int = cdc.RETENTION_DAYS, user = Depends(require_admin),
+                db: Session = Depends(get_write_db)):
+    names = sharding.target_names(db)
+    if names == ["global"]:
+        return cdc.compact(db, hari)
+    result = {}
+    for name in names:
+        with _target(db, name) as target:
+            result[name] = cdc.compact(target, hari)
+    return result
@@ -0,0 +1,113 @@
+"""
+Halaman awal, dashboard, form laporan dan feed live laporan.
+"""
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+import models, crud
+import cache
+import live_feed
+import serializers
+import template_cache
+from database import get_read_db, ReadSessionLocal
+from deps import require_login, require_login_redirect
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+# ================== HOME ==================
+@router.get("/", response_class=HTMLResponse)
+def home(request: Request, db: Session = Depends(get_read_db)):
+    counts = cache.cached("home_counts", ["users", "karyawan"], lambda: {
+        "total_user": db.query(models.User).count(),
+        "total_karyawan": db.query(models.Karyawan).count(),
+    })
+    
+    return templates.TemplateResponse("home.html", {
+        "request": request,
+        "total_user": counts["total_user"],
+        "total_karyawan": counts["total_karyawan"],
+    })
+
+# ================== DASHBOARD ADMIN ==================
+@router.get("/dashboard/admin", response_class=HTMLResponse)
+async def dashboard_admin(request: Request, db: Session = Depends(get_read_db)):
+    data = cache.cached("dashboard_admin", ["users", "karyawan", "produksi_selesai"], lambda: {
+        "total_users": len(crud.get_users(db)) if hasattr(crud, 'get_users') else 0,
+        "total_karyawan": db.query(models.Karyawan).count() if hasattr(models, 'Karyawan') else 0,
+        "produksi_bulan_ini": crud.count_produksi_selesai_bulan(db),
+    })
+    return templates.TemplateResponse("home.html", {
+        "request": request,
+        "data": data
+    })
+
+# ================== DASHBOARD MERAK + SEMARANG ==================
+@router.get("/dashboard/mrksmg", response_class=HTMLResponse)
+async def dashboard_mrksmg(request: Request, db: Session = Depends(get_read_db)):
+    # Posisi feed diambil sebelum query, supaya tidak ada laporan yang terlewat
+    live_last_event_id = live_feed.bus.last_event_id
+    # Get data terpisah untuk Merak dan Semarang sesuai template
+    laporan_merak, laporan_semarang = crud.get_laporan_by_location(db)
+    
+    return templates.TemplateResponse("dashboardmrksmg.html", {
+        "request": request,
+        "laporan_merak": laporan_merak,
+        "laporan_semarang": laporan_semarang,
+        "live_last_event_id": live_last_event_id,
+        "versi": template_cache.versi_laporan()
+    })
+
+@router.get("/api/laporan/stream")
+async def laporan_stream(request: Request, last_event_id: Optional[str] = None):
+    """Feed live laporan baru (Server-Sent Events) untuk dashboard Merak/Semarang"""
+    # Browser mengirim header Last-Event-ID saat reconnect otomatis
+    last_event_id = request.headers.get("Last-Event-ID") or last_event_id
+
+    return StreamingResponse(
+        live_feed.event_stream(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# =========================
+# ====== HALAMAN FORM =====
+# =========================
+@router.get("/form-laporan", response_class=HTMLResponse)
+async def form_laporan(request: Request, user_or_redirect = Depends(require_login_redirect)):
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    
+    user = user_or_redirect
+    return templates.TemplateResponse("form_laporan.html", {"request": request, "user": user})
+
+# ================== DASHBOARD ROUTES ==================
+@router.get("/dashboard", response_class=HTMLResponse)
+async def dashboard(request: Request, user_or_redirect = Depends(require_login_redirect), db: Session = Depends(get_read_db)):
+    """Main dashboard - require login with redirect"""
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+     
+    user = user_or_redirect
+    
+    if user.role == "admin":
+        return RedirectResponse(url="/dashboard/admin", status_code=302)
+    else:
+        return RedirectResponse(url="/form-laporan", status_code=302)
+
+# ================== API ROUTES ==================
+@router.get("/api/laporan")
+def get_all_laporan(request: Request):
+    """API endpoint to get all laporan data (JSON array, atau NDJSON dengan ?format=ndjson)"""
+    return serializers.stream_rows(request, ReadSessionLocal, crud.iter_laporan)
+
+@router.get("/laporan/about", response_class=HTMLResponse)
+async def about(request: Request, user = Depends(require_login)):
+    """About page - require login"""
+    return templates.TemplateResponse("about.html", {
+        "request": request, 
+        "user": user, 
+        "active_page": "about"
+    })
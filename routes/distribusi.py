@@ -0,0 +1,171 @@
+"""
+Laporan distribusi: kirim dan bongkar Merak / Semarang.
+"""
+from fastapi import APIRouter, Request, Depends, Form, File, UploadFile
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from sqlalchemy.orm import Session
+
+import crud
+import template_cache
+from database import get_write_db
+from deps import require_login, require_login_redirect
+from form_utils import save_upload, parse_date, parse_time, parse_int
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+@router.get("/laporan-supir", response_class=HTMLResponse)
+async def form_laporan(request: Request, user_or_redirect = Depends(require_login_redirect)):
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    
+    user = user_or_redirect
+    return templates.TemplateResponse("laporan-supir.html", {"request": request, "user": user})
+
+@router.post("/laporan/kirim-merak")
+def create_laporan_kirim_merak(
+    tanggal: str = Form(...),
+    nama_driver: str = Form(...),
+    plat_mobil: str = Form(...),
+    jam_berangkat: str = Form(...),
+    kapasitas: str = Form(...),
+    jenis_tabung: str = Form(...),
+    jumlah_dibawa: str = Form(...),
+    jumlah_turun: str = Form(...),
+    tujuan: str = Form(...),
+    alamat: str = Form(...),
+    kondisi_tabung: str = Form(...),
+    keterangan: str = Form(...),
+    verifikasi_barang: UploadFile = File(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "tanggal": parse_date(tanggal),
+        "nama_driver": nama_driver,
+        "plat_mobil": plat_mobil,
+        "jam_berangkat": parse_time(jam_berangkat),
+        "kapasitas": parse_int(kapasitas),
+        "jenis_tabung": jenis_tabung,
+        "jumlah_dibawa": parse_int(jumlah_dibawa),
+        "jumlah_turun": parse_int(jumlah_turun),
+        "tujuan": tujuan,
+        "alamat": alamat,
+        "kondisi_tabung": kondisi_tabung,
+        "keterangan": keterangan,
+        "verifikasi_barang": save_upload(verifikasi_barang, "distribusi")
+    }
+    result = crud.create_laporan_kirim(db, data, "merak")
+    return {"status": "success", **crud.ack_ids(result)}
+
+
+@router.post("/laporan/kirim-semarang")
+def create_laporan_kirim_semarang(
+    tanggal: str = Form(...),
+    nama_driver: str = Form(...),
+    plat_mobil: str = Form(...),
+    jam_berangkat: str = Form(...),
+    kapasitas: str = Form(...),
+    jenis_tabung: str = Form(...),
+    jumlah_dibawa: str = Form(...),
+    jumlah_turun: str = Form(...),
+    tujuan: str = Form(...),
+    alamat: str = Form(...),
+    kondisi_tabung: str = Form(...),
+    keterangan: str = Form(...),
+    verifikasi_barang: UploadFile = File(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "tanggal": parse_date(tanggal),
+        "nama_driver": nama_driver,
+        "plat_mobil": plat_mobil,
+        "jam_berangkat": parse_time(jam_berangkat),
+        "kapasitas": parse_int(kapasitas),
+        "jenis_tabung": jenis_tabung,
+        "jumlah_dibawa": parse_int(jumlah_dibawa),
+        "jumlah_turun": parse_int(jumlah_turun),
+        "tujuan": tujuan,
+        "alamat": alamat,
+        "kondisi_tabung": kondisi_tabung,
+        "keterangan": keterangan,
+        "verifikasi_barang": save_upload(verifikasi_barang, "distribusi")
+    }
+    result = crud.create_laporan_kirim(db, data, "semarang")
+    return {"status": "success", **crud.ack_ids(result)}
+
+
+# ================== DISTRIBUSI: BONGKAR ==================
+@router.post("/laporan/bongkar-merak")
+def create_laporan_bongkar_merak(
+    tanggal: str = Form(...),
+    nama_driver: str = Form(...),
+    jam_bongkar: str = Form(...),
+    jenis_tabung: str = Form(...),
+    jumlah_terbawa: str = Form(...),
+    jumlah_turun: str = Form(...),
+    sisa_dibawa: str = Form(...),
+    jumlah_kosong: str = Form(...),
+    kondisi_tabung: str = Form(...),
+    nama_pangkalan: str = Form(...),
+    alamat_pangkalan: str = Form(...),
+    catatan: str = Form(...),
+    media: UploadFile = File(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "tanggal": parse_date(tanggal),
+        "nama_driver": nama_driver,
+        "jam_bongkar": parse_time(jam_bongkar),
+        "jenis_tabung": jenis_tabung,
+        "jumlah_terbawa": parse_int(jumlah_terbawa),
+        "jumlah_turun": parse_int(jumlah_turun),
+        "sisa_dibawa": parse_int(sisa_dibawa),
+        "jumlah_kosong": parse_int(jumlah_kosong),
+        "kondisi_tabung": kondisi_tabung,
+        "nama_pangkalan": nama_pangkalan,
+        "alamat_pangkalan": alamat_pangkalan,
+        "catatan": catatan,
+        "media": save_upload(media, "distribusi")
+    }
+    result = crud.create_laporan_bongkar(db, data, "merak")
+    return {"status": "success", **crud.ack_ids(result)}
+
+
+@router.post("/laporan/bongkar-semarang")
+def create_laporan_bongkar_semarang(
+    tanggal: str = Form(...),
+    nama_driver: str = Form(...),
+    jam_bongkar: str = Form(...),
+    jenis_tabung: str = Form(...),
+    jumlah_terbawa: str = Form(...),
+    jumlah_turun: str = Form(...),
+    sisa_dibawa: str = Form(...),
+    jumlah_kosong: str = Form(...),
+    kondisi_tabung: str = Form(...),
+    nama_pangkalan: str = Form(...),
+    alamat_pangkalan: str = Form(...),
+    catatan: str = Form(...),
+    media: UploadFile = File(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "tanggal": parse_date(tanggal),
+        "nama_driver": nama_driver,
+        "jam_bongkar": parse_time(jam_bongkar),
+        "jenis_tabung": jenis_tabung,
+        "jumlah_terbawa": parse_int(jumlah_terbawa),
+        "jumlah_turun": parse_int(jumlah_turun),
+        "sisa_dibawa": parse_int(sisa_dibawa),
+        "jumlah_kosong": parse_int(jumlah_kosong),
+        "kondisi_tabung": kondisi_tabung,
+        "nama_pangkalan": nama_pangkalan,
+        "alamat_pangkalan": alamat_pangkalan,
+        "catatan": catatan,
+        "media": save_upload(media, "distribusi")
+    }
+    result = crud.create_laporan_bongkar(db, data, "semarang")
+    return JSONResponse({"status": "success", **crud.ack_ids(result)})
@@ -0,0 +1,56 @@
+"""
+Dashboard antrian job (jobs.py): kedalaman antrian, latensi, worker dan job gagal.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import HTMLResponse
+from starlette.concurrency import run_in_threadpool
+
+import jobs
+import template_cache
+from deps import require_admin
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+# Halaman hanya kerangka; angka diambil berkala dari /api/jobs (static/src/js/jobs.js)
+@router.get("/admin/jobs", response_class=HTMLResponse)
+async def jobs_page(request: Request, user = Depends(require_admin)):
+    return templates.TemplateResponse("jobs.html", {
+        "request": request,
+        "user": user,
+        "active_page": "jobs",
+        "refresh_ms": 5000,
+    })
+
+
+@router.get("/api/jobs")
+async def api_jobs(jendela: int = jobs.LATENCY_WINDOW, user = Depends(require_admin)):
+    """Ringkasan antrian; latensi dihitung dari job yang selesai dalam `jendela` detik terakhir"""
+    return await run_in_threadpool(jobs.get_queue().stats, max(60, min(jendela, 7 * 86400)))
+
+
+@router.get("/api/jobs/{job_id}")
+async def api_job(job_id: int, user = Depends(require_admin)):
+    job = await run_in_threadpool(jobs.get_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return job
+
+
+@router.post("/api/jobs/{job_id}/ulang")
+async def api_retry(job_id: int, user = Depends(require_admin)):
+    """Masukkan lagi job yang gagal ke antrian"""
+    if not await run_in_threadpool(jobs.get_queue().retry, job_id):
+        raise HTTPException(status_code=409, detail="Hanya job berstatus gagal yang bisa diulang")
+    return {"id": job_id, "status": "antri"}
+
+
+@router.post("/api/jobs")
+async def api_enqueue(request: Request, user = Depends(require_admin)):
+    """Jalankan task sekarang (misal task cron di luar jadwal): {"task": ..., "payload": {...}}"""
+    body = await request.json()
+    try:
+        job_id = await run_in_threadpool(jobs.enqueue, body.get("task"), body.get("payload") or {})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"id": job_id, "status": "antri"}
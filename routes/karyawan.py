@@ -0,0 +1,73 @@
+"""
+Data karyawan.
+"""
+from fastapi import APIRouter, Request, Depends, Form, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy.orm import Session
+
+import crud
+import template_cache
+from database import get_read_db, get_write_db
+from deps import require_login
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+# Halaman hanya kerangka; tabel diisi per halaman dari /api/karyawan (static/src/js/karyawan.js)
+@router.get("/laporan/data-karyawan", response_class=HTMLResponse)
+async def data_karyawan(
+    request: Request, 
+    user = Depends(require_login)
+):
+    return templates.TemplateResponse("karyawan.html", {
+        "request": request,
+        "user": user,
+        "active_page": "data-karyawan",  # <- harus sama dengan sidebar
+        "per_page": crud.DIRECTORY_PER_PAGE,
+    })
+
+# ================== KARYAWAN ==================
+
+@router.get("/karyawan", response_class=HTMLResponse)
+def list_karyawan(request: Request):
+    return templates.TemplateResponse("karyawan.html", {"request": request, "per_page": crud.DIRECTORY_PER_PAGE})
+
+
+@router.get("/api/karyawan")
+def api_karyawan(
+    q: str = "",
+    sort: str = "nama",
+    order: str = "asc",
+    page: int = 1,
+    per_page: int = crud.DIRECTORY_PER_PAGE,
+    user = Depends(require_login),
+    db: Session = Depends(get_read_db)
+):
+    """Satu halaman karyawan; q dicari sebagai awalan nik/nama/jabatan"""
+    try:
+        return crud.search_karyawan(db, q, sort, order == "desc", page, per_page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/karyawan/hapus/{id}")
+def hapus_karyawan(id: int, db: Session = Depends(get_write_db)):
+    crud.delete_karyawan(db, id)
+    return RedirectResponse(url="/karyawan", status_code=303)
+
+
+@router.post("/karyawan/simpan")
+def simpan_karyawan(
+    nik: str = Form(...),
+    nama: str = Form(...),
+    jabatan: str = Form(...),
+    kontak: str = Form(None),
+    keterangan: str = Form(None),
+    edit_id: str = Form(None),   # <-- aman kalau kosong
+    db: Session = Depends(get_write_db),
+):
+    if edit_id and edit_id.strip():
+        crud.update_karyawan(db, int(edit_id), nik, nama, jabatan, kontak, keterangan)
+    else:        # CREATE
+        crud.create_karyawan(db, nik, nama, jabatan, kontak, keterangan)
+    return RedirectResponse(url="/karyawan", status_code=303)
@@ -0,0 +1,177 @@
+"""
+Laporan sebelum/sesudah loading dan upload video bertahap (resumable).
+"""
+from fastapi import APIRouter, Request, Depends, Form, File, UploadFile, HTTPException, Response
+from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+import crud
+import template_cache
+import resumable_upload
+from database import get_write_db
+from deps import require_login, require_login_redirect
+from form_utils import UPLOAD_FOLDERS, save_upload, parse_date, parse_time, parse_int
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+@router.get("/laporan-loading", response_class=HTMLResponse)
+async def form_laporan(request: Request, user_or_redirect = Depends(require_login_redirect)):
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    
+    user = user_or_redirect
+    return templates.TemplateResponse("laporan-loading.html", {"request": request, "user": user})
+
+# ================== SEBELUM & SESUDAH LOADING ==================
+
+def resolve_video(file: Optional[UploadFile], upload_id: Optional[str], folder: str = "loading"):
+    """Ambil URL video dari upload bertahap (upload_id) atau dari file multipart biasa"""
+    if upload_id:
+        try:
+            return resumable_upload.finalize_upload(upload_id)
+        except resumable_upload.UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+    if file and file.filename:
+        return save_upload(file, folder)
+    raise HTTPException(status_code=400, detail="Video wajib diupload")
+
+
+@router.post("/sebelum-loading")
+def create_sebelum_loading(
+    penanggung_jawab: str = Form(...),
+    tanggal: str = Form(...),
+    nama_driver: str = Form(...),
+    jam_mulai: str = Form(...),
+    netto_spa: str = Form(...),
+    rotogen_kanan: str = Form(...),
+    rotogen_kiri: str = Form(...),
+    video_kiri: Optional[UploadFile] = File(None),
+    video_kanan: Optional[UploadFile] = File(None),
+    video_kiri_upload_id: Optional[str] = Form(None),
+    video_kanan_upload_id: Optional[str] = Form(None),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "penanggung_jawab": penanggung_jawab,
+        "tanggal": parse_date(tanggal),
+        "nama_driver": nama_driver,
+        "jam_mulai": parse_time(jam_mulai),
+        "netto_spa": parse_int(netto_spa),
+        "rotogen_kanan": parse_int(rotogen_kanan),
+        "rotogen_kiri": parse_int(rotogen_kiri),
+        "video_kiri": resolve_video(video_kiri, video_kiri_upload_id),
+        "video_kanan": resolve_video(video_kanan, video_kanan_upload_id)
+    }
+    crud.create_sebelum_loading(db, data)
+    return RedirectResponse(url="/laporan-loading", status_code=303)
+
+
+@router.post("/sesudah-loading")
+def create_sesudah_loading(
+    penanggung_jawab: str = Form(...),
+    tanggal: str = Form(...),
+    jam_selesai: str = Form(...),
+    video_kiri: Optional[UploadFile] = File(None),
+    video_kanan: Optional[UploadFile] = File(None),
+    video_kiri_upload_id: Optional[str] = Form(None),
+    video_kanan_upload_id: Optional[str] = Form(None),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "penanggung_jawab": penanggung_jawab,
+        "tanggal": parse_date(tanggal),
+        "jam_selesai": parse_time(jam_selesai),
+        "video_kiri": resolve_video(video_kiri, video_kiri_upload_id),
+        "video_kanan": resolve_video(video_kanan, video_kanan_upload_id)
+    }
+    crud.create_sesudah_loading(db, data)
+    return RedirectResponse(url="/laporan-loading", status_code=303)
+
+
+# ================== UPLOAD BERTAHAP (RESUMABLE) ==================
+def _upload_headers(meta: dict) -> dict:
+    return {
+        "Upload-Offset": str(meta["offset"]),
+        "Upload-Length": str(meta["length"]),
+        "Cache-Control": "no-store",
+    }
+
+@router.post("/api/uploads", status_code=201)
+async def api_create_upload(
+    response: Response,
+    filename: str = Form(...),
+    length: int = Form(...),
+    folder: str = Form("loading"),
+    user = Depends(require_login)
+):
+    """Mulai upload bertahap, kembalikan upload_id"""
+    if folder not in UPLOAD_FOLDERS:
+        folder = "general"
+    try:
+        meta = resumable_upload.create_upload(filename, length, folder)
+    except resumable_upload.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    response.headers.update(_upload_headers(meta))
+    response.headers["Location"] = f"/api/uploads/{meta['id']}"
+    return {"id": meta["id"], "offset": meta["offset"], "length": meta["length"]}
+
+@router.head("/api/uploads/{upload_id}")
+async def api_upload_progress_head(upload_id: str, user = Depends(require_login)):
+    """Cek offset terakhir (dipakai client untuk melanjutkan upload)"""
+    try:
+        meta = resumable_upload.get_upload(upload_id)
+    except resumable_upload.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return Response(status_code=200, headers=_upload_headers(meta))
+
+@router.get("/api/uploads/{upload_id}")
+async def api_upload_progress(upload_id: str, user = Depends(require_login)):
+    """Progress upload dalam bentuk JSON"""
+    try:
+        meta = resumable_upload.get_upload(upload_id)
+    except resumable_upload.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return {
+        "id": meta["id"],
+        "offset": meta["offset"],
+        "length": meta["length"],
+        "selesai": meta["offset"] == meta["length"],
+        "url": meta["url"],
+    }
+
+@router.patch("/api/uploads/{upload_id}")
+async def api_upload_chunk(upload_id: str, request: Request, user = Depends(require_login)):
+    """Kirim satu potongan file. Header Upload-Offset wajib diisi."""
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Header Upload-Offset wajib diisi")
+
+    try:
+        meta = await resumable_upload.append_chunk(upload_id, offset, request.stream())
+    except resumable_upload.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return Response(status_code=204, headers=_upload_headers(meta))
+
+@router.post("/api/uploads/{upload_id}/selesai")
+async def api_finalize_upload(upload_id: str, user = Depends(require_login)):
+    """Selesaikan upload; file dipindah ke folder uploads"""
+    try:
+        url = resumable_upload.finalize_upload(upload_id)
+    except resumable_upload.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return {"id": upload_id, "url": url}
+
+@router.delete("/api/uploads/{upload_id}")
+async def api_cancel_upload(upload_id: str, user = Depends(require_login)):
+    """Batalkan upload yang belum selesai"""
+    try:
+        resumable_upload.delete_upload(upload_id)
+    except resumable_upload.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return Response(status_code=204)
@@ -0,0 +1,276 @@
+"""
+Pembayaran agen: API, halaman laporan dan edit.
+"""
+from fastapi import APIRouter, Request, Depends, Form, File, UploadFile, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from datetime import date
+import os
+from typing import Optional
+
+import models, crud, schemas
+import serializers
+import template_cache
+from database import get_read_db, get_write_db, ReadSessionLocal
+from deps import require_login, require_login_redirect, require_admin
+from form_utils import save_upload
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+# ======================================
+# ===== API Pembayaran Agen (Revisi) ===
+# ======================================
+
+# List pembayaran agen
+@router.get("/api/pembayaran-agen")
+def api_list_pembayaran(request: Request):
+    """List pembayaran agen (JSON array, atau NDJSON dengan ?format=ndjson)"""
+    return serializers.stream_rows(request, ReadSessionLocal, crud.iter_pembayaran)
+
+# Tambah pembayaran agen
+@router.post("/api/pembayaran-agen")
+def api_create_pembayaran(
+    nama_agen: str = Form(...),
+    harga_pertabung: int = Form(...),
+    jenis_tabung: str = Form(...),
+    nama_driver: str = Form(...),
+    tanggal_pengiriman: date = Form(...),
+    jumlah_turun: int = Form(...),
+    bukti: UploadFile = File(None),
+    db: Session = Depends(get_write_db)
+):
+    obj = crud.create_pembayaran(
+        db,
+        nama_agen=nama_agen,
+        harga_pertabung=harga_pertabung,
+        jenis_tabung=jenis_tabung,
+        nama_driver=nama_driver,
+        tanggal_pengiriman=tanggal_pengiriman,
+        jumlah_turun=jumlah_turun,
+        bukti=bukti
+    )
+    return {"ok": True, "id": obj.id}
+
+@router.put("/api/pembayaran-agen/{id}")
+def api_update_pembayaran(
+    id: int,
+    nama_agen: str = Form(None),
+    harga_pertabung: int = Form(None),
+    jenis_tabung: str = Form(None),
+    nama_driver: str = Form(None),
+    tanggal_pengiriman: date = Form(None),
+    jumlah_turun: int = Form(None),
+    status: str = Form(None),
+    bukti: UploadFile = File(None),
+    role: str = Form("lapangan"),
+    db: Session = Depends(get_write_db)
+):
+    pembayaran = db.query(models.PembayaranAgen).filter(models.PembayaranAgen.id == id).first()
+    if not pembayaran:
+        raise HTTPException(status_code=404, detail="Data tidak ditemukan")
+
+    if role == "lapangan":
+        if bukti:
+            # Gunakan fungsi save_upload yang sudah ada
+            bukti_url = save_upload(bukti, "pembayaran")
+            if bukti_url:
+                pembayaran.bukti = bukti_url  # Simpan sebagai /uploads/pembayaran/filename
+                pembayaran.status = "Paid"
+            else:
+                raise HTTPException(status_code=400, detail="Gagal upload bukti")
+        else:
+            raise HTTPException(status_code=400, detail="Lapangan hanya bisa upload bukti pembayaran")
+
+    elif role == "admin":
+        for field, value in {
+            "nama_agen": nama_agen,
+            "harga_pertabung": harga_pertabung,
+            "jenis_tabung": jenis_tabung,
+            "nama_driver": nama_driver,
+            "tanggal_pengiriman": tanggal_pengiriman,
+            "jumlah_turun": jumlah_turun,
+            "status": status
+        }.items():
+            if value is not None:
+                setattr(pembayaran, field, value)
+
+        if bukti:
+            # Gunakan fungsi save_upload
+            bukti_url = save_upload(bukti, "pembayaran")
+            if bukti_url:
+                pembayaran.bukti = bukti_url
+
+    db.commit()
+    db.refresh(pembayaran)
+    crud._touch_updated(models.PembayaranAgen)
+    return {"ok": True, "id": pembayaran.id, "role": role}
+
+# Halaman laporan pembayaran agen
+@router.get("/laporan/pembayaran-agen", response_class=HTMLResponse)
+async def laporan_pembayaran_agen(
+    request: Request,
+    user = Depends(require_login), # Tambahkan dependensi ini
+    db: Session = Depends(get_read_db)
+):
+    pembayaran_list = db.query(models.PembayaranAgen).all()
+    return templates.TemplateResponse("laporan_pembayaran_agen.html", {
+        "request": request,
+        "pembayaran_list": pembayaran_list,
+        "versi": template_cache.update_versions(["pembayaran_agen"]),
+        "user": user, # Tambahkan user ke context
+    })
+
+@router.delete("/api/pembayaran-agen/{id}")
+def api_delete_pembayaran(
+    id: int,
+    user = Depends(require_admin),
+    db: Session = Depends(get_write_db)
+):
+    pembayaran = db.query(models.PembayaranAgen).filter(models.PembayaranAgen.id == id).first()
+    if not pembayaran:
+        raise HTTPException(status_code=404, detail="Data tidak ditemukan")
+
+    if pembayaran.bukti:
+        # Konversi URL ke file path
+        # /uploads/pembayaran/filename -> uploads/pembayaran/filename
+        file_path = pembayaran.bukti.lstrip("/")
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    db.delete(pembayaran)
+    db.commit()
+    crud._touch_updated(models.PembayaranAgen)
+    return {"ok": True, "message": "Data berhasil dihapus"}
+
+# ================== OPERASI MASSAL (admin / keuangan) ==================
+# Satu UPDATE/DELETE untuk semua baris sasaran (ids dan/atau filter agen + tanggal)
+@router.post("/api/pembayaran-agen/bulk/status")
+def api_bulk_status_pembayaran(
+    body: schemas.PembayaranAgenBulkStatus,
+    user = Depends(require_admin),
+    db: Session = Depends(get_write_db)
+):
+    """Ubah status banyak pembayaran sekaligus (misal tandai Paid)"""
+    try:
+        rows = crud.bulk_update_pembayaran(db, {"status": body.status}, **body.filter.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "diubah": len(rows), "id": [row["id"] for row in rows]}
+
+
+@router.post("/api/pembayaran-agen/bulk/harga")
+def api_bulk_harga_pembayaran(
+    body: schemas.PembayaranAgenBulkHarga,
+    user = Depends(require_admin),
+    db: Session = Depends(get_write_db)
+):
+    """Koreksi harga_pertabung banyak pembayaran sekaligus"""
+    try:
+        rows = crud.bulk_update_pembayaran(db, {"harga_pertabung": body.harga_pertabung}, **body.filter.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "diubah": len(rows), "id": [row["id"] for row in rows]}
+
+
+@router.post("/api/pembayaran-agen/bulk/hapus")
+def api_bulk_hapus_pembayaran(
+    body: schemas.PembayaranAgenBulkHapus,
+    user = Depends(require_admin),
+    db: Session = Depends(get_write_db)
+):
+    """Hapus banyak pembayaran sekaligus beserta file buktinya"""
+    try:
+        result = crud.bulk_delete_pembayaran(db, **body.filter.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "dihapus": len(result["id"]), **result}
+
+
+@router.get("/admin/fix-all-bukti-paths")
+def fix_all_bukti_paths(user = Depends(require_admin), db: Session = Depends(get_write_db)):
+    pembayaran_list = db.query(models.PembayaranAgen).filter(
+        models.PembayaranAgen.bukti.notlike('/uploads/pembayaran/%')
+    ).all()
+    
+    updated_count = 0
+    for pembayaran in pembayaran_list:
+        if pembayaran.bukti:
+            filename = os.path.basename(pembayaran.bukti)
+            new_path = f"/uploads/pembayaran/{filename}"
+            pembayaran.bukti = new_path
+            updated_count += 1
+    
+    db.commit()
+    crud._touch_updated(models.PembayaranAgen)
+    return {"message": f"Updated {updated_count} bukti paths", "updated_records": updated_count}
+
+
+@router.get("/agen/edit/{pembayaran_id}", response_class=HTMLResponse)
+async def edit_pembayaran(
+    request: Request,
+    pembayaran_id: int,
+    db: Session = Depends(get_read_db),
+    user: models.User = Depends(require_login)
+):
+    """Menampilkan halaman edit pembayaran agen"""
+    db_pembayaran = crud.get_pembayaran_by_id(db, pembayaran_id)
+    if not db_pembayaran:
+        raise HTTPException(status_code=404, detail="Data tidak ditemukan")
+    return templates.TemplateResponse(
+        "edit_pembayaran.html",
+        {
+            "request": request,
+            "pembayaran": db_pembayaran,
+            "user": user
+        }
+    )
+
+@router.post("/agen/edit/{pembayaran_id}")
+async def update_pembayaran(
+    request: Request,
+    pembayaran_id: int,
+    nama_agen: str = Form(...),
+    harga_pertabung: float = Form(...),
+    jenis_tabung: str = Form(...),
+    nama_driver: str = Form(...),
+    tanggal_pengiriman: date = Form(...),
+    jumlah_turun: int = Form(...),
+    status: Optional[str] = Form(None),
+    bukti: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_write_db),
+    user: models.User = Depends(require_login)
+):
+    """Memproses formulir edit pembayaran agen dan memperbarui data"""
+    try:
+        updated_data = {
+            "nama_agen": nama_agen,
+            "harga_pertabung": harga_pertabung,
+            "jenis_tabung": jenis_tabung,
+            "nama_driver": nama_driver,
+            "tanggal_pengiriman": tanggal_pengiriman,
+            "jumlah_turun": jumlah_turun,
+            "status": status,
+            "bukti": bukti
+        }
+        
+        updated_pembayaran = crud.update_pembayaran(db, pembayaran_id, **updated_data)
+        
+        if not updated_pembayaran:
+            raise HTTPException(status_code=404, detail="Data tidak ditemukan")
+        return RedirectResponse(url="/laporan/pembayaran-agen", status_code=303)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gagal memperbarui data: {str(e)}")
+
+@router.get("/agen", response_class=HTMLResponse)
+async def agen(request: Request, user_or_redirect = Depends(require_login_redirect)):
+    """Pembayaran agen - require login with redirect"""
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    
+    user = user_or_redirect
+    return templates.TemplateResponse("agen.html", {
+        "request": request, 
+        "user": user,
+        "active_page": "pembayaran-agen"
+    })
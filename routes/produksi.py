@@ -0,0 +1,98 @@
+"""
+Laporan produksi mulai/selesai dan analitik throughput produksi.
+"""
+from fastapi import APIRouter, Request, Depends, Form
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+import crud
+import cache
+import template_cache
+from database import get_read_db, get_write_db
+from deps import require_login, require_login_redirect
+from form_utils import parse_date, parse_time, parse_int
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+@router.get("/laporan-produksi", response_class=HTMLResponse)
+async def form_laporan(request: Request, user_or_redirect = Depends(require_login_redirect)):
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    
+    user = user_or_redirect
+    return templates.TemplateResponse("laporan-produksi.html", {"request": request, "user": user})
+
+# ================== PRODUKSI ==================
+@router.post("/produksi-mulai")
+def create_produksi_mulai(
+    kepala_produksi: str = Form(...),
+    tanggal: str = Form(...),
+    nama_driver: str = Form(...),
+    jam_mulai: str = Form(...),
+    shift: str = Form(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "kepala_produksi": kepala_produksi,
+        "tanggal": parse_date(tanggal),
+        "nama_driver": nama_driver,
+        "jam_mulai": parse_time(jam_mulai),
+        "shift": shift
+    }
+    result = crud.create_produksi_mulai(db, data)
+    return JSONResponse({
+        "success": True,
+        "message": "Produksi mulai berhasil disimpan",
+        **crud.ack_ids(result)
+    })
+
+
+@router.post("/produksi-selesai")
+def create_produksi_selesai(
+    kepala_produksi: str = Form(...),
+    tanggal: str = Form(...),
+    jam_selesai: str = Form(...),
+    tabung_kosong: str = Form(...),
+    tabung_12: str = Form(...), 
+    tabung_50: str = Form(...),
+    keterangan: str = Form(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "kepala_produksi": kepala_produksi,
+        "tanggal": parse_date(tanggal),
+        "jam_selesai": parse_time(jam_selesai),
+        "tabung_kosong": parse_int(tabung_kosong),
+        "tabung_12": parse_int(tabung_12),
+        "tabung_50": parse_int(tabung_50),
+        "keterangan": keterangan
+    }
+    # Perbaikan: Memanggil fungsi crud yang benar untuk ProduksiSelesai
+    result = crud.create_produksi_selesai(db, data)
+    return JSONResponse({
+        "success": True,
+        "message": "Produksi selesai berhasil disimpan",
+        **crud.ack_ids(result)
+    })
+
+# ================== ANALYTICS: THROUGHPUT PRODUKSI ==================
+@router.get("/api/analytics/produksi")
+def api_produksi_throughput(
+    dari: Optional[str] = None,
+    sampai: Optional[str] = None,
+    user = Depends(require_login),
+    db: Session = Depends(get_read_db)
+):
+    """Tabung per jam per shift & jenis, tren harian dan outlier produksi"""
+    import analytics_produksi  # NumPy baru di-import saat endpoint ini dipakai
+
+    dari_date, sampai_date = parse_date(dari), parse_date(sampai)
+    return cache.cached(
+        f"produksi_throughput|{dari_date}|{sampai_date}",
+        ["produksi_mulai", "produksi_selesai"],
+        lambda: analytics_produksi.throughput(db, dari_date, sampai_date),
+    )
@@ -0,0 +1,80 @@
+"""
+Rekap bulanan per driver dan agen (recap.py): halaman, generate, unduh PDF dan zip.
+"""
+from typing import Optional
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import recap
+import template_cache
+from database import get_read_db
+from deps import require_admin
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+
+def _checked(periode: str) -> str:
+    try:
+        recap.period_bounds(periode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return periode
+
+
+@router.get("/laporan/rekap", response_class=HTMLResponse)
+async def rekap_page(request: Request, periode: Optional[str] = None, user = Depends(require_admin)):
+    """Daftar rekap yang sudah dibuat untuk satu bulan (default bulan lalu)"""
+    periode = _checked(periode or recap.previous_period())
+    manifest = await run_in_threadpool(recap.load_manifest, periode)
+    return templates.TemplateResponse("rekap.html", {
+        "request": request,
+        "user": user,
+        "active_page": "rekap",
+        "periode": periode,
+        "manifest": manifest,
+        "hasil": request.query_params.get("hasil"),
+    })
+
+
+@router.post("/laporan/rekap")
+async def rekap_generate_form(periode: str = Form(...), paksa: bool = Form(False),
+                              db: Session = Depends(get_read_db), user = Depends(require_admin)):
+    result = await run_in_threadpool(recap.generate, db, _checked(periode), paksa)
+    hasil = f"{result['dirender']} dirender, {result['dari_cache']} dari cache, {result['total_ms'] / 1000:.1f} dtk"
+    return RedirectResponse(url=f"/laporan/rekap?{urlencode({'periode': periode, 'hasil': hasil})}", status_code=303)
+
+
+@router.get("/laporan/rekap/{periode}.zip")
+async def rekap_zip(periode: str, db: Session = Depends(get_read_db), user = Depends(require_admin)):
+    """Semua PDF bulan itu dalam satu zip (dokumen yang datanya berubah dirender dulu)"""
+    path = await run_in_threadpool(recap.build_zip, db, _checked(periode))
+    return FileResponse(path, media_type="application/zip", filename=f"rekap-{periode}.zip")
+
+
+@router.get("/laporan/rekap/{periode}/{jenis}/{file}")
+async def rekap_pdf(periode: str, jenis: str, file: str, user = Depends(require_admin)):
+    path = recap.document_path(_checked(periode), f"{jenis}/{file}")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Rekap tidak ditemukan, buat ulang rekap bulan ini")
+    return FileResponse(path, media_type="application/pdf", filename=file,
+                        content_disposition_type="inline")
+
+
+@router.get("/api/rekap/{periode}")
+async def api_rekap(periode: str, user = Depends(require_admin)):
+    manifest = await run_in_threadpool(recap.load_manifest, _checked(periode))
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Rekap bulan ini belum dibuat")
+    return manifest
+
+
+@router.post("/api/rekap/{periode}")
+async def api_rekap_generate(periode: str, paksa: bool = False,
+                             db: Session = Depends(get_read_db), user = Depends(require_admin)):
+    """Buat/perbarui rekap; yang isinya tidak berubah diambil dari cache"""
+    return await run_in_threadpool(recap.generate, db, _checked(periode), paksa)
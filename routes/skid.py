@@ -0,0 +1,162 @@
+"""
+Laporan skid Depot / Laut / Lumbung dan analitik turnaround skid.
+"""
+from fastapi import APIRouter, Request, Depends, Form, File, UploadFile, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+import crud
+import analytics_turnaround
+import template_cache
+from database import get_read_db, get_write_db
+from deps import require_login, require_login_redirect, require_admin
+from form_utils import save_upload, parse_date, parse_time, parse_int
+
+router = APIRouter()
+templates = template_cache.get_templates()
+
+@router.get("/laporan-skid", response_class=HTMLResponse)
+async def form_laporan(request: Request, user_or_redirect = Depends(require_login_redirect)):
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    
+    user = user_or_redirect
+    return templates.TemplateResponse("laporan-skid.html", {"request": request, "user": user})
+
+# ================== SKID MERAK DEPOT ==================
+@router.post("/skid-masuk-depot")
+def create_skid_masuk_depot(
+    nama_driver: str = Form(...),
+    tanggal: str = Form(...),
+    rit: str = Form(...),
+    jam_masuk: str = Form(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "nama_driver": nama_driver,
+        "tanggal": parse_date(tanggal),
+        "rit": parse_int(rit),
+        "jam_masuk": parse_time(jam_masuk)
+    }
+    result = crud.create_skid_masuk_depot(db, data)
+    return {"status": "success", **crud.ack_ids(result)}
+
+@router.post("/skid-keluar-depot")
+def create_skid_keluar_depot(
+    nama_driver: str = Form(...),
+    tanggal: str = Form(...),
+    jam_keluar: str = Form(...),
+    jumlah_spa: str = Form(...),
+    foto_spa: UploadFile = File(...),  # WAJIB
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "nama_driver": nama_driver,
+        "tanggal": parse_date(tanggal),
+        "jam_keluar": parse_time(jam_keluar),
+        "jumlah_spa": parse_int(jumlah_spa),
+        "foto_spa": save_upload(foto_spa, "skid_depot")
+    }
+    result = crud.create_skid_keluar_depot(db, data)
+    return {"status": "success", **crud.ack_ids(result)}
+
+# ================== SKID MERAK LAUT ==================
+@router.post("/skid-masuk-laut")
+def create_skid_masuk_laut(
+    nama_driver: str = Form(...),
+    tanggal: str = Form(...),
+    jam_masuk: str = Form(...),
+    petugas_loading: str = Form(...),
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "nama_driver": nama_driver,
+        "tanggal": parse_date(tanggal),
+        "jam_masuk": parse_time(jam_masuk),
+        "petugas_loading": petugas_loading
+    }
+    result = crud.create_skid_masuk_laut(db, data)
+    return {"status": "success", **crud.ack_ids(result)}
+
+@router.post("/skid-keluar-laut")
+def create_skid_keluar_laut(
+    nama_driver: str = Form(...),
+    tanggal: str = Form(...),
+    jam_keluar: str = Form(...),
+    catatan: str = Form(...),  # WAJIB
+    media: UploadFile = File(...),  # WAJIB
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "nama_driver": nama_driver,
+        "tanggal": parse_date(tanggal),
+        "jam_keluar": parse_time(jam_keluar),
+        "catatan": catatan,
+        "media": save_upload(media, "skid_laut")
+    }
+    result = crud.create_skid_keluar_laut(db, data)
+    return {"status": "success", **crud.ack_ids(result)}
+
+# ================== SKID SEMARANG LUMBUNG ==================
+@router.post("/skid-masuk-lumbung")
+def create_skid_masuk_lumbung(
+    nama_driver: str = Form(...),
+    tanggal: str = Form(...),
+    jam_masuk: str = Form(...),
+    petugas_loading: str = Form(...),  # WAJIB
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "nama_driver": nama_driver,
+        "tanggal": parse_date(tanggal),
+        "jam_masuk": parse_time(jam_masuk),
+        "petugas_loading": petugas_loading
+    }
+    result = crud.create_skid_masuk_lumbung(db, data)
+    return {"status": "success", **crud.ack_ids(result)}
+
+@router.post("/skid-keluar-lumbung")
+def create_skid_keluar_lumbung(
+    nama_driver: str = Form(...),
+    tanggal: str = Form(...),
+    jam_keluar: str = Form(...),
+    catatan: str = Form(...),  # WAJIB
+    media: UploadFile = File(...),  # WAJIB
+    user = Depends(require_login),
+    db: Session = Depends(get_write_db)
+):
+    data = {
+        "nama_driver": nama_driver,
+        "tanggal": parse_date(tanggal),
+        "jam_keluar": parse_time(jam_keluar),
+        "catatan": catatan,
+        "media": save_upload(media, "skid_lumbung")
+    }
+    result = crud.create_skid_keluar_lumbung(db, data)
+    return {"status": "success", **crud.ack_ids(result)}
+
+# ================== ANALYTICS: TURNAROUND SKID ==================
+@router.get("/api/analytics/turnaround")
+def api_turnaround(
+    site: Optional[str] = None,
+    dari: Optional[str] = None,
+    sampai: Optional[str] = None,
+    user = Depends(require_login),
+    db: Session = Depends(get_read_db)
+):
+    """Distribusi dwell & turnaround skid per site dan per hari (persentil)"""
+    if site and site not in analytics_turnaround.SITES:
+        raise HTTPException(status_code=400, detail="Site harus depot, laut atau lumbung")
+    # Read-only: tabel kunjungan diperbarui di jalur tulis (analytics_turnaround.schedule_refresh)
+    return analytics_turnaround.distribution(db, site, parse_date(dari), parse_date(sampai))
+
+@router.post("/api/analytics/turnaround/rebuild")
+def api_turnaround_rebuild(user = Depends(require_admin), db: Session = Depends(get_write_db)):
+    """Hitung ulang semua pasangan masuk/keluar (setelah data lama diedit/dihapus)"""
+    return {"ok": True, "grup": analytics_turnaround.rebuild(db)}
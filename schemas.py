@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
 from datetime import datetime, date, time
 
 
@@ -254,6 +254,29 @@ class PembayaranAgenUpdate(BaseModel):
     bukti: str | None = None
 
 
+class PembayaranAgenFilter(BaseModel):
+    """Sasaran operasi massal: daftar id dan/atau filter (digabung dengan AND)"""
+    ids: list[int] | None = None
+    nama_agen: str | None = None
+    tanggal_dari: date | None = None
+    tanggal_sampai: date | None = None
+    status: str | None = None                # hanya baris dengan status ini
+
+
+class PembayaranAgenBulkStatus(BaseModel):
+    filter: PembayaranAgenFilter
+    status: Literal["Paid", "Belum Paid"]
+
+
+class PembayaranAgenBulkHarga(BaseModel):
+    filter: PembayaranAgenFilter
+    harga_pertabung: float = Field(..., gt=0)
+
+
+class PembayaranAgenBulkHapus(BaseModel):
+    filter: PembayaranAgenFilter
+
+
 class PembayaranAgenResponse(PembayaranAgenBase):
     """Schema untuk response"""
     id: int
@@ -0,0 +1,105 @@
+"""
+Serialisasi JSON cepat untuk response API.
+
+- dumps() memakai orjson kalau terpasang (date/time/datetime langsung
+  didukung), dengan fallback ke json standar.
+- FastJSONResponse dipakai sebagai default_response_class aplikasi.
+- stream_rows() mengubah iterator dict (misal crud.iter_laporan) menjadi
+  StreamingResponse, baik sebagai array JSON maupun NDJSON
+  (application/x-ndjson, satu objek per baris). Baris di-encode per batch
+  begitu keluar dari cursor database; list lengkap tidak pernah dibuat dan
+  jsonable_encoder FastAPI tidak dipakai.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+BATCH_SIZE = 1000
+
+
+def _default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type {type(value).__name__} tidak bisa di-serialize ke JSON")
+
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, default=_default, ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# ================== STREAMING ==================
+def iter_ndjson(rows: Iterable, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    batch = []
+    for row in rows:
+        batch.append(dumps(row))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def iter_json_array(rows: Iterable, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    batch = []
+    for row in rows:
+        batch.append(dumps(row))
+        if len(batch) >= batch_size:
+            yield (b"" if first else b",") + b",".join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """?format=ndjson atau header Accept: application/x-ndjson"""
+    if request.query_params.get("format") == "ndjson":
+        return True
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _rows_with_session(session_factory: Callable[[], Session], rows_fn) -> Iterator:
+    # Session milik generator: dependency get_db sudah ditutup sebelum
+    # body response selesai dikirim
+    db = session_factory()
+    try:
+        yield from rows_fn(db)
+    finally:
+        db.close()
+
+
+def stream_rows(request: Request, session_factory: Callable[[], Session], rows_fn) -> StreamingResponse:
+    """
+    Response streaming untuk rows_fn(db) -> iterator dict. Format dipilih dari
+    request (NDJSON atau array JSON biasa).
+    """
+    rows = _rows_with_session(session_factory, rows_fn)
+    if wants_ndjson(request):
+        return StreamingResponse(iter_ndjson(rows), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(iter_json_array(rows), media_type="application/json")
@@ -0,0 +1,248 @@
+"""
+Routing request ke shard site dan fan-out query lintas site.
+
+database.py menentukan database tiap tabel (RoutingSession). Modul ini
+menambahkan:
+    - site_for_path / ShardRoutingMiddleware: site dari endpoint
+      (/skid-*-lumbung dan /laporan/*-semarang -> Semarang, depot/laut dan
+      /laporan/*-merak -> Merak), dipakai saat membaca laporan kirim/bongkar
+      tanpa lokasi di query.
+    - using_site(): sama, untuk kode di luar request.
+    - fan_out() / iter_merged(): jalankan query yang sama di setiap database
+      secara paralel (thread pool) lalu gabungkan hasilnya. Setiap database
+      punya skema lengkap (shard tanpa foreign key ke dimensi); tabel yang
+      bukan miliknya kosong, jadi query UNION dashboard bisa dijalankan apa
+      adanya di setiap shard.
+    - ensure_schemas() dan migrate(): skema di semua database dan pemindahan
+      baris lama dari database global ke shard site-nya.
+
+Tanpa DATABASE_URL_MERAK / DATABASE_URL_SEMARANG semua fungsi ini langsung
+memakai session pemanggil (satu database, tanpa thread tambahan).
+
+    python sharding.py migrate      # pindahkan data site dari database global
+"""
+import heapq
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+import database
+from database import Base, SITES
+
+MIGRATE_BATCH = 5000
+
+_PATH_SITES = (
+    (re.compile(r"^/skid-[a-z]+-lumbung"), "semarang"),
+    (re.compile(r"^/skid-[a-z]+-(depot|laut)"), "merak"),
+    (re.compile(r"^/laporan/[a-z]+-semarang"), "semarang"),
+    (re.compile(r"^/laporan/[a-z]+-merak"), "merak"),
+)
+
+_executor = ThreadPoolExecutor(max_workers=len(SITES) + 1, thread_name_prefix="shard")
+
+
+# ================== ROUTING ==================
+def site_for_path(path: str) -> Optional[str]:
+    for pattern, site in _PATH_SITES:
+        if pattern.match(path):
+            return site
+    return None
+
+
+@contextmanager
+def using_site(site: Optional[str]):
+    """Query laporan kirim/bongkar di blok ini memakai database site tersebut"""
+    token = database.current_site.set(database.site_for_lokasi(site))
+    try:
+        yield
+    finally:
+        database.current_site.reset(token)
+
+
+def sites_of(model_class) -> tuple:
+    """Site yang perlu dikunjungi untuk semua baris model (None = cukup routing biasa)"""
+    if database.sharding_enabled and model_class.__tablename__ in database.LOKASI_TABLES:
+        return SITES
+    return (None,)
+
+
+class ShardRoutingMiddleware:
+    """Middleware ASGI: isi database.current_site dari path request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        site = site_for_path(scope["path"]) if scope["type"] == "http" else None
+        if site is None:
+            await self.app(scope, receive, send)
+            return
+        token = database.current_site.set(site)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            database.current_site.reset(token)
+
+
+# ================== FAN-OUT ==================
+def _sharded(db: Session) -> bool:
+    return database.sharding_enabled and isinstance(db, database.RoutingSession)
+
+
+def _targets(db: Session) -> dict:
+    return database.targets(read=isinstance(db, database.ReadRoutingSession))
+
+
+def _run(fn: Callable, bind):
+    db = Session(bind=bind)
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+
+def fan_out(db: Session, fn: Callable[[Session], object]) -> List:
+    """
+    fn(session) dijalankan sekali per database (paralel); hasilnya list
+    berurutan global, merak, semarang. Tanpa shard: [fn(db)].
+    """
+    if not _sharded(db):
+        return [fn(db)]
+    futures = [_executor.submit(_run, fn, bind) for bind in _targets(db).values()]
+    return [f.result() for f in futures]
+
+
+@contextmanager
+def sessions(db: Session) -> Iterator[List[Tuple[str, Session]]]:
+    """[(nama database, session)] untuk diproses satu per satu; tanpa shard [("global", db)]"""
+    if not _sharded(db):
+        yield [("global", db)]
+        return
+    opened = [(name, Session(bind=bind)) for name, bind in _targets(db).items()]
+    try:
+        yield opened
+    finally:
+        for _, s in opened:
+            s.close()
+
+
+@contextmanager
+def target_session(db: Session, name: Optional[str]):
+    """Session ke satu database (global/merak/semarang); tanpa shard selalu db"""
+    if not _sharded(db) or name in (None, "global"):
+        yield db
+        return
+    binds = _targets(db)
+    if name not in binds:
+        raise ValueError(f"Database tidak dikenal: {name}. Pilihan: {', '.join(binds)}")
+    target = Session(bind=binds[name])
+    try:
+        yield target
+    finally:
+        target.close()
+
+
+def target_names(db: Session) -> list:
+    return list(_targets(db)) if _sharded(db) else ["global"]
+
+
+def iter_merged(db: Session, stmt, key: Callable, reverse: bool = False, batch_size: int = 1000) -> Iterator:
+    """
+    Stream baris `stmt` dari semua database, digabung menurut key (setiap
+    stmt harus sudah ORDER BY key yang sama). Query dieksekusi paralel, baris
+    dibaca bertahap dari masing-masing cursor.
+    """
+    if not _sharded(db):
+        yield from db.execute(stmt, execution_options={"yield_per": batch_size})
+        return
+    opened = [Session(bind=bind) for bind in _targets(db).values()]
+    try:
+        results = [f.result() for f in [
+            _executor.submit(s.execute, stmt, execution_options={"yield_per": batch_size}) for s in opened
+        ]]
+        yield from heapq.merge(*results, key=key, reverse=reverse)
+    finally:
+        for s in opened:
+            s.close()
+
+
+# ================== SKEMA & MIGRASI ==================
+def ensure_schemas() -> dict:
+    """
+    Skema di database shard (database global diurus migrations.ensure_schema).
+    Tanpa foreign key: drivers/kendaraan hanya terisi di database global.
+    """
+    import migrations
+    return {
+        name: migrations.ensure_schema(bind, dim_engine=database.engine, foreign_keys=False)
+        for name, bind in database.targets().items() if name != "global"
+    }
+
+
+def _site_filter(table, site: str):
+    if table.name in database.SITE_TABLES:
+        return None if database.SITE_TABLES[table.name] == site else False
+    return func.lower(table.c.lokasi) == site
+
+
+def migrate(batch: int = MIGRATE_BATCH) -> dict:
+    """
+    Pindahkan baris tabel site dari database global ke shard-nya (id tetap).
+    Baris yang id-nya sudah ada di shard dengan isi sama (migrasi terputus)
+    hanya dihapus dari global; id yang sudah dipakai baris lain di shard
+    dibiarkan di global dan dilaporkan sebagai "<tabel>->bentrok".
+    """
+    if not database.sharding_enabled:
+        return {}
+    ensure_schemas()
+    moved = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name not in database.SITE_TABLES and table.name not in database.LOKASI_TABLES:
+            continue
+        for site in SITES:
+            target = database.site_engines[site][0]
+            condition = _site_filter(table, site)
+            if target is database.engine or condition is False:
+                continue
+            where = [condition] if condition is not None else []
+            count = conflicts = 0
+            last_id = 0
+            with database.engine.connect() as source:
+                while True:
+                    rows = source.execute(
+                        select(table).where(table.c.id > last_id, *where).order_by(table.c.id).limit(batch)
+                    ).mappings().all()
+                    if not rows:
+                        break
+                    last_id = rows[-1]["id"]
+                    ids = [r["id"] for r in rows]
+                    with target.begin() as conn:
+                        existing = {r["id"]: r for r in conn.execute(
+                            select(table).where(table.c.id.in_(ids))
+                        ).mappings()}
+                        fresh = [dict(r) for r in rows if r["id"] not in existing]
+                        if fresh:
+                            conn.execute(table.insert(), fresh)
+                    done = [r["id"] for r in rows if r["id"] not in existing or existing[r["id"]] == r]
+                    conflicts += len(rows) - len(done)
+                    if done:
+                        with database.engine.begin() as conn:
+                            conn.execute(delete(table).where(table.c.id.in_(done)))
+                    count += len(fresh)
+            moved[f"{table.name}->{site}"] = count
+            if conflicts:
+                moved[f"{table.name}->bentrok"] = moved.get(f"{table.name}->bentrok", 0) + conflicts
+    return moved
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["migrate"]:
+        print(__doc__)
+        sys.exit(1)
+    for name, count in migrate().items():
+        print(f"{name:40} {count} baris")
@@ -0,0 +1,53 @@
+"""
+Laporan waktu startup: berapa lama import, inisialisasi di lifespan dan
+load modul route per subsistem. Dicetak sekali saat aplikasi siap dan bisa
+dilihat lagi di /api/startup (admin).
+
+Untuk rincian per modul pakai juga:  python -X importtime -c "import main"
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Diambil saat modul ini pertama kali di-import (main.py meng-import-nya paling awal)
+PROCESS_START = time.perf_counter()
+
+
+class StartupReport:
+    def __init__(self, started: float = PROCESS_START):
+        self.started = started
+        self.steps = []            # (nama, durasi detik)
+        self.ready_at = None
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.steps.append((name, seconds))
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            steps = list(self.steps)
+        return {
+            "siap_ms": round((self.ready_at - self.started) * 1000, 1) if self.ready_at else None,
+            "langkah": [{"nama": n, "ms": round(s * 1000, 1)} for n, s in steps],
+        }
+
+    def log(self):
+        data = self.as_dict()
+        print(f"Startup siap dalam {data['siap_ms']} ms")
+        for item in data["langkah"]:
+            print(f"  {item['nama']:<28} {item['ms']:>8.1f} ms")
+
+
+report = StartupReport()
@@ -0,0 +1,99 @@
+const API_BASE = "/api/pembayaran-agen";
+function pick(item, ...keys) { for (const k of keys) { if (item && item[k]!=null) return item[k]; } }
+function parseNumber(v){ if(!v) return 0; return Number(String(v).replace(/[^0-9\.\-]/g,""))||0; }
+function fmtCurrency(v){ return new Intl.NumberFormat("id-ID",{style:"currency",currency:"IDR",minimumFractionDigits:0}).format(v);}
+const form=document.getElementById("formPembayaran"),totalJumlahEl=document.getElementById("totalJumlah");
+
+async function loadData(){
+  const res=await fetch(API_BASE); if(!res.ok) return console.error("fetch fail",res.status);
+  const data=await res.json();
+  const tbody=document.getElementById("tabelBody"); tbody.innerHTML="";
+  const tbodyMobile=document.getElementById("tabelBodyMobile"); tbodyMobile.innerHTML="";
+  let grandTotal=0;
+
+  data.forEach(item=>{
+    const nama=pick(item,"nama_agen","namaAgen","nama")||"-";
+    const jenis=pick(item,"jenis_tabung","jenisTabung","jenis")||"-";
+    const hargaRaw=pick(item,"harga_pertabung","hargaPertabung","harga")||0;
+    const jumlahRaw=pick(item,"jumlah_tabung","jumlahTabung","jumlah","jumlah_turun")||0;
+    const driver=pick(item,"nama_driver","namaDriver","driver")||"-";
+    const tanggalRaw=pick(item,"tanggal_pengiriman","tanggalPengiriman","tanggal","created_at");
+    const status=pick(item,"status","paid_status")||"-";
+    const bukti=pick(item,"bukti","bukti_pembayaran","file")||null;
+    const hargaNum=parseNumber(hargaRaw), jumlahNum=parseNumber(jumlahRaw);
+    const subtotal=hargaNum*jumlahNum; grandTotal+=subtotal;
+    const hargaFormatted=hargaNum?fmtCurrency(hargaNum):"-";
+    const subtotalFormatted=subtotal?fmtCurrency(subtotal):"-";
+    let tanggalFormatted="-"; if(tanggalRaw){ const d=new Date(tanggalRaw); if(!isNaN(d)) tanggalFormatted=d.toLocaleDateString("id-ID",{day:"2-digit",month:"long",year:"numeric"});}
+    const id=pick(item,"id","_id")||"";
+
+    // Row desktop
+    const row=document.createElement("tr");
+    row.innerHTML=`
+      <td>${escapeHtml(nama)}</td>
+      <td>${escapeHtml(jenis)}</td>
+      <td class="text-end">${hargaFormatted}</td>
+      <td class="text-center">${jumlahNum||"-"}</td>
+      <td class="text-end">${subtotalFormatted}</td>
+      <td>${escapeHtml(driver)}</td>
+      <td>${tanggalFormatted}</td>
+      <td>${status==="Paid"||status==="paid"||status===true?'<span class="badge bg-success">Paid</span>':'<span class="badge bg-danger">Belum Paid</span>'}</td>
+      <td>${bukti?`<button class="btn btn-sm btn-outline-primary" onclick="showBukti('${escapeAttr(bukti)}')">Lihat Bukti</button>`:`<input type="file" class="form-control form-control-sm" accept="image/*" onchange="uploadBukti('${id}',this)">`}</td>`;
+    tbody.appendChild(row);
+
+    // Card mobile
+    const card=document.createElement("div");
+    card.className="card mb-2 shadow-sm";
+    card.innerHTML=`
+      <div class="card-body p-2">
+        <h6 class="fw-bold mb-1">${escapeHtml(nama)} (${escapeHtml(jenis)})</h6>
+        <p class="mb-1">Harga: ${hargaFormatted}</p>
+        <p class="mb-1">Jumlah: ${jumlahNum} | Total: <strong>${subtotalFormatted}</strong></p>
+        <p class="mb-1">Driver: ${escapeHtml(driver)}</p>
+        <p class="mb-1">Tanggal: ${tanggalFormatted}</p>
+        <p class="mb-1">Status: ${status==="Paid"||status==="paid"||status===true?'<span class="badge bg-success">Paid</span>':'<span class="badge bg-danger">Belum Paid</span>'}</p>
+        <div>${bukti?`<button class="btn btn-sm btn-outline-primary" onclick="showBukti('${escapeAttr(bukti)}')">Lihat Bukti</button>`:`<input type="file" class="form-control form-control-sm mt-1" accept="image/*" onchange="uploadBukti('${id}',this)">`}</div>
+      </div>`;
+    tbodyMobile.appendChild(card);
+  });
+
+  totalJumlahEl.textContent=fmtCurrency(grandTotal);
+}
+
+form.addEventListener("submit",async e=>{
+  e.preventDefault();
+  const fd=new FormData();
+  const hargaNum=parseNumber(document.getElementById("hargaPertabung").value);
+  fd.append("nama_agen",form.namaAgen.value); fd.append("namaAgen",form.namaAgen.value);
+  fd.append("harga_pertabung",hargaNum); fd.append("hargaPertabung",hargaNum);
+  fd.append("jenis_tabung",form.jenisTabung.value); fd.append("jenisTabung",form.jenisTabung.value);
+  fd.append("nama_driver",form.namaDriver.value); fd.append("namaDriver",form.namaDriver.value);
+  fd.append("tanggal_pengiriman",form.tanggalPengiriman.value); fd.append("tanggalPengiriman",form.tanggalPengiriman.value);
+  fd.append("jumlah_tabung",form.jumlahTabung.value); fd.append("jumlahTabung",form.jumlahTabung.value); fd.append("jumlah_turun",form.jumlahTabung.value);
+  if(form.bukti.files.length>0) fd.append("bukti",form.bukti.files[0]);
+  try{ const res=await fetch(API_BASE,{method:"POST",body:fd}); if(!res.ok) throw new Error();
+    form.reset(); if(window.bootstrap){ const collapseEl=document.getElementById("formCollapse"); const bs=bootstrap.Collapse.getInstance(collapseEl)||new bootstrap.Collapse(collapseEl); bs.hide();}
+    loadData(); }catch(err){ alert("Terjadi kesalahan saat menyimpan data."); }
+});
+
+async function uploadBukti(id,input){
+  if(!id||input.files.length===0) return;
+  const fd=new FormData(); fd.append("bukti",input.files[0]);
+  try{ const res=await fetch(`${API_BASE}/${id}`,{method:"PUT",body:fd}); if(!res.ok) throw new Error(); input.value=""; loadData();}
+  catch(err){ alert("Upload bukti gagal.");}
+}
+
+function showBukti(url) {
+  // Tambahkan awalan '/uploads/' jika belum ada, untuk memastikan jalur benar
+  const fullUrl = url.startsWith('/uploads/') ? url : '/uploads/' + url;
+
+  const buktiPreview = document.getElementById("buktiPreview");
+  buktiPreview.src = fullUrl;
+  const modal = new bootstrap.Modal(document.getElementById("buktiModal"));
+  modal.show();
+}
+
+function escapeHtml(s){ if(s==null) return ""; return String(s).replace(/[&<>"']/g,c=>({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[c])); }
+function escapeAttr(s){ if(s==null) return ""; return String(s).replace(/"/g,'&quot;'); }
+
+loadData();
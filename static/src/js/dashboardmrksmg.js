@@ -0,0 +1,198 @@
+function showTab(tabId, element) {
+    document.querySelectorAll('.content-section').forEach(section => {
+        section.style.display = 'none';
+    });
+    const activeSection = document.getElementById(tabId + '-content');
+    activeSection.style.display = 'block';
+    document.querySelectorAll('.tab-button').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    element.classList.add('active');
+    const filterContainer = document.getElementById('filter-' + tabId);
+    if (filterContainer) {
+        filterReports(tabId, 'all', filterContainer.querySelector('.filter-button:first-child'));
+    }
+}
+
+function filterReports(tabId, reportType, element) {
+    const filterContainer = document.getElementById('filter-' + tabId);
+    filterContainer.querySelectorAll('.filter-button').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    element.classList.add('active');
+    const reportsContainer = document.getElementById(tabId + '-content').querySelector('.reports-container');
+    if (reportsContainer) {
+        reportsContainer.querySelectorAll('.report-card').forEach(card => {
+            if (reportType === 'all' || card.getAttribute('data-report-type') === reportType) {
+                card.style.display = 'flex';
+            } else {
+                card.style.display = 'none';
+            }
+        });
+    }
+}
+
+function showMediaPreview(fileSrc) {
+    const modal = new bootstrap.Modal(document.getElementById('mediaPreviewModal'));
+    const img = document.getElementById('previewImage');
+    const vid = document.getElementById('previewVideo');
+    const vidSrc = document.getElementById('previewVideoSource');
+    img.classList.add("d-none");
+    vid.classList.add("d-none");
+    vid.pause();
+    vid.currentTime = 0;
+    const fileExtension = fileSrc.split('.').pop().toLowerCase();
+    if (['jpg', 'jpeg', 'png', 'gif', 'webp'].includes(fileExtension)) {
+        img.src = fileSrc;
+        img.classList.remove("d-none");
+    } else if (['mp4', 'mov', 'webm', 'avi'].includes(fileExtension)) {
+        vidSrc.src = fileSrc;
+        vid.load();
+        vid.classList.remove("d-none");
+    }
+    document.getElementById('downloadLink').href = fileSrc;
+    modal.show();
+}
+
+function toggleDetails(element) {
+    const cardContent = element.closest('.card-content');
+    const details = cardContent.querySelector('.detail-section');
+    const isExpanded = details.classList.contains('expanded');
+    if (isExpanded) {
+        details.classList.remove('expanded');
+        element.innerText = 'Lihat Detail';
+    } else {
+        details.classList.add('expanded');
+        element.innerText = 'Tutup Detail';
+    }
+}
+
+function confirmDeletion(reportId) {
+    const deleteModal = new bootstrap.Modal(document.getElementById('deleteConfirmModal'));
+    const confirmBtn = document.getElementById('confirmDeleteBtn');
+    
+    // Hapus event listener lama jika ada
+    confirmBtn.onclick = null;
+    
+    // Tambahkan event listener baru untuk ID yang sesuai
+    confirmBtn.onclick = function() {
+        // Panggil fungsi atau endpoint backend untuk menghapus data
+        window.location.href = '/hapus_laporan/' + reportId;
+    };
+    
+    deleteModal.show();
+}
+
+// ================== FEED LIVE (SSE) ==================
+// Laporan baru didorong server lewat /api/laporan/stream dan ditambahkan
+// di atas daftar, jadi halaman tidak perlu di-refresh.
+const LIVE_DISPLAY_FIELDS = window.DASHBOARD_CONFIG.displayFields;
+const LIVE_FILE_FIELDS = {
+    video_kiri: 'Video Kiri', video_kanan: 'Video Kanan', foto_spa: 'Foto SPA',
+    media: 'Lihat Media', verifikasi_barang: 'Verifikasi Barang'
+};
+
+function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
+
+function buildReportCard(row) {
+    const card = el('div', 'report-card');
+    card.dataset.reportType = row.jenis;
+    card.dataset.reportId = row.id;
+
+    const header = el('div', 'card-header');
+    header.append(el('span', 'report-id', 'Baru'), el('span', 'report-type', row.jenis));
+
+    const content = el('div', 'card-content');
+    const summary = el('div', 'summary-info');
+    summary.append(
+        el('span', 'tanggal', row.tanggal || ''),
+        el('span', 'driver', row.nama_driver || 'Driver Tidak Ditemukan')
+    );
+
+    const detail = el('div', 'detail-section');
+    const grid = el('div', 'info-grid');
+    (LIVE_DISPLAY_FIELDS[row.jenis] || []).forEach(field => {
+        if (row[field] === undefined) return;
+        const item = el('div', 'info-item');
+        const label = field.replace(/_/g, ' ');
+        item.append(
+            el('div', 'info-label', label.charAt(0).toUpperCase() + label.slice(1)),
+            el('div', 'info-value', row[field])
+        );
+        grid.append(item);
+    });
+    const files = el('div', 'files-grid');
+    Object.entries(LIVE_FILE_FIELDS).forEach(([field, label]) => {
+        if (!row[field]) return;
+        const btn = el('button', 'file-btn', label);
+        btn.onclick = () => showMediaPreview(row[field]);
+        files.append(btn);
+    });
+    const filesSection = el('div', 'files-section');
+    filesSection.append(el('div', 'files-title', 'File Terlampir'), files);
+    detail.append(grid, filesSection);
+
+    const toggle = el('button', 'toggle-btn', 'Lihat Detail');
+    toggle.onclick = () => toggleDetails(toggle);
+
+    content.append(summary, detail, toggle);
+    card.append(header, content);
+    return card;
+}
+
+function appendLiveReport(row) {
+    const lokasi = row.lokasi === 'semarang' ? 'semarang' : 'merak';
+    const section = document.getElementById(lokasi + '-content');
+    let container = section.querySelector('.reports-container');
+    if (!container) {
+        const empty = section.querySelector('.empty-state');
+        if (empty) empty.remove();
+        container = el('div', 'reports-container');
+        section.append(container);
+    }
+    // Bisa terkirim dua kali (render halaman + feed), cukup tampil sekali
+    const duplicate = Array.from(container.querySelectorAll('.report-card')).some(
+        card => card.dataset.reportId == row.id && card.dataset.reportType === row.jenis
+    );
+    if (duplicate) return;
+
+    container.prepend(buildReportCard(row));
+    ['stat-' + lokasi, 'stat-total'].forEach(id => {
+        const stat = document.getElementById(id);
+        stat.textContent = parseInt(stat.textContent, 10) + 1;
+    });
+}
+
+function startLiveFeed() {
+    if (!window.EventSource) return;
+    const source = new EventSource('/api/laporan/stream?last_event_id=' + encodeURIComponent(window.DASHBOARD_CONFIG.lastEventId));
+    source.addEventListener('laporan', e => appendLiveReport(JSON.parse(e.data)));
+    // Riwayat di server sudah habis: beri tahu saja, jangan reload otomatis
+    source.addEventListener('reset', showFeedNotice);
+}
+
+function showFeedNotice() {
+    if (document.getElementById('live-feed-notice')) return;
+    const notice = document.createElement('div');
+    notice.id = 'live-feed-notice';
+    notice.className = 'alert alert-warning';
+    notice.innerHTML = 'Sebagian laporan live terlewat. <a href="" class="alert-link">Muat ulang</a> untuk melihat semuanya.';
+    const stats = document.querySelector('.stats-overview');
+    stats.parentNode.insertBefore(notice, stats);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.getElementById('semarang-content').style.display = 'none';
+    
+    startLiveFeed();
+
+    const initialTab = document.querySelector('.tab-button.active');
+    if (initialTab) {
+        showTab(initialTab.getAttribute('onclick').match(/'([^']*)'/)[1], initialTab);
+    }
+});
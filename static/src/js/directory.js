@@ -0,0 +1,123 @@
+// ================== TABEL DIREKTORI (PER HALAMAN DARI SERVER) ==================
+// Dipakai karyawan.js dan users.js. Satu halaman diambil dari API daftar
+// (/api/karyawan, /api/users) dengan q, sort, order, page dan per_page;
+// pencarian dan urutan dikerjakan database, jadi halaman tidak pernah
+// memuat seluruh data. Request lama dibatalkan kalau filter berubah lagi.
+
+// Buat elemen tanpa innerHTML (data dari server selalu lewat textContent)
+function h(tag, props, ...children) {
+  const node = document.createElement(tag);
+  Object.entries(props || {}).forEach(([key, value]) => {
+    if (value === undefined || value === null) return;
+    if (key.startsWith('on')) node.addEventListener(key.slice(2), value);
+    else if (key === 'className') node.className = value;
+    else node.setAttribute(key, value);
+  });
+  children.flat().forEach(child => {
+    if (child === null || child === undefined || child === false) return;
+    node.append(child instanceof Node ? child : document.createTextNode(String(child)));
+  });
+  return node;
+}
+
+function csvCell(value) {
+  return '"' + String(value === null || value === undefined ? '' : value).replace(/"/g, '""') + '"';
+}
+
+function downloadCsv(filename, header, rows) {
+  const lines = [header.map(csvCell).join(',')].concat(rows.map(r => r.map(csvCell).join(',')));
+  const blob = new Blob([lines.join('\n')], { type: 'text/csv;charset=utf-8;' });
+  const url = URL.createObjectURL(blob);
+  const a = h('a', { href: url, download: filename });
+  document.body.appendChild(a);
+  a.click();
+  document.body.removeChild(a);
+  URL.revokeObjectURL(url);
+}
+
+// options: url, table, tbody, sort (kolom awal), filters() -> {q, ...},
+//          renderRow(item) -> <tr>, emptyText, ids {start, end, total, page, pages, prev, next}
+function createDirectory(options) {
+  const SEARCH_DELAY = 250;   // ms, tunggu user berhenti mengetik
+  const EXPORT_PAGE = 100;    // = DIRECTORY_MAX_PER_PAGE di server
+  const perPage = parseInt(options.tbody.dataset.perPage, 10) || 25;
+  const state = { page: 1, pages: 1, sort: options.sort, order: 'asc' };
+  const $ = id => document.getElementById(id);
+  let controller = null;
+  let timer = null;
+
+  function query(page, size) {
+    const params = new URLSearchParams({ sort: state.sort, order: state.order, page, per_page: size });
+    Object.entries(options.filters()).forEach(([key, value]) => { if (value) params.set(key, value); });
+    return `${options.url}?${params}`;
+  }
+
+  async function fetchJson(url, signal) {
+    const res = await fetch(url, { credentials: 'same-origin', headers: { Accept: 'application/json' }, signal });
+    if (!res.ok) throw new Error('HTTP ' + res.status);
+    return res.json();
+  }
+
+  function message(text) {
+    options.tbody.replaceChildren(h('tr', {}, h('td', { colspan: 6, className: 'text-center py-5 text-muted' }, text)));
+  }
+
+  function render(data) {
+    if (data.items.length) options.tbody.replaceChildren(...data.items.map(options.renderRow));
+    else message(options.emptyText);
+    const start = data.total ? (data.halaman - 1) * data.per_halaman + 1 : 0;
+    $(options.ids.start).textContent = start;
+    $(options.ids.end).textContent = data.total ? start + data.items.length - 1 : 0;
+    $(options.ids.total).textContent = data.total;
+    $(options.ids.page).textContent = data.halaman;
+    $(options.ids.pages).textContent = data.jumlah_halaman;
+    $(options.ids.prev).disabled = data.halaman <= 1;
+    $(options.ids.next).disabled = data.halaman >= data.jumlah_halaman;
+    options.table.querySelectorAll('th.sortable').forEach(th => {
+      const active = th.dataset.sort === state.sort;
+      th.classList.toggle('active', active);
+      const icon = th.querySelector('.sort-icon');
+      if (icon) icon.className = 'fas sort-icon ' + (!active ? 'fa-sort' : state.order === 'asc' ? 'fa-sort-up' : 'fa-sort-down');
+    });
+  }
+
+  async function load(page) {
+    if (controller) controller.abort();
+    controller = new AbortController();
+    try {
+      const data = await fetchJson(query(page, perPage), controller.signal);
+      state.page = data.halaman;
+      state.pages = data.jumlah_halaman;
+      render(data);
+    } catch (err) {
+      if (err.name !== 'AbortError') message('Gagal memuat data: ' + err.message);
+    }
+  }
+
+  function reload() {
+    clearTimeout(timer);
+    timer = setTimeout(() => load(1), SEARCH_DELAY);
+  }
+
+  // Semua baris yang cocok dengan filter sekarang (untuk export), per 100
+  async function all() {
+    const items = [];
+    for (let page = 1; ; page++) {
+      const data = await fetchJson(query(page, EXPORT_PAGE));
+      items.push(...data.items);
+      if (page >= data.jumlah_halaman) return items;
+    }
+  }
+
+  options.table.querySelectorAll('th.sortable').forEach(th => {
+    th.addEventListener('click', () => {
+      state.order = state.sort === th.dataset.sort && state.order === 'asc' ? 'desc' : 'asc';
+      state.sort = th.dataset.sort;
+      load(1);
+    });
+  });
+  $(options.ids.prev).addEventListener('click', () => { if (state.page > 1) load(state.page - 1); });
+  $(options.ids.next).addEventListener('click', () => { if (state.page < state.pages) load(state.page + 1); });
+
+  return { load, reload, all, state };
+}
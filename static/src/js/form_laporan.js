@@ -0,0 +1,228 @@
+// Mapping field ke backend
+const nameMapping = {
+  "Nama Driver": "nama_driver",
+  "Tanggal": "tanggal",
+  "Rit (trip ke berapa)": "rit",
+  "Jam Masuk": "jam_masuk",
+  "Jam Keluar": "jam_keluar",
+  "Jumlah SPA": "jumlah_spa",
+  "Upload Foto SPA": "foto_spa",
+  "Petugas Loading": "petugas_loading",
+  "Catatan": "catatan",
+  "Upload Foto": "media",
+  "Penanggung Jawab": "penanggung_jawab",
+  "Jam Mulai": "jam_mulai",
+  "Jam Mulai Bongkar": "jam_mulai",
+  "Shift": "shift",
+  "Netto SPA": "netto_spa",
+  "Rotogen Kanan": "rotogen_kanan",
+  "Rotogen Kiri": "rotogen_kiri",
+  "Upload Video Kiri": "video_kiri",
+  "Upload Video Kanan": "video_kanan",
+  "Jam Selesai": "jam_selesai",
+  "Kepala Produksi": "kepala_produksi",
+  "Jumlah Tabung Kosong": "tabung_kosong",
+  "Jumlah Tabung 12KG": "tabung_12",
+  "Jumlah Tabung 50KG": "tabung_50",
+  "Keterangan": "keterangan",
+  "Plat Mobil": "plat_mobil",
+  "Jam Berangkat": "jam_berangkat",
+  "Kapasitas Kendaraan": "kapasitas",
+  "Jenis Tabung": "jenis_tabung",
+  "Jumlah Tabung Dibawah": "jumlah_dibawa",
+  "Jumlah Tabung Turun": "jumlah_turun",
+  "Tujuan": "tujuan",
+  "Alamat Pengirim": "alamat",
+  "Kondisi Tabung": "kondisi_tabung",
+  "Upload Foto / Verifikasi Barang": "verifikasi_barang",
+  "Jam Bongkar": "jam_bongkar",
+  "Jumlah Tabung Terbawa": "jumlah_terbawa",
+  "Sisa Tabung Dibawah Pulang (Isi)": "sisa_dibawa",
+  "Jumlah Tabung Kosong Pulang": "jumlah_kosong",
+  "Nama Pangkalan": "nama_pangkalan",
+  "Alamat Pangkalan": "alamat_pangkalan",
+  "Catatan / Keterangan": "catatan",
+  "Upload Foto / Video Verifikasi": "media"
+};
+
+// Endpoint mapping
+const endpointMapping = {
+  "Skid Masuk Depot": "/skid-masuk-depot",
+  "Skid Keluar Depot": "/skid-keluar-depot",
+  "Skid Masuk Laut": "/skid-masuk-laut",
+  "Skid Keluar Laut": "/skid-keluar-laut",
+  "Skid Masuk Lumbung": "/skid-masuk-lumbung",
+  "Skid Keluar Lumbung": "/skid-keluar-lumbung",
+  "Sebelum Loading": "/sebelum-loading",
+  "Sesudah Loading": "/sesudah-loading",
+  "Produksi Mulai": "/produksi-mulai",
+  "Produksi Selesai": "/produksi-selesai",
+  "Laporan Kirim": (lokasi) => `/laporan/kirim-${lokasi}`,
+  "Laporan Bongkar": (lokasi) => `/laporan/bongkar-${lokasi}`
+};
+
+// Config field per lokasi - DIPERBAIKI SESUAI PERMINTAAN
+const formConfig = {
+  merak: {
+    "Skid Masuk Depot": ["Nama Driver", "Tanggal", "Rit (trip ke berapa)", "Jam Masuk"],
+    "Skid Keluar Depot": ["Nama Driver", "Tanggal", "Jam Keluar", "Jumlah SPA", "Upload Foto SPA"],
+    "Skid Masuk Laut": ["Nama Driver", "Tanggal", "Jam Masuk", "Petugas Loading"],
+    "Skid Keluar Laut": ["Nama Driver", "Tanggal", "Jam Keluar", "Catatan", "Upload Foto"],
+    "Sebelum Loading": ["Penanggung Jawab", "Tanggal", "Nama Driver", "Jam Mulai", "Netto SPA", "Rotogen Kanan", "Rotogen Kiri", "Upload Video Kiri", "Upload Video Kanan"],
+    "Sesudah Loading": ["Penanggung Jawab", "Tanggal", "Jam Selesai", "Upload Video Kiri", "Upload Video Kanan"],
+    "Produksi Mulai": ["Kepala Produksi", "Tanggal", "Nama Driver", "Jam Mulai Bongkar", "Shift"],
+    "Produksi Selesai": ["Kepala Produksi", "Tanggal", "Jam Selesai", "Jumlah Tabung Kosong", "Jumlah Tabung 12KG", "Jumlah Tabung 50KG", "Keterangan"],
+    "Laporan Kirim": ["Tanggal", "Nama Driver", "Plat Mobil", "Jam Berangkat", "Kapasitas Kendaraan", "Jenis Tabung", "Jumlah Tabung Dibawah", "Jumlah Tabung Turun", "Tujuan", "Alamat Pengirim", "Kondisi Tabung", "Keterangan", "Upload Foto / Verifikasi Barang"],
+    "Laporan Bongkar": ["Tanggal", "Nama Driver", "Jam Bongkar", "Jenis Tabung", "Jumlah Tabung Terbawa", "Jumlah Tabung Turun", "Sisa Tabung Dibawah Pulang (Isi)", "Jumlah Tabung Kosong Pulang", "Kondisi Tabung", "Nama Pangkalan", "Alamat Pangkalan", "Catatan / Keterangan", "Upload Foto / Video Verifikasi"]
+  },
+  semarang: {
+    "Skid Masuk Lumbung": ["Nama Driver", "Tanggal", "Jam Masuk", "Petugas Loading"],
+    "Skid Keluar Lumbung": ["Nama Driver", "Tanggal", "Jam Keluar", "Catatan", "Upload Foto"],
+    "Sebelum Loading": ["Penanggung Jawab", "Tanggal", "Nama Driver", "Jam Mulai", "Netto SPA", "Rotogen Kanan", "Rotogen Kiri", "Upload Video Kiri", "Upload Video Kanan"],
+    "Sesudah Loading": ["Penanggung Jawab", "Tanggal", "Jam Selesai", "Upload Video Kiri", "Upload Video Kanan"],
+    "Produksi Mulai": ["Kepala Produksi", "Tanggal", "Nama Driver", "Jam Mulai Bongkar", "Shift"],
+    "Produksi Selesai": ["Kepala Produksi", "Tanggal", "Jam Selesai", "Jumlah Tabung Kosong", "Jumlah Tabung 12KG", "Jumlah Tabung 50KG", "Keterangan"],
+    "Laporan Kirim": ["Tanggal", "Nama Driver", "Plat Mobil", "Jam Berangkat", "Kapasitas Kendaraan", "Jenis Tabung", "Jumlah Tabung Dibawah", "Jumlah Tabung Turun", "Tujuan", "Alamat Pengirim", "Kondisi Tabung", "Keterangan", "Upload Foto / Verifikasi Barang"],
+    "Laporan Bongkar": ["Tanggal", "Nama Driver", "Jam Bongkar", "Jenis Tabung", "Jumlah Tabung Terbawa", "Jumlah Tabung Turun", "Sisa Tabung Dibawah Pulang (Isi)", "Jumlah Tabung Kosong Pulang", "Kondisi Tabung", "Nama Pangkalan", "Alamat Pangkalan", "Catatan / Keterangan", "Upload Foto / Video Verifikasi"]
+  }
+};
+
+const lokasiSelect = document.getElementById("lokasi");
+const jenisSelect = document.getElementById("jenis");
+const formContainer = document.getElementById("formContainer");
+
+lokasiSelect.addEventListener("change", () => {
+  jenisSelect.innerHTML = '<option value="">-- Pilih Jenis --</option>';
+  formContainer.innerHTML = "";
+  if (lokasiSelect.value) {
+    Object.keys(formConfig[lokasiSelect.value]).forEach(jenis => {
+      const opt = document.createElement("option");
+      opt.value = jenis;
+      opt.textContent = jenis;
+      jenisSelect.appendChild(opt);
+    });
+  }
+});
+
+jenisSelect.addEventListener("change", () => {
+  formContainer.innerHTML = "";
+  if (jenisSelect.value) {
+    const fields = formConfig[lokasiSelect.value][jenisSelect.value];
+    fields.forEach(field => {
+      let inputType = "text";
+      if (field.toLowerCase().includes("tanggal")) inputType = "date";
+      if (field.toLowerCase().includes("jam")) inputType = "time";
+      if (field.toLowerCase().includes("upload")) inputType = "file";
+
+      const nameAttr = nameMapping[field] || field.toLowerCase().replace(/\s+/g, "_");
+
+      const wrapper = document.createElement("div");
+      wrapper.className = "form-group";
+
+      const label = document.createElement("label");
+      label.className = "form-label";
+      label.textContent = field;
+
+      wrapper.appendChild(label);
+
+      if (field.toLowerCase().includes("catatan") || field.toLowerCase().includes("keterangan")) {
+        const textarea = document.createElement("textarea");
+        textarea.className = "form-control";
+        textarea.name = nameAttr;
+        textarea.required = true;
+        wrapper.appendChild(textarea);
+      } else {
+        const input = document.createElement("input");
+        input.type = inputType;
+        input.className = "form-control";
+        input.name = nameAttr;
+        input.required = true;
+        wrapper.appendChild(input);
+      }
+
+      const error = document.createElement("div");
+      error.className = "error-text";
+      error.textContent = field + " wajib diisi.";
+      wrapper.appendChild(error);
+
+      formContainer.appendChild(wrapper);
+    });
+  }
+});
+
+// Submit ke backend FastAPI + validasi
+document.getElementById("formLaporan").addEventListener("submit", function(e) {
+  e.preventDefault();
+  let valid = true;
+
+  // validasi dropdown
+  if (!lokasiSelect.value) {
+    document.getElementById("lokasiError").style.display = "block";
+    valid = false;
+  } else {
+    document.getElementById("lokasiError").style.display = "none";
+  }
+
+  if (!jenisSelect.value) {
+    document.getElementById("jenisError").style.display = "block";
+    valid = false;
+  } else {
+    document.getElementById("jenisError").style.display = "none";
+  }
+
+  // validasi input dinamis - SEMUA FIELD WAJIB DIISI
+  const inputs = formContainer.querySelectorAll("input, textarea, select");
+  inputs.forEach(input => {
+    const errorText = input.parentElement.querySelector(".error-text");
+
+    if (input.type === "file") {
+      if (input.files.length === 0) {
+        errorText.style.display = "block";
+        valid = false;
+      } else {
+        errorText.style.display = "none";
+      }
+    } else {
+      if (input.value.trim() === "") {
+        errorText.style.display = "block";
+        valid = false;
+      } else {
+        errorText.style.display = "none";
+      }
+    }
+  });
+
+  if (!valid) return;
+
+  const lokasi = lokasiSelect.value;
+  const jenis = jenisSelect.value;
+  const formData = new FormData(this);
+
+  let endpoint = endpointMapping[jenis];
+  if (typeof endpoint === "function") {
+    endpoint = endpoint(lokasi);
+  }
+
+  // Lewat outbox: kalau offline laporan disimpan di perangkat dan dikirim ulang otomatis
+  LaporanOutbox.submit(endpoint, formData).then(result => {
+    if (result.state === "gagal") {
+      alert("Terjadi kesalahan saat menyimpan!");
+      return;
+    }
+    if (result.state === "antri") {
+      alert("Tidak bisa terhubung ke server. Data disimpan di perangkat dan dikirim otomatis saat online.");
+    } else {
+      alert("Data berhasil disimpan!");
+    }
+      
+    // Reset semua form
+    lokasiSelect.value = "";
+    jenisSelect.innerHTML = '<option value="">-- Pilih Jenis --</option>';
+    formContainer.innerHTML = "";
+      
+    // Focus kembali ke dropdown lokasi
+    lokasiSelect.focus();
+  }).catch(err => {
+    alert("Network error: " + err.message);
+  });
+});
@@ -0,0 +1,53 @@
+// Counter Animation for Statistics
+function animateCounters() {
+    const counters = document.querySelectorAll('.stat-number');
+
+    counters.forEach(counter => {
+        const target = parseInt(counter.getAttribute('data-target')) || 0;
+        const duration = 2000;
+        const increment = target / (duration / 16);
+        let current = 0;
+
+        const timer = setInterval(() => {
+            current += increment;
+            if (current >= target) {
+                counter.textContent = target.toLocaleString('id-ID');
+                clearInterval(timer);
+            } else {
+                counter.textContent = Math.floor(current).toLocaleString('id-ID');
+            }
+        }, 16);
+    });
+}
+
+// Mini Chart Simulation
+function createMiniCharts() {
+    const charts = document.querySelectorAll('.mini-chart');
+
+    charts.forEach(chart => {
+        const canvas = document.createElement('canvas');
+        canvas.width = 60;
+        canvas.height = 40;
+        chart.appendChild(canvas);
+
+        const ctx = canvas.getContext('2d');
+
+        // Simple line chart
+        ctx.strokeStyle = '#3b82f6';
+        ctx.lineWidth = 2;
+
+        ctx.beginPath();
+        ctx.moveTo(0, 30);
+        ctx.lineTo(15, 25);
+        ctx.lineTo(30, 15);
+        ctx.lineTo(45, 20);
+        ctx.lineTo(60, 10);
+        ctx.stroke();
+    });
+}
+
+// Initialize on page load
+document.addEventListener('DOMContentLoaded', function() {
+    setTimeout(animateCounters, 500);
+    createMiniCharts();
+});
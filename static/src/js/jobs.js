@@ -0,0 +1,89 @@
+// ================== DASHBOARD ANTRIAN JOB ==================
+// Angka diambil dari /api/jobs setiap data-refresh ms (default 5 detik);
+// tombol "Ulang" memasukkan lagi job gagal lewat /api/jobs/{id}/ulang.
+(function () {
+  const summary = document.getElementById('summary');
+  const REFRESH = parseInt(summary.dataset.refresh, 10) || 5000;
+  const $ = id => document.getElementById(id);
+
+  function h(tag, props, ...children) {
+    const node = document.createElement(tag);
+    Object.entries(props || {}).forEach(([key, value]) => {
+      if (key.startsWith('on')) node.addEventListener(key.slice(2), value);
+      else if (key === 'className') node.className = value;
+      else node.setAttribute(key, value);
+    });
+    children.flat().forEach(child => {
+      if (child === null || child === undefined) return;
+      node.append(child instanceof Node ? child : document.createTextNode(String(child)));
+    });
+    return node;
+  }
+
+  function ms(value) {
+    if (value >= 60000) return (value / 60000).toFixed(1) + ' mnt';
+    if (value >= 1000) return (value / 1000).toFixed(1) + ' dtk';
+    return Math.round(value) + ' ms';
+  }
+
+  function seconds(value) {
+    return value ? ms(value * 1000) : '-';
+  }
+
+  function render(data) {
+    const q = data.antrian;
+    $('statSiap').textContent = q.siap;
+    $('statTerjadwal').textContent = q.terjadwal;
+    $('statJalan').textContent = q.jalan;
+    $('statGagal').textContent = q.gagal;
+    $('statTunggu').textContent = seconds(q.tunggu_terlama_detik);
+    $('statThroughput').textContent = data.latensi.per_menit;
+
+    const tasks = Object.entries(data.task);
+    $('taskBody').replaceChildren(...(tasks.length ? tasks.map(([name, t]) => h('tr', {},
+      h('td', { className: 'fw-semibold' }, name),
+      h('td', {}, t.antri), h('td', {}, t.jalan), h('td', {}, t.selesai),
+      h('td', { className: t.gagal ? 'text-danger' : '' }, t.gagal),
+      h('td', {}, `${ms(t.tunggu.p50_ms)} / ${ms(t.tunggu.p95_ms)}`),
+      h('td', {}, `${ms(t.durasi.p50_ms)} / ${ms(t.durasi.p95_ms)}`)
+    )) : [h('tr', {}, h('td', { colspan: 7, className: 'text-center text-muted py-4' }, 'Belum ada job'))]));
+
+    const workers = Object.entries(data.worker);
+    $('workerList').replaceChildren(...(workers.length ? workers.map(([name, n]) =>
+      h('li', { className: 'list-group-item d-flex justify-content-between' }, h('code', {}, name), `${n} job`)
+    ) : [h('li', { className: 'list-group-item text-muted' }, 'Tidak ada job yang sedang jalan')]));
+
+    $('cronList').replaceChildren(...data.cron.map(c =>
+      h('li', { className: 'list-group-item d-flex justify-content-between' },
+        h('span', {}, h('code', {}, c.jadwal), ' ', c.task),
+        h('span', { className: 'text-muted small' }, c.berikutnya.replace('T', ' ')))
+    ));
+
+    $('failedBody').replaceChildren(...(data.gagal_terakhir.length ? data.gagal_terakhir.map(job => h('tr', {},
+      h('td', {}, job.id),
+      h('td', {}, job.name),
+      h('td', {}, job.attempts),
+      h('td', {}, h('pre', { className: 'job-error' }, (job.error || '').trim().split('\n').slice(-3).join('\n'))),
+      h('td', {}, h('button', { className: 'btn btn-outline-primary btn-sm', onclick: () => retry(job.id) }, 'Ulang'))
+    )) : [h('tr', {}, h('td', { colspan: 5, className: 'text-center text-muted py-4' }, 'Tidak ada job gagal'))]));
+
+    $('updatedAt').textContent = new Date().toLocaleTimeString('id-ID');
+  }
+
+  async function load() {
+    try {
+      const res = await fetch('/api/jobs', { credentials: 'same-origin', headers: { Accept: 'application/json' } });
+      if (res.ok) render(await res.json());
+    } catch (err) {
+      $('updatedAt').textContent = 'gagal memuat (' + err.message + ')';
+    }
+  }
+
+  async function retry(id) {
+    await fetch(`/api/jobs/${id}/ulang`, { method: 'POST', credentials: 'same-origin' });
+    load();
+  }
+
+  load();
+  setInterval(() => { if (!document.hidden) load(); }, REFRESH);
+})();
@@ -0,0 +1,94 @@
+// Edit Karyawan Function
+function editKaryawan(id, nik, nama, jabatan, kontak, keterangan) {
+    document.getElementById('formTitle').innerHTML = '<i class="fas fa-user-edit me-2"></i>Edit Karyawan';
+    document.getElementById('edit_id').value = id;
+    document.getElementById('nik').value = nik || '';
+    document.getElementById('nama').value = nama || '';
+    document.getElementById('jabatan').value = jabatan || '';
+    document.getElementById('kontak').value = kontak || '';
+    document.getElementById('keterangan').value = keterangan || '';
+    
+    const submitBtn = document.getElementById('submitBtn');
+    submitBtn.innerHTML = '<i class="fas fa-save me-1"></i>Update Karyawan';
+    submitBtn.classList.remove('btn-primary');
+    submitBtn.classList.add('btn-warning');
+    
+    // Scroll to form
+    document.querySelector('.card').scrollIntoView({ behavior: 'smooth' });
+}
+
+// Reset Form Function
+function resetForm() {
+    document.getElementById('formTitle').innerHTML = '<i class="fas fa-user-plus me-2"></i>Form Tambah Karyawan';
+    document.getElementById('edit_id').value = '';
+    document.getElementById('nik').value = '';
+    document.getElementById('nama').value = '';
+    document.getElementById('jabatan').value = '';
+    document.getElementById('kontak').value = '';
+    document.getElementById('keterangan').value = '';
+    
+    const submitBtn = document.getElementById('submitBtn');
+    submitBtn.innerHTML = '<i class="fas fa-plus me-1"></i>Tambah Karyawan';
+    submitBtn.classList.remove('btn-warning');
+    submitBtn.classList.add('btn-primary');
+}
+
+// Satu baris tabel (sama dengan markup lama di template)
+function renderKaryawan(k) {
+    const dash = () => h('span', { className: 'text-muted' }, '-');
+    const keterangan = k.keterangan || '';
+    return h('tr', { className: 'employee-row' },
+        h('td', {}, h('span', { className: 'id-badge' }, k.nik || '-')),
+        h('td', {}, h('div', { className: 'employee-info' },
+            h('div', { className: 'employee-avatar' }, k.nama ? k.nama[0].toUpperCase() : 'K'),
+            h('div', { className: 'employee-details' },
+                h('div', { className: 'employee-name' }, k.nama || '-'),
+                h('small', { className: 'text-muted' }, 'Karyawan')))),
+        h('td', {}, k.jabatan
+            ? h('span', { className: 'position-badge' }, h('i', { className: 'fas fa-briefcase me-1' }), k.jabatan)
+            : dash()),
+        h('td', {}, k.kontak
+            ? h('div', { className: 'contact-info' }, h('i', { className: 'fas fa-phone me-1 text-muted' }), h('span', {}, k.kontak))
+            : dash()),
+        h('td', {}, keterangan
+            ? h('div', { className: 'keterangan-text', title: keterangan },
+                keterangan.length > 50 ? keterangan.slice(0, 50) + '...' : keterangan)
+            : dash()),
+        h('td', { className: 'text-center' }, h('div', { className: 'action-buttons' },
+            h('button', {
+                type: 'button', className: 'btn btn-sm btn-outline-primary', title: 'Edit Karyawan',
+                onclick: () => editKaryawan(k.id, k.nik, k.nama, k.jabatan, k.kontak, k.keterangan),
+            }, h('i', { className: 'fas fa-edit' })),
+            h('a', {
+                href: `/karyawan/hapus/${k.id}`, className: 'btn btn-sm btn-outline-danger', title: 'Hapus Karyawan',
+                onclick: e => { if (!confirm(`Apakah Anda yakin ingin menghapus karyawan ${k.nama}?`)) e.preventDefault(); },
+            }, h('i', { className: 'fas fa-trash-alt' })))));
+}
+
+let directory = null;
+
+// Export Function: semua karyawan yang cocok dengan pencarian, bukan hanya halaman ini
+async function exportData() {
+    const items = await directory.all();
+    downloadCsv('data_karyawan_spbe_' + new Date().toISOString().slice(0,10) + '.csv',
+        ['NIK', 'Nama', 'Jabatan', 'Kontak', 'Keterangan'],
+        items.map(k => [k.nik, k.nama, k.jabatan, k.kontak, k.keterangan]));
+}
+
+// Event Listeners
+document.addEventListener('DOMContentLoaded', function() {
+    const tbody = document.getElementById('employeeTableBody');
+    directory = createDirectory({
+        url: '/api/karyawan',
+        table: tbody.closest('table'),
+        tbody,
+        sort: 'nama',
+        filters: () => ({ q: document.getElementById('searchInput').value.trim() }),
+        renderRow: renderKaryawan,
+        emptyText: 'Belum ada data karyawan',
+        ids: { start: 'showingStart', end: 'showingEnd', total: 'totalCount', page: 'currentPageSpan',
+               pages: 'totalPagesSpan', prev: 'prevBtn', next: 'nextBtn' },
+    });
+    document.getElementById('searchInput').addEventListener('input', directory.reload);
+    directory.load(1);
+});
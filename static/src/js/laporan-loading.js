@@ -0,0 +1,156 @@
+const dropdown = document.getElementById('jenis_laporan');
+const allForms = document.querySelectorAll('#form-sebelum, #form-sesudah');
+
+// Tampilkan form sesuai pilihan dropdown
+dropdown.addEventListener('change', () => {
+  allForms.forEach(f => f.classList.add('hidden'));
+  if (dropdown.value) {
+    document.getElementById(dropdown.value).classList.remove('hidden');
+  }
+});
+
+// Auto-isi tanggal & jam sekarang
+function formatTwoDigits(num) {
+  return num < 10 ? '0' + num : num;
+}
+
+function setInitialDateTime() {
+  const now = new Date();
+  const year = now.getFullYear();
+  const month = formatTwoDigits(now.getMonth() + 1);
+  const day = formatTwoDigits(now.getDate());
+  const hours = formatTwoDigits(now.getHours());
+  const minutes = formatTwoDigits(now.getMinutes());
+
+  document.querySelectorAll('.tanggal').forEach(el => el.value = `${year}-${month}-${day}`);
+  document.querySelectorAll('.jam').forEach(el => el.value = `${hours}:${minutes}`);
+}
+
+setInitialDateTime();
+
+// ================== UPLOAD VIDEO BERTAHAP ==================
+// Video dikirim per potongan ke /api/uploads supaya kalau sinyal putus
+// upload bisa dilanjutkan dari offset terakhir, bukan dari awal.
+const CHUNK_SIZE = 1024 * 1024; // 1 MB
+const MAX_RETRY = 8;
+
+function uploadKey(file) {
+  return `upload:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+function sleep(ms) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+async function getOrCreateUpload(file) {
+  // Lanjutkan upload lama kalau file yang sama pernah dikirim sebagian
+  const savedId = localStorage.getItem(uploadKey(file));
+  if (savedId) {
+    const res = await fetch(`/api/uploads/${savedId}`, { method: 'HEAD' });
+    if (res.ok) {
+      return { id: savedId, offset: parseInt(res.headers.get('Upload-Offset'), 10) };
+    }
+    localStorage.removeItem(uploadKey(file));
+  }
+
+  const fd = new FormData();
+  fd.append('filename', file.name);
+  fd.append('length', file.size);
+  fd.append('folder', 'loading');
+  const res = await fetch('/api/uploads', { method: 'POST', body: fd });
+  if (!res.ok) throw new Error('Gagal memulai upload');
+  const data = await res.json();
+  localStorage.setItem(uploadKey(file), data.id);
+  return { id: data.id, offset: 0 };
+}
+
+async function uploadResumable(file, onProgress) {
+  let { id, offset } = await getOrCreateUpload(file);
+  let retry = 0;
+
+  while (offset < file.size) {
+    const chunk = file.slice(offset, offset + CHUNK_SIZE);
+    try {
+      const res = await fetch(`/api/uploads/${id}`, {
+        method: 'PATCH',
+        headers: { 'Upload-Offset': String(offset), 'Content-Type': 'application/offset+octet-stream' },
+        body: chunk
+      });
+      if (res.status === 409) {
+        // Offset server beda (misal potongan terakhir sempat masuk), tanya ulang
+        const head = await fetch(`/api/uploads/${id}`, { method: 'HEAD' });
+        offset = parseInt(head.headers.get('Upload-Offset'), 10);
+        continue;
+      }
+      if (res.status === 503) {
+        // Server penuh: tunggu sesuai Retry-After, tidak dihitung sebagai gagal
+        await sleep(1000 * (parseInt(res.headers.get('Retry-After'), 10) || 5));
+        continue;
+      }
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      offset = parseInt(res.headers.get('Upload-Offset'), 10);
+      retry = 0;
+      onProgress(offset, file.size);
+    } catch (err) {
+      if (++retry > MAX_RETRY) throw err;
+      await sleep(Math.min(30000, 1000 * 2 ** retry));
+    }
+  }
+  return id;
+}
+
+document.querySelectorAll('form[enctype="multipart/form-data"]').forEach(form => {
+  form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const button = form.querySelector('button[type="submit"]');
+    const progress = form.querySelector('.upload-progress');
+    button.disabled = true;
+    progress.classList.remove('hidden');
+
+    try {
+      const fd = new FormData();
+      const uploaded = [];
+      for (const el of form.elements) {
+        if (!el.name) continue;
+        if (el.type === 'file') {
+          const file = el.files[0];
+          const label = el.name.replace('_', ' ');
+          const id = await uploadResumable(file, (done, total) => {
+            progress.textContent = `Upload ${label}: ${Math.floor(done * 100 / total)}%`;
+          });
+          fd.append(`${el.name}_upload_id`, id);
+          uploaded.push(file);
+        } else {
+          fd.append(el.name, el.value);
+        }
+      }
+
+      progress.textContent = 'Menyimpan laporan...';
+      const result = await LaporanOutbox.submit(form.action, fd);
+      if (result.state === 'gagal') throw new Error(result.error);
+      uploaded.forEach(file => localStorage.removeItem(uploadKey(file)));
+      if (result.state === 'antri') {
+        progress.textContent = 'Offline: laporan disimpan di perangkat dan dikirim otomatis saat online.';
+        form.reset();
+        button.disabled = false;
+        return;
+      }
+      window.location.href = result.response.url || '/laporan-loading';
+    } catch (err) {
+      if (err instanceof TypeError || !navigator.onLine) {
+        // Sinyal hilang di tengah upload: simpan laporan lengkap (beserta video) di outbox
+        const result = await LaporanOutbox.submit(form.action, new FormData(form)).catch(() => null);
+        if (result && result.state !== 'gagal') {
+          progress.textContent = result.state === 'antri'
+            ? 'Offline: laporan dan video disimpan di perangkat, dikirim otomatis saat online.'
+            : 'Laporan terkirim.';
+          form.reset();
+          button.disabled = false;
+          return;
+        }
+      }
+      progress.textContent = `Upload terputus (${err.message}). Tekan Kirim lagi untuk melanjutkan.`;
+      button.disabled = false;
+    }
+  });
+});
@@ -0,0 +1,84 @@
+    const dropdown = document.getElementById('jenis_laporan');
+    const allForms = document.querySelectorAll('#form-produksi-mulai-container, #form-produksi-selesai-container');
+    const forms = document.querySelectorAll('form');
+
+    // Fungsi untuk memformat angka menjadi dua digit (contoh: 05)
+    function formatTwoDigits(num) {
+      return num < 10 ? '0' + num : num;
+    }
+
+    // Fungsi untuk mengisi tanggal dan waktu saat ini secara otomatis
+    function setInitialDateTime() {
+      const now = new Date();
+      const year = now.getFullYear();
+      const month = formatTwoDigits(now.getMonth() + 1);
+      const day = formatTwoDigits(now.getDate());
+      const hours = formatTwoDigits(now.getHours());
+      const minutes = formatTwoDigits(now.getMinutes());
+      const dateString = `${year}-${month}-${day}`;
+      const timeString = `${hours}:${minutes}`;
+
+      document.querySelectorAll('.tanggal').forEach(el => el.value = dateString);
+      document.querySelectorAll('.jam').forEach(el => el.value = timeString);
+    }
+    
+    // Fungsi untuk menampilkan pesan (sukses atau error)
+    function showMessage(message, type) {
+      const messageBox = document.getElementById('message-box');
+      const messageText = document.getElementById('message-text');
+      messageText.textContent = message;
+      
+      messageBox.classList.remove('hidden', 'bg-green-100', 'bg-red-100', 'border-green-400', 'border-red-400', 'text-green-700', 'text-red-700');
+      
+      if (type === 'error') {
+        messageBox.classList.add('bg-red-100', 'border-red-400', 'text-red-700');
+      } else {
+        messageBox.classList.add('bg-green-100', 'border-green-400', 'text-green-700');
+      }
+      messageBox.classList.remove('hidden');
+      messageBox.scrollIntoView({ behavior: 'smooth' });
+    }
+
+    // Panggil fungsi untuk mengisi tanggal dan waktu saat halaman dimuat
+    setInitialDateTime();
+
+    // Event listener untuk dropdown
+    dropdown.addEventListener('change', () => {
+      allForms.forEach(f => f.classList.add('hidden'));
+      if (dropdown.value) {
+        document.getElementById(dropdown.value).classList.remove('hidden');
+        showMessage(''); // Sembunyikan pesan saat formulir diganti
+        setInitialDateTime();
+      }
+    });
+
+    // Event listener untuk semua formulir
+forms.forEach(form => {
+  form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    
+    const formData = new FormData(e.target);
+    const actionUrl = e.target.action;
+
+    try {
+      const sent = await LaporanOutbox.submit(actionUrl, formData);
+      // Antri = tersimpan di perangkat, dikirim ulang otomatis saat online
+      const result = sent.state === 'antri'
+        ? { success: true, message: 'Offline: laporan disimpan di perangkat dan dikirim otomatis saat online' }
+        : await sent.response.json();
+
+      if (result.success) {
+        showMessage(result.message, 'success');
+        e.target.reset();
+        setInitialDateTime();
+        document.getElementById(e.target.parentNode.id).classList.add('hidden');
+        dropdown.value = "";
+      } else {
+        showMessage('Gagal mengirim laporan!', 'error');
+      }
+    } catch (err) {
+      showMessage('Terjadi error koneksi ke server!', 'error');
+    }
+  });
+});
+  
@@ -0,0 +1,144 @@
+// DOM Elements
+const dropdown = document.getElementById('jenis_laporan');
+const allForms = document.querySelectorAll('#form-masuk-depot, #form-keluar-depot, #form-masuk-laut, #form-keluar-laut');
+const forms = document.querySelectorAll('form');
+const toast = document.getElementById('toast');
+const toastMessage = document.getElementById('toast-message');
+
+// Show/Hide forms based on dropdown
+dropdown.addEventListener('change', () => {
+  allForms.forEach(f => f.classList.add('hidden'));
+  if (dropdown.value) {
+    const selectedForm = document.getElementById(dropdown.value);
+    selectedForm.classList.remove('hidden');
+    // Smooth scroll to form
+    setTimeout(() => {
+      selectedForm.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    }, 100);
+  }
+});
+
+// Auto-fill date and time + lock input
+function formatTwoDigits(num) {
+  return num < 10 ? '0' + num : num;
+}
+
+function setInitialDateTime() {
+  const now = new Date();
+  const year = now.getFullYear();
+  const month = formatTwoDigits(now.getMonth() + 1);
+  const day = formatTwoDigits(now.getDate());
+  const hours = formatTwoDigits(now.getHours());
+  const minutes = formatTwoDigits(now.getMinutes());
+
+  // isi otomatis + kunci field tanggal
+  document.querySelectorAll('.tanggal').forEach(el => {
+    el.value = `${year}-${month}-${day}`;
+    el.setAttribute("readonly", true);
+  });
+
+  // isi otomatis + kunci field jam
+  document.querySelectorAll('.jam').forEach(el => {
+    el.value = `${hours}:${minutes}`;
+    el.setAttribute("readonly", true);
+  });
+}
+
+setInitialDateTime();
+
+// File upload handling
+document.querySelectorAll('input[type="file"]').forEach(input => {
+  input.addEventListener('change', function(e) {
+    const fileName = e.target.files[0]?.name;
+    const fileNameDisplay = e.target.parentElement.querySelector('.file-name');
+    if (fileName && fileNameDisplay) {
+      fileNameDisplay.textContent = `File terpilih: ${fileName}`;
+      fileNameDisplay.style.color = '#10b981';
+    }
+  });
+});
+
+// Show toast notification
+function showToast(message, type = 'success') {
+  toastMessage.textContent = message;
+  toast.classList.remove('success', 'error');
+  toast.classList.add(type);
+  toast.classList.add('show');
+  
+  setTimeout(() => {
+    toast.classList.remove('show');
+  }, 4000);
+}
+
+// Form submission handling
+forms.forEach(form => {
+  form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    
+    const submitBtn = form.querySelector('button[type="submit"]');
+    const spinner = submitBtn.querySelector('.loading-spinner');
+    const btnText = submitBtn.querySelector('span:first-child');
+    
+    // Show loading state
+    spinner.style.display = 'inline-block';
+    btnText.textContent = 'Mengirim...';
+    submitBtn.disabled = true;
+
+    const formData = new FormData(form);
+    const actionUrl = form.action;
+
+    try {
+      const result = await LaporanOutbox.submit(actionUrl, formData);
+
+      if (result.state === 'gagal') {
+        throw new Error('Terjadi kesalahan jaringan atau server.');
+      }
+
+      // Antri = tersimpan di perangkat, dikirim ulang otomatis saat online
+      const data = result.state === 'antri' ? { status: 'success' } : await result.response.json();
+      
+      if (data.status === 'success') {
+        showToast(result.state === 'antri'
+          ? 'Offline: laporan disimpan di perangkat dan dikirim otomatis saat online'
+          : 'Laporan berhasil dikirim!', 'success');
+        
+        // Reset form
+        form.reset();
+        setInitialDateTime();
+        
+        // Clear file names
+        form.querySelectorAll('.file-name').forEach(el => {
+          el.textContent = '';
+        });
+        
+        // Hide form and reset dropdown
+        setTimeout(() => {
+          allForms.forEach(f => f.classList.add('hidden'));
+          dropdown.value = "";
+          window.scrollTo({ top: 0, behavior: 'smooth' });
+        }, 1500);
+      } else {
+        showToast(data.message || 'Terjadi kesalahan saat mengirim laporan', 'error');
+      }
+    } catch (error) {
+      console.error('Error:', error);
+      showToast('Terjadi kesalahan: ' + error.message, 'error');
+    } finally {
+      // Reset button state
+      spinner.style.display = 'none';
+      btnText.textContent = 'Kirim Laporan';
+      submitBtn.disabled = false;
+    }
+  });
+});
+
+// Add input validation feedback
+document.querySelectorAll('input[required], textarea[required]').forEach(input => {
+  input.addEventListener('blur', function() {
+    if (this.value.trim() === '') {
+      this.classList.add('border-red-300');
+    } else {
+      this.classList.remove('border-red-300');
+    }
+  });
+});
@@ -0,0 +1,59 @@
+const dropdown = document.getElementById('jenis_laporan');
+const allForms = document.querySelectorAll('#form-kirim, #form-bongkar');
+const forms = document.querySelectorAll('form');
+
+// Ganti form sesuai dropdown
+dropdown.addEventListener('change', () => {
+  allForms.forEach(f => f.classList.add('hidden'));
+  if (dropdown.value) {
+    document.getElementById(dropdown.value).classList.remove('hidden');
+    setInitialDateTime();
+  }
+});
+
+// format dua digit
+function twoDigits(n) { return n < 10 ? '0' + n : n; }
+
+// set tanggal & jam otomatis
+function setInitialDateTime() {
+  const now = new Date();
+  const tanggal = `${now.getFullYear()}-${twoDigits(now.getMonth() + 1)}-${twoDigits(now.getDate())}`;
+  const jam = `${twoDigits(now.getHours())}:${twoDigits(now.getMinutes())}`;
+  document.querySelectorAll('.tanggal').forEach(el => el.value = tanggal);
+  document.querySelectorAll('.jam').forEach(el => el.value = jam);
+}
+
+// update setiap menit
+setInitialDateTime();
+setInterval(setInitialDateTime, 60000);
+
+// Tangani submit form
+forms.forEach(form => {
+  form.addEventListener('submit', (e) => {
+    e.preventDefault();
+    const formData = new FormData(form);
+    const url = form.action;
+
+    LaporanOutbox.submit(url, formData)
+      // Antri = tersimpan di perangkat, dikirim ulang otomatis saat online
+      .then(result => result.state === 'antri' ? { status: "success", antri: true } : result.response.json())
+      .then(data => {
+        if (data.status === "success") {
+          alert(data.antri
+            ? "📥 Offline: laporan disimpan di perangkat dan dikirim otomatis saat online"
+            : "✅ Laporan berhasil dikirim!");
+          form.reset();
+          dropdown.value = "";
+          allForms.forEach(f => f.classList.add('hidden'));
+          setInitialDateTime();
+          window.scrollTo({ top: 0, behavior: 'smooth' });
+        } else {
+          alert("❌ Gagal: " + (data.message || "Terjadi kesalahan"));
+        }
+      })
+      .catch(err => {
+        console.error(err);
+        alert("⚠️ Terjadi error koneksi: " + err.message);
+      });
+  });
+});
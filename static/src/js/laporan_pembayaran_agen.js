@@ -0,0 +1,142 @@
+    let deleteId = null;
+
+    // Filter functionality
+    function filterTable() {
+        const statusFilter = document.getElementById('statusFilter').value;
+        const searchTerm = document.getElementById('searchInput').value.toLowerCase();
+        const rows = document.querySelectorAll('.payment-row');
+        let visibleCount = 0;
+
+        rows.forEach(row => {
+            const status = row.getAttribute('data-status');
+            const searchText = row.getAttribute('data-search').toLowerCase();
+            
+            const matchesStatus = !statusFilter || status === statusFilter;
+            const matchesSearch = !searchTerm || searchText.includes(searchTerm);
+            
+            if (matchesStatus && matchesSearch) {
+                row.style.display = '';
+                visibleCount++;
+            } else {
+                row.style.display = 'none';
+            }
+        });
+
+        // Update showing count
+        document.getElementById('showingCount').textContent = visibleCount;
+    }
+
+    function resetFilters() {
+        document.getElementById('statusFilter').value = '';
+        document.getElementById('searchInput').value = '';
+        filterTable();
+    }
+
+    function exportData() {
+        const table = document.querySelector('table');
+        const rows = [];
+        
+        // Headers
+        const headers = ['ID', 'Nama Agen', 'Driver', 'Jenis Tabung', 'Harga per Unit', 'Jumlah', 'Total Bayar', 'Tanggal', 'Status'];
+        rows.push(headers.join(','));
+        
+        // Visible data rows
+        const visibleRows = Array.from(document.querySelectorAll('.payment-row')).filter(row => row.style.display !== 'none');
+        visibleRows.forEach(row => {
+            const cells = row.querySelectorAll('td');
+            const rowData = [
+                cells[0].textContent.trim(),
+                cells[1].querySelector('.agen-name').textContent.trim(),
+                cells[1].querySelector('.driver-name').textContent.replace('👔', '').trim(),
+                cells[2].textContent.trim(),
+                cells[3].textContent.trim(),
+                cells[4].textContent.trim(),
+                cells[5].textContent.trim(),
+                cells[6].textContent.trim(),
+                cells[7].querySelector('.badge').textContent.trim()
+            ];
+            rows.push(rowData.join(','));
+        });
+        
+        // Create and download CSV
+        const csvContent = rows.join('\n');
+        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        
+        a.href = url;
+        a.download = 'laporan_pembayaran_agen_' + new Date().toISOString().slice(0,10) + '.csv';
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+        window.URL.revokeObjectURL(url);
+    }
+
+    // Function to handle modal preview
+    function showBuktiPreview(buktiUrl) {
+        const modalImage = document.getElementById('previewImage');
+        const downloadLink = document.getElementById('downloadLink');
+
+        modalImage.src = buktiUrl;
+        downloadLink.href = buktiUrl;
+    }
+
+    // Function to show delete confirmation modal
+    function confirmDelete(id, namaAgen) {
+        deleteId = id;
+        document.getElementById('deleteItemName').textContent = namaAgen || 'Item ini';
+        
+        // Show the modal
+        const deleteModal = new bootstrap.Modal(document.getElementById('deleteConfirmModal'));
+        deleteModal.show();
+    }
+
+    // Function to handle actual delete
+    function executeDelete() {
+        if (!deleteId) return;
+
+        // Show loading state
+        const confirmBtn = document.getElementById('confirmDeleteBtn');
+        const originalText = confirmBtn.innerHTML;
+        confirmBtn.innerHTML = '<i class="fas fa-spinner fa-spin me-1"></i>Menghapus...';
+        confirmBtn.disabled = true;
+
+
+
+
+
+        
+        // Make delete request
+fetch(`/api/pembayaran-agen/${deleteId}`, {
+    method: 'DELETE',
+    headers: {
+        'Content-Type': 'application/json',
+        'X-Requested-With': 'XMLHttpRequest'
+    }
+})
+        .then(response => {
+            if (response.ok) {
+                // Success - reload page or remove row
+                location.reload();
+            } else {
+                throw new Error('Gagal menghapus data');
+            }
+        })
+        .catch(error => {
+            alert('Terjadi kesalahan: ' + error.message);
+            confirmBtn.innerHTML = originalText;
+            confirmBtn.disabled = false;
+        });
+    }
+
+    // Event listeners
+    document.addEventListener('DOMContentLoaded', function() {
+        document.getElementById('statusFilter').addEventListener('change', filterTable);
+        document.getElementById('searchInput').addEventListener('input', filterTable);
+        
+        // Delete confirmation button
+        document.getElementById('confirmDeleteBtn').addEventListener('click', executeDelete);
+        
+        // Initial count
+        filterTable();
+    });
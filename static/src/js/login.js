@@ -0,0 +1,8 @@
+document.querySelector('form').addEventListener('submit', function(e) {
+  const submitBtn = document.querySelector('.btn-login');
+  submitBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>Memproses...';
+  submitBtn.disabled = true;
+});
+
+// Auto-focus on username field
+document.getElementById('username').focus();
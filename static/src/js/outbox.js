@@ -0,0 +1,182 @@
+// ================== OUTBOX LAPORAN (IndexedDB) ==================
+// Laporan yang gagal terkirim (sinyal hilang, server sibuk) disimpan di
+// IndexedDB beserta file/foto/videonya, lalu dikirim ulang dengan backoff
+// saat koneksi kembali. Setiap kiriman membawa header Idempotency-Key yang
+// sama di setiap percobaan, jadi server tidak membuat laporan dobel walaupun
+// respons percobaan sebelumnya tidak sempat diterima.
+//
+// Dipakai di halaman form (window) dan di service worker (self), lewat
+// self.LaporanOutbox.
+(function (scope) {
+  const DB_NAME = 'laporan-outbox';
+  const STORE = 'kiriman';
+  const SYNC_TAG = 'laporan-outbox';
+  const BASE_DELAY = 5000;              // ms, percobaan ulang pertama
+  const MAX_DELAY = 10 * 60 * 1000;     // ms, jeda terpanjang
+  // Status yang layak dicoba lagi; 401 = sesi habis, berhasil setelah login ulang
+  const RETRY_STATUS = [401, 408, 409, 425, 429, 500, 502, 503, 504];
+  const channel = scope.BroadcastChannel ? new BroadcastChannel(DB_NAME) : null;
+
+  function openDb() {
+    return new Promise((resolve, reject) => {
+      const req = indexedDB.open(DB_NAME, 1);
+      req.onupgradeneeded = () => req.result.createObjectStore(STORE, { keyPath: 'key' });
+      req.onsuccess = () => resolve(req.result);
+      req.onerror = () => reject(req.error);
+    });
+  }
+
+  function withStore(mode, fn) {
+    return openDb().then(db => new Promise((resolve, reject) => {
+      const tx = db.transaction(STORE, mode);
+      const req = fn(tx.objectStore(STORE));
+      tx.oncomplete = () => { db.close(); resolve(req ? req.result : undefined); };
+      tx.onerror = tx.onabort = () => { db.close(); reject(tx.error); };
+    }));
+  }
+
+  const put = entry => withStore('readwrite', store => store.put(entry));
+  const remove = key => withStore('readwrite', store => store.delete(key));
+  const all = () => withStore('readonly', store => store.getAll());
+
+  function newKey() {
+    if (scope.crypto && scope.crypto.randomUUID) return scope.crypto.randomUUID().replace(/-/g, '');
+    return Date.now().toString(36) + Math.random().toString(36).slice(2, 14);
+  }
+
+  // FormData tidak bisa disimpan langsung; Blob/File bisa
+  function serialize(formData) {
+    const fields = [];
+    formData.forEach((value, name) => {
+      if (value instanceof Blob) {
+        fields.push({ name, blob: value, filename: value.name || '', type: value.type });
+      } else {
+        fields.push({ name, value });
+      }
+    });
+    return fields;
+  }
+
+  function toFormData(fields) {
+    const formData = new FormData();
+    fields.forEach(f => {
+      if (f.blob !== undefined) formData.append(f.name, f.blob, f.filename);
+      else formData.append(f.name, f.value);
+    });
+    return formData;
+  }
+
+  function backoff(attempts, retryAfter) {
+    const delay = Math.min(MAX_DELAY, BASE_DELAY * Math.pow(2, attempts));
+    const wait = delay / 2 + Math.random() * delay / 2;
+    return Math.max(wait, (parseInt(retryAfter, 10) || 0) * 1000);
+  }
+
+  function notify() {
+    if (channel) channel.postMessage('berubah');
+    if (scope.dispatchEvent && scope.CustomEvent) scope.dispatchEvent(new CustomEvent('outbox-change'));
+  }
+
+  async function reschedule(entry, error, retryAfter) {
+    entry.attempts += 1;
+    entry.nextAttempt = Date.now() + backoff(entry.attempts, retryAfter);
+    entry.error = error;
+    await put(entry);
+    return { state: 'antri', error };
+  }
+
+  // Satu percobaan kirim: {state: 'terkirim' | 'antri' | 'gagal', response?, error?}
+  async function attempt(entry) {
+    let response;
+    try {
+      response = await fetch(entry.url, {
+        method: 'POST',
+        body: toFormData(entry.fields),
+        credentials: 'same-origin',
+        headers: { 'Idempotency-Key': entry.key },
+      });
+    } catch (err) {
+      return reschedule(entry, 'Tidak ada koneksi');
+    }
+    if (response.redirected && new URL(response.url).pathname === '/login') {
+      return reschedule(entry, 'Sesi login habis');
+    }
+    if (response.ok) {
+      await remove(entry.key);
+      return { state: 'terkirim', response };
+    }
+    if (RETRY_STATUS.includes(response.status)) {
+      return reschedule(entry, 'HTTP ' + response.status, response.headers.get('Retry-After'));
+    }
+    // Ditolak server (validasi, file terlalu besar): mengulang tidak akan berhasil
+    entry.failed = true;
+    entry.error = 'HTTP ' + response.status;
+    await put(entry);
+    return { state: 'gagal', response, error: entry.error };
+  }
+
+  function requestSync() {
+    if (!scope.navigator || !navigator.serviceWorker) return;
+    navigator.serviceWorker.ready
+      .then(reg => reg.sync && reg.sync.register(SYNC_TAG))
+      .catch(() => {});
+  }
+
+  // Simpan dulu, baru kirim: kalau tab ditutup di tengah jalan laporan tetap ada
+  async function submit(url, formData) {
+    const entry = {
+      key: newKey(), url: new URL(url, scope.location.href).href, fields: serialize(formData),
+      created: Date.now(), attempts: 0, nextAttempt: 0,
+    };
+    if (!scope.indexedDB) {
+      const response = await fetch(entry.url, {
+        method: 'POST', body: formData, credentials: 'same-origin',
+        headers: { 'Idempotency-Key': entry.key },
+      });
+      return { state: response.ok ? 'terkirim' : 'gagal', response };
+    }
+    await put(entry);
+    const result = await attempt(entry);
+    if (result.state === 'antri') requestSync();
+    notify();
+    return result;
+  }
+
+  let running = null;
+
+  // Kirim semua entri yang sudah waktunya; berhenti di entri pertama yang masih offline
+  function flush() {
+    if (!running) {
+      running = (async () => {
+        let sent = 0;
+        const now = Date.now();
+        const entries = (await all()).sort((a, b) => a.created - b.created);
+        for (const entry of entries) {
+          if (entry.failed || entry.nextAttempt > now) continue;
+          const result = await attempt(entry);
+          if (result.state === 'terkirim') sent += 1;
+          else if (result.state === 'antri' && result.error === 'Tidak ada koneksi') break;
+        }
+        notify();
+        return sent;
+      })().finally(() => { running = null; });
+    }
+    return running;
+  }
+
+  async function summary() {
+    const entries = scope.indexedDB ? await all() : [];
+    return {
+      antri: entries.filter(e => !e.failed).length,
+      gagal: entries.filter(e => e.failed).length,
+      entries,
+    };
+  }
+
+  async function discard(key) {
+    await remove(key);
+    notify();
+  }
+
+  scope.LaporanOutbox = { submit, flush, summary, discard, SYNC_TAG, channel };
+})(self);
@@ -0,0 +1,40 @@
+// ================== PWA: SERVICE WORKER & STATUS OUTBOX ==================
+// Mendaftarkan service worker (/sw.js), mengirim ulang isi outbox saat
+// online / halaman dibuka / berkala, dan menampilkan jumlah laporan yang
+// masih menunggu di pojok kiri bawah.
+(function () {
+  const FLUSH_INTERVAL = 30000;   // ms
+
+  if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+      navigator.serviceWorker.register('/sw.js').catch(err => console.warn('Service worker gagal didaftarkan:', err));
+    });
+  }
+
+  const badge = document.createElement('button');
+  badge.type = 'button';
+  badge.title = 'Kirim ulang sekarang';
+  badge.style.cssText = 'position:fixed;left:16px;bottom:16px;z-index:9999;display:none;padding:8px 14px;' +
+    'border:none;border-radius:999px;background:#f97316;color:#fff;font-size:14px;box-shadow:0 4px 12px rgba(0,0,0,.2);cursor:pointer';
+  badge.addEventListener('click', () => LaporanOutbox.flush());
+
+  async function render() {
+    const { antri, gagal } = await LaporanOutbox.summary();
+    const parts = [];
+    if (antri) parts.push(`${antri} laporan menunggu dikirim`);
+    if (gagal) parts.push(`${gagal} ditolak server`);
+    badge.textContent = '📤 ' + parts.join(', ');
+    badge.style.background = gagal && !antri ? '#ef4444' : '#f97316';
+    badge.style.display = parts.length ? 'block' : 'none';
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.body.appendChild(badge);
+    render();
+    LaporanOutbox.flush();
+  });
+  window.addEventListener('online', () => LaporanOutbox.flush());
+  window.addEventListener('outbox-change', render);
+  if (LaporanOutbox.channel) LaporanOutbox.channel.onmessage = render;
+  setInterval(() => { if (navigator.onLine) LaporanOutbox.flush(); }, FLUSH_INTERVAL);
+})();
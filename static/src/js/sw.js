@@ -0,0 +1,99 @@
+// ================== SERVICE WORKER ==================
+// Dikirim lewat /sw.js; server menambahkan self.SW_CONFIG di awal file:
+//   versi  - hash manifest aset, cache lama dibuang kalau berubah
+//   shell  - halaman form yang disimpan untuk dibuka offline
+//   aset   - URL CSS/JS versi hash (immutable)
+//   outbox - URL outbox.js (antrian laporan offline)
+// Halaman form: network-first, fallback ke cache. Aset /static/dist:
+// cache-first. Script/CSS dari CDN: stale-while-revalidate. POST tidak
+// disentuh; laporan offline diurus outbox (dikirim ulang juga dari event
+// sync di sini).
+const CONFIG = self.SW_CONFIG;
+const CACHE = 'laporan-' + CONFIG.versi;
+
+importScripts(CONFIG.outbox);
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE);
+    await cache.addAll(CONFIG.aset);
+    // Halaman form butuh login; yang gagal/redirect ke login dilewati
+    await Promise.all(CONFIG.shell.map(async url => {
+      try {
+        const response = await fetch(url, { credentials: 'same-origin' });
+        if (response.ok && !response.redirected) await cache.put(url, response);
+      } catch (err) {
+        // offline saat install: halaman disimpan saat pertama kali dibuka
+      }
+    }));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    const names = await caches.keys();
+    await Promise.all(names.filter(n => n.startsWith('laporan-') && n !== CACHE).map(n => caches.delete(n)));
+    await self.clients.claim();
+  })());
+});
+
+async function networkFirst(request) {
+  const cache = await caches.open(CACHE);
+  try {
+    const response = await fetch(request);
+    if (response.ok && !response.redirected) cache.put(request, response.clone());
+    return response;
+  } catch (err) {
+    const cached = await cache.match(request, { ignoreSearch: true });
+    if (cached) return cached;
+    throw err;
+  }
+}
+
+async function cacheFirst(request) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+  const response = await fetch(request);
+  if (response.ok) cache.put(request, response.clone());
+  return response;
+}
+
+async function staleWhileRevalidate(request) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(request);
+  const fresh = fetch(request).then(response => {
+    if (response.ok || response.type === 'opaque') cache.put(request, response.clone());
+    return response;
+  });
+  if (cached) {
+    fresh.catch(() => {});
+    return cached;
+  }
+  return fresh;
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+  if (url.origin === self.location.origin) {
+    if (request.mode === 'navigate' && CONFIG.shell.includes(url.pathname)) {
+      event.respondWith(networkFirst(request));
+    } else if (url.pathname.startsWith('/static/dist/')) {
+      event.respondWith(cacheFirst(request));
+    }
+  } else if (request.destination === 'script' || request.destination === 'style') {
+    event.respondWith(staleWhileRevalidate(request));
+  }
+});
+
+self.addEventListener('sync', event => {
+  if (event.tag === LaporanOutbox.SYNC_TAG) {
+    // Gagal = browser menjadwalkan sync lagi nanti
+    event.waitUntil(LaporanOutbox.flush().then(async () => {
+      if ((await LaporanOutbox.summary()).antri) throw new Error('Masih ada laporan di antrian');
+    }));
+  }
+});
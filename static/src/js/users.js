@@ -0,0 +1,78 @@
+// Data user diambil per halaman dari /api/users (lihat directory.js)
+let directory = null;
+
+function pad(n) {
+    return String(n).padStart(2, '0');
+}
+
+// Satu baris tabel (sama dengan markup lama di template)
+function renderUser(user) {
+    const roles = {
+        admin: ['role-admin', 'fa-crown', 'Admin'],
+        lapangan: ['role-lapangan', 'fa-hard-hat', 'Lapangan'],
+    };
+    const roleName = user.role ? user.role[0].toUpperCase() + user.role.slice(1) : 'User';
+    const [roleClass, roleIcon, roleLabel] = roles[user.role] || ['role-user', 'fa-user', roleName];
+    const created = user.created_at ? new Date(user.created_at) : null;
+
+    return h('tr', { className: 'user-row' },
+        h('td', {}, h('span', { className: 'id-badge' }, user.id)),
+        h('td', {}, h('div', { className: 'user-info' },
+            h('div', { className: 'user-avatar-sm' }, user.username ? user.username[0].toUpperCase() : 'U'),
+            h('div', { className: 'user-details' }, h('div', { className: 'username' }, user.username || '-')))),
+        h('td', {}, h('div', { className: 'email-display' }, user.email
+            ? [h('i', { className: 'fas fa-envelope text-muted me-2' }), user.email]
+            : h('span', { className: 'text-muted' }, '-'))),
+        h('td', {}, h('span', { className: 'badge ' + roleClass }, h('i', { className: `fas ${roleIcon} me-1` }), roleLabel)),
+        h('td', {}, h('div', { className: 'date-display' },
+            h('i', { className: 'fas fa-calendar-alt text-muted me-2' }),
+            created
+                ? [`${pad(created.getDate())}/${pad(created.getMonth() + 1)}/${created.getFullYear()}`,
+                   h('small', { className: 'text-muted d-block' }, `${pad(created.getHours())}:${pad(created.getMinutes())}`)]
+                : h('span', { className: 'text-muted' }, '-'))),
+        h('td', {}, h('div', { className: 'action-buttons' },
+            h('a', { href: `/users/edit/${user.id}`, className: 'btn btn-sm btn-outline-primary', title: 'Edit User' },
+                h('i', { className: 'fas fa-edit' })),
+            h('a', {
+                href: `/users/delete/${user.id}`, className: 'btn btn-sm btn-outline-danger', title: 'Hapus User',
+                onclick: e => { if (!confirm(`Apakah Anda yakin ingin menghapus user ${user.username}?`)) e.preventDefault(); },
+            }, h('i', { className: 'fas fa-trash-alt' })))));
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    const table = document.getElementById('userTable');
+    directory = createDirectory({
+        url: '/api/users',
+        table,
+        tbody: table.querySelector('tbody'),
+        sort: 'username',
+        filters: () => ({
+            q: document.getElementById('searchInput').value.trim(),
+            role: document.getElementById('roleFilter').value,
+        }),
+        renderRow: renderUser,
+        emptyText: 'Belum ada data user',
+        ids: { start: 'showingStart', end: 'showingEnd', total: 'totalRows', page: 'currentPageSpan',
+               pages: 'totalPagesSpan', prev: 'prevBtn', next: 'nextBtn' },
+    });
+
+    document.getElementById('searchInput').addEventListener('input', directory.reload);
+    document.getElementById('roleFilter').addEventListener('change', () => directory.load(1));
+    directory.load(1);
+});
+
+// Reset Filters
+function resetFilters() {
+    document.getElementById('searchInput').value = '';
+    document.getElementById('roleFilter').value = '';
+    directory.load(1);
+}
+
+// Export to Excel Function: semua user yang cocok dengan filter
+async function exportToExcel() {
+    const items = await directory.all();
+    downloadCsv('data_user_spbe_' + new Date().toISOString().slice(0,10) + '.csv',
+        ['ID', 'Username', 'Email', 'Role', 'Tanggal Daftar'],
+        items.map(u => [u.id, u.username, u.email, u.role, u.created_at]));
+}
@@ -0,0 +1,154 @@
+"""
+Lapisan template Jinja: bytecode cache di disk dan cache fragmen per baris.
+
+- Bytecode cache (FileSystemBytecodeCache) menyimpan hasil kompilasi template
+  di .jinja_cache/, jadi worker baru tidak perlu parse ulang template besar.
+- Tag {% cache key %}...{% endcache %} menyimpan HTML hasil render satu blok.
+  Key dibuat dari (jenis, id, versi update tabel); versi update hanya naik
+  saat baris diubah/dihapus (lihat crud._touch_updated), bukan saat ada insert,
+  jadi laporan baru tidak membuat baris lama dirender ulang.
+- Global asset('css/base.css') memberi URL aset statis versi hash (assets.py).
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Undefined, nodes
+from jinja2.ext import Extension
+
+import assets
+import cache
+import crud
+
+BYTECODE_CACHE_DIR = ".jinja_cache"
+MAX_FRAGMENTS = 200_000
+
+# Field yang ditampilkan per jenis laporan di dashboard Merak/Semarang
+DISPLAY_FIELDS = {
+    "Skid Masuk Depot": ['rit', 'jam_masuk'],
+    "Skid Keluar Depot": ['jam_keluar', 'jumlah_spa'],
+    "Skid Masuk Laut": ['jam_masuk', 'petugas_loading'],
+    "Skid Keluar Laut": ['jam_keluar', 'catatan'],
+    "Skid Masuk Lumbung": ['jam_masuk', 'petugas_loading'],
+    "Skid Keluar Lumbung": ['jam_keluar', 'catatan'],
+    "Sebelum Loading": ['penanggung_jawab', 'jam_mulai', 'netto_spa', 'rotogen_kanan', 'rotogen_kiri'],
+    "Sesudah Loading": ['penanggung_jawab', 'jam_selesai'],
+    "Produksi Mulai": ['kepala_produksi', 'jam_mulai'],
+    "Produksi Selesai": ['kepala_produksi', 'jam_selesai', 'tabung_kosong', 'tabung_12', 'tabung_50', 'keterangan'],
+    "Laporan Kirim": ['plat_mobil', 'jam_berangkat', 'kapasitas', 'jenis_tabung', 'jumlah_dibawa', 'jumlah_turun', 'tujuan', 'alamat', 'kondisi_tabung', 'keterangan'],
+    "Laporan Bongkar": ['jam_bongkar', 'jenis_tabung', 'jumlah_terbawa', 'jumlah_turun', 'sisa_dibawa', 'jumlah_kosong', 'kondisi_tabung', 'nama_pangkalan', 'alamat_pangkalan', 'catatan'],
+}
+
+
+# ================== FRAGMENT CACHE ==================
+class FragmentLRU:
+    """LRU di memori untuk potongan HTML yang sudah dirender"""
+
+    def __init__(self, max_entries: int = MAX_FRAGMENTS):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value: str):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache key %} ... {% endcache %}  -- key harus hashable (tuple)"""
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentLRU())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_cache_support", args), [], [], body
+        ).set_lineno(lineno)
+
+    def _cache_support(self, key, caller):
+        # Versi tidak dikirim route -> jangan cache, key-nya tidak bisa dipercaya
+        if any(isinstance(part, Undefined) for part in key):
+            return caller()
+        store = self.environment.fragment_cache
+        rv = store.get(key)
+        if rv is None:
+            rv = caller()
+            store.set(key, rv)
+        return rv
+
+
+# ================== FACTORY ==================
+def create_templates(directory: str = "templates") -> Jinja2Templates:
+    os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+    # Environment disiapkan sendiri: opsi env lewat Jinja2Templates(**kwargs) sudah deprecated di Starlette
+    env = Environment(
+        loader=FileSystemLoader(directory),
+        autoescape=True,
+        extensions=[FragmentCacheExtension],
+        bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_DIR),
+    )
+    templates = Jinja2Templates(env=env)
+    templates.env.globals["DISPLAY_FIELDS"] = DISPLAY_FIELDS
+    templates.env.globals["asset"] = assets.asset
+    return templates
+
+
+_templates = None
+_templates_lock = threading.Lock()
+
+def get_templates() -> Jinja2Templates:
+    """Environment template bersama, dibuat saat pertama kali dipakai"""
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                _templates = create_templates("templates")
+    return _templates
+
+
+def versi_laporan() -> dict:
+    """Versi update per jenis laporan (key fragmen dashboard Merak/Semarang)"""
+    versions = update_versions(crud.LAPORAN_TABLES)
+    return {jenis: versions[model.__tablename__] for model, (jenis, _) in crud.JENIS_LAPORAN.items()}
+
+
+def update_versions(tables: Iterable[str]) -> dict:
+    """Versi update per tabel untuk key fragmen (0 kalau cache tidak tersedia)"""
+    tables = list(tables)
+    try:
+        versions = cache.get_cache().get_versions([f"{t}:update" for t in tables])
+    except Exception as e:
+        print(f"Error membaca versi tabel: {e}")
+        # Tanpa versi yang valid, key unik per request supaya tidak ada data basi
+        return {t: object() for t in tables}
+    return {t: versions[f"{t}:update"] for t in tables}